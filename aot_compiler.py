@@ -1,30 +1,192 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+"""
+Compilador AOT (Ahead-of-Time) do NajaScript usando LLVM
+
+Gera um executável nativo a partir da AST de um programa. Os valores são
+dinâmicos como no interpretador: cada variável, argumento e resultado é um
+ponteiro para um valor do runtime em C (naja_runtime.c), com contagem de
+referências, e as operações viram chamadas às funções naja_* dele. O
+runtime é compilado junto com o objeto gerado por _link_executable.
+
+Protocolo de referências do código gerado: toda expressão produz uma
+referência própria, que é liberada depois de usada; argumentos de funções
+do usuário são entregues ao chamado, que os guarda nas variáveis locais e
+libera todas elas ao retornar. Valores imortais (constantes, booleanos e
+None) dispensam a liberação.
+
+Funções, variáveis, if/elif/else, while, for, break/continue, listas,
+dicionários, strings e os métodos e funções nativas do interpretador são
+suportados; classes, flux, try, switch, match e outros módulos não.
+"""
+
 import os
-import sys
-import ctypes
+import hashlib
 import platform
-import tempfile
 import subprocess
-from enum import Enum, auto
 
 import llvmlite.binding as llvm
 import llvmlite.ir as ir
 from ast_nodes import *
+from lexer import TokenType
 
-# Inicializa o LLVM
-llvm.initialize()
+# Inicializa o LLVM (versões recentes do llvmlite fazem isso sozinhas)
+try:
+    llvm.initialize()
+except RuntimeError:
+    pass
 llvm.initialize_native_target()
 llvm.initialize_native_asmprinter()
 
-class DataType(Enum):
-    """Tipos de dados suportados pelo compilador AOT"""
-    INT = auto()
-    FLOAT = auto()
-    BOOL = auto()
-    STRING = auto()
-    VOID = auto()
+# Runtime ligado a todos os executáveis
+RUNTIME_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "naja_runtime.c")
+
+# Todo valor (e toda string C) é um ponteiro opaco
+_VALUE = ir.IntType(8).as_pointer()
+_INT = ir.IntType(32)
+_INT64 = ir.IntType(64)
+_DOUBLE = ir.DoubleType()
+_VOID = ir.VoidType()
+_NULL = ir.Constant(_VALUE, None)
+
+_BINARY = (_VALUE, (_VALUE, _VALUE))
+_UNARY = (_VALUE, (_VALUE,))
+
+# Funções do runtime: nome -> (tipo de retorno, tipos dos parâmetros)
+_RUNTIME_FUNCTIONS = {
+    "naja_init": (_VOID, ()),
+    "naja_finish": (_INT, ()),
+    "naja_incref": (_VOID, (_VALUE,)),
+    "naja_decref": (_VOID, (_VALUE,)),
+    "naja_load": _BINARY,
+    "naja_release_assigned": (_VOID, (_VALUE, _VALUE)),
+    "naja_raise": (_VOID, (_VALUE,)),
+    "naja_none": (_VALUE, ()),
+    "naja_bool": (_VALUE, (_INT,)),
+    "naja_const_int": (_VALUE, (_INT64,)),
+    "naja_const_float": (_VALUE, (_DOUBLE,)),
+    "naja_const_string": (_VALUE, (_VALUE, _INT64)),
+    "naja_truthy": (_INT, (_VALUE,)),
+    "naja_add": _BINARY,
+    "naja_inplace_add": _BINARY,
+    "naja_sub": _BINARY,
+    "naja_mul": _BINARY,
+    "naja_div": _BINARY,
+    "naja_mod": _BINARY,
+    "naja_pow": _BINARY,
+    "naja_eq": _BINARY,
+    "naja_ne": _BINARY,
+    "naja_lt": _BINARY,
+    "naja_le": _BINARY,
+    "naja_gt": _BINARY,
+    "naja_ge": _BINARY,
+    "naja_and": _BINARY,
+    "naja_or": _BINARY,
+    "naja_neg": _UNARY,
+    "naja_not": _UNARY,
+    "naja_str": _UNARY,
+    "naja_print": (_VOID, (_VALUE, _INT)),
+    "naja_print_end": (_VOID, (_INT,)),
+    "naja_list_new": (_VALUE, (_INT64,)),
+    "naja_list_append": (_VOID, (_VALUE, _VALUE)),
+    "naja_dict_new": (_VALUE, ()),
+    "naja_dict_append": (_VOID, (_VALUE, _VALUE)),
+    "naja_default": (_VALUE, (_VALUE, _INT)),
+    "naja_method": (_VALUE, (_VALUE, _INT, _VALUE, _INT64, _VALUE.as_pointer())),
+    "naja_get_attr": _BINARY,
+    "naja_builtin_input": _UNARY,
+    "naja_builtin_abs": _UNARY,
+    "naja_builtin_round": _UNARY,
+    "naja_builtin_round2": _BINARY,
+    "naja_builtin_sqrt": _UNARY,
+    "naja_builtin_min": _BINARY,
+    "naja_builtin_max": _BINARY,
+}
+
+_BINARY_OPERATORS = {
+    "+": "naja_add",
+    "-": "naja_sub",
+    "*": "naja_mul",
+    "/": "naja_div",
+    "%": "naja_mod",
+    "**": "naja_pow",
+    "==": "naja_eq",
+    "!=": "naja_ne",
+    "<": "naja_lt",
+    "<=": "naja_le",
+    ">": "naja_gt",
+    ">=": "naja_ge",
+    "&&": "naja_and",
+    "and": "naja_and",
+    "||": "naja_or",
+    "or": "naja_or",
+}
+
+_COMPOUND_OPERATORS = {
+    TokenType.PLUS_ASSIGN: "naja_inplace_add",
+    TokenType.MINUS_ASSIGN: "naja_sub",
+    TokenType.MULTIPLY_ASSIGN: "naja_mul",
+    TokenType.DIVIDE_ASSIGN: "naja_div",
+    TokenType.MODULO_ASSIGN: "naja_mod",
+    TokenType.POWER_ASSIGN: "naja_pow",
+}
+
+# Funções do runtime que sempre retornam True, False ou None (imortais)
+_IMMORTAL_RESULTS = {
+    "naja_none", "naja_bool", "naja_eq", "naja_ne", "naja_lt", "naja_le",
+    "naja_gt", "naja_ge", "naja_and", "naja_or", "naja_not",
+}
+
+# Funções nativas de um argumento
+_UNARY_BUILTINS = {
+    "str": "naja_str",
+    "toString": "naja_str",
+    "abs": "naja_builtin_abs",
+    "sqrt": "naja_builtin_sqrt",
+}
+
+# Valor padrão das declarações sem valor (NAJA_DEFAULT_* do runtime)
+_DEFAULT_KINDS = {"int": 1, "float": 2, "string": 3, "bool": 4, "list": 5, "dict": 6}
+
+# Métodos nativos (NAJA_METHOD_* do runtime)
+_METHOD_IDS = {"length": 0, "get": 1, "add": 2, "remove": 3, "removeLast": 4, "substring": 5}
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+def runtime_cache_dir():
+    """Diretório do runtime pré-compilado (~/.cache/najascript/aot)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "najascript", "aot")
+
+
+def runtime_object(cc="gcc"):
+    """Objeto do runtime, compilado na primeira vez e reutilizado pelas ligações seguintes
+
+    O nome do arquivo inclui um hash do fonte, então mudanças no runtime
+    geram um objeto novo. Se o cache não puder ser gravado, retorna o
+    próprio fonte, que é compilado junto na ligação.
+    """
+    with open(RUNTIME_SOURCE, "rb") as file:
+        digest = hashlib.sha256(file.read() + cc.encode()).hexdigest()[:16]
+    path = os.path.join(runtime_cache_dir(), f"naja_runtime-{digest}.o")
+    if os.path.isfile(path):
+        return path
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(runtime_cache_dir(), exist_ok=True)
+    except OSError:
+        return RUNTIME_SOURCE
+    subprocess.check_call([cc, "-O2", "-c", RUNTIME_SOURCE, "-o", temp_path])
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+        return RUNTIME_SOURCE
+    return path
+
 
 class AOTCompiler:
     """
@@ -35,23 +197,30 @@ class AOTCompiler:
         self.module = None
         self.builder = None
         self.function = None
-        self.local_vars = {}
-        self.global_vars = {}
         self.func_symtab = {}
-        
+        self.global_vars = {}
+    
     def _get_default_triple(self):
         """Obtém o triple padrão para a plataforma atual"""
         return llvm.get_default_triple()
-        
+    
     def compile(self, ast_program, output_file=None, optimize=True):
         """
         Compila um programa AST para código nativo
+        
+        Com output_file gera o executável (ou só o objeto, se terminar em .o)
+        e retorna o caminho dele; sem, retorna o IR LLVM do programa.
         """
         # Cria um novo módulo LLVM
         self.module = ir.Module(name="najascript_module")
         self.module.triple = self.target_triple
+        self.func_symtab = {}
+        self.global_vars = {}
+        self.constants = {}
+        self.c_strings = {}
+        self.immortal = set()
         
-        # Processa as declarações de função e variáveis globais
+        # Declara as funções antes de compilar, para permitir chamadas adiantadas
         self._declare_functions(ast_program)
         
         # Compila as funções
@@ -59,9 +228,8 @@ class AOTCompiler:
             if isinstance(statement, FunctionDeclaration):
                 self._compile_function(statement)
         
-        # Adiciona função main se não existir
-        if "main" not in self.func_symtab:
-            self._create_main_function(ast_program)
+        # O código de nível superior vira a função main do executável
+        self._create_main_function(ast_program)
         
         # Verifica o módulo LLVM
         llvm_module = llvm.parse_assembly(str(self.module))
@@ -75,149 +243,490 @@ class AOTCompiler:
         if output_file:
             return self._generate_output(llvm_module, output_file)
         else:
-            return str(self.module)
+            return str(llvm_module)
     
     def _declare_functions(self, ast_program):
         """
-        Declara todas as funções e variáveis globais
+        Declara as funções de nível superior (naja_user_<nome>, uma referência por parâmetro)
         """
         for statement in ast_program.statements:
             if isinstance(statement, FunctionDeclaration):
-                # Cria a declaração da função no LLVM
-                func_name = statement.name
-                return_type = self._convert_type(statement.return_type)
-                
-                # Determina os tipos dos parâmetros
-                param_types = [self._convert_type(param.var_type) for param in statement.parameters]
-                
-                # Cria o tipo de função
-                func_type = ir.FunctionType(return_type, param_types)
-                
-                # Declara a função no módulo
-                func = ir.Function(self.module, func_type, name=func_name)
-                
-                # Armazena a função na tabela de símbolos
-                self.func_symtab[func_name] = func
-                
-            elif isinstance(statement, VarDeclaration) and not isinstance(statement.value, FunctionDeclaration):
-                # Declara variáveis globais
-                var_name = statement.name
-                var_type = self._convert_type(statement.var_type)
-                
-                # Cria uma variável global
-                global_var = ir.GlobalVariable(self.module, var_type, name=var_name)
-                global_var.linkage = 'common'
-                global_var.initializer = ir.Constant(var_type, None)
-                
-                # Armazena na tabela de símbolos globais
-                self.global_vars[var_name] = global_var
+                if statement.name in self.func_symtab:
+                    raise Exception(f"Redeclaração da função '{statement.name}' não suportada pelo compilador AOT")
+                func_type = ir.FunctionType(_VALUE, [_VALUE] * len(statement.parameters))
+                func = ir.Function(self.module, func_type, name=f"naja_user_{statement.name}")
+                func.linkage = "internal"
+                self.func_symtab[statement.name] = func
+    
+    def _begin_function(self, function):
+        """
+        Prepara a compilação do corpo de uma função LLVM
+        
+        As variáveis locais são allocas no bloco de entrada, iniciadas com
+        NULL (variável ainda não definida); o bloco de entrada só salta para
+        o corpo em _end_function, depois que todas foram criadas.
+        """
+        self.function = function
+        entry_block = function.append_basic_block("entry")
+        self.entry_builder = ir.IRBuilder(entry_block)
+        self.body_block = function.append_basic_block("body")
+        self.builder = ir.IRBuilder(self.body_block)
+        self.slots = []
+        self.scopes = []
+        self.loops = []
+    
+    def _end_function(self):
+        """Encerra o bloco de entrada da função em compilação"""
+        self.entry_builder.branch(self.body_block)
     
     def _compile_function(self, ast_function):
         """
         Compila uma função AST para código LLVM
-        """
-        # Obtém a função LLVM
-        func_name = ast_function.name
-        func = self.func_symtab[func_name]
         
-        # Cria um bloco de entrada
-        entry_block = func.append_basic_block('entry')
-        self.builder = ir.IRBuilder(entry_block)
-        
-        # Parâmetros da função
-        for i, param in enumerate(ast_function.parameters):
-            param_name = param.name
-            param_value = func.args[i]
-            param_value.name = param_name
-            
-            # Aloca espaço na stack para o parâmetro
-            alloca = self.builder.alloca(param_value.type, name=param_name)
-            self.builder.store(param_value, alloca)
-            self.local_vars[param_name] = alloca
+        Os returns guardam o valor e saltam para um bloco de saída comum,
+        que libera todas as variáveis locais.
+        """
+        function = self.func_symtab[ast_function.name]
+        self._begin_function(function)
+        self.result = self.entry_builder.alloca(_VALUE, name="result")
+        self.exit_block = function.append_basic_block("exit")
         
-        # Compila o corpo da função
-        for statement in ast_function.body:
-            self._compile_statement(statement)
+        # Os parâmetros recebem as referências entregues pelo chamador
+        self.scopes.append({})
+        for (_, name), argument in zip(ast_function.parameters, function.args):
+            slot = self._declare_local(name)
+            self.entry_builder.store(argument, slot)
         
-        # Adiciona retorno se não houver
+        self._compile_block(ast_function.body)
         if not self.builder.block.is_terminated:
-            ret_type = func.return_value.type
-            if ret_type == ir.VoidType():
-                self.builder.ret_void()
-            else:
-                self.builder.ret(ir.Constant(ret_type, None))
+            self.builder.store(self._call("naja_none"), self.result)
+            self.builder.branch(self.exit_block)
+        
+        self.builder.position_at_end(self.exit_block)
+        value = self.builder.load(self.result)
+        for slot in self.slots:
+            self._call("naja_decref", self.builder.load(slot))
+        self.builder.ret(value)
+        self._end_function()
+        self.result = None
     
     def _create_main_function(self, ast_program):
         """
-        Cria uma função main que executa o código no nível global
-        """
-        # Tipo da função main: int main(void)
-        func_type = ir.FunctionType(ir.IntType(32), [])
-        func = ir.Function(self.module, func_type, name="main")
+        Cria a função main com o código de nível superior
         
-        # Cria o bloco de entrada
-        entry_block = func.append_basic_block('entry')
-        self.builder = ir.IRBuilder(entry_block)
-        
-        # Armazena a função atual
-        self.function = func
+        Antes do programa, main inicializa o runtime e cria as constantes
+        (imortais) usadas por todas as funções.
+        """
+        main = ir.Function(self.module, ir.FunctionType(_INT, []), name="main")
+        self._begin_function(main)
+        self.result = None
         
-        # Compila as declarações globais
         for statement in ast_program.statements:
+            if self.builder.block.is_terminated:
+                break
             if not isinstance(statement, FunctionDeclaration):
                 self._compile_statement(statement)
+        if not self.builder.block.is_terminated:
+            self.builder.ret(self._call("naja_finish"))
+        
+        # Inicialização, no fim do bloco de entrada
+        self.builder = self.entry_builder
+        self._call("naja_init")
+        for variable, value in self.constants.values():
+            if isinstance(value, str):
+                data = value.encode("utf-8", "surrogatepass")
+                constant = self._call("naja_const_string", self._c_string(value), ir.Constant(_INT64, len(data)))
+            elif isinstance(value, float):
+                constant = self._call("naja_const_float", ir.Constant(_DOUBLE, value))
+            else:
+                constant = self._call("naja_const_int", ir.Constant(_INT64, value))
+            self.builder.store(constant, variable)
+        self._end_function()
+    
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+    
+    def _runtime(self, name):
+        """Declaração (criada no primeiro uso) de uma função do runtime"""
+        function = self.module.globals.get(name)
+        if function is None:
+            return_type, param_types = _RUNTIME_FUNCTIONS[name]
+            function = ir.Function(self.module, ir.FunctionType(return_type, param_types), name=name)
+        return function
+    
+    def _call(self, name, *args):
+        """Chama uma função do runtime"""
+        result = self.builder.call(self._runtime(name), args)
+        if name in _IMMORTAL_RESULTS:
+            self.immortal.add(id(result))
+        return result
+    
+    def _release(self, value):
+        """Libera uma referência produzida por uma expressão"""
+        if id(value) not in self.immortal:
+            self._call("naja_decref", value)
+    
+    def _retain(self, value):
+        """Cria mais uma referência para um valor"""
+        if id(value) not in self.immortal:
+            self._call("naja_incref", value)
+    
+    def _raise(self, message):
+        """Erro em tempo de execução, com a mensagem do interpretador; resulta em None"""
+        self._call("naja_raise", self._c_string(message))
+        return self._call("naja_none")
+    
+    def _c_string(self, text):
+        """Ponteiro para uma string C constante"""
+        pointer = self.c_strings.get(text)
+        if pointer is None:
+            data = bytearray(text.encode("utf-8", "surrogatepass") + b"\0")
+            array_type = ir.ArrayType(ir.IntType(8), len(data))
+            variable = ir.GlobalVariable(self.module, array_type, name=f"naja_cstr_{len(self.c_strings)}")
+            variable.linkage = "internal"
+            variable.global_constant = True
+            variable.initializer = ir.Constant(array_type, data)
+            zero = ir.Constant(_INT, 0)
+            pointer = variable.gep([zero, zero])
+            self.c_strings[text] = pointer
+        return pointer
+    
+    def _constant(self, value):
+        """Carrega uma constante do programa (criada em main)"""
+        key = (type(value), repr(value))
+        entry = self.constants.get(key)
+        if entry is None:
+            variable = ir.GlobalVariable(self.module, _VALUE, name=f"naja_const_{len(self.constants)}")
+            variable.linkage = "internal"
+            variable.initializer = _NULL
+            entry = self.constants[key] = (variable, value)
+        result = self.builder.load(entry[0])
+        self.immortal.add(id(result))
+        return result
+    
+    def _statements(self, body):
+        """Lista de instruções de um corpo (lista, bloco ou instrução única)"""
+        if body is None:
+            return []
+        if isinstance(body, list):
+            return body
+        if isinstance(body, BlockStatement):
+            return body.statements
+        return [body]
+    
+    def _unsupported(self, node):
+        return Exception(f"{type(node).__name__} não suportado pelo compilador AOT")
+    
+    # ------------------------------------------------------------------
+    # Variáveis
+    # ------------------------------------------------------------------
+    
+    def _declare_local(self, name, is_const=False):
+        """Cria uma variável local no escopo atual"""
+        slot = self.entry_builder.alloca(_VALUE, name=name)
+        self.entry_builder.store(_NULL, slot)
+        self.slots.append(slot)
+        self.scopes[-1][name] = [slot, is_const]
+        return slot
+    
+    def _global(self, name):
+        """Variável global [slot, constante] (NULL até a declaração ser executada)"""
+        entry = self.global_vars.get(name)
+        if entry is None:
+            variable = ir.GlobalVariable(self.module, _VALUE, name=f"naja_global_{name}")
+            variable.linkage = "internal"
+            variable.initializer = _NULL
+            entry = self.global_vars[name] = [variable, False]
+        return entry
+    
+    def _resolve(self, name):
+        """Variável visível com o nome: escopos locais e depois os globais"""
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return self._global(name)
+    
+    def _is_variable(self, name):
+        """Se o nome é uma variável declarada em algum escopo visível"""
+        return any(name in scope for scope in self.scopes) or name in self.global_vars
+    
+    def _load_variable(self, name):
+        """Nova referência para o valor de uma variável (erro se não estiver definida)"""
+        slot, _ = self._resolve(name)
+        return self._call("naja_load", self.builder.load(slot), self._c_string(name))
+    
+    def _store(self, slot, value, name=None):
+        """Guarda uma referência em uma variável e libera o valor antigo
         
-        # Adiciona retorno 0 para sucesso
-        self.builder.ret(ir.Constant(ir.IntType(32), 0))
-        
-        # Adiciona à tabela de símbolos
-        self.func_symtab["main"] = func
+        Com name, é uma atribuição: a variável já precisa estar definida.
+        """
+        old = self.builder.load(slot)
+        self.builder.store(value, slot)
+        if name is None:
+            self._call("naja_decref", old)
+        else:
+            self._call("naja_release_assigned", old, self._c_string(name))
+    
+    def _assign(self, name, value):
+        """Atribui uma referência a uma variável existente"""
+        slot, is_const = self._resolve(name)
+        if is_const:
+            self._release(value)
+            self._raise(f"Não é possível reatribuir valor à constante '{name}'.")
+            return
+        self._store(slot, value, name)
+    
+    # ------------------------------------------------------------------
+    # Instruções
+    # ------------------------------------------------------------------
+    
+    def _compile_block(self, body):
+        """Compila uma sequência de instruções (as posteriores a um salto são inalcançáveis)"""
+        for statement in self._statements(body):
+            if self.builder.block.is_terminated:
+                break
+            self._compile_statement(statement)
+    
+    def _compile_scoped_block(self, body):
+        """Compila um corpo em um novo escopo de variáveis"""
+        self.scopes.append({})
+        self._compile_block(body)
+        self.scopes.pop()
     
     def _compile_statement(self, statement):
         """
-        Compila uma declaração para código LLVM
+        Compila uma instrução
         """
-        # Implementa para cada tipo de declaração
         if isinstance(statement, VarDeclaration):
             self._compile_var_declaration(statement)
         elif isinstance(statement, ExpressionStatement):
-            self._compile_expression(statement.expression)
-        elif isinstance(statement, ReturnStatement):
-            self._compile_return(statement)
+            self._compile_effect(statement.expression)
+        elif isinstance(statement, (Assignment, CompoundAssignment)):
+            self._compile_effect(statement)
         elif isinstance(statement, IfStatement):
             self._compile_if_statement(statement)
         elif isinstance(statement, WhileStatement):
             self._compile_while_statement(statement)
-        # Outros tipos de declarações serão implementados conforme necessário
+        elif isinstance(statement, ForStatement):
+            self._compile_for_statement(statement)
+        elif isinstance(statement, ReturnStatement):
+            self._compile_return(statement)
+        elif isinstance(statement, BreakStatement):
+            if not self.loops:
+                raise Exception("break fora de um loop")
+            self.builder.branch(self.loops[-1][1])
+        elif isinstance(statement, ContinueStatement):
+            if not self.loops:
+                raise Exception("continue fora de um loop")
+            self.builder.branch(self.loops[-1][0])
+        elif isinstance(statement, BlockStatement):
+            self._compile_block(statement.statements)
+        elif isinstance(statement, ImportStatement) and statement.module_name == "NajaPt":
+            # As palavras-chave em português já foram traduzidas no pré-processamento
+            pass
+        elif isinstance(statement, FunctionDeclaration):
+            raise Exception(f"Função '{statement.name}' aninhada não suportada pelo compilador AOT")
+        else:
+            raise self._unsupported(statement)
+    
+    def _compile_effect(self, expression):
+        """Compila uma expressão pelo efeito, descartando o valor"""
+        if isinstance(expression, Assignment):
+            self._compile_assignment(expression, want_result=False)
+        elif isinstance(expression, CompoundAssignment):
+            self._compile_compound_assignment(expression, want_result=False)
+        else:
+            self._release(self._compile_expression(expression))
     
     def _compile_var_declaration(self, statement):
         """
         Compila uma declaração de variável
+        
+        Sem valor (ou com null), a variável recebe o padrão do tipo declarado.
+        """
+        if isinstance(statement.value, FunctionDeclaration):
+            raise self._unsupported(statement.value)
+        if statement.value is None:
+            value = self._call("naja_none")
+        else:
+            value = self._compile_expression(statement.value)
+        kind = _DEFAULT_KINDS.get(statement.var_type)
+        if kind is not None and (statement.value is None or not isinstance(statement.value, Literal)
+                                 or isinstance(statement.value, NullLiteral)):
+            default = self._call("naja_default", value, ir.Constant(_INT, kind))
+            self._release(value)
+            value = default
+        
+        if not self.scopes:
+            entry = self._global(statement.name)
+            entry[1] = statement.is_const
+            slot = entry[0]
+        elif statement.name in self.scopes[-1]:
+            entry = self.scopes[-1][statement.name]
+            entry[1] = statement.is_const
+            slot = entry[0]
+        else:
+            slot = self._declare_local(statement.name, statement.is_const)
+        self._store(slot, value)
+    
+    def _compile_assignment(self, node, want_result=True):
+        """Compila uma atribuição; retorna o valor atribuído se want_result"""
+        value = self._compile_expression(node.value)
+        if isinstance(node.name, GetAttr):
+            target = self._compile_expression(node.name.object)
+            self._release(value)
+            self._release(target)
+            return self._raise(f"Não é possível atribuir à propriedade '{node.name.name}' em um não-objeto")
+        if want_result:
+            self._retain(value)
+        self._assign(node.name, value)
+        return value if want_result else None
+    
+    def _compile_compound_assignment(self, node, want_result=True):
+        """Compila +=, -=, *=, /=, %= e **="""
+        operator = _COMPOUND_OPERATORS.get(node.operator)
+        if operator is None:
+            raise Exception(f"Operador de atribuição composta não suportado: {node.operator}")
+        if not isinstance(node.name, str):
+            raise self._unsupported(node.name)
+        current = self._load_variable(node.name)
+        operand = self._compile_expression(node.value)
+        result = self._call(operator, current, operand)
+        self._release(current)
+        self._release(operand)
+        if want_result:
+            self._retain(result)
+        self._assign(node.name, result)
+        return result if want_result else None
+    
+    def _compile_return(self, statement):
+        """
+        Compila uma instrução de retorno
+        """
+        if self.result is None:
+            raise Exception("return fora de uma função não suportado pelo compilador AOT")
+        if statement.value is None:
+            value = self._call("naja_none")
+        else:
+            value = self._compile_expression(statement.value)
+        self.builder.store(value, self.result)
+        self.builder.branch(self.exit_block)
+    
+    def _compile_condition(self, expression):
+        """Compila uma condição para um i1 (veracidade do valor)"""
+        value = self._compile_expression(expression)
+        truthy = self._call("naja_truthy", value)
+        self._release(value)
+        return self.builder.icmp_signed("!=", truthy, ir.Constant(_INT, 0))
+    
+    def _compile_if_statement(self, statement):
+        """
+        Compila uma instrução if/elif/else (cada ramo com o próprio escopo)
+        """
+        end_block = self.function.append_basic_block("if.end")
+        branches = [(statement.condition, statement.then_branch)] + list(statement.elif_branches)
+        for condition, body in branches:
+            then_block = self.function.append_basic_block("if.then")
+            next_block = self.function.append_basic_block("if.next")
+            self.builder.cbranch(self._compile_condition(condition), then_block, next_block)
+            
+            self.builder.position_at_end(then_block)
+            self._compile_scoped_block(body)
+            if not self.builder.block.is_terminated:
+                self.builder.branch(end_block)
+            self.builder.position_at_end(next_block)
+        
+        if statement.else_branch is not None:
+            self._compile_scoped_block(statement.else_branch)
+        if not self.builder.block.is_terminated:
+            self.builder.branch(end_block)
+        self.builder.position_at_end(end_block)
+    
+    def _compile_while_statement(self, statement):
+        """
+        Compila uma instrução while (o corpo usa o escopo atual, como no interpretador)
+        """
+        cond_block = self.function.append_basic_block("while.cond")
+        body_block = self.function.append_basic_block("while.body")
+        end_block = self.function.append_basic_block("while.end")
+        
+        self.builder.branch(cond_block)
+        self.builder.position_at_end(cond_block)
+        self.builder.cbranch(self._compile_condition(statement.condition), body_block, end_block)
+        
+        self.builder.position_at_end(body_block)
+        self.loops.append((cond_block, end_block))
+        self._compile_block(statement.body)
+        self.loops.pop()
+        if not self.builder.block.is_terminated:
+            self.builder.branch(cond_block)
+        self.builder.position_at_end(end_block)
+    
+    def _compile_for_statement(self, statement):
         """
-        var_name = statement.name
-        var_type = self._convert_type(statement.var_type)
+        Compila uma instrução for (inicialização e corpo em um escopo próprio;
+        continue segue para a atualização)
+        """
+        self.scopes.append({})
+        if isinstance(statement.init, Statement):
+            self._compile_statement(statement.init)
+        elif statement.init is not None:
+            self._compile_effect(statement.init)
         
-        # Aloca espaço na stack
-        alloca = self.builder.alloca(var_type, name=var_name)
+        cond_block = self.function.append_basic_block("for.cond")
+        body_block = self.function.append_basic_block("for.body")
+        update_block = self.function.append_basic_block("for.update")
+        end_block = self.function.append_basic_block("for.end")
         
-        # Compila e armazena o valor inicial, se houver
-        if statement.value:
-            value = self._compile_expression(statement.value)
-            self.builder.store(value, alloca)
+        self.builder.branch(cond_block)
+        self.builder.position_at_end(cond_block)
+        if statement.condition is None:
+            self.builder.branch(body_block)
+        else:
+            self.builder.cbranch(self._compile_condition(statement.condition), body_block, end_block)
+        
+        self.builder.position_at_end(body_block)
+        self.loops.append((update_block, end_block))
+        self._compile_block(statement.body)
+        self.loops.pop()
+        if not self.builder.block.is_terminated:
+            self.builder.branch(update_block)
+        
+        self.builder.position_at_end(update_block)
+        if isinstance(statement.update, Statement):
+            self._compile_statement(statement.update)
+        elif statement.update is not None:
+            self._compile_effect(statement.update)
+        self.builder.branch(cond_block)
         
-        # Armazena na tabela de símbolos local
-        self.local_vars[var_name] = alloca
+        self.builder.position_at_end(end_block)
+        self.scopes.pop()
+    
+    # ------------------------------------------------------------------
+    # Expressões
+    # ------------------------------------------------------------------
     
     def _compile_expression(self, expression):
         """
-        Compila uma expressão para código LLVM
+        Compila uma expressão; o resultado é uma referência própria
         """
         if isinstance(expression, IntegerLiteral):
-            return ir.Constant(ir.IntType(32), expression.value)
+            if not _INT64_MIN <= expression.value <= _INT64_MAX:
+                raise Exception(f"Inteiro {expression.value} fora do intervalo de 64 bits do compilador AOT")
+            return self._constant(expression.value)
         elif isinstance(expression, FloatLiteral):
-            return ir.Constant(ir.FloatType(), expression.value)
+            return self._constant(float(expression.value))
+        elif isinstance(expression, StringLiteral):
+            return self._constant(expression.value)
         elif isinstance(expression, BooleanLiteral):
-            return ir.Constant(ir.IntType(1), 1 if expression.value else 0)
+            return self._call("naja_bool", ir.Constant(_INT, 1 if expression.value else 0))
+        elif isinstance(expression, NullLiteral):
+            return self._call("naja_none")
+        elif isinstance(expression, ListLiteral):
+            return self._compile_container("naja_list_new", "naja_list_append", expression.elements)
+        elif isinstance(expression, DictLiteral):
+            return self._compile_container("naja_dict_new", "naja_dict_append", expression.items)
         elif isinstance(expression, Variable):
             return self._compile_variable(expression)
         elif isinstance(expression, BinaryOperation):
@@ -226,271 +735,190 @@ class AOTCompiler:
             return self._compile_unary_operation(expression)
         elif isinstance(expression, FunctionCall):
             return self._compile_function_call(expression)
-        # Outros tipos de expressões serão implementados conforme necessário
+        elif isinstance(expression, MethodCall):
+            return self._compile_method_call(expression)
+        elif isinstance(expression, GetAttr):
+            target = self._compile_expression(expression.object)
+            result = self._call("naja_get_attr", target, self._c_string(expression.name))
+            self._release(target)
+            return result
+        elif isinstance(expression, Assignment):
+            return self._compile_assignment(expression)
+        elif isinstance(expression, CompoundAssignment):
+            return self._compile_compound_assignment(expression)
+        else:
+            raise self._unsupported(expression)
+    
+    def _compile_container(self, new_name, append_name, elements):
+        """Literal de lista ou dicionário (elementos avaliados antes da criação)"""
+        values = [self._compile_expression(element) for element in elements]
+        if new_name == "naja_list_new":
+            container = self._call(new_name, ir.Constant(_INT64, len(values)))
+        else:
+            container = self._call(new_name)
+        for value in values:
+            self._call(append_name, container, value)
+            self._release(value)
+        return container
     
     def _compile_variable(self, expression):
         """
-        Compila o acesso a uma variável
+        Compila a leitura de uma variável
         """
-        var_name = expression.name
-        
-        # Procura na tabela de símbolos local primeiro
-        if var_name in self.local_vars:
-            # Carrega o valor da variável local
-            return self.builder.load(self.local_vars[var_name], name=var_name)
-        # Depois procura nas variáveis globais
-        elif var_name in self.global_vars:
-            # Carrega o valor da variável global
-            return self.builder.load(self.global_vars[var_name], name=var_name)
-        else:
-            raise ValueError(f"Variável '{var_name}' não encontrada")
+        if expression.name in self.func_symtab and not self._is_variable(expression.name):
+            raise Exception(f"Função '{expression.name}' usada como valor não suportada pelo compilador AOT")
+        return self._load_variable(expression.name)
     
     def _compile_binary_operation(self, expression):
         """
-        Compila uma operação binária
+        Compila uma operação binária (os dois lados são sempre avaliados)
         """
+        operator = _BINARY_OPERATORS.get(expression.operator)
+        if operator is None:
+            raise Exception(f"Operador não implementado: {expression.operator}")
         left = self._compile_expression(expression.left)
         right = self._compile_expression(expression.right)
-        
-        # Verifica se os operandos são do mesmo tipo
-        if left.type != right.type:
-            # Implementar conversão de tipos, se necessário
-            pass
-        
-        # Implementa cada operador
-        if expression.operator == "+":
-            if isinstance(left.type, ir.IntType):
-                return self.builder.add(left, right, "addtmp")
-            elif isinstance(left.type, ir.FloatType):
-                return self.builder.fadd(left, right, "addtmp")
-        elif expression.operator == "-":
-            if isinstance(left.type, ir.IntType):
-                return self.builder.sub(left, right, "subtmp")
-            elif isinstance(left.type, ir.FloatType):
-                return self.builder.fsub(left, right, "subtmp")
-        elif expression.operator == "*":
-            if isinstance(left.type, ir.IntType):
-                return self.builder.mul(left, right, "multmp")
-            elif isinstance(left.type, ir.FloatType):
-                return self.builder.fmul(left, right, "multmp")
-        elif expression.operator == "/":
-            if isinstance(left.type, ir.IntType):
-                return self.builder.sdiv(left, right, "divtmp")
-            elif isinstance(left.type, ir.FloatType):
-                return self.builder.fdiv(left, right, "divtmp")
-        elif expression.operator == "<":
-            if isinstance(left.type, ir.IntType):
-                return self.builder.icmp_signed("<", left, right, "cmptmp")
-            elif isinstance(left.type, ir.FloatType):
-                return self.builder.fcmp_ordered("<", left, right, "cmptmp")
-        # Outros operadores serão implementados conforme necessário
-        
-        raise ValueError(f"Operador binário '{expression.operator}' não implementado")
+        result = self._call(operator, left, right)
+        self._release(left)
+        self._release(right)
+        return result
     
     def _compile_unary_operation(self, expression):
         """
         Compila uma operação unária
         """
-        operand = self._compile_expression(expression.operand)
-        
-        # Implementa cada operador unário
         if expression.operator == "-":
-            if isinstance(operand.type, ir.IntType):
-                return self.builder.neg(operand, "negtmp")
-            elif isinstance(operand.type, ir.FloatType):
-                return self.builder.fneg(operand, "negtmp")
+            operator = "naja_neg"
         elif expression.operator == "!":
-            # Para negação lógica, converte para boolean (i1) e nega
-            if operand.type != ir.IntType(1):
-                operand = self.builder.icmp_signed("!=", operand, 
-                                               ir.Constant(operand.type, 0), "booltmp")
-            return self.builder.not_(operand, "nottmp")
-        
-        raise ValueError(f"Operador unário '{expression.operator}' não implementado")
+            operator = "naja_not"
+        else:
+            raise Exception(f"Operador unário não suportado: {expression.operator}")
+        operand = self._compile_expression(expression.operand)
+        result = self._call(operator, operand)
+        self._release(operand)
+        return result
     
-    def _compile_function_call(self, expression):
-        """
-        Compila uma chamada de função
-        """
-        func_name = expression.name
-        
-        # Verifica se a função existe
-        if func_name not in self.func_symtab:
-            # Para funções nativas, crie declarações apropriadas
-            if func_name == "print" or func_name == "println":
-                self._declare_print_function()
-            else:
-                raise ValueError(f"Função '{func_name}' não encontrada")
-        
-        # Obtém a função
-        func = self.func_symtab[func_name]
-        
-        # Compila os argumentos
-        args = []
-        if expression.arguments:
-            for arg in expression.arguments:
-                args.append(self._compile_expression(arg))
-        
-        # Chama a função
-        return self.builder.call(func, args, "calltmp")
+    def _compile_arguments(self, arguments):
+        return [self._compile_expression(argument) for argument in arguments]
     
-    def _compile_return(self, statement):
+    def _compile_function_call(self, expression):
         """
-        Compila uma declaração de retorno
+        Compila uma chamada de função do usuário ou nativa
         """
-        # Se tiver um valor para retornar
-        if statement.value:
-            value = self._compile_expression(statement.value)
-            self.builder.ret(value)
+        if isinstance(expression.name, Variable):
+            name = expression.name.name
+        elif isinstance(expression.name, str):
+            name = expression.name
         else:
-            self.builder.ret_void()
+            raise self._unsupported(expression.name)
+        
+        if name in self.func_symtab and not self._is_variable(name):
+            function = self.func_symtab[name]
+            values = self._compile_arguments(expression.arguments)
+            count = len(function.args)
+            # Argumentos a mais são avaliados e descartados; os que faltam valem null
+            for value in values[count:]:
+                self._release(value)
+            values = values[:count] + [self._call("naja_none") for _ in range(count - len(values))]
+            return self.builder.call(function, values)
+        
+        if self._is_variable(name):
+            raise Exception(f"Chamada de '{name}' como função não suportada pelo compilador AOT")
+        return self._compile_builtin_call(name, expression.arguments)
     
-    def _compile_if_statement(self, statement):
-        """
-        Compila uma declaração if
-        """
-        # Compila a condição
-        condition = self._compile_expression(statement.condition)
-        
-        # Converte para boolean se necessário
-        if condition.type != ir.IntType(1):
-            condition = self.builder.icmp_signed("!=", condition, 
-                                           ir.Constant(condition.type, 0), "ifcond")
-        
-        # Cria blocos para then, else e merge
-        then_block = self.function.append_basic_block("then")
-        else_block = self.function.append_basic_block("else")
-        merge_block = self.function.append_basic_block("ifcont")
-        
-        # Cria o branch condicional
-        self.builder.cbranch(condition, then_block, else_block)
-        
-        # Compila o bloco then
-        self.builder.position_at_end(then_block)
-        for stmt in statement.then_branch:
-            self._compile_statement(stmt)
-        
-        # Adiciona jump para o bloco merge se necessário
-        if not self.builder.block.is_terminated:
-            self.builder.branch(merge_block)
-        
-        # Salva o bloco then para PHI (se necessário)
-        then_end = self.builder.block
-        
-        # Compila o bloco else
-        self.builder.position_at_end(else_block)
-        if statement.else_branch:
-            for stmt in statement.else_branch:
-                self._compile_statement(stmt)
-        
-        # Adiciona jump para o bloco merge se necessário
-        if not self.builder.block.is_terminated:
-            self.builder.branch(merge_block)
-        
-        # Salva o bloco else para PHI (se necessário)
-        else_end = self.builder.block
-        
-        # Posiciona no bloco merge
-        self.builder.position_at_end(merge_block)
+    def _compile_builtin_call(self, name, arguments):
+        """Compila uma chamada de função nativa"""
+        count = len(arguments)
+        if name in ("print", "println"):
+            values = self._compile_arguments(arguments)
+            for index, value in enumerate(values):
+                self._call("naja_print", value, ir.Constant(_INT, 1 if index else 0))
+                self._release(value)
+            self._call("naja_print_end", ir.Constant(_INT, 1 if name == "println" else 0))
+            return self._call("naja_none")
+        if name in ("list", "dict"):
+            if name == "list":
+                return self._compile_container("naja_list_new", "naja_list_append", arguments)
+            return self._compile_container("naja_dict_new", "naja_dict_append", arguments)
+        
+        if name == "input" and count <= 1:
+            operator = "naja_builtin_input"
+        elif name in _UNARY_BUILTINS and count == 1:
+            operator = _UNARY_BUILTINS[name]
+        elif name == "round" and count in (1, 2):
+            operator = "naja_builtin_round" if count == 1 else "naja_builtin_round2"
+        elif name in ("min", "max") and count >= 2:
+            operator = f"naja_builtin_{name}"
+        elif name in ("input", "str", "toString", "abs", "sqrt", "round", "min", "max"):
+            raise Exception(f"{name}() com {count} argumento(s) não suportado pelo compilador AOT")
+        else:
+            values = self._compile_arguments(arguments)
+            for value in values:
+                self._release(value)
+            return self._raise(f"Variável ou função '{name}' não definida.")
+        
+        values = self._compile_arguments(arguments)
+        if operator == "naja_builtin_input" and not values:
+            return self._call(operator, _NULL)
+        result = values[0]
+        if operator in ("naja_builtin_min", "naja_builtin_max"):
+            # min(a, b, c) = min(min(a, b), c), mantendo o primeiro nos empates
+            for value in values[1:]:
+                combined = self._call(operator, result, value)
+                self._release(result)
+                self._release(value)
+                result = combined
+            return result
+        result = self._call(operator, *values)
+        for value in values:
+            self._release(value)
+        return result
     
-    def _compile_while_statement(self, statement):
-        """
-        Compila uma declaração while
-        """
-        # Cria blocos para condição, corpo e continuação
-        cond_block = self.function.append_basic_block("while.cond")
-        body_block = self.function.append_basic_block("while.body")
-        end_block = self.function.append_basic_block("while.end")
-        
-        # Branch para o bloco de condição
-        self.builder.branch(cond_block)
-        
-        # Compila o bloco de condição
-        self.builder.position_at_end(cond_block)
-        condition = self._compile_expression(statement.condition)
-        
-        # Converte para boolean se necessário
-        if condition.type != ir.IntType(1):
-            condition = self.builder.icmp_signed("!=", condition, 
-                                           ir.Constant(condition.type, 0), "whilecond")
-        
-        # Branch condicional
-        self.builder.cbranch(condition, body_block, end_block)
-        
-        # Compila o corpo do loop
-        self.builder.position_at_end(body_block)
-        for stmt in statement.body:
-            self._compile_statement(stmt)
-        
-        # Branch de volta para a condição
-        if not self.builder.block.is_terminated:
-            self.builder.branch(cond_block)
-        
-        # Posiciona no final do loop
-        self.builder.position_at_end(end_block)
+    def _compile_method_call(self, expression):
+        """Compila uma chamada de método nativo de lista, dicionário ou string"""
+        target = self._compile_expression(expression.object)
+        values = self._compile_arguments(expression.arguments)
+        if values:
+            array_type = ir.ArrayType(_VALUE, len(values))
+            array = self.entry_builder.alloca(array_type, name="args")
+            for index, value in enumerate(values):
+                pointer = self.builder.gep(array, [ir.Constant(_INT, 0), ir.Constant(_INT, index)])
+                self.builder.store(value, pointer)
+            arguments = self.builder.gep(array, [ir.Constant(_INT, 0), ir.Constant(_INT, 0)])
+        else:
+            arguments = ir.Constant(_VALUE.as_pointer(), None)
+        result = self._call(
+            "naja_method",
+            target,
+            ir.Constant(_INT, _METHOD_IDS.get(expression.method, -1)),
+            self._c_string(expression.method),
+            ir.Constant(_INT64, len(values)),
+            arguments,
+        )
+        self._release(target)
+        for value in values:
+            self._release(value)
+        return result
     
-    def _declare_print_function(self):
-        """
-        Declara a função print do sistema
-        """
-        # Declara a função printf do C
-        printf_type = ir.FunctionType(ir.IntType(32), [ir.IntType(8).as_pointer()], var_arg=True)
-        printf_func = ir.Function(self.module, printf_type, name="printf")
-        self.func_symtab["printf"] = printf_func
-        
-        # Cria uma função de wrapper para print
-        print_type = ir.FunctionType(ir.VoidType(), [ir.IntType(8).as_pointer()])
-        print_func = ir.Function(self.module, print_type, name="print")
-        
-        # Cria o corpo da função
-        block = print_func.append_basic_block("entry")
-        builder = ir.IRBuilder(block)
-        
-        # Chama printf com o argumento
-        builder.call(printf_func, [print_func.args[0]], "printf_call")
-        builder.ret_void()
-        
-        # Adiciona à tabela de símbolos
-        self.func_symtab["print"] = print_func
-        
-        # Também adiciona println
-        println_func = ir.Function(self.module, print_type, name="println")
-        block = println_func.append_basic_block("entry")
-        builder = ir.IRBuilder(block)
-        
-        # Format string com quebra de linha
-        format_str = ir.Constant(ir.ArrayType(ir.IntType(8), 3), bytearray("%s\n\0", "utf-8"))
-        format_str_ptr = builder.bitcast(format_str, ir.IntType(8).as_pointer())
-        
-        # Chama printf com o argumento e quebra de linha
-        builder.call(printf_func, [format_str_ptr, println_func.args[0]], "printf_call")
-        builder.ret_void()
-        
-        # Adiciona à tabela de símbolos
-        self.func_symtab["println"] = println_func
+    # ------------------------------------------------------------------
+    # Geração do executável
+    # ------------------------------------------------------------------
     
-    def _convert_type(self, type_name):
-        """
-        Converte um tipo NajaScript para um tipo LLVM
-        """
-        if type_name == "int":
-            return ir.IntType(32)
-        elif type_name == "float":
-            return ir.FloatType()
-        elif type_name == "bool":
-            return ir.IntType(1)
-        elif type_name == "string":
-            return ir.IntType(8).as_pointer()
-        elif type_name == "void" or type_name is None:
-            return ir.VoidType()
-        else:
-            # Para tipos não suportados, use um ponteiro genérico
-            return ir.IntType(8).as_pointer()
+    def _target_machine(self):
+        """Máquina alvo (código relocável, para executáveis PIE)"""
+        target = llvm.Target.from_triple(self.target_triple)
+        return target.create_target_machine(opt=3, reloc="pic")
     
     def _optimize_module(self, llvm_module):
         """
         Otimiza o módulo LLVM
         """
+        if hasattr(llvm, "create_pass_builder"):
+            # Gerenciador de passes novo (llvmlite >= 0.44)
+            pass_builder = llvm.create_pass_builder(self._target_machine(), llvm.PipelineTuningOptions(speed_level=3))
+            pass_builder.getModulePassManager().run(llvm_module, pass_builder)
+            return
+        
         # Cria um pass manager
         pmb = llvm.create_pass_manager_builder()
         pmb.opt_level = 3  # Nível de otimização (0-3)
@@ -509,38 +937,36 @@ class AOTCompiler:
         # Determina o tipo de saída com base na extensão
         _, ext = os.path.splitext(output_file)
         
-        # Seleciona o alvo para a plataforma atual
-        target = llvm.Target.from_triple(self.target_triple)
-        target_machine = target.create_target_machine()
-        
         # Gera código objeto
         obj_file = output_file if ext == '.o' else output_file + '.o'
         with open(obj_file, 'wb') as f:
-            f.write(target_machine.emit_object(llvm_module))
+            f.write(self._target_machine().emit_object(llvm_module))
         
         # Se não for apenas um objeto, cria um executável
         if ext != '.o':
-            self._link_executable(obj_file, output_file)
-            # Limpa o arquivo objeto intermediário
-            if output_file != obj_file:
+            try:
+                self._link_executable(obj_file, output_file)
+            finally:
+                # Limpa o arquivo objeto intermediário
                 os.remove(obj_file)
         
         return output_file
     
     def _link_executable(self, obj_file, exe_file):
         """
-        Vincula o arquivo objeto em um executável
+        Vincula o arquivo objeto e o runtime (naja_runtime.c) em um executável
         """
         # Determina o compilador C para vincular
-        if platform.system() == "Windows":
-            cc = "cl"
-            exe_flag = "/Fe:"
-        else:
-            cc = "gcc"
-            exe_flag = "-o"
+        cc = "cl" if platform.system() == "Windows" else "gcc"
         
-        # Constrói a linha de comando para o linker
-        cmd = [cc, obj_file, exe_flag + exe_file]
-        
-        # Executa o comando de vinculação
-        subprocess.check_call(cmd) 
\ No newline at end of file
+        try:
+            # Constrói a linha de comando para o linker
+            if cc == "cl":
+                cmd = [cc, "/O2", obj_file, RUNTIME_SOURCE, "/Fe:" + exe_file]
+            else:
+                cmd = [cc, obj_file, runtime_object(cc), "-lm", "-o", exe_file]
+            
+            # Executa o comando de vinculação
+            subprocess.check_call(cmd)
+        except FileNotFoundError:
+            raise Exception(f"Compilador C '{cc}' não encontrado: ele é necessário para gerar o executável")
@@ -2,28 +2,53 @@
 # -*- coding: utf-8 -*-
 
 # Definição das classes para representar os nós da AST
+#
+# Todos os nós usam __slots__ (sem __dict__ por instância) e declaram em
+# _fields os atributos que contêm nós filhos (um nó, uma lista de nós ou
+# listas/tuplas aninhadas, como os ramos elif). As funções iter_child_nodes
+# e walk e a classe NodeVisitor percorrem a árvore usando apenas esses
+# campos declarados.
 
 class Node:
     """Classe base para todos os nós da AST"""
-    pass
+    # Posição no código fonte: token inicial (line, column) e final (end_line, end_column)
+    __slots__ = ('line', 'column', 'end_line', 'end_column')
+    _fields = ()
+
+    def __new__(cls, *args, **kwargs):
+        node = super().__new__(cls)
+        node.line = node.column = node.end_line = node.end_column = None
+        return node
 
 class Program(Node):
+    __slots__ = ('statements',)
+    _fields = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements
 
 class Statement(Node):
     """Classe base para todos os tipos de declarações"""
-    pass
+    __slots__ = ()
 
 class BlockStatement(Statement):
+    __slots__ = ('statements',)
+    _fields = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements
 
 class ExpressionStatement(Statement):
+    __slots__ = ('expression',)
+    _fields = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
 class VarDeclaration(Statement):
+    __slots__ = ('var_type', 'name', 'value', 'is_const', 'exported')
+    _fields = ('value',)
+
     def __init__(self, var_type, name, value=None, is_const=False, exported=False):
         self.var_type = var_type
         self.name = name
@@ -32,52 +57,89 @@ class VarDeclaration(Statement):
         self.exported = exported
 
 class FluxDeclaration(Statement):
+    __slots__ = ('name', 'expression')
+    _fields = ('expression',)
+
     def __init__(self, name, expression):
         self.name = name
         self.expression = expression  # Expressão a ser reavaliada
 
 class Assignment(Statement):
+    __slots__ = ('name', 'value', 'depth', 'slot')
+    _fields = ('name', 'value')
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.depth = None  # Posição resolvida pelo Resolver (ver resolver.py)
+        self.slot = None
 
 class CompoundAssignment(Statement):
+    __slots__ = ('name', 'operator', 'value', 'depth', 'slot')
+    _fields = ('name', 'value')
+
     def __init__(self, name, operator, value):
         self.name = name
         self.operator = operator  # +=, -=, *=, etc.
         self.value = value
+        self.depth = None  # Posição resolvida pelo Resolver (ver resolver.py)
+        self.slot = None
 
 class IfStatement(Statement):
+    __slots__ = ('condition', 'then_branch', 'elif_branches', 'else_branch',
+                 'then_scope', 'elif_scopes', 'else_scope')
+    _fields = ('condition', 'then_branch', 'elif_branches', 'else_branch')
+
     def __init__(self, condition, then_branch, elif_branches=None, else_branch=None):
         self.condition = condition
         self.then_branch = then_branch
         self.elif_branches = elif_branches if elif_branches else []
         self.else_branch = else_branch
+        self.then_scope = None  # Escopos de slots de cada ramo (ver resolver.py)
+        self.elif_scopes = []
+        self.else_scope = None
 
 class WhileStatement(Statement):
+    __slots__ = ('condition', 'body')
+    _fields = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
 
 class DoWhileStatement(Statement):
+    __slots__ = ('body', 'condition')
+    _fields = ('body', 'condition')
+
     def __init__(self, body, condition):
         self.body = body
         self.condition = condition
 
 class ForStatement(Statement):
+    __slots__ = ('init', 'condition', 'update', 'body', 'scope')
+    _fields = ('init', 'condition', 'update', 'body')
+
     def __init__(self, init, condition, update, body):
         self.init = init           # Inicialização (int i = 0)
         self.condition = condition  # Condição (i < 5)
         self.update = update        # Atualização (i = i + 1)
         self.body = body            # Corpo do loop
+        self.scope = None           # Escopo de slots do loop (ver resolver.py)
 
 class ForInStatement(Statement):
+    __slots__ = ('item', 'iterable', 'body')
+    _fields = ('iterable', 'body')
+
     def __init__(self, item, iterable, body):
         self.item = item
         self.iterable = iterable
         self.body = body
 
 class FunctionDeclaration(Statement):
+    __slots__ = ('name', 'parameters', 'body', 'return_type', 'is_async', 'generic_params',
+                 'decorators', 'exported', 'scope', 'pool_frames')
+    _fields = ('decorators', 'body')
+
     def __init__(self, name, parameters, body, return_type=None, is_async=False, generic_params=None, exported=False):
         self.name = name
         self.parameters = parameters
@@ -87,8 +149,13 @@ class FunctionDeclaration(Statement):
         self.generic_params = generic_params if generic_params else []
         self.decorators = []  # Lista de decoradores
         self.exported = exported
+        self.scope = None  # Escopo de slots da chamada (ver resolver.py)
+        self.pool_frames = False  # Se os ambientes das chamadas podem ser reutilizados
 
 class ClassDeclaration(Statement):
+    __slots__ = ('name', 'methods', 'properties', 'extends', 'implements', 'generic_params', 'decorators')
+    _fields = ('decorators', 'properties', 'methods')
+
     def __init__(self, name, methods=None, properties=None, extends=None, implements=None, generic_params=None):
         self.name = name
         self.methods = methods if methods else []
@@ -99,6 +166,9 @@ class ClassDeclaration(Statement):
         self.decorators = []  # Lista de decoradores
 
 class InterfaceDeclaration(Statement):
+    __slots__ = ('name', 'methods', 'extends', 'generic_params')
+    _fields = ('methods',)
+
     def __init__(self, name, methods=None, extends=None, generic_params=None):
         self.name = name
         self.methods = methods if methods else []
@@ -106,75 +176,108 @@ class InterfaceDeclaration(Statement):
         self.generic_params = generic_params if generic_params else []
 
 class PropertyDeclaration(Node):
+    __slots__ = ('name', 'prop_type', 'access_modifier', 'value', 'is_static', 'decorators')
+    _fields = ('decorators', 'value')
+
     def __init__(self, name, prop_type, access_modifier="public", value=None, is_static=False):
         self.name = name
         self.prop_type = prop_type
         self.access_modifier = access_modifier  # public, private, protected
         self.value = value
         self.is_static = is_static
+        self.decorators = []  # Lista de decoradores
 
 class MethodDeclaration(FunctionDeclaration):
+    __slots__ = ('access_modifier', 'is_static')
+
     def __init__(self, name, parameters, body, return_type=None, access_modifier="public", is_static=False, is_async=False, generic_params=None):
         super().__init__(name, parameters, body, return_type, is_async, generic_params)
         self.access_modifier = access_modifier  # public, private, protected
         self.is_static = is_static
 
 class ConstructorDeclaration(MethodDeclaration):
+    __slots__ = ()
+
     def __init__(self, parameters, body, access_modifier="public"):
         super().__init__("constructor", parameters, body, None, access_modifier)
 
 class ReturnStatement(Statement):
+    __slots__ = ('value',)
+    _fields = ('value',)
+
     def __init__(self, value=None):
         self.value = value
 
 class BreakStatement(Statement):
-    pass
+    __slots__ = ()
 
 class ContinueStatement(Statement):
-    pass
+    __slots__ = ()
 
 class ThrowStatement(Statement):
+    __slots__ = ('expression',)
+    _fields = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression
 
 class TryStatement(Statement):
+    __slots__ = ('try_block', 'catch_clauses', 'finally_block')
+    _fields = ('try_block', 'catch_clauses', 'finally_block')
+
     def __init__(self, try_block, catch_clauses=None, finally_block=None):
         self.try_block = try_block
         self.catch_clauses = catch_clauses if catch_clauses else []
         self.finally_block = finally_block
 
 class CatchClause(Node):
+    __slots__ = ('exception_type', 'variable_name', 'body')
+    _fields = ('body',)
+
     def __init__(self, exception_type, variable_name, body):
         self.exception_type = exception_type
         self.variable_name = variable_name
         self.body = body
 
 class SwitchStatement(Statement):
+    __slots__ = ('value', 'cases', 'default')
+    _fields = ('value', 'cases', 'default')
+
     def __init__(self, value, cases, default=None):
         self.value = value
         self.cases = cases
         self.default = default
 
 class ImportStatement(Statement):
+    __slots__ = ('module_name', 'import_items', 'is_import_all', 'module_alias', 'is_default_import')
+
     def __init__(self, module_name, import_items=None, is_import_all=False, module_alias=None, is_default_import=False):
         self.module_name = module_name
         self.import_items = import_items if import_items else []  # Lista de itens específicos a importar
-        self.is_import_all = is_import_all  # Flag para import * 
+        self.is_import_all = is_import_all  # Flag para import *
         self.module_alias = module_alias  # Alias para o módulo (import "module" as alias)
         self.is_default_import = is_default_import  # Flag para import padrão (import defaultExport from "module")
 
 class ImportItem:
     """Representa um item específico sendo importado com possível alias"""
+    __slots__ = ('name', 'alias')
+
     def __init__(self, name, alias=None):
         self.name = name      # Nome original no módulo
         self.alias = alias    # Alias local (se fornecido)
 
 class MatchStatement(Statement):
+    __slots__ = ('expression', 'cases')
+    _fields = ('expression', 'cases')
+
     def __init__(self, expression, cases):
         self.expression = expression
         self.cases = cases  # Lista de padrões e expressões correspondentes
 
 class MatchCase(Node):
+    __slots__ = ('pattern', 'body', 'condition')
+    _fields = ('pattern', 'condition', 'body')
+
     def __init__(self, pattern, body, condition=None):
         self.pattern = pattern  # O padrão a ser comparado
         self.body = body        # O corpo a ser executado se o padrão corresponder
@@ -183,30 +286,46 @@ class MatchCase(Node):
 # Expressões
 class Expression(Node):
     """Classe base para todas as expressões"""
-    pass
+    __slots__ = ()
 
 class BinaryOperation(Expression):
+    __slots__ = ('left', 'operator', 'right')
+    _fields = ('left', 'right')
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
         self.right = right
 
 class UnaryOperation(Expression):
+    __slots__ = ('operator', 'operand')
+    _fields = ('operand',)
+
     def __init__(self, operator, operand):
         self.operator = operator
         self.operand = operand
 
 class TernaryOperator(Expression):
+    __slots__ = ('condition', 'then_expr', 'else_expr')
+    _fields = ('condition', 'then_expr', 'else_expr')
+
     def __init__(self, condition, then_expr, else_expr):
         self.condition = condition
         self.then_expr = then_expr
         self.else_expr = else_expr
 
 class Variable(Expression):
+    __slots__ = ('name', 'depth', 'slot')
+
     def __init__(self, name):
         self.name = name
+        self.depth = None  # Posição resolvida pelo Resolver (ver resolver.py)
+        self.slot = None
 
 class FunctionCall(Expression):
+    __slots__ = ('name', 'arguments', 'type_arguments', 'is_await')
+    _fields = ('name', 'arguments')
+
     def __init__(self, name, arguments=None, type_arguments=None):
         self.name = name
         self.arguments = arguments if arguments else []
@@ -214,19 +333,29 @@ class FunctionCall(Expression):
         self.is_await = False  # Se for uma chamada await
 
 class MethodCall(Expression):
+    __slots__ = ('object', 'method', 'arguments', 'type_arguments', 'is_await', 'inline_cache')
+    _fields = ('object', 'arguments')
+
     def __init__(self, object, method, arguments=None, type_arguments=None):
         self.object = object  # Objeto no qual o método é chamado
         self.method = method  # Nome do método
         self.arguments = arguments if arguments else []
         self.type_arguments = type_arguments if type_arguments else []
         self.is_await = False  # Se for uma chamada await
+        self.inline_cache = None  # MethodCache criado na primeira execução (ver interpreter.py)
 
 class GetAttr(Expression):
+    __slots__ = ('object', 'name')
+    _fields = ('object',)
+
     def __init__(self, object, name):
         self.object = object  # Objeto do qual queremos acessar um atributo
         self.name = name      # Nome do atributo
 
 class ModuleMethodCall(Expression):
+    __slots__ = ('module', 'method', 'arguments', 'type_arguments', 'is_await')
+    _fields = ('module', 'arguments')
+
     def __init__(self, module, method, arguments=None, type_arguments=None):
         self.module = module    # Módulo no qual o método é chamado
         self.method = method    # Nome do método
@@ -235,33 +364,51 @@ class ModuleMethodCall(Expression):
         self.is_await = False  # Se for uma chamada await
 
 class AwaitExpression(Expression):
+    __slots__ = ('expression',)
+    _fields = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression  # Expressão a ser aguardada
 
 class NewExpression(Expression):
+    __slots__ = ('class_name', 'arguments', 'type_arguments')
+    _fields = ('arguments',)
+
     def __init__(self, class_name, arguments=None, type_arguments=None):
         self.class_name = class_name
         self.arguments = arguments if arguments else []
         self.type_arguments = type_arguments if type_arguments else []
 
 class ThisExpression(Expression):
-    pass
+    __slots__ = ()
 
 class SuperExpression(Expression):
+    __slots__ = ('method', 'arguments')
+    _fields = ('arguments',)
+
     def __init__(self, method=None, arguments=None):
         self.method = method  # Método a ser chamado em super, se for uma chamada
         self.arguments = arguments if arguments else []
 
 class SpreadExpression(Expression):
+    __slots__ = ('expression',)
+    _fields = ('expression',)
+
     def __init__(self, expression):
         self.expression = expression  # Expressão a ser expandida
 
 class TypeCast(Expression):
+    __slots__ = ('target_type', 'expression')
+    _fields = ('expression',)
+
     def __init__(self, target_type, expression):
         self.target_type = target_type  # Tipo alvo para o cast
         self.expression = expression    # Expressão a ser convertida
 
 class Decorator(Node):
+    __slots__ = ('name', 'arguments')
+    _fields = ('arguments',)
+
     def __init__(self, name, arguments=None):
         self.name = name
         self.arguments = arguments if arguments else []
@@ -269,48 +416,74 @@ class Decorator(Node):
 # Literais
 class Literal(Expression):
     """Classe base para todos os valores literais"""
-    pass
+    __slots__ = ()
 
 class IntegerLiteral(Literal):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class FloatLiteral(Literal):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class StringLiteral(Literal):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class BooleanLiteral(Literal):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
 class NullLiteral(Literal):
-    pass
+    __slots__ = ()
 
 class ListLiteral(Literal):
+    __slots__ = ('elements',)
+    _fields = ('elements',)
+
     def __init__(self, elements=None):
         self.elements = elements if elements else []
 
 class DictLiteral(Literal):
+    __slots__ = ('items',)
+    _fields = ('items',)
+
     def __init__(self, items=None):
         self.items = items if items else []
 
 class SetLiteral(Literal):
+    __slots__ = ('elements',)
+    _fields = ('elements',)
+
     def __init__(self, elements=None):
         self.elements = elements if elements else []
 
 class MapLiteral(Literal):
+    __slots__ = ('items',)
+    _fields = ('items',)
+
     def __init__(self, items=None):
         self.items = items if items else []
 
 class TupleLiteral(Literal):
+    __slots__ = ('elements',)
+    _fields = ('elements',)
+
     def __init__(self, elements=None):
         self.elements = elements if elements else []
 
 class ExportStatement(Statement):
+    __slots__ = ('identifier', 'is_default', 'from_module', 'export_items', 'is_all_export')
+    _fields = ('identifier',)
+
     def __init__(self, identifier=None, is_default=False, from_module=None, export_items=None, is_all_export=False):
         self.identifier = identifier  # Nome de variável/função sendo exportada
         self.is_default = is_default  # Se é export default
@@ -320,6 +493,52 @@ class ExportStatement(Statement):
 
 class ExportItem:
     """Representa um item específico sendo re-exportado com possível alias"""
+    __slots__ = ('name', 'alias')
+
     def __init__(self, name, alias=None):
         self.name = name      # Nome original no módulo de origem
-        self.alias = alias    # Alias na exportação (se fornecido)
\ No newline at end of file
+        self.alias = alias    # Alias na exportação (se fornecido)
+
+# Percurso da AST
+
+def _iter_nodes(value):
+    """Itera sobre os nós contidos em um valor de campo (nó, lista ou tupla)"""
+    if isinstance(value, Node):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_nodes(item)
+
+def iter_child_nodes(node):
+    """Itera sobre os filhos diretos de um nó, na ordem dos campos declarados"""
+    for field in node._fields:
+        yield from _iter_nodes(getattr(node, field))
+
+def iter_attributes(node):
+    """Itera sobre (nome, valor) de todos os atributos do nó, incluindo a posição"""
+    for cls in reversed(type(node).__mro__):
+        for name in cls.__dict__.get('__slots__', ()):
+            yield name, getattr(node, name, None)
+
+def walk(node):
+    """Itera em pré-ordem sobre um nó (ou lista de nós) e todos os seus descendentes"""
+    pending = list(_iter_nodes(node))
+    pending.reverse()
+    while pending:
+        current = pending.pop()
+        yield current
+        children = list(iter_child_nodes(current))
+        children.reverse()
+        pending.extend(children)
+
+class NodeVisitor:
+    """Visitante da AST: chama visit_<Classe> para cada nó ou generic_visit se não existir"""
+
+    def visit(self, node):
+        visitor = getattr(self, f"visit_{type(node).__name__}", self.generic_visit)
+        return visitor(node)
+
+    def generic_visit(self, node):
+        """Visita todos os filhos diretos do nó"""
+        for child in iter_child_nodes(node):
+            self.visit(child)
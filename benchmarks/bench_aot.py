@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark dos executáveis gerados pelo compilador AOT
+
+Compila scripts de exemplos/ e alguns programas sintéticos (recursão,
+montagem de strings, listas e dicionários) com o AOTCompiler e compara o
+tempo do executável nativo (medido como um processo novo, incluindo a
+inicialização) com o do interpretador de árvore na mesma execução do
+Python. Também mostra o tempo de compilação e confere se as saídas são
+iguais.
+
+Uso: python benchmarks/bench_aot.py [--scale N] [--repeat N]
+"""
+
+import io
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+
+# Scripts de exemplos/ suportados pelo compilador AOT
+EXAMPLES = [
+    "hello_world",
+    "test_complete_final",
+    "test_control_flow_simple",
+    "test_elif_simple",
+    "test_functions_simple",
+    "test_variables",
+]
+
+PROGRAMS = {
+    "fib": """
+fun fib(int n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+println(fib({fib}));
+""",
+    "strings": """
+fun linha(int n) {{
+    string s = "";
+    for (int i = 0; i < n; i = i + 1) {{
+        s = s + i % 10;
+    }}
+    return s;
+}}
+int total = 0;
+for (int k = 0; k < {rounds}; k = k + 1) {{
+    string s = linha(200);
+    string trecho = s.substring(10, 50);
+    total += trecho.length();
+}}
+println(total);
+""",
+    "listas": """
+list numeros = [];
+for (int i = 0; i < {size}; i = i + 1) {{
+    numeros.add(i * 3 % 7);
+}}
+int soma = 0;
+for (int k = 0; k < 20; k = k + 1) {{
+    for (int i = 0; i < numeros.length(); i = i + 1) {{
+        soma += numeros.get(i);
+    }}
+}}
+while (numeros.length() > 0) {{
+    soma -= numeros.removeLast();
+}}
+println(soma);
+""",
+    "dicionarios": """
+dict contagem = {{}};
+for (int i = 0; i < {size}; i = i + 1) {{
+    string chave = "k" + i % 100;
+    if (i < 100) {{
+        contagem.add(chave, 0);
+    }}
+    contagem.add(chave, contagem.get(chave) + 1);
+}}
+println(contagem.length(), contagem.get("k7"));
+""",
+}
+
+
+def interpret(source):
+    """Executa o programa no interpretador e retorna (tempo, saída)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = Interpreter()
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue()
+
+
+def compile_program(source, output_file):
+    """Compila o programa para um executável e retorna o tempo de compilação"""
+    from aot_compiler import AOTCompiler
+
+    interpreter = Interpreter()
+    ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+    start = time.perf_counter()
+    AOTCompiler().compile(ast, output_file=output_file)
+    return time.perf_counter() - start
+
+
+def execute(executable):
+    """Executa o programa compilado em um processo novo e retorna (tempo, saída)"""
+    start = time.perf_counter()
+    process = subprocess.run([executable], stdout=subprocess.PIPE, text=True)
+    return time.perf_counter() - start, process.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos executáveis gerados pelo compilador AOT")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplicador do tamanho dos programas sintéticos")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    try:
+        import llvmlite
+    except ImportError:
+        print("llvmlite não encontrado: o compilador AOT precisa dele")
+        return
+    if shutil.which("gcc") is None:
+        print("gcc não encontrado: o compilador AOT precisa dele para ligar o runtime")
+        return
+
+    programs = []
+    for name in EXAMPLES:
+        with open(ROOT_DIR / "exemplos" / f"{name}.naja", encoding="utf-8") as file:
+            programs.append((name, file.read()))
+    for name, template in PROGRAMS.items():
+        source = template.format(fib=22 + args.scale, rounds=200 * args.scale, size=20000 * args.scale)
+        programs.append((name, source))
+
+    build_dir = tempfile.mkdtemp(prefix="najascript_bench_aot_")
+    try:
+        print(f"{'programa':26} {'compilação':>11} {'interpretado':>13} {'nativo':>10} {'speedup':>9}")
+        for name, source in programs:
+            executable = str(Path(build_dir) / name)
+            compile_time = compile_program(source, executable)
+            interpreted = min(interpret(source) for _ in range(args.repeat))
+            native = min(execute(executable) for _ in range(args.repeat))
+
+            print(f"{name:26} {compile_time * 1000:9.1f} ms {interpreted[0] * 1000:10.1f} ms "
+                  f"{native[0] * 1000:7.1f} ms {interpreted[0] / native[0]:8.1f}x")
+            if interpreted[1] != native[1]:
+                print("AVISO: os modos produziram saídas diferentes!")
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de memória da AST do NajaScript
+
+Gera um programa sintético de N linhas, faz o parse e mede com tracemalloc
+quantos bytes a AST retida ocupa. Para comparação, reconstrói a mesma árvore
+com objetos comuns (um __dict__ por instância, como os nós eram antes de
+usarem __slots__) e mede de novo.
+
+Uso: python benchmarks/bench_ast_memory.py [--lines N]
+"""
+
+import gc
+import io
+import sys
+import time
+import argparse
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from ast_nodes import Node, walk, iter_attributes
+
+# Cada bloco tem 10 linhas
+BLOCK = """fun f{n}(int a, int b) {{
+    int c = a * 2 + b;
+    if (c > 10) {{
+        c = c - {n};
+    }} else {{
+        c = c + 1;
+    }}
+    return c;
+}}
+int r{n} = f{n}({n}, 3);
+"""
+
+
+class DictNode:
+    """Nó equivalente com __dict__ por instância"""
+
+
+def generate(lines):
+    """Gera um programa com aproximadamente 'lines' linhas"""
+    return "".join(BLOCK.format(n=n) for n in range(max(1, lines // 10)))
+
+
+def to_dict_nodes(value):
+    """Copia uma árvore de nós com __slots__ para objetos com __dict__"""
+    if isinstance(value, Node):
+        copy = DictNode()
+        for name, attribute in iter_attributes(value):
+            setattr(copy, name, to_dict_nodes(attribute))
+        return copy
+    if isinstance(value, list):
+        return [to_dict_nodes(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(to_dict_nodes(item) for item in value)
+    return value
+
+
+def measure(build):
+    """Bytes retidos pelo objeto construído por build()"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memória da AST")
+    parser.add_argument("--lines", type=int, default=50000, help="Linhas do programa gerado")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        source = Interpreter().preprocess_source(generate(args.lines))
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast, slots_bytes = measure(lambda: Parser(Lexer(source)).parse())
+    elapsed = time.perf_counter() - start
+
+    nodes = sum(1 for _ in walk(ast))
+    _, dict_bytes = measure(lambda: to_dict_nodes(ast))
+
+    print(f"Programa com {source.count(chr(10))} linhas, {nodes} nós (parse em {elapsed:.2f}s)")
+    print(f"{'representação':16} {'MiB':>8} {'bytes/nó':>9}")
+    print(f"{'__dict__':16} {dict_bytes / 2**20:8.2f} {dict_bytes / nodes:9.1f}")
+    print(f"{'__slots__':16} {slots_bytes / 2**20:8.2f} {slots_bytes / nodes:9.1f}")
+    print(f"Redução: {(1 - slots_bytes / dict_bytes) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do código C com float e listas gerado pelo CJITCompiler
+
+Executa núcleos numéricos com float (integração pela regra do trapézio,
+com parâmetros float declarados e divisões) e com listas de float
+(produto escalar e norma, que leem a lista pelo buffer double* passado à
+função) com o interpretador de árvore puro e com o TieredJIT usando o
+CJITCompiler. O tempo medido inclui o período em que as funções ainda
+são interpretadas e a compilação em segundo plano.
+
+Uso: python benchmarks/bench_c_jit_float.py [--rounds N] [--size N] [--threshold N] [--repeat N]
+"""
+
+import io
+import sys
+import time
+import shutil
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from c_jit_compiler import CJITCompiler
+
+PROGRAMS = {
+    "float": """
+fun trapezio(float a, float b, int n) {{
+    float h = (b - a) / n;
+    float soma = (a * a + b * b) / 2;
+    for (int i = 1; i < n; i = i + 1) {{
+        float x = a + i * h;
+        soma += x * x;
+    }}
+    return soma * h;
+}}
+int i = 0;
+float total = 0.0;
+while (i < {rounds}) {{
+    total = total + trapezio(0.0, i / 10, {size});
+    i = i + 1;
+}}
+println(total);
+""",
+    "lista": """
+fun produto(any u, any v) {{
+    float soma = 0.0;
+    for (int i = 0; i < u.length(); i = i + 1) {{
+        soma += u.get(i) * v.get(i);
+    }}
+    return soma;
+}}
+fun maximo(any v) {{
+    float m = v.get(0);
+    for (int i = 1; i < v.length(); i = i + 1) {{
+        if (v.get(i) > m) {{
+            m = v.get(i);
+        }}
+    }}
+    return m;
+}}
+list u = [];
+list v = [];
+int k = 0;
+while (k < {size}) {{
+    u.add(k * 0.5);
+    v.add(1.0 / (k + 1));
+    k = k + 1;
+}}
+int i = 0;
+float total = 0.0;
+while (i < {rounds}) {{
+    total = total + produto(u, v) + maximo(u);
+    i = i + 1;
+}}
+println(total);
+""",
+}
+
+
+def run(source, threshold):
+    """Executa o programa (com JIT se threshold não for None) e retorna (tempo, saída)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = Interpreter()
+        if threshold is not None:
+            interpreter.set_jit_compiler(CJITCompiler(verbose=False), threshold=threshold)
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do JIT em C com float e listas")
+    parser.add_argument("--rounds", type=int, default=300, help="Chamadas de cada núcleo")
+    parser.add_argument("--size", type=int, default=500, help="Passos da integração e tamanho das listas")
+    parser.add_argument("--threshold", type=int, default=1000, help="Limite de chamadas + back-edges")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    if shutil.which("gcc") is None:
+        print("gcc não encontrado: o CJITCompiler precisa dele")
+        return
+
+    for name, template in PROGRAMS.items():
+        source = template.format(rounds=args.rounds, size=args.size)
+        interpreted = min(run(source, None) for _ in range(args.repeat))
+        compiled = min(run(source, args.threshold) for _ in range(args.repeat))
+
+        print(f"Núcleo {name}: {args.rounds} chamadas com {args.size} elementos")
+        print(f"  {'interpretado':14} {interpreted[0]:8.3f} s")
+        print(f"  {'JIT em C':14} {compiled[0]:8.3f} s")
+        print(f"  speedup {interpreted[0] / compiled[0]:14.2f}x")
+        print()
+
+        if interpreted[1] != compiled[1]:
+            print("AVISO: os modos produziram saídas diferentes!")
+
+
+if __name__ == "__main__":
+    main()
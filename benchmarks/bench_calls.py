@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do retorno de funções no interpretador de árvore do NajaScript
+
+Compara o return sinalizado por valor (RETURN_SIGNAL repassado por
+execute_block até a chamada) com o return anterior, que lançava uma
+ReturnException capturada em Function.__call__ (reproduzido abaixo como
+referência). Os programas são dominados por chamadas: fib recursivo, uma
+recursão linear com return dentro de if e uma busca com return antecipado
+de dentro de um laço. Mostra chamadas por segundo em cada modo.
+
+Uso: python benchmarks/bench_calls.py [--fib N] [--repeat N]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter, ReturnException
+
+PROGRAMS = {
+    "fib": ("""
+fun fib(int n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+println(fib({fib}));
+""", lambda sizes: 2 * _fib(sizes["fib"] + 1) - 1),
+    "soma": ("""
+fun soma(int n) {{
+    if (n == 0) {{
+        return 0;
+    }}
+    return n + soma(n - 1);
+}}
+int i = 0;
+int total = 0;
+while (i < {rounds}) {{
+    total = total + soma(30);
+    i = i + 1;
+}}
+println(total);
+""", lambda sizes: sizes["rounds"] * 31),
+    "busca": ("""
+fun posicao(any valores, int alvo) {{
+    int i = 0;
+    while (i < valores.length()) {{
+        if (valores.get(i) == alvo) {{
+            return i;
+        }}
+        i = i + 1;
+    }}
+    return -1;
+}}
+list valores = [1, 2, 3, 4, 5, 6, 7, 8];
+int i = 0;
+int total = 0;
+while (i < {searches}) {{
+    total = total + posicao(valores, i % 10);
+    i = i + 1;
+}}
+println(total);
+""", lambda sizes: sizes["searches"]),
+}
+
+
+def _fib(n):
+    """n-ésimo número de Fibonacci (para contar as chamadas do fib recursivo)"""
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def raising_return(interpreter, stmt):
+    """execute_ReturnStatement anterior: o valor viaja em uma exceção"""
+    value = None
+    if stmt.value:
+        value = interpreter.evaluate(stmt.value)
+    raise ReturnException(value)
+
+
+def make_interpreter(signals):
+    """Interpretador com return sinalizado ou com o return por exceção"""
+    interpreter = Interpreter()
+    if not signals:
+        interpreter.execute_ReturnStatement = lambda stmt: raising_return(interpreter, stmt)
+        interpreter._build_dispatch_tables()
+    return interpreter
+
+
+def run(source, signals):
+    """Executa um programa e retorna (tempo, saída)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = make_interpreter(signals)
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do retorno de funções sem exceções")
+    parser.add_argument("--fib", type=int, default=20, help="Argumento do fib recursivo")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    scale = max(1, args.fib // 10)
+    sizes = {"fib": args.fib, "rounds": scale * scale * 300, "searches": scale * scale * 5000}
+    print(f"{'programa':10} {'chamadas':>9} {'exceção (k/s)':>14} {'sinal (k/s)':>12} {'speedup':>8}")
+    for name, (template, count_calls) in PROGRAMS.items():
+        source = template.format(**sizes)
+        calls = count_calls(sizes)
+
+        results = {signals: min(run(source, signals) for _ in range(args.repeat)) for signals in (False, True)}
+        if results[False][1] != results[True][1]:
+            print(f"{name:10} saídas diferentes entre os modos!")
+            continue
+        if "Erro" in results[True][1]:
+            print(f"{name:10} {results[True][1].strip()}")
+            continue
+
+        raising, signalled = results[False][0], results[True][0]
+        print(f"{name:10} {calls:9d} {calls / raising / 1000:14.1f} {calls / signalled / 1000:12.1f} "
+              f"{raising / signalled:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do compilador de closures do NajaScript
+
+Executa laços while/for apertados e chamadas de função com o interpretador
+de árvore e com o modo closures (closure_compiler.ClosureCompiler) e
+compara os tempos. O tempo de compilação das closures é incluído.
+
+Uso: python benchmarks/bench_closures.py [--repeat N] [--size N]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from closure_compiler import ClosureCompiler
+
+PROGRAMS = {
+    "while": """
+int i = 0;
+int total = 0;
+while (i < {size}) {{
+    total = total + i * 2;
+    i = i + 1;
+}}
+println(total);
+""",
+    "for": """
+int total = 0;
+for (int i = 0; i < {size}; i = i + 1) {{
+    if (i % 3 == 0) {{
+        total += i;
+    }}
+}}
+println(total);
+""",
+    "chamadas": """
+fun soma(int a, int b) {{
+    return a + b;
+}}
+int i = 0;
+int total = 0;
+while (i < {size}) {{
+    total = soma(total, i);
+    i = i + 1;
+}}
+println(total);
+""",
+}
+
+
+def run_program(source, closures):
+    """Executa um programa e retorna (tempo, saída)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = Interpreter()
+        if closures:
+            interpreter.set_closure_compiler(ClosureCompiler(interpreter))
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+
+    return elapsed, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do compilador de closures")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições por programa (usa o melhor tempo)")
+    parser.add_argument("--size", type=int, default=100000, help="Número de iterações dos laços")
+    args = parser.parse_args()
+
+    print(f"{'programa':10} {'árvore (s)':>11} {'closures (s)':>13} {'speedup':>8}")
+    for name, template in PROGRAMS.items():
+        source = template.format(size=args.size)
+
+        tree_time, tree_output = min(run_program(source, False) for _ in range(args.repeat))
+        closure_time, closure_output = min(run_program(source, True) for _ in range(args.repeat))
+
+        if tree_output != closure_output:
+            print(f"{name:10} saídas diferentes entre os modos!")
+            continue
+
+        print(f"{name:10} {tree_time:11.3f} {closure_time:13.3f} {tree_time / closure_time:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
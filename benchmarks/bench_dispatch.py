@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark do despacho de nós do interpretador NajaScript
+
+Compara o despacho antigo (f-string + hasattr + getattr a cada nó) com a
+tabela de despacho por tipo construída em Interpreter._build_dispatch_tables.
+Mede o custo por nó em dois cenários:
+
+  1. Despacho isolado: avalia repetidamente um IntegerLiteral
+  2. Exemplos com laços de exemplos/ executados várias vezes
+
+Uso: python benchmarks/bench_dispatch.py [--repeat N] [arquivos.naja ...]
+"""
+
+import os
+import sys
+import io
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from ast_nodes import IntegerLiteral
+
+# Exemplos com laços while/for que executam sem dependências externas
+DEFAULT_EXAMPLES = [
+    "exemplos/test_control_flow_simple.naja",
+    "exemplos/teste_basico.naja",
+    "exemplos/test_complete_final.naja",
+    "exemplos/test_fixed_comparison.naja",
+]
+
+
+class LegacyDispatchInterpreter(Interpreter):
+    """Interpretador com o despacho anterior, baseado em nomes de métodos"""
+
+    def execute(self, stmt):
+        method_name = f"execute_{type(stmt).__name__}"
+        if hasattr(self, method_name):
+            return getattr(self, method_name)(stmt)
+        else:
+            raise Exception(f"Método não implementado: {method_name}")
+
+    def evaluate(self, expr):
+        if expr is None:
+            return None
+        if isinstance(expr, str):
+            return expr
+        method_name = f"evaluate_{expr.__class__.__name__}"
+        if hasattr(self, method_name):
+            return getattr(self, method_name)(expr)
+        raise Exception(f"Tipo de expressão não implementado: {expr.__class__.__name__}")
+
+
+class CountingInterpreter(Interpreter):
+    """Interpretador que apenas conta quantos nós são despachados"""
+
+    def __init__(self, *args, **kwargs):
+        self.node_count = 0
+        super().__init__(*args, **kwargs)
+
+    def execute(self, stmt):
+        self.node_count += 1
+        return super().execute(stmt)
+
+    def evaluate(self, expr):
+        self.node_count += 1
+        return super().evaluate(expr)
+
+
+def parse_example(path):
+    """Lê, pré-processa e faz o parse de um exemplo"""
+    source = Path(path).read_text(encoding="utf-8")
+    source = Interpreter().preprocess_source(source)
+    return Parser(Lexer(source)).parse()
+
+
+def run_program(interpreter_class, ast, module_dir):
+    """Executa um programa com a saída descartada e retorna o tempo gasto"""
+    interpreter = interpreter_class()
+    interpreter.module_paths = [".", "./modules", module_dir]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+
+    return elapsed, interpreter
+
+
+def bench_isolated(iterations):
+    """Mede apenas o custo de despacho avaliando um literal inteiro"""
+    results = {}
+    node = IntegerLiteral(1)
+
+    for label, interpreter_class in (("antes", LegacyDispatchInterpreter), ("depois", Interpreter)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter = interpreter_class()
+        evaluate = interpreter.evaluate
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            evaluate(node)
+        elapsed = time.perf_counter() - start
+
+        results[label] = elapsed / iterations * 1e9
+
+    return results
+
+
+def bench_example(path, repeat):
+    """Mede o tempo por nó de um exemplo com os dois despachos"""
+    ast = parse_example(path)
+    module_dir = os.path.dirname(os.path.abspath(path))
+
+    _, counter = run_program(CountingInterpreter, ast, module_dir)
+    node_count = counter.node_count
+
+    results = {"nos": node_count}
+    for label, interpreter_class in (("antes", LegacyDispatchInterpreter), ("depois", Interpreter)):
+        best = min(run_program(interpreter_class, ast, module_dir)[0] for _ in range(repeat))
+        results[label] = best / max(node_count, 1) * 1e9
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do despacho de nós do interpretador")
+    parser.add_argument("files", nargs="*", help="Arquivos .naja a medir (padrão: exemplos com laços)")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetições por exemplo (usa o melhor tempo)")
+    parser.add_argument("--iterations", type=int, default=1000000, help="Iterações do teste isolado")
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)
+    files = args.files or DEFAULT_EXAMPLES
+
+    print("=== Despacho isolado (evaluate de IntegerLiteral) ===")
+    isolated = bench_isolated(args.iterations)
+    print(f"antes:  {isolated['antes']:8.1f} ns/nó")
+    print(f"depois: {isolated['depois']:8.1f} ns/nó")
+    print(f"ganho:  {isolated['antes'] - isolated['depois']:8.1f} ns/nó")
+
+    print("\n=== Exemplos com laços ===")
+    print(f"{'exemplo':45} {'nós':>7} {'antes ns/nó':>12} {'depois ns/nó':>13} {'speedup':>8}")
+    for path in files:
+        try:
+            results = bench_example(path, args.repeat)
+        except Exception as e:
+            print(f"{path:45} erro: {e}")
+            continue
+        speedup = results["antes"] / results["depois"] if results["depois"] else 0.0
+        print(f"{path:45} {results['nos']:7d} {results['antes']:12.1f} {results['depois']:13.1f} {speedup:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
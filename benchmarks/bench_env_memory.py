@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de alocação de ambientes do interpretador NajaScript
+
+Executa um laço de 1M iterações que entra em um if/else e chama uma função
+a cada volta, e relata quantos ambientes são criados por iteração e quantos
+bytes eles ocupam. Compara o resolver sem otimizações de alocação com a
+elisão de blocos sem declarações e o pool de frames de função.
+
+Uso: python benchmarks/bench_env_memory.py [--iterations N] [--peak]
+"""
+
+import io
+import sys
+import time
+import argparse
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import environment
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from resolver import Resolver
+
+PROGRAM = """
+fun step(int x) {{
+    int y = x % 7;
+    return y;
+}}
+int total = 0;
+int i = 0;
+while (i < {iterations}) {{
+    if (i % 2 == 0) {{
+        total = total + step(i);
+    }} else {{
+        total = total - 1;
+    }}
+    i = i + 1;
+}}
+println(total);
+"""
+
+CONFIGURATIONS = [
+    ("sem elisão/pool", dict(elide_blocks=False, pool_frames=False)),
+    ("só elisão", dict(elide_blocks=True, pool_frames=False)),
+    ("elisão + pool", dict(elide_blocks=True, pool_frames=True)),
+]
+
+
+def environment_size(env):
+    """Bytes ocupados por um ambiente e pelos seus dicionários e slots"""
+    size = sys.getsizeof(env) + sys.getsizeof(env.__dict__)
+    for value in vars(env).values():
+        if isinstance(value, (dict, list)):
+            size += sys.getsizeof(value)
+    return size
+
+
+class AllocationCounter:
+    """Conta os ambientes criados e soma o tamanho de cada um"""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+
+    def install(self):
+        """Envolve os construtores de Environment e SlotEnvironment"""
+        self._originals = []
+        for cls in (environment.Environment, environment.SlotEnvironment):
+            original = cls.__dict__["__init__"]
+            self._originals.append((cls, original))
+            cls.__init__ = self._wrap(original)
+
+    def uninstall(self):
+        for cls, original in self._originals:
+            cls.__init__ = original
+
+    def _wrap(self, original):
+        counter = self
+
+        def __init__(env, *args, **kwargs):
+            original(env, *args, **kwargs)
+            counter.count += 1
+            counter.bytes += environment_size(env)
+        return __init__
+
+
+def run(iterations, options, peak):
+    """Executa o programa com um resolver configurado e retorna as medições"""
+    source = PROGRAM.format(iterations=iterations)
+
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        interpreter = Interpreter()
+        interpreter.resolver = Resolver(**options)
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        counter = AllocationCounter()
+        counter.install()
+        if peak:
+            tracemalloc.start()
+        try:
+            start = time.perf_counter()
+            interpreter.interpret(ast)
+            elapsed = time.perf_counter() - start
+            peak_bytes = tracemalloc.get_traced_memory()[1] if peak else None
+        finally:
+            if peak:
+                tracemalloc.stop()
+            counter.uninstall()
+
+    return {
+        "tempo": elapsed,
+        "ambientes": counter.count / iterations,
+        "bytes": counter.bytes / iterations,
+        "pico": peak_bytes,
+        "saida": output.getvalue(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de alocação de ambientes")
+    parser.add_argument("--iterations", type=int, default=1000000, help="Iterações do laço")
+    parser.add_argument("--peak", action="store_true", help="Medir também o pico de memória com tracemalloc (mais lento)")
+    args = parser.parse_args()
+
+    print(f"Laço de {args.iterations} iterações (if/else + chamada de função por iteração)")
+    header = f"{'configuração':18} {'tempo (s)':>10} {'ambientes/iter':>15} {'bytes/iter':>11}"
+    if args.peak:
+        header += f" {'pico (KiB)':>11}"
+    print(header)
+
+    outputs = set()
+    for label, options in CONFIGURATIONS:
+        result = run(args.iterations, options, args.peak)
+        outputs.add(result["saida"])
+        line = f"{label:18} {result['tempo']:10.2f} {result['ambientes']:15.2f} {result['bytes']:11.0f}"
+        if args.peak:
+            line += f" {result['pico'] / 1024:11.1f}"
+        print(line)
+
+    if len(outputs) != 1:
+        print("AVISO: as configurações produziram saídas diferentes!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark dos caches inline de MethodCall do NajaScript
+
+Compara os caches inline com a cascata de isinstance + if/elif por nome de
+método usada antes deles (reproduzida abaixo como referência): primeiro a
+avaliação de um único MethodCall por tipo de receptor, depois um programa com
+chamadas em listas e strings (sítios monomórficos e um polimórfico), cujos
+contadores de acerto/falha são mostrados no final.
+
+Uso: python benchmarks/bench_inline_cache.py [--iterations N] [--repeat N]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter, NajaList, NajaDict, NajaObject, NajaModule
+from ast_nodes import MethodCall, Variable, IntegerLiteral
+
+PROGRAM = """
+list valores = [1, 2, 3, 4, 5];
+string nome = "najascript";
+any alvo = valores;
+int i = 0;
+int total = 0;
+while (i < {iterations}) {{
+    total = total + valores.get(i % 5) + valores.length();
+    if (i % 2 == 0) {{
+        alvo = nome;
+    }} else {{
+        alvo = valores;
+    }}
+    total = total + alvo.length();
+    i = i + 1;
+}}
+println(total);
+"""
+
+
+def cascade_invoke_method(interpreter, obj, method_name, arguments):
+    """Despacho anterior aos caches: cascata de isinstance e if/elif por nome"""
+    if interpreter.debug:
+        print(f"DEBUG: MethodCall: objeto={obj}, método={method_name}, argumentos={arguments}")
+    if isinstance(obj, NajaModule):
+        return interpreter._invoke_method(obj, method_name, arguments)
+    elif isinstance(obj, NajaObject):
+        try:
+            return obj._call_method(method_name, interpreter, arguments)
+        except Exception as e:
+            raise Exception(f"Erro ao chamar método '{method_name}' no objeto {obj._class_name}: {e}")
+    elif isinstance(obj, NajaList):
+        if method_name == "length":
+            return obj.length()
+        elif method_name == "get":
+            if len(arguments) != 1:
+                raise Exception(f"Método get() espera 1 argumento, recebeu {len(arguments)}")
+            return obj.get(arguments[0])
+        elif method_name == "add":
+            if len(arguments) != 1:
+                raise Exception(f"Método add() espera 1 argumento, recebeu {len(arguments)}")
+            return obj.add(arguments[0])
+        elif method_name == "remove":
+            if len(arguments) != 1:
+                raise Exception(f"Método remove() espera 1 argumento, recebeu {len(arguments)}")
+            return obj.remove(arguments[0])
+        elif method_name == "removeLast":
+            if len(arguments) != 0:
+                raise Exception(f"Método removeLast() não espera argumentos, recebeu {len(arguments)}")
+            return obj.removeLast()
+        else:
+            raise Exception(f"Listas não possuem o método '{method_name}'")
+    elif isinstance(obj, NajaDict):
+        if method_name == "length":
+            return obj.length()
+        elif method_name == "get":
+            if len(arguments) != 1:
+                raise Exception(f"Método get() espera 1 argumento, recebeu {len(arguments)}")
+            return obj.get(arguments[0])
+        elif method_name == "add":
+            if len(arguments) not in [1, 2]:
+                raise Exception(f"Método add() espera 1 ou 2 argumentos, recebeu {len(arguments)}")
+            if len(arguments) == 1:
+                return obj.add(arguments[0])
+            else:
+                return obj.add(arguments[0], arguments[1])
+        elif method_name == "remove":
+            if len(arguments) != 1:
+                raise Exception(f"Método remove() espera 1 argumento, recebeu {len(arguments)}")
+            return obj.remove(arguments[0])
+        else:
+            raise Exception(f"Dicionários não possuem o método '{method_name}'")
+    elif isinstance(obj, str):
+        if method_name == "length":
+            return len(obj)
+        elif method_name == "substring":
+            return obj[arguments[0]:] if len(arguments) == 1 else obj[arguments[0]:arguments[1]]
+    return interpreter._invoke_method(obj, method_name, arguments)
+
+
+def cascade_method_call(interpreter, expr):
+    """evaluate_MethodCall sem cache"""
+    obj = interpreter.evaluate(expr.object)
+    arguments = [interpreter.evaluate(arg) for arg in expr.arguments]
+    return cascade_invoke_method(interpreter, obj, expr.method, arguments)
+
+
+def make_interpreter(cached):
+    """Interpretador com os caches inline ou com a cascata anterior"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = Interpreter()
+    if not cached:
+        interpreter.evaluate_MethodCall = lambda expr: cascade_method_call(interpreter, expr)
+        interpreter._build_dispatch_tables()
+    return interpreter
+
+
+def measure_call(receiver, method_name, arguments, iterations):
+    """ns por avaliação de um MethodCall 'alvo.método(...)' com cascata e com cache"""
+    times = []
+    for cached in (False, True):
+        interpreter = make_interpreter(cached)
+        interpreter.environment.define("alvo", receiver)
+        node = MethodCall(Variable("alvo"), method_name, [IntegerLiteral(value) for value in arguments])
+        evaluate = interpreter.evaluate
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            evaluate(node)
+        times.append((time.perf_counter() - start) / iterations * 1e9)
+    return times
+
+
+def run(iterations, cached):
+    """Executa o programa e retorna (tempo, saída, relatório dos caches)"""
+    source = PROGRAM.format(iterations=iterations)
+    interpreter = make_interpreter(cached)
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue(), interpreter.inline_cache_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos caches inline de MethodCall")
+    parser.add_argument("--iterations", type=int, default=100000, help="Iterações do laço")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por configuração")
+    args = parser.parse_args()
+
+    dictionary = NajaDict()
+    dictionary.add(1, "um")
+    cases = [
+        ("lista.get(0)", NajaList([1, 2, 3]), "get", [0]),
+        ("lista.length()", NajaList([1, 2, 3]), "length", []),
+        ("dict.get(1)", dictionary, "get", [1]),
+        ("string.length()", "najascript", "length", []),
+        ("string.substring(1, 4)", "najascript", "substring", [1, 4]),
+    ]
+    print(f"Avaliação de um MethodCall ({args.iterations} chamadas por caso)")
+    print(f"  {'chamada':24} {'cascata ns':>11} {'cache ns':>9} {'speedup':>8}")
+    for label, receiver, method_name, arguments in cases:
+        cascade, cached = measure_call(receiver, method_name, arguments, args.iterations)
+        print(f"  {label:24} {cascade:11.1f} {cached:9.1f} {cascade / cached:7.2f}x")
+
+    results = {}
+    for label, cached in (("cascata", False), ("cache inline", True)):
+        runs = [run(args.iterations, cached) for _ in range(args.repeat)]
+        results[label] = min(runs, key=lambda result: result[0])
+
+    print()
+    print(f"Programa: laço de {args.iterations} iterações com 3 chamadas de método cada")
+    for label, (elapsed, _, _) in results.items():
+        print(f"  {label:14} {elapsed:8.3f} s")
+    print(f"  speedup {results['cascata'][0] / results['cache inline'][0]:14.2f}x")
+
+    print()
+    for line in results["cache inline"][2]:
+        print(line)
+
+    if results["cascata"][1] != results["cache inline"][1]:
+        print("AVISO: as configurações produziram saídas diferentes!")
+
+
+if __name__ == "__main__":
+    main()
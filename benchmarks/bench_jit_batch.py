@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da compilação em lote do CJITCompiler
+
+Gera um módulo com N funções numéricas e compara o tempo para compilar
+todas elas uma a uma (um gcc e um dlopen por função, como o TieredJIT faz
+com funções quentes) com o compile_module, que gera uma única unidade de
+tradução C, e com o compile_module dividido entre --jobs processos gcc.
+O cache em disco fica desligado para medir sempre a compilação.
+
+Uso: python benchmarks/bench_jit_batch.py [--functions N] [--jobs N] [--repeat N]
+"""
+
+import sys
+import time
+import shutil
+import argparse
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from c_jit_compiler import CJITCompiler
+
+FUNCTION = """
+fun auxiliar{index}(int x, int y) {{
+    if (x > y) {{
+        return x * {index} - y;
+    }}
+    return y * {index} - x;
+}}
+"""
+
+
+def compile_individually(functions):
+    compiler = CJITCompiler(verbose=False, use_cache=False)
+    for declaration in functions:
+        compiler.compile_function(declaration, None)
+
+
+def compile_batch(functions, jobs):
+    compiler = CJITCompiler(verbose=False, use_cache=False, jobs=jobs)
+    compiler.compile_module(functions)
+
+
+def measure(action, repeat):
+    """Melhor tempo de 'repeat' execuções"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da compilação em lote do JIT em C")
+    parser.add_argument("--functions", type=int, default=30, help="Funções no módulo gerado")
+    parser.add_argument("--jobs", type=int, default=4, help="Processos gcc da compilação em paralelo")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    if shutil.which("gcc") is None:
+        print("gcc não encontrado: o CJITCompiler precisa dele")
+        return
+
+    source = "".join(FUNCTION.format(index=index) for index in range(args.functions))
+    functions = Parser(Lexer(source)).parse().statements
+
+    individual = measure(lambda: compile_individually(functions), args.repeat)
+    batch = measure(lambda: compile_batch(functions, 1), args.repeat)
+    parallel = measure(lambda: compile_batch(functions, args.jobs), args.repeat)
+
+    print(f"Compilação de {args.functions} funções")
+    print(f"  {'uma a uma':18} {individual * 1000:9.1f} ms")
+    print(f"  {'lote':18} {batch * 1000:9.1f} ms  ({individual / batch:.1f}x)")
+    print(f"  {f'lote, {args.jobs} jobs':18} {parallel * 1000:9.1f} ms  ({individual / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do cache em disco do CJITCompiler
+
+Compila um conjunto de funções numéricas (algumas especializações int e
+float) com um diretório de cache vazio, simulando a primeira execução, e
+depois com um novo CJITCompiler apontando para o mesmo diretório,
+simulando a execução seguinte, que só carrega as bibliotecas com dlopen.
+Também mede o compilador sem cache, como era antes. Mostra o tempo total
+de aquecimento de cada modo.
+
+Uso: python benchmarks/bench_jit_cache.py [--repeat N]
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from c_jit_compiler import CJITCompiler
+
+PROGRAM = """
+fun fib(any n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+fun distancia(any a, any b) {
+    if (a > b) {
+        return a - b;
+    }
+    return b - a;
+}
+fun potencia(int b, int e) {
+    if (e == 0) {
+        return 1;
+    }
+    return b * potencia(b, e - 1);
+}
+fun quadrado(any x) {
+    return x * x;
+}
+"""
+
+SIGNATURES = {
+    "fib": [(int,), (float,)],
+    "distancia": [(int, int), (float, int)],
+    "potencia": [(int, int)],
+    "quadrado": [(int,), (float,)],
+}
+
+
+def warm_up(functions, cache_dir, use_cache):
+    """Compila (ou carrega) todas as especializações e retorna o tempo gasto"""
+    start = time.perf_counter()
+    compiler = CJITCompiler(verbose=False, cache_dir=cache_dir, use_cache=use_cache)
+    for declaration in functions:
+        for signature in SIGNATURES[declaration.name]:
+            compiler.compile_function(declaration, None, signature)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache em disco do JIT em C")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    if shutil.which("gcc") is None:
+        print("gcc não encontrado: o CJITCompiler precisa dele")
+        return
+
+    functions = Parser(Lexer(PROGRAM)).parse().statements
+    count = sum(len(signatures) for signatures in SIGNATURES.values())
+
+    uncached, cold, warm = [], [], []
+    for _ in range(args.repeat):
+        cache_dir = tempfile.mkdtemp(prefix="najascript_bench_cache_")
+        try:
+            uncached.append(warm_up(functions, cache_dir, False))
+            cold.append(warm_up(functions, cache_dir, True))
+            warm.append(warm_up(functions, cache_dir, True))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"Aquecimento de {count} especializações")
+    print(f"  {'sem cache':14} {min(uncached) * 1000:9.1f} ms")
+    print(f"  {'cache vazio':14} {min(cold) * 1000:9.1f} ms")
+    print(f"  {'cache quente':14} {min(warm) * 1000:9.1f} ms")
+    print(f"  speedup {min(uncached) / min(warm):15.1f}x")
+
+
+if __name__ == "__main__":
+    main()
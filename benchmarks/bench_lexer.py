@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de vazão do lexer do NajaScript
+
+Monta um código-fonte grande repetindo os exemplos do repositório e mede
+quantos tokens por segundo o lexer produz caractere a caractere (legacy) e
+com a expressão regular mestre, tanto via get_next_token (como o parser usa)
+quanto iterando diretamente o gerador Lexer.tokens(). Também confere que os
+modos geram exatamente os mesmos tokens.
+
+Uso: python benchmarks/bench_lexer.py [--size-mb N] [--repeat N]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer, TokenType
+
+
+def build_source(size_mb):
+    """Concatena os exemplos que o lexer aceita até atingir o tamanho pedido"""
+    samples = []
+    for path in sorted((ROOT_DIR / "exemplos").glob("*.naja")):
+        text = path.read_text(encoding="utf-8", errors="replace").lstrip("﻿")
+        try:
+            Lexer(text, legacy=True).tokenize()
+        except Exception:
+            continue
+        samples.append(text)
+
+    chunk = "\n".join(samples) + "\n"
+    target = int(size_mb * 1024 * 1024)
+    return chunk * max(1, target // len(chunk))
+
+
+def lex(source, mode):
+    """Lexa o código inteiro e retorna os tokens"""
+    if mode == "gerador":
+        return list(Lexer(source).tokens())[:-1]
+
+    lexer = Lexer(source, legacy=(mode == "legacy"))
+    tokens = []
+    token = lexer.get_next_token()
+    while token.type != TokenType.EOF:
+        tokens.append(token)
+        token = lexer.get_next_token()
+    return tokens
+
+
+def measure(source, mode, repeat):
+    """Melhor tempo entre 'repeat' execuções e os tokens da última"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = lex(source, mode)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de vazão do lexer")
+    parser.add_argument("--size-mb", type=float, default=1.0, help="Tamanho do código gerado em MiB")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo")
+    args = parser.parse_args()
+
+    source = build_source(args.size_mb)
+    print(f"Código de {len(source) / 1024 / 1024:.2f} MiB, {source.count(chr(10))} linhas")
+    print(f"{'modo':10} {'tempo (s)':>10} {'tokens':>9} {'tokens/s':>12}")
+
+    results = {}
+    for label in ("legacy", "regex", "gerador"):
+        elapsed, tokens = measure(source, label, args.repeat)
+        results[label] = (elapsed, [(t.type, t.value, t.line, t.column) for t in tokens])
+        print(f"{label:10} {elapsed:10.3f} {len(tokens):9d} {len(tokens) / elapsed:12.0f}")
+
+    print(f"Speedup: {results['legacy'][0] / results['regex'][0]:.2f}x")
+    if not results["legacy"][1] == results["regex"][1] == results["gerador"][1]:
+        print("AVISO: os modos produziram tokens diferentes!")
+
+
+if __name__ == "__main__":
+    main()
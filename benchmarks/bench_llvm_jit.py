@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do JIT com o LLVM (MCJIT do llvmlite) do NajaScript
+
+Executa programas com funções numéricas quentes (recursão com int, um laço
+de float com elif e break e uma soma sobre uma lista de float) com o
+interpretador de árvore puro, com o TieredJIT usando o CJITCompiler (gcc,
+se disponível) e com o TieredJIT usando o LLVMJITCompiler, que traduz o
+bytecode de registradores para código de máquina no próprio processo. A
+compilação roda em segundo plano; o tempo medido inclui o período em que
+as funções ainda são interpretadas. No final de cada programa, mostra o
+relatório de camadas do modo LLVM.
+
+Uso: python benchmarks/bench_llvm_jit.py [--rounds N] [--threshold N] [--repeat N]
+"""
+
+import io
+import sys
+import time
+import shutil
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+
+PROGRAMS = {
+    "fib": """
+fun fib(int n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+int i = 0;
+int total = 0;
+while (i < {rounds}) {{
+    total = total + fib(16);
+    i = i + 1;
+}}
+println(total);
+""",
+    "serie": """
+fun serie(int n) {{
+    float total = 0.0;
+    for (int i = 1; i < n; i = i + 1) {{
+        if (i % 3 == 0) {{
+            total += 1.0 / i;
+        }} elif (i % 3 == 1) {{
+            total -= 0.5 / i;
+        }} else {{
+            total = total * 0.999;
+        }}
+        if (total > 1000000.0) {{
+            break;
+        }}
+    }}
+    return total;
+}}
+float soma = 0.0;
+for (int k = 0; k < {rounds}; k = k + 1) {{
+    soma += serie(2000 + k);
+}}
+println(soma);
+""",
+    "lista": """
+fun media(any valores) {{
+    float total = 0.0;
+    for (int i = 0; i < valores.length(); i = i + 1) {{
+        total += valores.get(i);
+    }}
+    return total / valores.length();
+}}
+list valores = [];
+for (int i = 0; i < 5000; i = i + 1) {{
+    valores.add(i * 0.5);
+}}
+float soma = 0.0;
+for (int k = 0; k < {rounds}; k = k + 1) {{
+    soma += media(valores);
+}}
+println(soma);
+""",
+}
+
+
+def make_compiler(mode, interpreter):
+    """Compilador JIT de um modo ('c' ou 'llvm')"""
+    if mode == "c":
+        from c_jit_compiler import CJITCompiler
+        return CJITCompiler(verbose=False, use_cache=False)
+    from naja_llvm import LLVMJITCompiler
+    return LLVMJITCompiler(interpreter, verbose=False)
+
+
+def run(source, mode, threshold):
+    """Executa o programa (com JIT se mode não for None) e retorna (tempo, saída, relatório)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = Interpreter()
+        if mode is not None:
+            interpreter.set_jit_compiler(make_compiler(mode, interpreter), threshold=threshold)
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue(), interpreter.jit_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do JIT com o LLVM")
+    parser.add_argument("--rounds", type=int, default=40, help="Iterações do laço principal")
+    parser.add_argument("--threshold", type=int, default=1000, help="Limite de chamadas + back-edges")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    try:
+        import llvmlite
+    except ImportError:
+        print("llvmlite não encontrado: o LLVMJITCompiler precisa dele")
+        return
+
+    modes = [("interpretado", None), ("jit llvm", "llvm")]
+    if shutil.which("gcc") is not None:
+        modes.insert(1, ("jit c (gcc)", "c"))
+    else:
+        print("gcc não encontrado: o modo jit c fica de fora")
+
+    for name, template in PROGRAMS.items():
+        source = template.format(rounds=args.rounds)
+        results = [(label, min(run(source, mode, args.threshold) for _ in range(args.repeat)))
+                   for label, mode in modes]
+        baseline = results[0][1][0]
+
+        print(f"Programa {name}: {args.rounds} rodadas")
+        for label, result in results:
+            print(f"  {label:14} {result[0]:8.3f} s {baseline / result[0]:8.2f}x")
+        print()
+        for line in results[-1][1][2]:
+            print(f"  {line}")
+        print()
+
+        if any(result[1] != results[0][1][1] for _, result in results):
+            print("AVISO: os modos produziram saídas diferentes!")
+
+
+if __name__ == "__main__":
+    main()
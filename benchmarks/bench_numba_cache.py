@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do cache em disco do JITCompiler (Numba)
+
+Compila um conjunto de funções numéricas (algumas especializações int e
+float) com um diretório de cache vazio, simulando a primeira execução, e
+depois com um novo JITCompiler apontando para o mesmo diretório, que
+carrega o código de máquina gravado pela Numba. Também mede o compilador
+sem cache, como era antes. Cada modo roda em um processo novo, como uma
+execução do najascript.py, para que nada compilado fique na memória.
+
+Uso: python benchmarks/bench_numba_cache.py [--repeat N]
+"""
+
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+PROGRAM = """
+fun fib(any n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+fun soma(any v) {
+    float s = 0.0;
+    for (int i = 0; i < v.length(); i = i + 1) {
+        s += v.get(i);
+    }
+    return s;
+}
+fun potencia(any b, int e) {
+    any r = b;
+    for (int i = 1; i < e; i = i + 1) {
+        r = r * b;
+    }
+    return r;
+}
+"""
+
+# Executado em um processo novo: compila todas as especializações e mostra o tempo
+WARM_UP = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import NajaList
+from jit_compiler import JITCompiler
+signatures = {{
+    "fib": [(int,), (float,)],
+    "soma": [(NajaList,)],
+    "potencia": [(int, int), (float, int)],
+}}
+compiler = JITCompiler(verbose=False, cache_dir={cache_dir!r}, use_cache={use_cache!r})
+for declaration in Parser(Lexer({program!r})).parse().statements:
+    for signature in signatures[declaration.name]:
+        if compiler.compile_function(declaration, None, signature) is None:
+            raise SystemExit(f"{{declaration.name}}{{signature}} não foi compilada")
+print(json.dumps(time.perf_counter() - start))
+"""
+
+
+def warm_up(cache_dir, use_cache):
+    """Tempo de importação + compilação (ou carga) das especializações em um processo novo"""
+    code = WARM_UP.format(root=str(ROOT_DIR), cache_dir=cache_dir, use_cache=use_cache, program=PROGRAM)
+    process = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True, check=True)
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache em disco do JIT com Numba")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    try:
+        import numba
+    except ImportError:
+        print("Numba não encontrada: o JITCompiler precisa dela")
+        return
+
+    uncached, cold, warm = [], [], []
+    for _ in range(args.repeat):
+        cache_dir = tempfile.mkdtemp(prefix="najascript_bench_numba_")
+        try:
+            uncached.append(warm_up(cache_dir, False))
+            cold.append(warm_up(cache_dir, True))
+            warm.append(warm_up(cache_dir, True))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("Aquecimento de 5 especializações (inclui importar a Numba)")
+    print(f"  {'sem cache':14} {min(uncached) * 1000:9.1f} ms")
+    print(f"  {'cache vazio':14} {min(cold) * 1000:9.1f} ms")
+    print(f"  {'cache quente':14} {min(warm) * 1000:9.1f} ms")
+    print(f"  speedup {min(uncached) / min(warm):15.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do cache de ASTs do NajaScript (__najacache__)
+
+Copia modules/Matematica.naja para um diretório temporário junto com um
+script que o importa e mede:
+
+  - a inicialização do CLI (najascript.py em um subprocesso) sem cache,
+    com o cache frio (primeira execução, que grava as entradas) e quente
+  - dentro do processo, o tempo de pré-processar + lexar + parsear o módulo
+    repetido N vezes contra o tempo de carregá-lo do cache
+
+Uso: python benchmarks/bench_parse_cache.py [--runs N] [--copies N]
+"""
+
+import io
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from interpreter import Interpreter
+from parse_cache import ParseCache, CACHE_DIR_NAME
+
+MAIN_PROGRAM = """import * as M from "Matematica";
+println(M);
+"""
+
+
+def run_cli(workdir, *flags):
+    """Tempo de parede de uma execução do CLI"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(ROOT_DIR / "najascript.py"), *flags, "main.naja"],
+                   cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def bench_cli(workdir, runs):
+    """Melhor tempo de inicialização sem cache, com cache frio e com cache quente"""
+    results = {"sem cache": [], "cache frio": [], "cache quente": []}
+    for _ in range(runs):
+        results["sem cache"].append(run_cli(workdir, "--no-cache"))
+        shutil.rmtree(workdir / CACHE_DIR_NAME, ignore_errors=True)
+        results["cache frio"].append(run_cli(workdir))
+        results["cache quente"].append(run_cli(workdir))
+    return {label: min(times) for label, times in results.items()}
+
+
+def bench_parse(workdir, copies, runs):
+    """Parse completo contra leitura do cache de um módulo grande"""
+    path = workdir / "Grande.naja"
+    source = (ROOT_DIR / "modules" / "Matematica.naja").read_text(encoding="utf-8") * copies
+    path.write_text(source, encoding="utf-8")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = Interpreter()
+
+    cache = ParseCache()
+    parse_times, load_times = [], []
+    for _ in range(runs):
+        shutil.rmtree(workdir / CACHE_DIR_NAME, ignore_errors=True)
+        start = time.perf_counter()
+        cache.parse(str(path), source, interpreter.preprocess_source)
+        parse_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        cache.parse(str(path), source, interpreter.preprocess_source)
+        load_times.append(time.perf_counter() - start)
+
+    assert cache.hits == runs and cache.misses == runs
+    return source.count("\n"), min(parse_times), min(load_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de ASTs")
+    parser.add_argument("--runs", type=int, default=5, help="Execuções por medição")
+    parser.add_argument("--copies", type=int, default=50, help="Cópias do módulo no teste em processo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        workdir = Path(temp)
+        shutil.copy(ROOT_DIR / "modules" / "Matematica.naja", workdir)
+        (workdir / "main.naja").write_text(MAIN_PROGRAM, encoding="utf-8")
+
+        print("Inicialização do CLI (import de Matematica.naja)")
+        for label, elapsed in bench_cli(workdir, args.runs).items():
+            print(f"  {label:14} {elapsed * 1000:8.1f} ms")
+
+        lines, parse_time, load_time = bench_parse(workdir, args.copies, args.runs)
+        print(f"Módulo de {lines} linhas em processo")
+        print(f"  {'parse':14} {parse_time * 1000:8.1f} ms")
+        print(f"  {'cache':14} {load_time * 1000:8.1f} ms")
+        print(f"  speedup        {parse_time / load_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
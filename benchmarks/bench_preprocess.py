@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do pré-processador português -> NajaScript
+
+Compara Interpreter.preprocess_source (uma passada de uma regex combinada
+que preserva strings e comentários) com a implementação anterior de ~40
+chamadas re.sub sequenciais, reproduzida abaixo como referência, em um
+código de ~1 MiB. Também confere que os dois produzem os mesmos tokens,
+a menos do conteúdo de strings (que a versão anterior traduzia).
+
+Uso: python benchmarks/bench_preprocess.py [--size-mb N] [--repeat N]
+"""
+
+import io
+import re
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer, TokenType
+from interpreter import Interpreter
+
+SAMPLE = """// Exemplo em português
+funcao soma(inteiro a, inteiro b) {
+    retornar a + b;
+}
+lista numeros = [1, 2, 3];
+numeros.adicionar(4);
+numeros.adicionarUltimo(5);
+inteiro i = 0;
+enquanto (i < comprimento(numeros)) {
+    se (numeros.obter(i) % 2 == 0) {
+        escreverln("par: " + converter_para_texto(numeros.obter(i)));
+    } senao se (i == 0) {
+        escreverln("primeiro");
+    } senao {
+        escreverln("ímpar, texto livre com se e para");
+    }
+    i = i + 1;
+}
+booleano pronto = verdadeiro;
+texto nome = nulo;
+"""
+
+
+def legacy_preprocess_source(source):
+    """Implementação anterior: um re.sub por palavra, inclusive dentro de strings"""
+    traducoes = {
+        r'\bfuncao\b': 'fun', r'\bse\b': 'if', r'\bsenao se\b': 'elif', r'\bsenao\b': 'else',
+        r'\benquanto\b': 'while', r'\bpara\b': 'for', r'\bparacada\b': 'forin',
+        r'\bretornar\b': 'return', r'\bverdadeiro\b': 'true', r'\bfalso\b': 'false',
+        r'\bem\b': 'in', r'\bnulo\b': 'null', r'\bcontinuar\b': 'continue', r'\bparar\b': 'break',
+        r'\bimportar\b': 'import', r'\binteiro\b': 'int', r'\bdecimal\b': 'float',
+        r'\btexto\b': 'string', r'\bbooleano\b': 'bool', r'\blista\b': 'list',
+        r'\bdicionario\b': 'dict', r'\bqualquer\b': 'any', r'\bescrever\b': 'print',
+        r'\bescreverln\b': 'println', r'\bcomprimento\b': 'length',
+        r'\bconverter_para_texto\b': 'toString', r'\bconverter_para_inteiro\b': 'toInt',
+        r'\bconverter_para_decimal\b': 'toFloat', r'\badicionar\b': 'add', r'\bremover\b': 'remove',
+        r'\bobter\b': 'get', r'\badicionarUltimo\b': 'add', r'\bremoverUltimo\b': 'removeLast',
+        r'\bsubstituir\b': 'replace',
+    }
+    resultado = source
+    expressoes_especificas = [
+        (r'\bsenao se\b', 'elif'),
+        (r'\badicionarUltimo\b', 'add'),
+        (r'\bremoverUltimo\b', 'removeLast'),
+        (r'\bconverter_para_texto\b', 'toString'),
+        (r'\bconverter_para_inteiro\b', 'toInt'),
+        (r'\bconverter_para_decimal\b', 'toFloat'),
+    ]
+    for padrao, substituto in expressoes_especificas:
+        resultado = re.sub(padrao, substituto, resultado)
+        if padrao in traducoes:
+            del traducoes[padrao]
+    for padrao, substituto in traducoes.items():
+        resultado = re.sub(padrao, substituto, resultado)
+    return resultado
+
+
+def build_source(size_mb):
+    """Repete o exemplo em português até o tamanho pedido"""
+    return SAMPLE * max(1, int(size_mb * 1024 * 1024) // len(SAMPLE))
+
+
+def best_time(function, source, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def token_signature(source):
+    """Tokens do código, ignorando o conteúdo das strings"""
+    return [(token.type, None if token.type == TokenType.STRING_LIT else token.value)
+            for token in Lexer(source).tokens()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pré-processador português")
+    parser.add_argument("--size-mb", type=float, default=1.0, help="Tamanho do código gerado em MiB")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por implementação")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = Interpreter()
+
+    source = build_source(args.size_mb)
+    legacy_time, legacy_result = best_time(legacy_preprocess_source, source, args.repeat)
+    single_time, single_result = best_time(interpreter.preprocess_source, source, args.repeat)
+
+    print(f"Código de {len(source) / 1024 / 1024:.2f} MiB")
+    print(f"  {'re.sub sequencial':20} {legacy_time * 1000:9.1f} ms")
+    print(f"  {'passada única':20} {single_time * 1000:9.1f} ms")
+    print(f"  speedup {legacy_time / single_time:18.2f}x")
+
+    if token_signature(legacy_result) != token_signature(single_result):
+        print("AVISO: as implementações produziram tokens diferentes fora de strings!")
+
+
+if __name__ == "__main__":
+    main()
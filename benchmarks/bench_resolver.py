@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da resolução estática de variáveis do NajaScript
+
+Mede o custo de ler uma variável local declarada N ambientes acima do
+ambiente atual, com a busca dinâmica de Environment.get (quatro dicionários
+por nível) e com o par (depth, slot) calculado pelo Resolver.
+
+Uso: python benchmarks/bench_resolver.py [--iterations N] [--max-depth N]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from interpreter import Interpreter
+from environment import Environment, SlotEnvironment
+from ast_nodes import Variable
+
+
+def build_chain(interpreter, depth, slots):
+    """Monta 'depth' ambientes de bloco acima de um ambiente de função com 'x'"""
+    if slots:
+        environment = SlotEnvironment(interpreter.globals, {"x": 0})
+    else:
+        environment = Environment(interpreter.globals)
+    environment.define("x", 42)
+
+    for _ in range(depth):
+        if slots:
+            environment = SlotEnvironment(environment, {"tmp": 0})
+        else:
+            environment = Environment(environment)
+        environment.define("tmp", 0)
+    return environment
+
+
+def measure(interpreter, node, iterations):
+    """Tempo médio em ns de interpreter.evaluate(node)"""
+    evaluate = interpreter.evaluate
+    start = time.perf_counter()
+    for _ in range(iterations):
+        evaluate(node)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do resolvedor de variáveis")
+    parser.add_argument("--iterations", type=int, default=200000, help="Leituras por medição")
+    parser.add_argument("--max-depth", type=int, default=8, help="Profundidade máxima medida")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = Interpreter()
+
+    print(f"{'depth':>5} {'dinâmico ns':>12} {'slot ns':>9} {'speedup':>8}")
+    for depth in range(args.max_depth + 1):
+        interpreter.environment = build_chain(interpreter, depth, slots=False)
+        dynamic = measure(interpreter, Variable("x"), args.iterations)
+
+        resolved = Variable("x")
+        resolved.depth, resolved.slot = depth, 0
+        interpreter.environment = build_chain(interpreter, depth, slots=True)
+        slot = measure(interpreter, resolved, args.iterations)
+
+        print(f"{depth:5d} {dynamic:12.1f} {slot:9.1f} {dynamic / slot:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
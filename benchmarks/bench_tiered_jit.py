@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da compilação em camadas (TieredJIT) do NajaScript
+
+Executa programas que chamam repetidamente funções numéricas recursivas
+com o interpretador de árvore puro e com o TieredJIT usando o CJITCompiler
+(gcc): um só com argumentos int e outro que mistura int e float nas mesmas
+funções (uma especialização por assinatura, protegida por guardas). A
+compilação roda em segundo plano; o tempo medido inclui o período em que
+as funções ainda são interpretadas. No final de cada programa, mostra o
+relatório de camadas.
+
+Uso: python benchmarks/bench_tiered_jit.py [--rounds N] [--threshold N] [--repeat N]
+"""
+
+import io
+import sys
+import time
+import shutil
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from c_jit_compiler import CJITCompiler
+
+PROGRAMS = {
+    "int": """
+fun fib(int n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+fun distancia(int a, int b) {{
+    if (a > b) {{
+        return a - b;
+    }}
+    return b - a;
+}}
+int i = 0;
+int total = 0;
+while (i < {rounds}) {{
+    total = total + fib(16) + distancia(i, 50);
+    i = i + 1;
+}}
+println(total);
+""",
+    "int/float": """
+fun fib(any n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+fun distancia(any a, any b) {{
+    if (a > b) {{
+        return a - b;
+    }}
+    return b - a;
+}}
+int i = 0;
+any total = 0;
+while (i < {rounds}) {{
+    if (i % 2 == 0) {{
+        total = total + fib(16) + distancia(i, 50);
+    }} else {{
+        total = total + fib(16.0) + distancia(0.5, i);
+    }}
+    i = i + 1;
+}}
+println(total);
+""",
+}
+
+
+def run(source, threshold):
+    """Executa o programa (com JIT se threshold não for None) e retorna (tempo, saída, relatório)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = Interpreter()
+        if threshold is not None:
+            interpreter.set_jit_compiler(CJITCompiler(verbose=False), threshold=threshold)
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+    return elapsed, output.getvalue(), interpreter.jit_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da compilação em camadas")
+    parser.add_argument("--rounds", type=int, default=40, help="Iterações do laço principal")
+    parser.add_argument("--threshold", type=int, default=1000, help="Limite de chamadas + back-edges")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções por modo (usa o melhor tempo)")
+    args = parser.parse_args()
+
+    if shutil.which("gcc") is None:
+        print("gcc não encontrado: o CJITCompiler precisa dele")
+        return
+
+    for name, template in PROGRAMS.items():
+        source = template.format(rounds=args.rounds)
+        interpreted = min(run(source, None) for _ in range(args.repeat))
+        tiered = min(run(source, args.threshold) for _ in range(args.repeat))
+
+        print(f"Programa {name}: {args.rounds} chamadas de fib(16) e distancia()")
+        print(f"  {'interpretado':14} {interpreted[0]:8.3f} s")
+        print(f"  {'em camadas':14} {tiered[0]:8.3f} s")
+        print(f"  speedup {interpreted[0] / tiered[0]:14.2f}x")
+        print()
+        for line in tiered[2]:
+            print(f"  {line}")
+        print()
+
+        if interpreted[1] != tiered[1]:
+            print("AVISO: os modos produziram saídas diferentes!")
+
+
+if __name__ == "__main__":
+    main()
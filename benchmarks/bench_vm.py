@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da máquina virtual de bytecode do NajaScript
+
+Executa laços while/for, chamadas recursivas, listas e métodos de classe
+com o interpretador de árvore, com o modo closures e com a máquina virtual
+de registradores (naja_bytecode.BytecodeInterpreter) e compara os tempos.
+O tempo de compilação para bytecode é incluído. Com --dis, mostra o
+bytecode de cada programa.
+
+Uso: python benchmarks/bench_vm.py [--repeat N] [--size N] [--dis]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from lexer import Lexer
+from parser_naja import Parser
+from interpreter import Interpreter
+from closure_compiler import ClosureCompiler
+from naja_bytecode import BytecodeInterpreter
+
+PROGRAMS = {
+    "while": """
+fun laco(int n) {{
+    int i = 0;
+    int total = 0;
+    while (i < n) {{
+        total = total + i * 2;
+        i = i + 1;
+    }}
+    return total;
+}}
+println(laco({size}));
+""",
+    "for": """
+fun laco(int n) {{
+    int total = 0;
+    for (int i = 0; i < n; i = i + 1) {{
+        if (i % 3 == 0) {{
+            total += i;
+        }}
+    }}
+    return total;
+}}
+println(laco({size}));
+""",
+    "fib": """
+fun fib(int n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+println(fib({fib}));
+""",
+    "listas": """
+fun preencher(int n) {{
+    list valores = [];
+    int i = 0;
+    while (i < n) {{
+        valores.add(i);
+        i = i + 1;
+    }}
+    int total = 0;
+    i = 0;
+    while (i < valores.length()) {{
+        total = total + valores.get(i);
+        i = i + 1;
+    }}
+    return total;
+}}
+println(preencher({size}));
+""",
+    "classes": """
+class Contador {{
+    constructor(int inicio) {{
+        this.valor = inicio;
+    }}
+
+    public fun somar(int n) {{
+        this.valor = this.valor + n;
+        return this.valor;
+    }}
+}}
+fun usar(int n) {{
+    any contador = new Contador(0);
+    int i = 0;
+    while (i < n) {{
+        contador.somar(i);
+        i = i + 1;
+    }}
+    return contador.valor;
+}}
+println(usar({calls}));
+""",
+}
+
+MODES = ("árvore", "closures", "vm")
+
+
+def make_interpreter(mode):
+    """Interpretador no modo pedido"""
+    interpreter = Interpreter()
+    if mode == "closures":
+        interpreter.set_closure_compiler(ClosureCompiler(interpreter))
+    elif mode == "vm":
+        interpreter.set_vm(BytecodeInterpreter(interpreter))
+    return interpreter
+
+
+def run_program(source, mode):
+    """Executa um programa e retorna (tempo, saída)"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter = make_interpreter(mode)
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        elapsed = time.perf_counter() - start
+
+    return elapsed, output.getvalue()
+
+
+def show_bytecode(source):
+    """Imprime o bytecode das funções declaradas no programa"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = make_interpreter("vm")
+        ast = Parser(Lexer(interpreter.preprocess_source(source))).parse()
+        interpreter.resolver.resolve(ast)
+    for stmt in ast.statements:
+        declarations = stmt.methods if hasattr(stmt, "methods") else [stmt]
+        for declaration in declarations:
+            if hasattr(declaration, "body") and hasattr(declaration, "parameters"):
+                for line in interpreter.vm.code_for(declaration).disassemble():
+                    print(f"  {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da máquina virtual de bytecode")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições por programa (usa o melhor tempo)")
+    parser.add_argument("--size", type=int, default=100000, help="Número de iterações dos laços")
+    parser.add_argument("--dis", action="store_true", help="Mostrar o bytecode de cada programa")
+    args = parser.parse_args()
+
+    fib_n = max(10, min(25, args.size.bit_length() + 3))
+    print(f"{'programa':10} {'árvore (s)':>11} {'closures (s)':>13} {'vm (s)':>9} {'vm/árvore':>10}")
+    for name, template in PROGRAMS.items():
+        source = template.format(size=args.size, fib=fib_n, calls=args.size // 4)
+        if args.dis:
+            show_bytecode(source)
+
+        results = {mode: min(run_program(source, mode) for _ in range(args.repeat)) for mode in MODES}
+        outputs = {output for _, output in results.values()}
+        if len(outputs) != 1:
+            print(f"{name:10} saídas diferentes entre os modos!")
+            continue
+
+        tree, closures, vm = (results[mode][0] for mode in MODES)
+        print(f"{name:10} {tree:11.3f} {closures:13.3f} {vm:9.3f} {tree / vm:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
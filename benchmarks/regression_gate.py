@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Barreira de regressão de desempenho do NajaScript
+
+Compara uma execução da suíte (run_suite.py) com uma linha de base em JSON,
+por padrão a benchmarks/baseline.json versionada no repositório. Sem
+--current, roda de novo a suíte com os programas, backends e repetições
+da linha de base. Com --base-root, a linha de base é medida na hora em
+outra árvore (um worktree do commit base), com as execuções intercaladas
+com as da árvore atual. Cada par programa/backend, e a inicialização de cada
+backend, passa por dois testes sobre os tempos das repetições (por padrão
+o tempo de CPU do processo, menos sensível a outros processos na mesma
+máquina do que o tempo de relógio; --metric wall usa o de relógio):
+
+- Mann-Whitney U unilateral (a execução atual é mais lenta?), exato para
+  amostras pequenas sem empates e pela aproximação normal nos outros casos;
+- intervalo de confiança por bootstrap da razão entre as medianas.
+
+Há regressão quando a razão das medianas passa de 1 + --threshold e o
+teste é significativo (p < --alpha). Um benchmark que funcionava na linha
+de base e agora falha ou produz outra saída também conta como regressão.
+O relatório mostra todos os benchmarks e o código de saída é 1 se houver
+alguma regressão, para uso na CI.
+
+Como os tempos dependem da máquina, a linha de base versionada só vale
+para o hardware em que foi medida, e mesmo nele a carga da máquina muda
+de uma sessão para outra. Na CI a comparação usa --base-root: as duas
+árvores são medidas no mesmo runner, no mesmo intervalo de tempo.
+
+Uso: python benchmarks/regression_gate.py [--baseline ARQUIVO | --base-root DIR] [--current ARQUIVO] [--threshold F] [--alpha F] [--metric cpu|wall] [--output ARQUIVO]
+"""
+
+import sys
+import json
+import math
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from run_suite import BACKENDS, PROGRAMS, run_suite
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Campos da máquina que precisam coincidir para os tempos serem comparáveis
+_MACHINE_FIELDS = ("python", "processador", "cpus")
+
+# Maior m*n com a distribuição exata do U calculada por contagem
+_EXACT_LIMIT = 2500
+
+BOOTSTRAP_SAMPLES = 2000
+
+# Métrica -> campo dos tempos das repetições no JSON do run_suite.py
+_METRICS = {"cpu": "tempos_cpu_s", "wall": "tempos_s"}
+
+
+def mann_whitney_greater(current, baseline):
+    """Valor-p do Mann-Whitney U unilateral para 'current' maior que 'baseline'
+
+    U conta os pares (atual, base) em que o atual é maior (empates valem
+    meio). Sem empates e com m*n pequeno, a distribuição de U sob a
+    hipótese nula é contada exatamente; caso contrário, usa a aproximação
+    normal com correção de continuidade e de empates.
+    """
+    m, n = len(current), len(baseline)
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c in current for b in baseline)
+    values = list(current) + list(baseline)
+    has_ties = len(set(values)) < len(values)
+
+    if not has_ties and m * n <= _EXACT_LIMIT:
+        # counts[k] = quantas ordenações das m+n amostras dão U == k
+        counts = _u_distribution(m, n)
+        total = sum(counts)
+        return sum(counts[math.ceil(u):]) / total
+
+    mean = m * n / 2
+    tie_sizes = [values.count(value) for value in set(values)]
+    tie_term = sum(t ** 3 - t for t in tie_sizes) / ((m + n) * (m + n - 1))
+    variance = m * n / 12 * ((m + n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _u_distribution(m, n):
+    """Contagens da distribuição exata de U para amostras de tamanhos m e n"""
+    # table[i][j][k]: ordenações de i atuais e j de base com U == k,
+    # construídas pela última amostra (atual: soma j ao U; base: não soma)
+    table = [[None] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        for j in range(n + 1):
+            if i == 0 or j == 0:
+                table[i][j] = [1] + [0] * (i * j)
+                continue
+            counts = [0] * (i * j + 1)
+            for k, ways in enumerate(table[i - 1][j]):
+                counts[k + j] += ways
+            for k, ways in enumerate(table[i][j - 1]):
+                counts[k] += ways
+            table[i][j] = counts
+    return table[m][n]
+
+
+def bootstrap_ratio(current, baseline, confidence=0.95, samples=BOOTSTRAP_SAMPLES, seed=0):
+    """Intervalo de confiança por bootstrap da razão mediana(atual) / mediana(base)"""
+    generator = random.Random(seed)
+    ratios = []
+    for _ in range(samples):
+        resampled_current = [generator.choice(current) for _ in current]
+        resampled_baseline = [generator.choice(baseline) for _ in baseline]
+        ratios.append(statistics.median(resampled_current) / statistics.median(resampled_baseline))
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    return ratios[int(tail * (samples - 1))], ratios[int((1 - tail) * (samples - 1))]
+
+
+def compare(name, baseline, current, args):
+    """Compara os tempos de um benchmark e retorna a linha do relatório"""
+    entry = {"benchmark": name}
+    field = _METRICS[args.metric]
+    if baseline is None or field not in baseline:
+        entry.update(veredito="novo" if current and field in current else "sem dados")
+        return entry
+    if current is None or field not in current or current.get("status", "ok") != "ok":
+        reason = (current or {}).get("erro") or (current or {}).get("status") or "não executado"
+        entry.update(veredito="regressao", motivo=f"falhou na execução atual: {reason}")
+        return entry
+
+    base_times, current_times = baseline[field], current[field]
+    ratio = statistics.median(current_times) / statistics.median(base_times)
+    p_value = mann_whitney_greater(current_times, base_times)
+    low, high = bootstrap_ratio(current_times, base_times)
+    entry.update(base_s=statistics.median(base_times), atual_s=statistics.median(current_times),
+                 razao=ratio, ic95=[low, high], p=p_value)
+
+    if ratio > 1 + args.threshold and p_value < args.alpha:
+        entry["veredito"] = "regressao"
+    elif ratio < 1 - args.threshold and mann_whitney_greater(base_times, current_times) < args.alpha:
+        entry["veredito"] = "melhora"
+    else:
+        entry["veredito"] = "ok"
+    return entry
+
+
+def compare_reports(baseline, current, args):
+    """Compara todos os benchmarks da linha de base com a execução atual"""
+    entries = []
+    current_startup = current.get("inicializacao", {})
+    for backend, result in baseline.get("inicializacao", {}).items():
+        entries.append(compare(f"inicializacao/{backend}", result, current_startup.get(backend), args))
+
+    current_results = {(r["programa"], r["backend"]): r for r in current.get("resultados", [])}
+    for result in baseline.get("resultados", []):
+        if result.get("status") != "ok":
+            continue
+        key = (result["programa"], result["backend"])
+        entries.append(compare("/".join(key), result, current_results.pop(key, None), args))
+    for key, result in current_results.items():
+        if result.get("status") == "ok":
+            entries.append(compare("/".join(key), None, result, args))
+    return entries
+
+
+def _restrict(report, programs, backends):
+    """Mantém no relatório só os programas e backends selecionados"""
+    report["resultados"] = [result for result in report.get("resultados", [])
+                            if result["programa"] in programs and result["backend"] in backends]
+    report["inicializacao"] = {backend: result for backend, result in report.get("inicializacao", {}).items()
+                               if backend in backends}
+
+
+def print_report(entries, baseline, current, args):
+    """Mostra a tabela de comparação e o resumo"""
+    print(f"Linha de base: commit {baseline.get('commit') or '?'} ({baseline.get('data', '?')})")
+    print(f"Atual:         commit {current.get('commit') or '?'} ({current.get('data', '?')})")
+    for field in _MACHINE_FIELDS:
+        if baseline.get(field) != current.get(field):
+            print(f"AVISO: '{field}' difere da linha de base ({baseline.get(field)} -> {current.get(field)}); "
+                  f"os tempos podem não ser comparáveis")
+    print(f"Limite: +{args.threshold * 100:.0f}% na mediana do tempo de {'CPU' if args.metric == 'cpu' else 'relógio'} "
+          f"com p < {args.alpha}\n")
+
+    print(f"{'benchmark':32} {'base':>10} {'atual':>10} {'razão':>7} {'IC 95%':>15} {'p':>7}  veredito")
+    for entry in entries:
+        if "razao" in entry:
+            low, high = entry["ic95"]
+            print(f"{entry['benchmark']:32} {entry['base_s'] * 1000:7.1f} ms {entry['atual_s'] * 1000:7.1f} ms "
+                  f"{entry['razao']:6.2f}x {f'{low:.2f}-{high:.2f}x':>15} {entry['p']:7.4f}  {entry['veredito']}")
+        else:
+            detail = f": {entry['motivo']}" if "motivo" in entry else ""
+            print(f"{entry['benchmark']:32} {'-':>10} {'-':>10} {'-':>7} {'-':>15} {'-':>7}  {entry['veredito']}{detail}")
+
+    regressions = [entry for entry in entries if entry["veredito"] == "regressao"]
+    print()
+    if regressions:
+        print(f"FALHOU: {len(regressions)} benchmark(s) com regressão de desempenho:")
+        for entry in regressions:
+            if "razao" in entry:
+                print(f"  {entry['benchmark']}: {entry['razao']:.2f}x mais lento "
+                      f"({entry['base_s'] * 1000:.1f} ms -> {entry['atual_s'] * 1000:.1f} ms, p = {entry['p']:.4f})")
+            else:
+                print(f"  {entry['benchmark']}: {entry['motivo']}")
+    else:
+        print(f"OK: nenhuma regressão em {len(entries)} benchmark(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Barreira de regressão de desempenho do NajaScript")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="JSON da linha de base (padrão: %(default)s)")
+    parser.add_argument("--base-root",
+                        help="Árvore do NajaScript da linha de base (um worktree do commit base), medida agora "
+                             "com as execuções intercaladas com as da árvore atual, em vez de --baseline")
+    parser.add_argument("--current", help="JSON de uma execução já feita (padrão: roda a suíte agora)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Aumento relativo da mediana tolerado (padrão: %(default)s)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Nível de significância (padrão: %(default)s)")
+    parser.add_argument("--metric", choices=sorted(_METRICS), default="cpu",
+                        help="Tempo comparado: de CPU do processo ou de relógio (padrão: %(default)s)")
+    parser.add_argument("--programs", help="Programas separados por vírgula (padrão: os da linha de base)")
+    parser.add_argument("--backends", help="Backends separados por vírgula (padrão: os da linha de base)")
+    parser.add_argument("--warmup", type=int, help="Execuções de aquecimento (padrão: as da linha de base ou 1)")
+    parser.add_argument("--repeat", type=int, help="Execuções medidas (padrão: as da linha de base ou 5)")
+    parser.add_argument("--jit-threshold", type=int, help="Limite dos backends jit (padrão: o da linha de base)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Tempo máximo de cada execução (s)")
+    parser.add_argument("--root", default=str(ROOT_DIR), help="Árvore do NajaScript medida (padrão: este repositório)")
+    parser.add_argument("--output", help="Grava as execuções e a comparação neste JSON")
+    args = parser.parse_args()
+
+    if args.base_root:
+        baseline = {"configuracao": {}}
+        programs, backends = list(PROGRAMS), list(BACKENDS)
+    else:
+        try:
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            print(f"Linha de base não encontrada: {args.baseline} (gere com benchmarks/run_suite.py --output)")
+            sys.exit(2)
+        measured = [result for result in baseline.get("resultados", []) if result.get("status") == "ok"]
+        programs = [name for name in PROGRAMS if any(result["programa"] == name for result in measured)]
+        backends = [name for name in BACKENDS if name in baseline.get("inicializacao", {})]
+    if args.programs:
+        programs = [name.strip() for name in args.programs.split(",") if name.strip()]
+    if args.backends:
+        backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+
+    configuration = baseline["configuracao"] if "configuracao" in baseline else {}
+    args.warmup = configuration.get("warmup", 1) if args.warmup is None else args.warmup
+    args.repeat = configuration.get("repeat", 5) if args.repeat is None else args.repeat
+    if args.jit_threshold is None:
+        args.jit_threshold = configuration.get("jit_threshold")
+
+    if args.base_root:
+        baseline, current = run_suite(programs, backends, args, roots=[args.base_root, args.root],
+                                      labels=["(base)", "(atual)"])
+        print()
+    elif args.current:
+        with open(args.current, encoding="utf-8") as file:
+            current = json.load(file)
+    else:
+        current, = run_suite(programs, backends, args)
+        print()
+
+    # Só entram na comparação os benchmarks selecionados
+    _restrict(baseline, programs, backends)
+    _restrict(current, programs, backends)
+
+    entries = compare_reports(baseline, current, args)
+    regressions = print_report(entries, baseline, current, args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"base": baseline, "atual": current, "comparacao": entries}, file, indent=2, ensure_ascii=False)
+        print(f"\nComparação gravada em {args.output}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Suíte de benchmarks do NajaScript em todos os backends
+
+Executa cada programa de benchmarks/suite/ (fib recursivo, nbody,
+spectral-norm, montagem de strings, listas e dicionários, POO e importação
+em massa de módulos) com cada backend disponível: o interpretador de
+árvore, o compilador de closures, a máquina virtual de bytecode, o
+TieredJIT com Numba, com gcc e com o LLVM e os executáveis do compilador
+AOT. Cada medida é um processo novo do najascript.py (com --no-cache, para
+que as execuções não dependam dos caches em disco), com rodadas de
+aquecimento descartadas e repetições medidas. O tempo de inicialização de
+cada backend é medido com um programa trivial.
+
+Um backend suporta um programa quando a execução termina sem erro e a
+saída é igual à do interpretador; os demais ficam registrados no JSON com
+o motivo. O JSON traz, por programa e backend, a mediana, o p95, os tempos
+de todas as repetições (de relógio e de CPU) e o pico de memória
+residente (RSS) do processo, além de dados da máquina e do commit, para
+comparar versões. Com --root, mede outra árvore do NajaScript (um
+worktree de outra versão) com os mesmos programas; o regression_gate.py
+compara dois desses JSON.
+
+Uso: python benchmarks/run_suite.py [--programs A,B] [--backends A,B] [--warmup N] [--repeat N] [--root DIR] [--output ARQUIVO]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import importlib.util
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Adicionar o diretório raiz do projeto ao path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+SUITE_DIR = Path(__file__).resolve().parent / "suite"
+PROGRAMS = {path.stem: path for path in sorted(SUITE_DIR.glob("*.naja"))}
+
+# Programa trivial usado para medir a inicialização de cada backend
+STARTUP_PROGRAM = "println(0);\n"
+
+# Backend -> (opções do najascript.py, dependências Python, precisa do gcc)
+BACKENDS = {
+    "interpretador": ([], (), False),
+    "closures": (["--closures"], (), False),
+    "vm": (["--vm"], (), False),
+    "jit-numba": (["--jit", "numba"], ("numba",), False),
+    "jit-c": (["--jit", "c"], (), True),
+    "jit-llvm": (["--jit", "llvm"], ("llvmlite",), False),
+    "aot": (None, ("llvmlite",), True),
+}
+
+# Linhas que o najascript.py acrescenta à saída do programa
+_TIMING_PREFIX = "Tempo de execução:"
+_ERROR_PREFIXES = ("Erro durante a interpretação:", "Erro durante a compilação:", "Erro ao importar módulos:")
+
+
+def missing_dependency(backend):
+    """Nome da dependência que falta para o backend, ou None se estiver disponível"""
+    _, modules, needs_gcc = BACKENDS[backend]
+    for module in modules:
+        if importlib.util.find_spec(module) is None:
+            return module
+    if needs_gcc and shutil.which("gcc") is None:
+        return "gcc"
+    return None
+
+
+def percentile(values, fraction):
+    """Percentil com interpolação linear entre as amostras ordenadas"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def clean_output(output):
+    """Saída do programa sem a linha de tempo de execução do najascript.py"""
+    lines = [line for line in output.splitlines() if not line.startswith(_TIMING_PREFIX)]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return "\n".join(lines)
+
+
+def run_process(command, work_dir, timeout):
+    """Executa um processo e retorna (tempo, tempo de CPU, pico de RSS em KB, código de saída, saída)
+
+    O tempo de CPU (usuário + sistema, somando todas as threads) e o pico
+    de RSS vêm do rusage do próprio filho (os.wait4); onde não há wait4
+    (Windows) eles ficam None. No Linux o pico inclui a memória herdada
+    do fork antes do exec, então serve para comparar o mesmo backend entre
+    versões, não como medida absoluta de processos pequenos. Um processo
+    que passa de 'timeout' segundos é encerrado e retorna o código None.
+    """
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8", dir=work_dir) as output:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=work_dir, stdout=output, stderr=subprocess.STDOUT,
+                                   stdin=subprocess.DEVNULL)
+        killed = threading.Event()
+
+        def kill():
+            killed.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            if hasattr(os, "wait4"):
+                _, status, usage = os.wait4(process.pid, 0)
+                elapsed = time.perf_counter() - start
+                process.returncode = os.waitstatus_to_exitcode(status)
+                cpu_time = usage.ru_utime + usage.ru_stime
+                peak_rss = usage.ru_maxrss
+                if sys.platform == "darwin":
+                    peak_rss //= 1024  # no macOS o ru_maxrss vem em bytes
+            else:
+                process.wait()
+                elapsed = time.perf_counter() - start
+                cpu_time = peak_rss = None
+        finally:
+            timer.cancel()
+        output.seek(0)
+        text = output.read()
+    return elapsed, cpu_time, peak_rss, None if killed.is_set() else process.returncode, text
+
+
+def build_command(backend, program, root, args):
+    """Linha de comando que executa o programa com o backend (exceto aot) na árvore 'root'"""
+    options = BACKENDS[backend][0]
+    command = [sys.executable, str(Path(root) / "najascript.py"), "--no-cache"] + options
+    if backend.startswith("jit-") and args.jit_threshold is not None:
+        command += ["--jit-threshold", str(args.jit_threshold)]
+    return command + [str(program)]
+
+
+def compile_aot(program, work_dir, root, args):
+    """Compila o programa com --aot e retorna (caminho do executável, tempo, erro)"""
+    executable = str(Path(work_dir) / (Path(program).stem + ".bin"))
+    command = [sys.executable, str(Path(root) / "najascript.py"), "--no-cache",
+               "--aot", executable, str(program)]
+    elapsed, _, _, code, output = run_process(command, work_dir, args.timeout)
+    if code != 0 or not os.path.exists(executable):
+        return None, elapsed, clean_output(output) or "falha na compilação"
+    return executable, elapsed, None
+
+
+def measure(commands, work_dirs, args):
+    """Roda as execuções de aquecimento e as medidas de cada comando
+
+    Com vários comandos (a mesma medida em árvores diferentes), as
+    execuções são intercaladas, alternando a ordem a cada rodada, para que
+    variações da máquina ao longo do tempo afetem todos igualmente.
+    Retorna, para cada comando, um dicionário com os tempos, as
+    estatísticas e a saída da última execução, ou com 'erro' se alguma
+    execução falhar.
+    """
+    states = [{"times": [], "cpu_times": [], "peaks": [], "output": ""} for _ in commands]
+    for run in range(args.warmup + args.repeat):
+        order = range(len(commands)) if run % 2 == 0 else reversed(range(len(commands)))
+        for index in order:
+            state = states[index]
+            if "erro" in state:
+                continue
+            elapsed, cpu_time, peak_rss, code, text = run_process(commands[index], work_dirs[index], args.timeout)
+            state["output"] = clean_output(text)
+            if code is None:
+                state["erro"] = f"tempo limite de {args.timeout} s excedido"
+                continue
+            failure = next((line for line in state["output"].splitlines() if line.startswith(_ERROR_PREFIXES)), None)
+            if code != 0 or failure is not None:
+                state["erro"] = failure or f"código de saída {code}"
+                continue
+            if run >= args.warmup:
+                state["times"].append(elapsed)
+                if cpu_time is not None:
+                    state["cpu_times"].append(cpu_time)
+                if peak_rss is not None:
+                    state["peaks"].append(peak_rss)
+
+    results = []
+    for state in states:
+        if "erro" in state:
+            results.append({"erro": state["erro"], "saida": state["output"]})
+            continue
+        times = state["times"]
+        result = {
+            "mediana_s": statistics.median(times),
+            "p95_s": percentile(times, 0.95),
+            "min_s": min(times),
+            "tempos_s": times,
+            "rss_pico_kb": max(state["peaks"]) if state["peaks"] else None,
+            "saida": state["output"],
+        }
+        if state["cpu_times"]:
+            result.update(mediana_cpu_s=statistics.median(state["cpu_times"]), tempos_cpu_s=state["cpu_times"])
+        results.append(result)
+    return results
+
+
+def _commands(backend, program, roots, work_dirs, args):
+    """Comandos do programa no backend em cada árvore, com os tempos de compilação do aot
+
+    Retorna (comandos, tempos de compilação, erros); para o aot, uma
+    árvore em que a compilação falha fica com comando None e o erro.
+    """
+    if backend != "aot":
+        return [build_command(backend, program, root, args) for root in roots], [None] * len(roots), [None] * len(roots)
+    commands, compile_times, errors = [], [], []
+    for root, work_dir in zip(roots, work_dirs):
+        executable, compile_time, error = compile_aot(program, work_dir, root, args)
+        commands.append([executable] if executable else None)
+        compile_times.append(compile_time)
+        errors.append(error)
+    return commands, compile_times, errors
+
+
+def _measure_available(commands, work_dirs, args):
+    """measure() só dos comandos existentes; None na posição dos que faltam"""
+    indexes = [index for index, command in enumerate(commands) if command is not None]
+    measured = measure([commands[index] for index in indexes], [work_dirs[index] for index in indexes], args)
+    results = [None] * len(commands)
+    for index, result in zip(indexes, measured):
+        results[index] = result
+    return results
+
+
+def measure_startup(backend, roots, work_dirs, args):
+    """Mede o tempo e a memória de um programa trivial no backend, em cada árvore"""
+    program = Path(work_dirs[0]).parent / "inicializacao.naja"
+    program.write_text(STARTUP_PROGRAM, encoding="utf-8")
+    commands, _, errors = _commands(backend, program, roots, work_dirs, args)
+    results = []
+    for result, error in zip(_measure_available(commands, work_dirs, args), errors):
+        if result is None:
+            result = {"erro": error}
+        result.pop("saida", None)
+        results.append(result)
+    return results
+
+
+def run_program(backend, program, references, roots, work_dirs, args):
+    """Mede um programa em um backend, em cada árvore, e classifica os resultados"""
+    commands, compile_times, errors = _commands(backend, program, roots, work_dirs, args)
+    results = []
+    for measured, compile_time, error, reference in zip(_measure_available(commands, work_dirs, args),
+                                                        compile_times, errors, references):
+        result = {"programa": program.stem, "backend": backend}
+        if measured is None:
+            result.update(status="nao_suportado", erro=error)
+            results.append(result)
+            continue
+        if compile_time is not None:
+            result["compilacao_s"] = compile_time
+        output = measured.pop("saida", None)
+        if "erro" in measured:
+            result.update(status="erro", erro=measured["erro"])
+        elif reference is not None and output != reference:
+            result.update(status="saida_diferente", **measured)
+        else:
+            result.update(status="ok", **measured)
+        results.append(result)
+    return results
+
+
+def reference_output(program, root, work_dir, args):
+    """Saída do programa no interpretador de árvore, usada para validar os outros backends"""
+    text = run_process(build_command("interpretador", program, root, args), work_dir, args.timeout)[-1]
+    return clean_output(text)
+
+
+def git_commit(root):
+    """Commit atual do repositório em 'root', se houver git"""
+    try:
+        process = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True)
+    except OSError:
+        return None
+    return process.stdout.strip() or None
+
+
+def select(names, available, kind):
+    """Filtra a lista de nomes de --programs ou --backends"""
+    if not names:
+        return list(available)
+    selected = [name.strip() for name in names.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        raise SystemExit(f"{kind} desconhecido(s): {', '.join(unknown)} (disponíveis: {', '.join(available)})")
+    return selected
+
+
+def run_suite(program_names, backend_names, args, roots=None, labels=None):
+    """Mede os programas nos backends e retorna um relatório (o conteúdo do JSON) por árvore
+
+    'args' traz warmup, repeat, jit_threshold, timeout e root, como as
+    opções de linha de comando. 'roots' são as árvores do NajaScript
+    medidas (padrão: [args.root]), com as execuções intercaladas entre
+    elas; 'labels' identifica cada uma na tabela mostrada.
+    """
+    roots = roots or [args.root]
+    labels = labels or [""] * len(roots)
+    backends = []
+    unavailable = {}
+    for backend in backend_names:
+        missing = missing_dependency(backend)
+        if missing is None:
+            backends.append(backend)
+        else:
+            unavailable[backend] = missing
+            print(f"{missing} não encontrado: o backend {backend} fica de fora")
+
+    work_dir = tempfile.mkdtemp(prefix="najascript_suite_")
+    work_dirs = []
+    for index in range(len(roots)):
+        work_dirs.append(os.path.join(work_dir, str(index)))
+        os.mkdir(work_dirs[-1])
+    startup = [{} for _ in roots]
+    results = [[] for _ in roots]
+    try:
+        print(f"{'inicialização':16} {'backend':22} {'mediana':>10} {'rss pico':>10}")
+        for backend in backends:
+            for index, result in enumerate(measure_startup(backend, roots, work_dirs, args)):
+                startup[index][backend] = result
+                label = f"{backend} {labels[index]}".strip()
+                if "mediana_s" in result:
+                    print(f"{'':16} {label:22} {result['mediana_s'] * 1000:7.1f} ms "
+                          f"{(result['rss_pico_kb'] or 0) / 1024:7.1f} MB")
+                else:
+                    print(f"{'':16} {label:22} erro: {result['erro']}")
+        print()
+
+        print(f"{'programa':16} {'backend':22} {'mediana':>10} {'p95':>10} {'rss pico':>10}  status")
+        for name in program_names:
+            program = PROGRAMS[name]
+            references = [reference_output(program, root, directory, args)
+                          for root, directory in zip(roots, work_dirs)]
+            for backend in backends:
+                for index, result in enumerate(run_program(backend, program, references, roots, work_dirs, args)):
+                    result["inicializacao_s"] = startup[index][backend].get("mediana_s")
+                    results[index].append(result)
+                    label = f"{backend} {labels[index]}".strip()
+                    if "mediana_s" in result:
+                        rss = f"{result['rss_pico_kb'] / 1024:7.1f} MB" if result["rss_pico_kb"] else f"{'-':>10}"
+                        print(f"{name:16} {label:22} {result['mediana_s'] * 1000:7.1f} ms "
+                              f"{result['p95_s'] * 1000:7.1f} ms {rss}  {result['status']}")
+                    else:
+                        print(f"{name:16} {label:22} {'-':>10} {'-':>10} {'-':>10}  {result['status']}: {result['erro']}")
+                    if result["status"] == "saida_diferente":
+                        print("AVISO: os modos produziram saídas diferentes!")
+            for backend, missing in unavailable.items():
+                for tree_results in results:
+                    tree_results.append({"programa": name, "backend": backend, "status": "indisponivel",
+                                         "erro": f"{missing} não encontrado"})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return [{
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(root),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "configuracao": {
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "jit_threshold": args.jit_threshold,
+        },
+        "inicializacao": startup[index],
+        "resultados": results[index],
+    } for index, root in enumerate(roots)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do NajaScript em todos os backends")
+    parser.add_argument("--programs", help=f"Programas separados por vírgula (padrão: todos: {', '.join(PROGRAMS)})")
+    parser.add_argument("--backends", help=f"Backends separados por vírgula (padrão: todos: {', '.join(BACKENDS)})")
+    parser.add_argument("--warmup", type=int, default=1, help="Execuções de aquecimento descartadas")
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por programa e backend")
+    parser.add_argument("--jit-threshold", type=int, help="Limite de chamadas + back-edges dos backends jit")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Tempo máximo de cada execução (s)")
+    parser.add_argument("--root", default=str(ROOT_DIR),
+                        help="Árvore do NajaScript medida, por exemplo um worktree de outra versão (padrão: este repositório)")
+    parser.add_argument("--output", default="resultados_suite.json", help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    if args.repeat < 1 or args.warmup < 0:
+        parser.error("--repeat deve ser pelo menos 1 e --warmup não pode ser negativo")
+
+    report, = run_suite(select(args.programs, PROGRAMS, "Programa"), select(args.backends, BACKENDS, "Backend"), args)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
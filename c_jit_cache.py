@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache persistente das bibliotecas compiladas pelo CJITCompiler
+
+Guarda cada .so gerado pelo gcc em um diretório compartilhado entre
+execuções (por padrão ~/.cache/najascript/c_jit, ou $NAJA_JIT_CACHE_DIR),
+para que a próxima execução carregue a biblioteca com dlopen em vez de
+gerar e compilar o C de novo.
+
+A chave de cada entrada é um hash da AST normalizada da função (sem
+posições no código-fonte nem anotações do resolver), da assinatura da
+especialização, das flags e da versão do gcc e de uma impressão digital
+do gerador de código. Funções com o mesmo nome em módulos diferentes têm
+chaves diferentes; a mesma função em arquivos diferentes compartilha a
+entrada.
+
+As bibliotecas são gravadas em um arquivo temporário e renomeadas com
+os.replace, então processos paralelos nunca carregam um .so incompleto.
+O tamanho total é limitado: ao passar de max_bytes, as entradas usadas
+há mais tempo (pela data de modificação, renovada a cada acerto) são
+removidas. Falhas ao ler ou gravar o cache nunca interrompem a
+compilação.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import subprocess
+
+from ast_nodes import Node, iter_attributes
+
+CACHE_SUFFIX = ".so"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Idade a partir da qual um arquivo temporário é considerado abandonado
+# (processo encerrado durante a compilação)
+_STALE_TEMP_SECONDS = 3600
+
+# Versão do formato das entradas (incrementar ao mudar a chave ou o ABI gerado)
+_FORMAT = b"NAJACJIT1"
+
+# Módulos cujo código determina o C gerado
+_CODEGEN_MODULES = ("c_jit_compiler.py", "c_jit_cache.py", "jit_types.py", "ast_nodes.py")
+
+# Atributos que não mudam a semântica da função: posição no código-fonte e
+# anotações preenchidas pelo resolver e pelo interpretador
+_IGNORED_ATTRIBUTES = frozenset((
+    "line", "column", "end_line", "end_column",
+    "depth", "slot", "scope", "then_scope", "elif_scopes", "else_scope",
+    "pool_frames", "inline_cache",
+))
+
+_codegen_fingerprint = None
+_gcc_versions = {}
+
+
+def default_cache_dir():
+    """Diretório padrão do cache ($NAJA_JIT_CACHE_DIR ou ~/.cache/najascript/c_jit)"""
+    directory = os.environ.get("NAJA_JIT_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "najascript", "c_jit")
+
+
+def codegen_fingerprint():
+    """Impressão digital do gerador de código C"""
+    global _codegen_fingerprint
+    if _codegen_fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(_FORMAT)
+        digest.update(sys.platform.encode())
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in _CODEGEN_MODULES:
+            try:
+                with open(os.path.join(base_dir, name), "rb") as file:
+                    digest.update(file.read())
+            except OSError:
+                digest.update(name.encode())
+        _codegen_fingerprint = digest.hexdigest()
+    return _codegen_fingerprint
+
+
+def gcc_version(compiler="gcc"):
+    """Versão completa do compilador C (consultada uma vez por processo)"""
+    if compiler not in _gcc_versions:
+        try:
+            process = subprocess.run([compiler, "--version"], stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, text=True)
+            _gcc_versions[compiler] = process.stdout.splitlines()[0] if process.stdout else ""
+        except OSError:
+            _gcc_versions[compiler] = ""
+    return _gcc_versions[compiler]
+
+
+def normalized_ast(node):
+    """Representação textual estável de uma AST, sem posições nem anotações"""
+    parts = []
+    _dump(node, parts)
+    return "".join(parts)
+
+
+def _dump(value, parts):
+    if isinstance(value, Node):
+        parts.append(type(value).__name__)
+        parts.append("(")
+        for name, attribute in iter_attributes(value):
+            if name not in _IGNORED_ATTRIBUTES:
+                parts.append(name)
+                parts.append("=")
+                _dump(attribute, parts)
+                parts.append(",")
+        parts.append(")")
+    elif isinstance(value, (list, tuple)):
+        parts.append("[")
+        for item in value:
+            _dump(item, parts)
+            parts.append(",")
+        parts.append("]")
+    else:
+        parts.append(repr(value))
+
+
+def function_key(ast_function, signature, flags, compiler="gcc"):
+    """Chave de uma especialização: AST normalizada, assinatura, flags e versão do gcc"""
+    digest = hashlib.sha256()
+    digest.update(codegen_fingerprint().encode())
+    digest.update(gcc_version(compiler).encode())
+    digest.update(" ".join(flags).encode())
+    digest.update(",".join(param_type.__name__ for param_type in signature).encode())
+    digest.update(normalized_ast(ast_function).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def module_key(function_keys):
+    """Chave de um lote de funções compiladas em uma única biblioteca"""
+    digest = hashlib.sha256()
+    digest.update(b"module")
+    for key in function_keys:
+        digest.update(key.encode())
+    return digest.hexdigest()
+
+
+class CJITCache:
+    """Cache de bibliotecas compartilhadas em disco com despejo LRU"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        # Estatísticas da execução atual
+        self.hits = 0
+        self.misses = 0
+
+    def cache_path(self, key):
+        """Caminho da biblioteca de uma entrada"""
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def lookup(self, key):
+        """Caminho da biblioteca em cache para a chave, ou None
+
+        Um acerto renova a data de modificação da entrada, que é a ordem
+        usada no despejo.
+        """
+        path = self.cache_path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def temp_path(self, key):
+        """Arquivo temporário onde o gcc grava a biblioteca antes de store()"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            pass
+        return os.path.join(self.cache_dir, f"{key}.{os.getpid()}.tmp{CACHE_SUFFIX}")
+
+    def store(self, key, temp_path):
+        """Publica a biblioteca compilada de forma atômica e retorna o caminho final
+
+        Se não for possível gravar no cache, retorna o próprio arquivo
+        temporário, que continua válido para esta execução.
+        """
+        path = self.cache_path(key)
+        try:
+            os.replace(temp_path, path)
+        except OSError:
+            return temp_path
+        self.evict()
+        return path
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até o cache caber em max_bytes
+
+        Arquivos temporários abandonados também são removidos.
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        try:
+            with os.scandir(self.cache_dir) as scanner:
+                for entry in scanner:
+                    if not entry.name.endswith(CACHE_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if ".tmp" in entry.name:
+                        if now - stat.st_mtime > _STALE_TEMP_SECONDS:
+                            _remove(entry.path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            # Processos que já carregaram a biblioteca continuam usando o inode
+            if _remove(path):
+                total -= size
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(CACHE_SUFFIX):
+                _remove(os.path.join(self.cache_dir, name))
+
+
+def _remove(path):
+    """Remove um arquivo do cache; retorna False se não foi possível"""
+    try:
+        os.remove(path)
+    except OSError:
+        return False
+    return True
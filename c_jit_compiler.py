@@ -5,15 +5,126 @@ import os
 import tempfile
 import subprocess
 import ctypes
+from array import array
 from ast_nodes import *
+from interpreter import NajaList
+from jit_types import (ARITHMETIC_OPERATORS, COMPOUND_OPERATORS, FLOAT_ONLY,
+                       declared_signature, specialize_function, specialize_functions)
+from c_jit_cache import CJITCache, function_key, module_key
+
+# Tipos Python dos argumentos aceitos -> (tipo C, tipos ctypes dos parâmetros
+# C, código no nome do arquivo). Uma NajaList de float vira um buffer
+# const double* contíguo seguido do seu tamanho (o C só lê as listas).
+_C_LIST_TYPE = "const double*"
+_C_TYPES = {
+    int: ("long long", (ctypes.c_longlong,), "i"),
+    float: ("double", (ctypes.c_double,), "d"),
+    NajaList: (_C_LIST_TYPE, (ctypes.c_void_p, ctypes.c_longlong), "l"),
+}
+
+# Operações que o C não executa como o Python marcam naja_error com o motivo,
+# o resultado é descartado e a chamada é refeita pelo interpretador (que
+# produz o valor exato ou o erro do NajaScript). Laços e chamadas param assim
+# que o indicador é marcado.
+_NATIVE_ERRORS = {
+    1: (OverflowError, "Overflow de inteiro de 64 bits"),
+    2: (ZeroDivisionError, "Divisão por zero"),
+    3: (IndexError, "Índice fora dos limites da lista"),
+    4: (OverflowError, "Divisão de inteiros sem representação exata em double"),
+}
+
+# O indicador é definido em um único arquivo C de cada biblioteca; os
+# demais (compilação em lote em paralelo) o declaram como extern.
+_C_ERROR_FLAG = "int naja_error = 0;\n"
+_C_ERROR_EXTERN = "extern int naja_error;\n"
+_C_PRELUDE = """
+static inline long long naja_add(long long a, long long b) {
+    long long r;
+    if (__builtin_add_overflow(a, b, &r)) naja_error = 1;
+    return r;
+}
+
+static inline long long naja_sub(long long a, long long b) {
+    long long r;
+    if (__builtin_sub_overflow(a, b, &r)) naja_error = 1;
+    return r;
+}
+
+static inline long long naja_mul(long long a, long long b) {
+    long long r;
+    if (__builtin_mul_overflow(a, b, &r)) naja_error = 1;
+    return r;
+}
+
+static inline long long naja_neg(long long a) {
+    if (a == -__LONG_LONG_MAX__ - 1) naja_error = 1;
+    return -a;
+}
+
+static inline double naja_div(double a, double b) {
+    if (b == 0.0) {
+        naja_error = 2;
+        return 0.0;
+    }
+    return a / b;
+}
+
+/* Inteiros até 2^53 viram double sem arredondamento: a divisão fica igual à do Python */
+static inline double naja_div_int(long long a, long long b) {
+    const long long exact = 1LL << 53;
+    if (a > exact || a < -exact || b > exact || b < -exact) {
+        naja_error = 4;
+        return 0.0;
+    }
+    return naja_div((double)a, (double)b);
+}
+
+/* Resto com o sinal do divisor, como o % do Python */
+static inline long long naja_mod(long long a, long long b) {
+    if (b == 0) {
+        naja_error = 2;
+        return 0;
+    }
+    if (b == -1) return 0;
+    long long r = a % b;
+    if (r != 0 && ((r < 0) != (b < 0))) r += b;
+    return r;
+}
+
+static inline double naja_get(const double* v, long long n, long long i) {
+    if (i < 0 || i >= n) {
+        naja_error = 3;
+        return 0.0;
+    }
+    return v[i];
+}
+
+"""
+
+# Flags do gcc (fazem parte da chave do cache em disco). Sem contração em
+# FMA, cada operação de ponto flutuante arredonda como no Python.
+_GCC_COMPILE_FLAGS = ("-fPIC", "-O3", "-ffp-contract=off")
+_GCC_FLAGS = ("-shared",) + _GCC_COMPILE_FLAGS
+
+# Funções a partir das quais a compilação em lote é dividida entre os jobs do gcc
+_PARALLEL_MIN_FUNCTIONS = 16
+
+# Funções do prelúdio para cada operador inteiro
+_CHECKED_OPERATIONS = {"+": "naja_add", "-": "naja_sub", "*": "naja_mul"}
 
 class CCodeGenerator:
     """
     Gerador de código C a partir de AST NajaScript
     """
-    def __init__(self):
+    def __init__(self, param_types=None, return_type=None, expression_type=None):
         self.indent_level = 0
         self.include_stdio = False
+        # Tipos C de uma especialização (senão derivados dos tipos declarados)
+        self.param_types = param_types
+        self.return_type = return_type
+        # Tipo Python (int/float/NajaList) de cada expressão e declaração, inferido
+        # pelo TypeChecker: aritmética int vira naja_add/..., listas viram buffers
+        self.expression_type = expression_type
         
     def indent(self):
         """Incrementa o nível de indentação"""
@@ -44,16 +155,44 @@ class CCodeGenerator:
         """Gera código C para declaração de função"""
         self.include_stdio = True  # Adicionamos stdio.h para funções com print
         
-        return_type = "int"  # Tipo padrão, poderia ser inferido da análise
+        func_header = f"{self._function_signature(node)} {{\n"
+        
+        self.indent()
+        body = []
+        if self.expression_type is not None:
+            # Com o indicador de erro marcado, chamadas retornam na hora (o resultado será descartado)
+            body.append(f"{self.get_indent()}if (naja_error) return 0;")
+        for stmt in node.body:
+            body.append(f"{self.get_indent()}{self.generate(stmt)}")
+        self.dedent()
+        
+        func_body = "\n".join(body)
+        func_footer = "\n}"
+        
+        return func_header + func_body + func_footer
+    
+    def generate_prototype(self, node):
+        """Protótipo C de uma função (chamadas entre funções de um mesmo lote)"""
+        return f"{self._function_signature(node)};"
+    
+    def _function_signature(self, node):
+        """Tipo de retorno, nome e parâmetros C de uma função"""
+        # Inteiros de 64 bits, o mais próximo dos int do Python
+        return_type = self.return_type or "long long"
         
         params = []
-        for param in node.parameters:
+        for index, param in enumerate(node.parameters):
+            if self.param_types is not None:
+                params.append(f"{self.param_types[index]} {param[1]}")
+                if self.param_types[index] == _C_LIST_TYPE:
+                    params.append(f"long long {_length_name(param[1])}")
+                continue
             # Verifica se o parâmetro é uma tupla (tipo, nome)
             if isinstance(param, tuple) and len(param) == 2:
                 param_type, param_name = param
                 # Mapeia tipos NajaScript para tipos C
                 type_map = {
-                    "int": "int",
+                    "int": "long long",
                     "float": "double",
                     "string": "char*",
                     "bool": "int"
@@ -66,18 +205,7 @@ class CCodeGenerator:
             
         params_str = ", ".join(params) if params else "void"
         
-        func_header = f"{return_type} {node.name}({params_str}) {{\n"
-        
-        self.indent()
-        body = []
-        for stmt in node.body:
-            body.append(f"{self.get_indent()}{self.generate(stmt)}")
-        self.dedent()
-        
-        func_body = "\n".join(body)
-        func_footer = "\n}"
-        
-        return func_header + func_body + func_footer
+        return f"{return_type} {node.name}({params_str})"
         
     def _generate_returnstatement(self, node):
         """Gera código C para instrução return"""
@@ -91,6 +219,11 @@ class CCodeGenerator:
         left = self.generate(node.left)
         right = self.generate(node.right)
         
+        # Aritmética de uma especialização: com as funções verificadas do prelúdio
+        if node.operator in ARITHMETIC_OPERATORS and self.expression_type is not None:
+            return self._arithmetic(node.operator, left, right,
+                                    self.expression_type(node.left), self.expression_type(node.right))
+        
         # Mapear operadores para C
         op_map = {
             "+": "+",
@@ -111,11 +244,26 @@ class CCodeGenerator:
         op = op_map.get(node.operator, node.operator)
         
         return f"({left} {op} {right})"
+    
+    def _arithmetic(self, operator, left, right, left_type, right_type):
+        """Operação aritmética com a semântica do NajaScript para os tipos dos operandos"""
+        both_int = left_type is int and right_type is int
+        if operator in _CHECKED_OPERATIONS and both_int:
+            return f"{_CHECKED_OPERATIONS[operator]}({left}, {right})"
+        if operator == "/":
+            return f"naja_div_int({left}, {right})" if both_int else f"naja_div({left}, {right})"
+        if operator == "%":
+            return f"naja_mod({left}, {right})"
+        # double: o C converte o operando long long como o Python converte int em float
+        return f"({left} {operator} {right})"
         
     def _generate_unaryoperation(self, node):
         """Gera código C para operações unárias"""
         operand = self.generate(node.operand)
         
+        if node.operator == "-" and self.expression_type is not None and self.expression_type(node) is int:
+            return f"naja_neg({operand})"
+        
         # Mapear operadores unários
         op_map = {
             "-": "-",
@@ -133,7 +281,8 @@ class CCodeGenerator:
         
     def _generate_floatliteral(self, node):
         """Gera código C para literais float"""
-        return str(node.value)
+        # repr() é a menor representação que volta ao mesmo double
+        return repr(float(node.value))
         
     def _generate_stringliteral(self, node):
         """Gera código C para literais string"""
@@ -145,6 +294,10 @@ class CCodeGenerator:
         """Gera código C para identificadores"""
         return node.name
         
+    def _generate_variable(self, node):
+        """Gera código C para leitura de variáveis"""
+        return node.name
+        
     def _generate_blockstatement(self, node):
         """Gera código C para blocos de código"""
         self.indent()
@@ -155,6 +308,43 @@ class CCodeGenerator:
         
         return "{\n" + "\n".join(lines) + f"\n{self.get_indent()}}}"
         
+    def _generate_vardeclaration(self, node):
+        """Gera código C para declaração de variável local (tipo inferido do valor inicial)"""
+        var_type = self.expression_type(node) if self.expression_type is not None else int
+        c_type = _C_TYPES[var_type][0]
+        if node.value is not None:
+            value = self.generate(node.value)
+        else:
+            value = "0.0" if var_type is float else "0"
+        return f"{c_type} {node.name} = {value};"
+    
+    def _generate_assignment(self, node):
+        """Gera código C para atribuição a variável (sem ';', também usada no for)"""
+        return f"{node.name} = {self.generate(node.value)}"
+    
+    def _generate_compoundassignment(self, node):
+        """Gera código C para atribuição composta (+=, -=, ...) como atribuição simples"""
+        operator = COMPOUND_OPERATORS[node.operator]
+        value = self._arithmetic(operator, node.name, self.generate(node.value),
+                                 self.expression_type(node), self.expression_type(node.value))
+        return f"{node.name} = {value}"
+    
+    def _generate_methodcall(self, node):
+        """Gera código C para length() e get(i) de uma NajaList no buffer double*"""
+        name = node.object.name
+        length = _length_name(name)
+        if node.method == "length":
+            return length
+        return f"naja_get({name}, {length}, {self.generate(node.arguments[0])})"
+    
+    def _generate_breakstatement(self, node):
+        """Gera código C para break"""
+        return "break;"
+    
+    def _generate_continuestatement(self, node):
+        """Gera código C para continue"""
+        return "continue;"
+    
     def _generate_expressionstatement(self, node):
         """Gera código C para expressões como statements"""
         return f"{self.generate(node.expression)};"
@@ -200,7 +390,7 @@ class CCodeGenerator:
         
     def _generate_whilestatement(self, node):
         """Gera código C para estrutura while"""
-        condition = self.generate(node.condition)
+        condition = self._loop_condition(node.condition)
         
         while_header = f"while ({condition}) {{\n"
         self.indent()
@@ -218,10 +408,36 @@ class CCodeGenerator:
         
         return while_header + body + while_footer
         
+    def _generate_forstatement(self, node):
+        """Gera código C para o for (inicialização; condição; atualização)"""
+        init = self.generate(node.init) if node.init is not None else ";"
+        if not init.endswith(";"):
+            init += ";"
+        condition = self._loop_condition(node.condition)
+        update = self.generate(node.update) if node.update is not None else ""
+        
+        for_header = f"for ({init} {condition}; {update}) {{\n"
+        self.indent()
+        body = "\n".join(f"{self.get_indent()}{self.generate(stmt)}" for stmt in node.body)
+        self.dedent()
+        
+        return for_header + body + f"\n{self.get_indent()}}}"
+    
+    def _loop_condition(self, condition):
+        """Condição de um laço; numa especialização, o laço também para se naja_error for marcado"""
+        code = self.generate(condition) if condition is not None else "1"
+        if self.expression_type is None:
+            return code
+        return f"!naja_error && {code}"
+        
     def _generate_functioncall(self, node):
         """Gera código C para chamadas de função"""
         args = []
         for arg in node.arguments:
+            if self.expression_type is not None and self.expression_type(arg) is NajaList:
+                # Lista: o buffer e o tamanho
+                args.append(f"{arg.name}, {_length_name(arg.name)}")
+                continue
             args.append(self.generate(arg))
         
         args_str = ", ".join(args)
@@ -231,6 +447,8 @@ class CCodeGenerator:
     def generate_complete_c_file(self, ast_function):
         """Gera um arquivo C completo a partir de uma função AST"""
         includes = '#include <stdio.h>\n#include <stdlib.h>\n\n' if self.include_stdio else ''
+        if self.expression_type is not None:
+            includes += _C_ERROR_FLAG + _C_PRELUDE
         
         function_code = self.generate(ast_function)
         
@@ -243,120 +461,295 @@ class CJITCompiler:
     """
     Compilador JIT para NajaScript que gera e compila código C
     """
-    def __init__(self):
-        self.compiled_functions = {}  # Cache de funções compiladas
+    def __init__(self, verbose=True, cache_dir=None, use_cache=True, jobs=1):
+        self.compiled_functions = {}  # Funções (ou lotes) já carregados nesta execução, pela chave
+        self.verbose = verbose  # Mensagens de progresso (desligadas na compilação em camadas)
+        self.jobs = max(1, jobs)  # Processos gcc em paralelo na compilação em lote
+        # Bibliotecas compiladas em execuções anteriores (ver c_jit_cache.py)
+        self.cache = CJITCache(cache_dir) if use_cache else None
         self.temp_dir = tempfile.mkdtemp(prefix="najascript_c_jit_")
-        print(f"CJITCompiler: Diretório temporário criado em {self.temp_dir}")
+        self._log(f"CJITCompiler: Diretório temporário criado em {self.temp_dir}")
     
-    def is_optimizable(self, ast_node):
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+    
+    def is_optimizable(self, ast_node, signature=None):
         """
         Verifica se um nó AST pode ser otimizado pelo JIT
-        """
-        # Para a versão C, podemos suportar mais tipos de operações
-        if isinstance(ast_node, FunctionDeclaration):
-            # Consideramos praticamente todas as funções otimizáveis
-            return True
         
-        return False
-    
-    def _contains_only_numeric_ops(self, statements):
+        'signature' são os tipos Python dos argumentos da especialização (int,
+        float ou NajaList de float); sem ela, valem os tipos declarados dos
+        parâmetros. O corpo precisa ser traduzido pelo CCodeGenerator com a
+        mesma semântica do interpretador, o que o TypeChecker (jit_types.py) verifica
+        enquanto infere o tipo de cada expressão e variável local.
         """
-        Verifica se um bloco de código contém apenas operações numéricas
-        Usado apenas para compatibilidade com a interface
-        """
-        return True
-    
-    def _is_numeric_operation(self, statement):
-        """
-        Verifica se uma declaração envolve apenas operações numéricas
-        Usado apenas para compatibilidade com a interface
-        """
-        return True
+        if not isinstance(ast_node, FunctionDeclaration):
+            return False
+        return specialize_function(ast_node, signature) is not None
     
-    def _is_numeric_expression(self, expression):
-        """
-        Verifica se uma expressão é numérica
-        Usado apenas para compatibilidade com a interface
-        """
-        return True
-    
-    def compile_function(self, ast_function, environment):
+    def compile_function(self, ast_function, environment, signature=None):
         """
         Compila uma função AST para código nativo usando C como intermediário
         
         :param ast_function: Nó AST da função a ser compilada
         :param environment: Ambiente de execução (para contexto)
-        :return: Uma função Python que chama o código C compilado
+        :param signature: Tipos Python dos argumentos da especialização (padrão: os declarados)
+        :return: A função C (ctypes) com argtypes/restype da especialização
         """
         function_name = ast_function.name
-        
-        # Verifica se a função já está em cache
-        if function_name in self.compiled_functions:
-            print(f"CJITCompiler: Usando função '{function_name}' do cache")
-            return self.compiled_functions[function_name]
-            
-        print(f"CJITCompiler: Compilando função '{function_name}'")
+        typed = specialize_function(ast_function, signature)
+        if typed is None:
+            raise Exception(f"Função '{function_name}' não pode ser compilada para C com essa assinatura")
+        signature = typed.signature
+        # A chave depende da AST, não do nome: funções homônimas de módulos diferentes não colidem
+        key = function_key(ast_function, signature, _GCC_FLAGS)
+        
+        # Verifica se a função já foi carregada nesta execução
+        if key in self.compiled_functions:
+            self._log(f"CJITCompiler: Usando função '{function_name}' do cache")
+            return self.compiled_functions[key]
         
         try:
-            # Gera o código C
-            generator = CCodeGenerator()
-            c_code = generator.generate_complete_c_file(ast_function)
+            # Biblioteca de uma execução anterior: basta carregá-la
+            lib = self._load_cached(key, f"'{function_name}'")
+            if lib is None:
+                param_types = [_C_TYPES[param_type][0] for param_type in signature]
+                suffix = "".join(_C_TYPES[param_type][2] for param_type in signature)
+                self._log(f"CJITCompiler: Compilando função '{function_name}' ({', '.join(param_types) or 'void'})")
+                
+                # Gera o código C
+                c_code = _generator(typed).generate_complete_c_file(ast_function)
+                lib = self._build([c_code], f"{function_name}_{suffix}_{key[:12]}", key)
             
-            # Cria arquivos temporários
-            c_file_path = os.path.join(self.temp_dir, f"{function_name}.c")
-            so_file_path = os.path.join(self.temp_dir, f"{function_name}.so")
+            native_function = self._bind(lib, typed)
+                
+            # Armazena a função em cache
+            self.compiled_functions[key] = native_function
             
+            return native_function
+            
+        except Exception as e:
+            self._log(f"CJITCompiler: Erro ao compilar função '{function_name}': {e}")
+            raise
+    
+    def specialize_module(self, declarations):
+        """Especializações das funções de um módulo que podem ser compiladas juntas
+        
+        Considera as FunctionDeclaration de 'declarations' (as statements de
+        um Program) com os tipos declarados dos parâmetros. Uma função pode
+        chamar diretamente as outras do lote; as que dependem de uma função
+        recusada também são recusadas, até sobrar um conjunto estável.
+        Nomes declarados mais de uma vez ficam de fora, pois a chamada
+        interpretada usaria a última definição.
+        
+        :return: {declaração: (assinatura, tipo de retorno)}, na ordem do módulo
+        """
+        return {function: (typed.signature, typed.return_type)
+                for function, typed in self._specialize_declarations(declarations).items()}
+    
+    def _specialize_declarations(self, declarations):
+        """TypeChecker de cada função do módulo aceita no lote"""
+        functions = [stmt for stmt in declarations if isinstance(stmt, FunctionDeclaration)]
+        names = [function.name for function in functions]
+        signatures = {}
+        for function in functions:
+            signature = declared_signature(function)
+            if signature is not None and names.count(function.name) == 1:
+                signatures[function] = signature
+        return specialize_functions(signatures)
+    
+    def compile_module(self, declarations, environment=None):
+        """
+        Compila de uma vez todas as funções aceitas por specialize_module
+        
+        Gera uma única unidade de tradução C (com protótipos, para que as
+        funções se chamem diretamente em C), compila com uma chamada ao gcc
+        e carrega uma única biblioteca. Com jobs > 1 e ao menos
+        _PARALLEL_MIN_FUNCTIONS funções, o C é dividido em partes compiladas
+        em paralelo e ligadas na mesma biblioteca.
+        
+        :return: {declaração: (assinatura, função nativa)}
+        """
+        entries = self._specialize_declarations(declarations)
+        if not entries:
+            return {}
+        key = module_key([function_key(function, typed.signature, _GCC_FLAGS)
+                          for function, typed in entries.items()])
+        
+        if key not in self.compiled_functions:
+            description = f"do lote de {len(entries)} funções"
+            try:
+                lib = self._load_cached(key, description)
+                if lib is None:
+                    self._log(f"CJITCompiler: Compilando lote: {', '.join(f.name for f in entries)}")
+                    lib = self._build(self._module_sources(entries), f"lote_{key[:12]}", key)
+                self.compiled_functions[key] = {
+                    function: (typed.signature, self._bind(lib, typed))
+                    for function, typed in entries.items()
+                }
+            except Exception as e:
+                self._log(f"CJITCompiler: Erro ao compilar lote: {e}")
+                raise
+        return self.compiled_functions[key]
+    
+    def _module_sources(self, entries):
+        """Arquivos C de um lote: um só ou, em paralelo, um por job
+        
+        Todos os arquivos recebem o prelúdio e os protótipos de todas as
+        funções; o indicador de erro é definido só no primeiro.
+        """
+        generators = {function: _generator(typed) for function, typed in entries.items()}
+        prototypes = "\n".join(generator.generate_prototype(function)
+                               for function, generator in generators.items())
+        
+        functions = list(entries)
+        parts = min(self.jobs, len(functions)) if len(functions) >= _PARALLEL_MIN_FUNCTIONS else 1
+        chunks = [functions[index::parts] for index in range(parts)]
+        
+        sources = []
+        for index, chunk in enumerate(chunks):
+            code = [generators[function].generate(function) for function in chunk]
+            header = "#include <stdio.h>\n#include <stdlib.h>\n\n"
+            header += (_C_ERROR_FLAG if index == 0 else _C_ERROR_EXTERN) + _C_PRELUDE
+            sources.append(header + prototypes + "\n\n" + "\n\n".join(code) + "\n")
+        return sources
+    
+    def _load_cached(self, key, description):
+        """Biblioteca em cache de uma execução anterior, ou None"""
+        so_file_path = self.cache.lookup(key) if self.cache is not None else None
+        if so_file_path is None:
+            return None
+        self._log(f"CJITCompiler: Biblioteca {description} encontrada em {so_file_path}")
+        try:
+            return ctypes.CDLL(so_file_path)
+        except OSError as e:
+            # Entrada ilegível (p. ex. gravada por outra arquitetura): recompila
+            self._log(f"CJITCompiler: Entrada do cache ignorada: {e}")
+            return None
+    
+    def _build(self, sources, base_name, key):
+        """Compila os arquivos C com o gcc em uma biblioteca compartilhada e a carrega
+        
+        Com mais de um arquivo, cada um é compilado para um objeto em um
+        processo gcc separado (todos ao mesmo tempo) e os objetos são
+        ligados na biblioteca.
+        """
+        # Cria arquivos temporários (com o início da chave no nome); com o
+        # cache, o .so é gravado ao lado da entrada final e publicado com os.replace
+        if self.cache is not None:
+            so_file_path = self.cache.temp_path(key)
+        else:
+            so_file_path = os.path.join(self.temp_dir, base_name + ".so")
+        
+        c_file_paths = []
+        for index, c_code in enumerate(sources):
+            suffix = f"_{index}" if len(sources) > 1 else ""
+            c_file_path = os.path.join(self.temp_dir, f"{base_name}{suffix}.c")
             # Escreve o código C em um arquivo
             with open(c_file_path, 'w') as f:
                 f.write(c_code)
-                
-            print(f"CJITCompiler: Código C gerado em {c_file_path}")
-            
-            # Compila o código C para uma biblioteca compartilhada
-            compile_cmd = [
-                "gcc", "-shared", "-fPIC", "-O3",
-                "-o", so_file_path, c_file_path
+            c_file_paths.append(c_file_path)
+            self._log(f"CJITCompiler: Código C gerado em {c_file_path}")
+        
+        # Compila o código C para uma biblioteca compartilhada
+        if len(c_file_paths) == 1:
+            _run_gcc(["gcc", *_GCC_FLAGS, "-o", so_file_path, c_file_paths[0]])
+        else:
+            object_paths = [c_file_path[:-2] + ".o" for c_file_path in c_file_paths]
+            processes = [
+                subprocess.Popen(["gcc", *_GCC_COMPILE_FLAGS, "-c", "-o", object_path, c_file_path],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                for c_file_path, object_path in zip(c_file_paths, object_paths)
             ]
+            for process in processes:
+                _, stderr = process.communicate()
+                if process.returncode != 0:
+                    raise Exception(f"Erro ao compilar C: {stderr}")
+            _run_gcc(["gcc", "-shared", "-o", so_file_path, *object_paths])
+        
+        if self.cache is not None:
+            so_file_path = self.cache.store(key, so_file_path)
             
-            process = subprocess.run(
-                compile_cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            if process.returncode != 0:
-                raise Exception(f"Erro ao compilar C: {process.stderr}")
-                
-            print(f"CJITCompiler: Biblioteca compilada em {so_file_path}")
-            
-            # Carrega a biblioteca compartilhada
-            lib = ctypes.CDLL(so_file_path)
-            
-            # Obtém a função da biblioteca
-            c_func = getattr(lib, function_name)
-            
-            # Define tipos de parâmetros e retorno
-            # Por padrão, assume int para todos
-            c_func.argtypes = [ctypes.c_int] * len(ast_function.parameters)
-            c_func.restype = ctypes.c_int
-            
-            # Cria a função Python que chama a função C
-            def wrapper_function(*args):
-                # Converte argumentos Python para tipos C
-                c_args = []
-                for i, arg in enumerate(args):
-                    c_args.append(ctypes.c_int(arg))
-                
-                # Chama a função C
-                result = c_func(*c_args)
+        self._log(f"CJITCompiler: Biblioteca compilada em {so_file_path}")
+        
+        # Carrega a biblioteca compartilhada
+        return ctypes.CDLL(so_file_path)
+    
+    def _bind(self, lib, typed):
+        """Função Python que chama a especialização carregada e verifica naja_error
+        
+        Listas são copiadas para um array('d') contíguo (uma passada em C,
+        sem conversão elemento a elemento pelo ctypes) e passadas como o
+        endereço do buffer e o tamanho. Listas com algum elemento que não
+        seja float fazem a chamada ser interpretada.
+        """
+        function_name = typed.function.name
+        signature = typed.signature
+        
+        # Obtém a função da biblioteca
+        c_func = getattr(lib, function_name)
+        
+        # Define tipos de parâmetros e retorno; o ctypes converte os argumentos
+        c_func.argtypes = [c_type for param_type in signature for c_type in _C_TYPES[param_type][1]]
+        c_func.restype = _C_TYPES[typed.return_type][1][0]
+        error = ctypes.c_int.in_dll(lib, "naja_error")
+        
+        def check_error():
+            code = error.value
+            error.value = 0
+            exception_type, message = _NATIVE_ERRORS.get(code, (ArithmeticError, f"Erro {code}"))
+            raise exception_type(f"{message} em '{function_name}'")
+        
+        list_positions = [index for index, param_type in enumerate(signature) if param_type is NajaList]
+        if not list_positions:
+            def native_function(*args):
+                result = c_func(*args)
+                if error.value:
+                    check_error()
                 return result
-                
-            # Armazena a função em cache
-            self.compiled_functions[function_name] = wrapper_function
             
-            return wrapper_function
+            return native_function
+        
+        def native_function(*args):
+            c_args = list(args)
+            # Mantém os buffers vivos durante a chamada
+            buffers = []
+            # Do fim para o começo: cada lista vira dois argumentos C
+            for index in reversed(list_positions):
+                elements = args[index]._elements
+                if not FLOAT_ONLY.issuperset(map(type, elements)):
+                    raise TypeError(f"Lista com elementos que não são float em '{function_name}'")
+                buffer = array('d', elements)
+                buffers.append(buffer)
+                c_args[index:index + 1] = (buffer.buffer_info()[0], len(buffer))
             
-        except Exception as e:
-            print(f"CJITCompiler: Erro ao compilar função '{function_name}': {e}")
-            raise 
\ No newline at end of file
+            result = c_func(*c_args)
+            if error.value:
+                check_error()
+            return result
+        
+        return native_function
+
+
+def _generator(typed):
+    """CCodeGenerator de uma especialização (tipos C e aritmética com a semântica do NajaScript)"""
+    return CCodeGenerator([_C_TYPES[param_type][0] for param_type in typed.signature],
+                          _C_TYPES[typed.return_type][0], typed.types.get)
+
+
+def _run_gcc(command):
+    """Executa o gcc e lança Exception com a saída de erro se falhar"""
+    process = subprocess.run(
+        command, 
+        stdout=subprocess.PIPE, 
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    
+    if process.returncode != 0:
+        raise Exception(f"Erro ao compilar C: {process.stderr}")
+
+def _length_name(name):
+    """Parâmetro C com o tamanho de uma lista"""
+    return f"naja_len_{name}"
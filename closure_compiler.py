@@ -0,0 +1,678 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compilador de closures para NajaScript
+
+Percorre a AST uma única vez e produz uma árvore de closures Python
+especializadas. Cada nó vira uma função sem argumentos que já carrega os
+filhos compilados, o operador resolvido e as constantes, de modo que a
+execução não precisa mais despachar pelo tipo do nó nem comparar o operador
+a cada avaliação.
+
+A semântica (ambientes, truthiness, ordem de avaliação, mensagens de erro)
+é a mesma do interpretador de árvore. Nós que não têm uma versão
+especializada são delegados ao próprio interpretador.
+"""
+
+import operator
+
+from ast_nodes import *
+from lexer import TokenType
+from environment import Environment, SlotEnvironment, EMPTY_SLOT
+from interpreter import (
+    Function, ReturnException, BreakException, ContinueException,
+    NajaObject, NajaList, NajaDict, NajaSet, NajaMap, NajaTuple,
+)
+
+
+# Operadores binários que mapeiam diretamente para funções do Python
+_BINARY_OPERATORS = {
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+    "**": operator.pow,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+# Literais cujo valor pode ser embutido diretamente na closure do operador
+_CONSTANT_NODES = (IntegerLiteral, FloatLiteral, StringLiteral, BooleanLiteral)
+
+# Operadores das atribuições compostas (+=, -=, ...)
+_COMPOUND_OPERATORS = {
+    TokenType.PLUS_ASSIGN: operator.add,
+    TokenType.MINUS_ASSIGN: operator.sub,
+    TokenType.MULTIPLY_ASSIGN: operator.mul,
+    TokenType.DIVIDE_ASSIGN: operator.truediv,
+    TokenType.MODULO_ASSIGN: operator.mod,
+    TokenType.POWER_ASSIGN: operator.pow,
+}
+
+# Tipos de chamada resolvidos para cada classe de callee
+_CALL_INTERPRETER = 0   # Function / NajaGameFunction: callee(interpreter, args)
+_CALL_NATIVE = 1        # Função Python: callee(*args)
+_CALL_OTHER = 2         # Objeto não chamável: caminho genérico do interpretador
+
+
+class CompiledFunction(Function):
+    """Função NajaScript cujo corpo foi compilado em closures"""
+    def __init__(self, declaration, environment, body):
+        super().__init__(declaration, environment)
+        self.body = body
+
+    def _execute_body(self, interpreter, environment):
+        """Executa o corpo compilado no ambiente já preparado com os parâmetros"""
+        for statement in self.body:
+            statement()
+
+
+class ClosureCompiler:
+    """Compila nós da AST em closures Python especializadas"""
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self._loop_depth = 0  # Laços envolvendo a statement em compilação (break/continue)
+        self._statement_compilers = {
+            ExpressionStatement: self._compile_ExpressionStatement,
+            VarDeclaration: self._compile_VarDeclaration,
+            Assignment: self._compile_Assignment,
+            CompoundAssignment: self._compile_CompoundAssignment,
+            IfStatement: self._compile_IfStatement,
+            WhileStatement: self._compile_WhileStatement,
+            ForStatement: self._compile_ForStatement,
+            BlockStatement: self._compile_BlockStatement,
+            ReturnStatement: self._compile_ReturnStatement,
+            BreakStatement: self._compile_BreakStatement,
+            ContinueStatement: self._compile_ContinueStatement,
+            FunctionDeclaration: self._compile_FunctionDeclaration,
+        }
+        self._expression_compilers = {
+            IntegerLiteral: self._compile_Literal,
+            FloatLiteral: self._compile_Literal,
+            StringLiteral: self._compile_Literal,
+            BooleanLiteral: self._compile_Literal,
+            NullLiteral: self._compile_NullLiteral,
+            Variable: self._compile_Variable,
+            BinaryOperation: self._compile_BinaryOperation,
+            UnaryOperation: self._compile_UnaryOperation,
+            FunctionCall: self._compile_FunctionCall,
+            MethodCall: self._compile_MethodCall,
+            GetAttr: self._compile_GetAttr,
+            Assignment: self._compile_Assignment,
+            CompoundAssignment: self._compile_CompoundAssignment,
+            ListLiteral: self._compile_ListLiteral,
+            DictLiteral: self._compile_DictLiteral,
+        }
+
+    # ------------------------------------------------------------------
+    # Pontos de entrada
+    # ------------------------------------------------------------------
+
+    def compile_program(self, program):
+        """Compila um Program e retorna a lista de closures das statements"""
+        return self.compile_statements(program.statements)
+
+    def compile_statements(self, statements):
+        """Compila uma lista de statements em uma lista de closures"""
+        return [self.compile_statement(statement) for statement in statements]
+
+    def compile_statement(self, stmt):
+        """Compila uma statement; nós sem versão especializada usam o interpretador"""
+        compiler = self._statement_compilers.get(type(stmt))
+        if compiler is not None:
+            return compiler(stmt)
+
+        execute = self.interpreter.execute
+        def run():
+            return execute(stmt)
+        return run
+
+    def compile_expression(self, expr):
+        """Compila uma expressão; nós sem versão especializada usam o interpretador"""
+        compiler = self._expression_compilers.get(type(expr))
+        if compiler is not None:
+            return compiler(expr)
+
+        evaluate = self.interpreter.evaluate
+        def run():
+            return evaluate(expr)
+        return run
+
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+
+    def _run_block(self, body):
+        """Cria uma closure que executa um bloco compilado no ambiente recebido"""
+        interpreter = self.interpreter
+
+        def run_block(environment):
+            previous_env = interpreter.environment
+            interpreter.environment = environment
+            try:
+                for statement in body:
+                    statement()
+            finally:
+                interpreter.environment = previous_env
+            return None
+        return run_block
+
+    def _block_environment(self, scope):
+        """Cria uma closure que monta o ambiente de um bloco (com slots quando resolvido)"""
+        interpreter = self.interpreter
+        if scope is None:
+            return lambda: Environment(interpreter.environment)
+        if not scope:
+            # Bloco sem declarações: reutiliza o ambiente atual
+            return lambda: interpreter.environment
+        return lambda: SlotEnvironment(interpreter.environment, scope)
+
+    def _compile_lookup(self, node):
+        """Compila a leitura de uma variável, direto do slot quando resolvida"""
+        interpreter = self.interpreter
+        name = node.name
+        depth = node.depth
+        slot = node.slot
+
+        if slot is None:
+            def lookup():
+                return interpreter.environment.get(name)
+        elif depth == 0:
+            def lookup():
+                value = interpreter.environment.slots[slot]
+                if value is not EMPTY_SLOT:
+                    return value
+                return interpreter.environment.get(name)
+        else:
+            def lookup():
+                environment = interpreter.environment
+                for _ in range(depth):
+                    environment = environment.enclosing
+                value = environment.slots[slot]
+                if value is not EMPTY_SLOT:
+                    return value
+                return interpreter.environment.get(name)
+        return lookup
+
+    def _compile_store(self, node):
+        """Compila a escrita em uma variável, direto no slot quando resolvida"""
+        interpreter = self.interpreter
+        name = node.name
+        depth = node.depth
+        slot = node.slot
+
+        if slot is None:
+            def store(value):
+                interpreter.environment.assign(name, value)
+        else:
+            def store(value):
+                environment = interpreter.environment
+                for _ in range(depth):
+                    environment = environment.enclosing
+                slots = environment.slots
+                if slots[slot] is not EMPTY_SLOT and not environment.change_listeners:
+                    slots[slot] = value
+                else:
+                    interpreter.environment.assign(name, value)
+        return store
+
+    def _compile_condition(self, expr):
+        """Compila uma condição já convertida para bool com a truthiness da linguagem"""
+        value_of = self.compile_expression(expr)
+        is_truthy = self.interpreter.is_truthy
+
+        def condition():
+            value = value_of()
+            if value is True:
+                return True
+            if value is False:
+                return False
+            return is_truthy(value)
+        return condition
+
+    # ------------------------------------------------------------------
+    # Expressões
+    # ------------------------------------------------------------------
+
+    def _compile_Literal(self, expr):
+        value = expr.value
+        return lambda: value
+
+    def _compile_NullLiteral(self, expr):
+        return lambda: None
+
+    def _compile_Variable(self, expr):
+        return self._compile_lookup(expr)
+
+    def _compile_BinaryOperation(self, expr):
+        left = self.compile_expression(expr.left)
+        right = self.compile_expression(expr.right)
+        op = expr.operator
+        is_truthy = self.interpreter.is_truthy
+
+        if op == "+" and isinstance(expr.right, (IntegerLiteral, FloatLiteral)):
+            constant = expr.right.value
+            def run():
+                lhs = left()
+                if isinstance(lhs, str):
+                    return lhs + str(constant)
+                return lhs + constant
+        elif op == "+":
+            def run():
+                lhs = left()
+                rhs = right()
+                # Concatenação de strings
+                if isinstance(lhs, str) or isinstance(rhs, str):
+                    return str(lhs) + str(rhs)
+                return lhs + rhs
+        elif op in _BINARY_OPERATORS and isinstance(expr.right, _CONSTANT_NODES):
+            # Operando direito constante (limites de laço, incrementos): evita uma chamada
+            function = _BINARY_OPERATORS[op]
+            constant = expr.right.value
+            def run():
+                return function(left(), constant)
+        elif op in _BINARY_OPERATORS:
+            function = _BINARY_OPERATORS[op]
+            def run():
+                return function(left(), right())
+        elif op == "&&" or op == "and":
+            # Os dois lados são sempre avaliados, como no interpretador
+            def run():
+                lhs = left()
+                rhs = right()
+                return is_truthy(lhs) and is_truthy(rhs)
+        elif op == "||" or op == "or":
+            def run():
+                lhs = left()
+                rhs = right()
+                return is_truthy(lhs) or is_truthy(rhs)
+        else:
+            def run():
+                left()
+                right()
+                raise Exception(f"Operador não implementado: {op}")
+        return run
+
+    def _compile_UnaryOperation(self, expr):
+        operand = self.compile_expression(expr.operand)
+        op = expr.operator
+        is_truthy = self.interpreter.is_truthy
+
+        if op == "-":
+            def run():
+                value = operand()
+                if isinstance(value, (int, float)):
+                    return -value
+                raise TypeError(f"Operador '-' não suportado para {type(value)}")
+        elif op == "!":
+            def run():
+                return not is_truthy(operand())
+        else:
+            def run():
+                operand()
+                raise ValueError(f"Operador unário não suportado: {op}")
+        return run
+
+    def _compile_FunctionCall(self, expr):
+        interpreter = self.interpreter
+        arguments = [self.compile_expression(arg) for arg in expr.arguments]
+
+        function_name = None
+        if isinstance(expr.name, Variable):
+            function_name = expr.name.name
+        elif isinstance(expr.name, str):
+            function_name = expr.name
+
+        if function_name:
+            def callee_of():
+                return interpreter.environment.get(function_name)
+            error_name = function_name
+        else:
+            callee_of = self.compile_expression(expr.name)
+            error_name = str(expr.name)
+
+        # Cache do tipo de chamada por classe do callee neste ponto de chamada
+        call_kinds = {}
+
+        def run():
+            callee = callee_of()
+            args = [argument() for argument in arguments]
+
+            kind = call_kinds.get(type(callee))
+            if kind is None:
+                kind = _classify_callee(callee)
+                call_kinds[type(callee)] = kind
+
+            if kind == _CALL_INTERPRETER:
+                return callee(interpreter, args)
+            if kind == _CALL_NATIVE:
+                return callee(*args)
+            return _call_other(interpreter, callee, args, error_name)
+        return run
+
+    def _compile_MethodCall(self, expr):
+        interpreter = self.interpreter
+        obj_of = self.compile_expression(expr.object)
+        arguments = [self.compile_expression(arg) for arg in expr.arguments]
+        # Mesmo cache inline do interpretador de árvore (um por nó)
+        cache = expr.inline_cache or interpreter._method_cache(expr)
+        dispatch = cache.dispatch
+
+        if not arguments:
+            def run():
+                obj = obj_of()
+                if type(obj) is cache.receiver_type and not interpreter.debug:
+                    cache.hits += 1
+                    return cache.handler(obj)
+                return dispatch(interpreter, obj, [])
+            return run
+
+        if len(arguments) == 1:
+            argument_of = arguments[0]
+
+            def run():
+                obj = obj_of()
+                arg = argument_of()
+                if type(obj) is cache.receiver_type and not interpreter.debug:
+                    cache.hits += 1
+                    return cache.handler(obj, arg)
+                return dispatch(interpreter, obj, [arg])
+            return run
+
+        def run():
+            obj = obj_of()
+            args = [argument() for argument in arguments]
+            if type(obj) is cache.receiver_type and not interpreter.debug:
+                cache.hits += 1
+                return cache.handler(obj, *args)
+            return dispatch(interpreter, obj, args)
+        return run
+
+    def _compile_GetAttr(self, expr):
+        interpreter = self.interpreter
+        obj_of = self.compile_expression(expr.object)
+        name = expr.name
+
+        def run():
+            return interpreter._get_attribute(obj_of(), name)
+        return run
+
+    def _compile_Assignment(self, expr):
+        interpreter = self.interpreter
+        value_of = self.compile_expression(expr.value)
+
+        if isinstance(expr.name, GetAttr):
+            obj_of = self.compile_expression(expr.name.object)
+            attr_name = expr.name.name
+
+            def run():
+                value = value_of()
+                obj = obj_of()
+                if isinstance(obj, NajaObject):
+                    obj._set_property(attr_name, value)
+                else:
+                    raise Exception(f"Não é possível atribuir à propriedade '{attr_name}' em um não-objeto")
+                return value
+        else:
+            store = self._compile_store(expr)
+
+            def run():
+                value = value_of()
+                store(value)
+                return value
+        return run
+
+    def _compile_CompoundAssignment(self, expr):
+        value_of = self.compile_expression(expr.value)
+        op = expr.operator
+        function = _COMPOUND_OPERATORS.get(op)
+        lookup = self._compile_lookup(expr)
+
+        if function is None:
+            def run():
+                lookup()
+                value_of()
+                raise Exception(f"Operador de atribuição composta não suportado: {op}")
+            return run
+
+        store = self._compile_store(expr)
+
+        def run():
+            result = function(lookup(), value_of())
+            store(result)
+            return result
+        return run
+
+    def _compile_ListLiteral(self, expr):
+        elements = [self.compile_expression(element) for element in expr.elements]
+
+        def run():
+            return NajaList([element() for element in elements])
+        return run
+
+    def _compile_DictLiteral(self, expr):
+        items = [self.compile_expression(item) for item in expr.items]
+
+        def run():
+            return NajaDict([item() for item in items])
+        return run
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _compile_ExpressionStatement(self, stmt):
+        return self.compile_expression(stmt.expression)
+
+    def _compile_VarDeclaration(self, stmt):
+        interpreter = self.interpreter
+
+        # Declarações exportadas têm lógica de exportação e depuração própria
+        if stmt.exported:
+            execute = interpreter.execute_VarDeclaration
+            return lambda: execute(stmt)
+
+        value_of = self.compile_expression(stmt.value) if stmt.value else None
+        default = _default_factory(stmt.var_type)
+        name = stmt.name
+        is_const = stmt.is_const
+
+        def run():
+            value = value_of() if value_of is not None else None
+            if value is None and default is not None:
+                value = default()
+            if is_const:
+                interpreter.environment.define_const(name, value)
+            else:
+                interpreter.environment.define(name, value)
+            return value
+        return run
+
+    def _compile_IfStatement(self, stmt):
+        condition = self._compile_condition(stmt.condition)
+        then_branch = self._run_block(self.compile_statements(stmt.then_branch))
+        then_env = self._block_environment(stmt.then_scope)
+        branches = []
+        for i, (elif_condition, elif_body) in enumerate(stmt.elif_branches or []):
+            scope = stmt.elif_scopes[i] if i < len(stmt.elif_scopes) else None
+            branches.append((
+                self._compile_condition(elif_condition),
+                self._run_block(self.compile_statements(elif_body)),
+                self._block_environment(scope),
+            ))
+        else_branch = None
+        if stmt.else_branch:
+            else_branch = self._run_block(self.compile_statements(stmt.else_branch))
+            else_env = self._block_environment(stmt.else_scope)
+
+        def run():
+            if condition():
+                return then_branch(then_env())
+            for elif_condition, elif_body, elif_env in branches:
+                if elif_condition():
+                    return elif_body(elif_env())
+            if else_branch is not None:
+                return else_branch(else_env())
+            return None
+        return run
+
+    def _compile_WhileStatement(self, stmt):
+        interpreter = self.interpreter
+        condition = self._compile_condition(stmt.condition)
+        body = self._run_block(self._compile_loop_body(stmt.body))
+
+        def run():
+            # Iterações de laços de funções contam como back-edges na compilação em camadas
+            profile = interpreter.loop_profiles.get(stmt)
+            while condition():
+                if profile is not None:
+                    profile.back_edges += 1
+                try:
+                    body(interpreter.environment)
+                except BreakException:
+                    break
+                except ContinueException:
+                    continue
+            return None
+        return run
+
+    def _compile_ForStatement(self, stmt):
+        interpreter = self.interpreter
+        if isinstance(stmt.init, VarDeclaration):
+            init = self._compile_VarDeclaration(stmt.init)
+        else:
+            init = self.compile_expression(stmt.init)
+        condition = self._compile_condition(stmt.condition)
+        update = self.compile_expression(stmt.update)
+        body = self._run_block(self._compile_loop_body(stmt.body))
+        new_environment = self._block_environment(stmt.scope)
+
+        def run():
+            # Cria um novo ambiente para o loop
+            loop_env = new_environment()
+            prev_env = interpreter.environment
+            interpreter.environment = loop_env
+
+            profile = interpreter.loop_profiles.get(stmt)
+            try:
+                init()
+                while condition():
+                    if profile is not None:
+                        profile.back_edges += 1
+                    try:
+                        body(loop_env)
+                        update()
+                    except BreakException:
+                        break
+                    except ContinueException:
+                        update()
+                        continue
+            finally:
+                interpreter.environment = prev_env
+            return None
+        return run
+
+    def _compile_BlockStatement(self, stmt):
+        statements = self.compile_statements(stmt.statements)
+
+        def run():
+            result = None
+            for statement in statements:
+                result = statement()
+            return result
+        return run
+
+    def _compile_ReturnStatement(self, stmt):
+        value_of = self.compile_expression(stmt.value) if stmt.value else None
+
+        if value_of is None:
+            def run():
+                raise ReturnException(None)
+        else:
+            def run():
+                raise ReturnException(value_of())
+        return run
+
+    def _compile_loop_body(self, statements):
+        """Compila o corpo de um laço, onde break e continue são válidos"""
+        self._loop_depth += 1
+        try:
+            return self.compile_statements(statements)
+        finally:
+            self._loop_depth -= 1
+
+    def _compile_BreakStatement(self, stmt):
+        return self._compile_loop_exit("break", BreakException)
+
+    def _compile_ContinueStatement(self, stmt):
+        return self._compile_loop_exit("continue", ContinueException)
+
+    def _compile_loop_exit(self, keyword, exception):
+        """break/continue lançam a exceção tratada pelo laço; fora de laço, erro"""
+        if self._loop_depth == 0:
+            def run():
+                raise Exception(f"'{keyword}' fora de um laço")
+        else:
+            def run():
+                raise exception()
+        return run
+
+    def _compile_FunctionDeclaration(self, stmt):
+        interpreter = self.interpreter
+        # O corpo da função não está dentro dos laços que envolvem a declaração
+        loop_depth, self._loop_depth = self._loop_depth, 0
+        try:
+            body = self.compile_statements(stmt.body)
+        finally:
+            self._loop_depth = loop_depth
+
+        def run():
+            function = CompiledFunction(stmt, interpreter.environment, body)
+            return interpreter._declare_function(stmt, function)
+        return run
+
+
+def _default_factory(var_type):
+    """Retorna a fábrica do valor padrão de um tipo declarado (ou None)"""
+    return {
+        "int": lambda: 0,
+        "float": lambda: 0.0,
+        "string": lambda: "",
+        "bool": lambda: False,
+        "list": NajaList,
+        "dict": NajaDict,
+        "set": NajaSet,
+        "map": NajaMap,
+        "tuple": NajaTuple,
+    }.get(var_type)
+
+
+def _classify_callee(callee):
+    """Determina como um callee deve ser chamado, com as mesmas regras do interpretador"""
+    if callee.__class__.__name__ == "NajaGameFunction" or isinstance(callee, Function):
+        return _CALL_INTERPRETER
+    if callable(callee) and not isinstance(callee, (int, float, str, bool)):
+        return _CALL_NATIVE
+    return _CALL_OTHER
+
+
+def _call_other(interpreter, callee, arguments, name):
+    """Caminho genérico para callees que não são funções nem chamáveis do Python"""
+    if hasattr(callee, "__call__") and callable(getattr(callee, "__call__")):
+        try:
+            return callee.__call__(interpreter, arguments)
+        except TypeError:
+            try:
+                return callee(interpreter, arguments)
+            except TypeError:
+                try:
+                    return callee(*arguments)
+                except Exception as e:
+                    raise Exception(f"Erro ao chamar função: {e}")
+    raise Exception(f"'{name}' não é uma função ou não é chamável")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fixtures dos testes: execução de programas NajaScript nos três modos
+(interpretador de árvore, --closures e --vm)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from interpreter import Interpreter
+from closure_compiler import ClosureCompiler
+from naja_bytecode import BytecodeInterpreter
+
+MODES = ("arvore", "closures", "vm")
+
+
+def make_interpreter(mode="arvore"):
+    """Interpretador no modo de execução pedido, como o najascript.py monta"""
+    interpreter = Interpreter()
+    if mode == "closures":
+        interpreter.set_closure_compiler(ClosureCompiler(interpreter))
+    elif mode == "vm":
+        interpreter.set_vm(BytecodeInterpreter(interpreter))
+    return interpreter
+
+
+@pytest.fixture(params=MODES)
+def mode(request):
+    """Cada modo de execução"""
+    return request.param
+
+
+@pytest.fixture
+def run_naja(capsys):
+    """Executa um programa e devolve a sua saída
+
+    Erros de execução aparecem na saída como "Erro durante a
+    interpretação: ...", como no najascript.py.
+    """
+    def run(source, mode="arvore", interpreter=None):
+        interpreter = interpreter or make_interpreter(mode)
+        interpreter.interpret(interpreter.parse_file("teste.naja", source))
+        return capsys.readouterr().out
+
+    return run
@@ -14,12 +14,21 @@ class Environment:
         self.interpreter = None
     
     def define(self, name, value, is_const=False, is_flux=False):
-        """Define uma variável no ambiente atual"""
+        """Define uma variável no ambiente atual
+
+        A nova definição substitui a anterior do mesmo nome neste ambiente,
+        mesmo quando uma é função e a outra não (ex.: 'int memory = 5;' sobre
+        o builtin memory), já que get() consulta as funções antes dos valores.
+        """
         # Se for uma Função, armazená-la no dicionário de funções
         if callable(value) and not isinstance(value, (int, float, str, bool)):
             self.functions[name] = value
+            if name in self.values:
+                del self.values[name]
+                self.value_info.pop(name, None)
             return
-        
+        self.functions.pop(name, None)
+
         # Se for um módulo, armazená-lo no dicionário de módulos
         if hasattr(value, 'exports') and hasattr(value, 'get_method'):
             self.modules[name] = value
@@ -179,4 +188,112 @@ class Environment:
             return current_class == accessing_class
         
         # Por padrão, considerar como public
-        return True 
\ No newline at end of file
+        return True 
+
+# Marca um slot que ainda não recebeu valor (ou cujo nome passou a viver nos dicionários)
+EMPTY_SLOT = object()
+
+# Tipos que sempre podem ser guardados diretamente em um slot
+_PLAIN_TYPES = (int, float, str, bool, type(None))
+
+
+def _is_plain_value(value):
+    """Verifica se Environment.define guardaria o valor em 'values' como variável comum"""
+    if type(value) in _PLAIN_TYPES:
+        return True
+    if callable(value) and not isinstance(value, (int, float, str, bool)):
+        return False
+    if hasattr(value, 'exports') and hasattr(value, 'get_method'):
+        return False
+    if hasattr(value, 'evaluate') and hasattr(value, 'notify_change'):
+        return False
+    return True
+
+
+class SlotEnvironment(Environment):
+    """Ambiente cujas variáveis locais resolvidas pelo Resolver ficam em um array de slots
+
+    O 'scope' é o dicionário {nome: índice} calculado pelo resolver para o nó
+    que cria o ambiente. Variáveis comuns ficam em self.slots; funções,
+    módulos, constantes, valores flux e nomes não resolvidos continuam nos
+    dicionários de Environment, com a mesma semântica de busca.
+    """
+    def __init__(self, enclosing, scope):
+        # Mesmos atributos de Environment.__init__, atribuídos diretamente por desempenho
+        self.values = {}
+        self.value_info = {}
+        self.functions = {}
+        self.classes = {}
+        self.modules = {}
+        self.enclosing = enclosing
+        self.change_listeners = {}
+        self.interpreter = None
+        self.scope = scope
+        self.slots = [EMPTY_SLOT] * len(scope)
+        self.dynamic_names = None  # Nomes definidos pelos dicionários
+    
+    def define(self, name, value, is_const=False, is_flux=False):
+        """Define uma variável, usando o slot quando o nome foi resolvido"""
+        index = self.scope.get(name)
+        if index is not None:
+            if ((self.dynamic_names is None or name not in self.dynamic_names)
+                    and not is_const and not is_flux and _is_plain_value(value)):
+                self.slots[index] = value
+                return
+            
+            # O nome passa a viver nos dicionários: move o valor atual do slot
+            current = self.slots[index]
+            if current is not EMPTY_SLOT:
+                self.values[name] = current
+                self.value_info[name] = (False, False)
+                self.slots[index] = EMPTY_SLOT
+        
+        if self.dynamic_names is None:
+            self.dynamic_names = set()
+        self.dynamic_names.add(name)
+        super().define(name, value, is_const, is_flux)
+    
+    def get(self, name):
+        """Obtém o valor de uma variável, consultando primeiro o slot"""
+        index = self.scope.get(name)
+        if index is not None:
+            value = self.slots[index]
+            if value is not EMPTY_SLOT:
+                return value
+        
+        if self.dynamic_names is None and self.enclosing:
+            return self.enclosing.get(name)
+        return super().get(name)
+    
+    def assign(self, name, value):
+        """Atribui um valor a uma variável existente, consultando primeiro o slot"""
+        index = self.scope.get(name)
+        if index is not None:
+            current = self.slots[index]
+            if current is not EMPTY_SLOT:
+                self.slots[index] = value
+                if self.change_listeners:
+                    self._notify_change_listeners(name, current, value)
+                return value
+        
+        if self.dynamic_names is None and self.enclosing:
+            return self.enclosing.assign(name, value)
+        return super().assign(name, value)
+    
+    def is_reusable(self):
+        """Verifica se nada além dos slots foi usado, permitindo reaproveitar o ambiente"""
+        return self.dynamic_names is None and not self.change_listeners
+    
+    def reset(self, enclosing):
+        """Esvazia os slots e troca o ambiente pai, para reutilizar o ambiente em outra chamada"""
+        slots = self.slots
+        for i in range(len(slots)):
+            slots[i] = EMPTY_SLOT
+        self.enclosing = enclosing
+    
+    def is_defined(self, name):
+        """Verifica se uma variável, função ou módulo está definida"""
+        index = self.scope.get(name)
+        if index is not None and self.slots[index] is not EMPTY_SLOT:
+            return True
+        return super().is_defined(name)
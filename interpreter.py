@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from ast_nodes import *
+import ast_nodes
 import os
 import re
 from lexer import Lexer, TokenType
@@ -13,6 +14,7 @@ import types
 import asyncio
 import traceback
 import math
+import weakref
 
 class ExportedValue:
     """Wrapper para valores primitivos exportados"""
@@ -129,21 +131,9 @@ class FluxValue:
         if not self.expression:
             return
             
-        def extract_vars(node):
-            if hasattr(node, '__class__'):
-                class_name = node.__class__.__name__
-                if class_name == 'Variable':
-                    self._dependencies.add(node.name)
-                elif hasattr(node, '__dict__'):
-                    for attr_value in node.__dict__.values():
-                        if hasattr(attr_value, '__class__') and hasattr(attr_value.__class__, '__name__'):
-                            extract_vars(attr_value)
-                        elif isinstance(attr_value, list):
-                            for item in attr_value:
-                                if hasattr(item, '__class__'):
-                                    extract_vars(item)
-        
-        extract_vars(self.expression)
+        for node in walk(self.expression):
+            if isinstance(node, Variable):
+                self._dependencies.add(node.name)
         
     def evaluate(self):
         """Avalia a expressão no ambiente atual e retorna o resultado"""
@@ -184,18 +174,46 @@ class FluxValue:
         return f"FluxValue({self.name}, value={self._cached_value})"
 
 # Now import Environment after FluxValue is defined
-from environment import Environment
+from environment import Environment, SlotEnvironment, EMPTY_SLOT
+from resolver import Resolver
+from tiered_jit import TieredJIT, GuardFailure, DEFAULT_THRESHOLD
+
+# Máximo de ambientes guardados por função para reutilização (cobre recursão rasa)
+FRAME_POOL_LIMIT = 16
+
+# Máximo de tipos de receptor por cache inline de MethodCall
+INLINE_CACHE_SIZE = 4
+
+class Completion:
+    """Sinal de término antecipado de uma statement (return, break ou continue)
+
+    O interpretador de árvore não lança exceções para desviar o fluxo: a
+    statement retorna um destes sinais, execute_block e os laços o repassam
+    até quem o consome (o laço ou a chamada de função) e o valor de um
+    return fica em Interpreter.return_value.
+    """
+    __slots__ = ('kind',)
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __repr__(self):
+        return f"<sinal {self.kind}>"
+
+RETURN_SIGNAL = Completion("return")
+BREAK_SIGNAL = Completion("break")
+CONTINUE_SIGNAL = Completion("continue")
 
 class BreakException(Exception):
-    """Exceção lançada quando um comando break é encontrado"""
+    """Exceção lançada por um break compilado em closures"""
     pass
 
 class ContinueException(Exception):
-    """Exceção lançada quando um comando continue é encontrado"""
+    """Exceção lançada por um continue compilado em closures"""
     pass
 
 class ReturnException(Exception):
-    """Exceção lançada quando um comando return é encontrado"""
+    """Exceção lançada por um return compilado em closures (ou no nível superior)"""
     def __init__(self, value=None):
         self.value = value
 
@@ -567,21 +585,30 @@ class Function:
         self.declaration = declaration
         self.environment = environment
         self.compiled_version = None  # Versão compilada JIT
+        self._frame_pool = []  # Ambientes de chamadas anteriores para reutilizar
     
     def __call__(self, interpreter, arguments):
         """Chama a função com os argumentos fornecidos"""
+        # Compilação em camadas: conta a chamada e instala a versão compilada quando pronta
+        if self.compiled_version is None and interpreter.tiered_jit is not None:
+            interpreter.tiered_jit.record_call(self, arguments)
+        
         # Verifica se podemos usar a versão compilada JIT
         if self.compiled_version:
             try:
                 # Executa a versão compilada diretamente
                 return self.compiled_version(*arguments)
+            except GuardFailure as failure:
+                # Argumentos sem especialização compilada: esta chamada é interpretada
+                if failure.deoptimize:
+                    self.compiled_version = None
             except Exception as e:
                 # Se falhar, volta para a versão interpretada
                 print(f"JIT: Erro ao executar versão compilada, usando interpretador: {e}")
         
         # Versão interpretada original
         # Cria um novo ambiente com o ambiente de definição como pai
-        environment = Environment(self.environment)
+        environment = self._new_frame()
         
         # Garantir que arguments seja uma lista
         if not isinstance(arguments, list):
@@ -613,14 +640,45 @@ class Function:
         interpreter.environment = environment
         
         try:
-            # Executa o corpo da função
-            interpreter.execute_block(self.declaration.body, environment)
-            return None
+            # Executa o corpo da função (corpos compilados podem retornar o valor diretamente)
+            return self._execute_body(interpreter, environment)
         except ReturnException as return_value:
             return return_value.value
+        except BreakException:
+            raise Exception("'break' fora de um laço")
+        except ContinueException:
+            raise Exception("'continue' fora de um laço")
         finally:
             # Restaura o ambiente original
             interpreter.environment = previous_env
+            if self.declaration.pool_frames:
+                self._release_frame(environment)
+    
+    def _new_frame(self):
+        """Cria (ou reutiliza do pool) o ambiente de uma chamada"""
+        scope = self.declaration.scope
+        if scope is None:
+            return Environment(self.environment)
+        if not scope:
+            # Função sem parâmetros nem declarações: executa no ambiente de definição
+            return self.environment
+        if self._frame_pool:
+            frame = self._frame_pool.pop()
+            frame.reset(self.environment)
+            return frame
+        return SlotEnvironment(self.environment, scope)
+    
+    def _release_frame(self, frame):
+        """Devolve o ambiente de uma chamada ao pool se ninguém mais pode referenciá-lo"""
+        if frame.is_reusable() and len(self._frame_pool) < FRAME_POOL_LIMIT:
+            self._frame_pool.append(frame)
+    
+    def _execute_body(self, interpreter, environment):
+        """Executa o corpo da função no ambiente já preparado e retorna o valor do return"""
+        signal = interpreter.execute_block(self.declaration.body, environment)
+        if signal is None:
+            return None
+        return interpreter.completion_value(signal)
             
     # Adicionando suporte para callbacks onChange
     def as_callback(self):
@@ -730,6 +788,195 @@ class NajaModule:
         """Representação em string do módulo"""
         return f"<módulo '{self.name}'>"
 
+# Tradução português -> NajaScript aplicada por Interpreter.preprocess_source
+_PT_TRANSLATIONS = {
+    # Palavras-chave
+    'funcao': 'fun',
+    'se': 'if',
+    'senao se': 'elif',
+    'senao': 'else',
+    'enquanto': 'while',
+    'para': 'for',
+    'paracada': 'forin',
+    'retornar': 'return',
+    'verdadeiro': 'true',
+    'falso': 'false',
+    'em': 'in',
+    'nulo': 'null',
+    'continuar': 'continue',
+    'parar': 'break',
+    'importar': 'import',
+    
+    # Tipos
+    'inteiro': 'int',
+    'decimal': 'float',
+    'texto': 'string',
+    'booleano': 'bool',
+    'lista': 'list',
+    'dicionario': 'dict',
+    'qualquer': 'any',
+    
+    # Funções
+    'escrever': 'print',
+    'escreverln': 'println',
+    'comprimento': 'length',
+    'converter_para_texto': 'toString',
+    'converter_para_inteiro': 'toInt',
+    'converter_para_decimal': 'toFloat',
+    
+    # Métodos
+    'adicionar': 'add',
+    'remover': 'remove',
+    'obter': 'get',
+    'adicionarUltimo': 'add',
+    'removerUltimo': 'removeLast',
+    'substituir': 'replace',
+}
+
+# Strings e comentários (grupo 1, mantidos como estão) ou uma palavra traduzível
+# (grupo 2). As palavras mais longas vêm primeiro para "senao se" vencer "senao".
+_PT_PATTERN = re.compile(
+    r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|(?://|\#)[^\n]*|/\*.*?\*/)"""
+    r"|\b(" + "|".join(re.escape(word) for word in sorted(_PT_TRANSLATIONS, key=len, reverse=True)) + r")\b",
+    re.DOTALL,
+)
+
+
+def _translate_pt_match(match):
+    """Substituição de _PT_PATTERN: mantém strings e comentários e traduz as palavras"""
+    word = match.group(2)
+    if word is None:
+        return match.group(1)
+    return _PT_TRANSLATIONS[word]
+
+
+# Métodos nativos de listas, dicionários e strings despachados por
+# Interpreter._resolve_method: nome -> (atributo do tipo ou função chamada como
+# f(obj, *argumentos), quantidades de argumentos aceitas ou None se ignorados).
+
+def _string_substring(obj, *arguments):
+    start = arguments[0]
+    if not isinstance(start, int):
+        raise Exception(f"O índice inicial deve ser um número inteiro")
+    if len(arguments) == 1:
+        return obj[start:]
+    end = arguments[1]
+    if not isinstance(end, int):
+        raise Exception(f"O índice final deve ser um número inteiro")
+    return obj[start:end]
+
+_LIST_METHODS = {
+    "length": ("length", None),
+    "get": ("get", (1,)),
+    "add": ("add", (1,)),
+    "remove": ("remove", (1,)),
+    "removeLast": ("removeLast", (0,)),
+}
+
+_DICT_METHODS = {
+    "length": ("length", None),
+    "get": ("get", (1,)),
+    "add": ("add", (1, 2)),
+    "remove": ("remove", (1,)),
+}
+
+_STRING_METHODS = {
+    "length": (len, None),
+    "substring": (_string_substring, (1, 2)),
+}
+
+
+def _arity_error(method_name, arities, count):
+    """Exceção para um método nativo chamado com a quantidade errada de argumentos"""
+    if arities == (0,):
+        return Exception(f"Método {method_name}() não espera argumentos, recebeu {count}")
+    if len(arities) == 1:
+        plural = "argumento" if arities[0] == 1 else "argumentos"
+        return Exception(f"Método {method_name}() espera {arities[0]} {plural}, recebeu {count}")
+    return Exception(f"Método {method_name}() espera {' ou '.join(map(str, arities))} argumentos, recebeu {count}")
+
+
+def _native_method(receiver_type, table, method_name, count):
+    """Callable f(obj, *argumentos) de um método nativo, ou None se não existir
+
+    Lança a exceção de aridade se o método existe mas não aceita 'count' argumentos.
+    """
+    entry = table.get(method_name)
+    if entry is None:
+        return None
+    method, arities = entry
+    if isinstance(method, str):
+        method = getattr(receiver_type, method)
+    if arities is None:
+        if count:
+            # Argumentos são ignorados, como na cascata original
+            return lambda obj, *arguments: method(obj)
+        return method
+    if count not in arities:
+        raise _arity_error(method_name, arities, count)
+    return method
+
+
+def _object_method(interpreter, method_name):
+    """Callable f(obj, *argumentos) que chama um método de objetos de classes do usuário"""
+    def call_method(obj, *arguments):
+        try:
+            # Chama o método no objeto
+            return obj._call_method(method_name, interpreter, list(arguments))
+        except Exception as e:
+            raise Exception(f"Erro ao chamar método '{method_name}' no objeto {obj._class_name}: {e}")
+    return call_method
+
+
+class MethodCache:
+    """Cache inline polimórfico de um MethodCall
+
+    O primeiro tipo de receptor visto fica em (receiver_type, handler), testado
+    direto por evaluate_MethodCall; até INLINE_CACHE_SIZE tipos ficam em
+    'entries'. Os métodos vêm de Interpreter._resolve_method e são chamados
+    como f(obj, *argumentos). A quantidade de argumentos de um sítio é fixa,
+    então a aridade é checada só na resolução. Um tipo novo é uma falha: o
+    método é resolvido e guardado. Tipos não cacheáveis (módulos, objetos
+    Python genéricos), erros de resolução e sítios com mais tipos
+    (megamórficos) usam _invoke_method.
+    """
+    __slots__ = ('node', 'receiver_type', 'handler', 'entries', 'hits', 'misses', '__weakref__')
+
+    def __init__(self, node):
+        self.node = node
+        self.receiver_type = None
+        self.handler = None
+        self.entries = {}  # {tipo do receptor: callable f(obj, *argumentos)}
+        self.hits = 0
+        self.misses = 0
+
+    def dispatch(self, interpreter, obj, arguments):
+        """Caminho lento: procura o tipo nas entradas polimórficas ou resolve o método"""
+        receiver_type = type(obj)
+        if not interpreter.debug:
+            handler = self.entries.get(receiver_type)
+            if handler is not None:
+                self.hits += 1
+                return handler(obj, *arguments)
+
+        self.misses += 1
+        if not interpreter.debug and len(self.entries) < INLINE_CACHE_SIZE:
+            try:
+                handler = interpreter._resolve_method(receiver_type, self.node.method, len(arguments))
+            except Exception:
+                handler = None
+            if handler is not None:
+                self.entries[receiver_type] = handler
+                if self.receiver_type is None:
+                    self.receiver_type = receiver_type
+                    self.handler = handler
+                return handler(obj, *arguments)
+        return interpreter._invoke_method(obj, self.node.method, arguments)
+
+    def is_megamorphic(self):
+        return len(self.entries) >= INLINE_CACHE_SIZE and self.misses > len(self.entries)
+
+
 class Interpreter:
     """Interpretador para NajaScript"""
     def __init__(self, debug=False):
@@ -745,6 +992,18 @@ class Interpreter:
         self.for_loops = []
         self.loop_depth = 0
         self.jit_compiler = None
+        self.tiered_jit = None  # TieredJIT que decide quando usar o jit_compiler
+        self.loop_profiles = {}  # {laço: FunctionProfile} cujas iterações contam como back-edges
+        self.closure_compiler = None
+        self.vm = None  # BytecodeInterpreter opcional (modo --vm)
+        self.return_value = None  # Valor do último return, até a chamada consumi-lo
+        self.method_caches = weakref.WeakSet()  # Caches inline de MethodCall ainda vivos, para inline_cache_report()
+        self.parse_cache = None  # ParseCache opcional para arquivos e módulos
+        self.parsed_files = None  # (caminho, AST) dos arquivos parseados, só após keep_parsed_files()
+        self.instrumentation = None  # TraceStats/MemoryReport que embrulha execute/evaluate
+        self.memory_report = None  # MemoryReport ativo (--mem-report), usado por memory()
+        self.resolver = Resolver()
+        self._build_dispatch_tables()
         self._setup_builtins()
         self._register_native_functions()
         self.type_registry = {}  # Registro de classes para o sistema de tipos
@@ -752,82 +1011,91 @@ class Interpreter:
         self.logger = None
     
     def preprocess_source(self, source):
-        """Pré-processa o código fonte, traduzindo comandos em português para NajaScript"""
-        # Dicionário de tradução português -> NajaScript
-        traducoes = {
-            # Palavras-chave
-            r'\bfuncao\b': 'fun',
-            r'\bse\b': 'if',
-            r'\bsenao se\b': 'elif',
-            r'\bsenao\b': 'else',
-            r'\benquanto\b': 'while',
-            r'\bpara\b': 'for',
-            r'\bparacada\b': 'forin',
-            r'\bretornar\b': 'return',
-            r'\bverdadeiro\b': 'true',
-            r'\bfalso\b': 'false',
-            r'\bem\b': 'in',
-            r'\bnulo\b': 'null',
-            r'\bcontinuar\b': 'continue',
-            r'\bparar\b': 'break',
-            r'\bimportar\b': 'import',
-            
-            # Tipos
-            r'\binteiro\b': 'int',
-            r'\bdecimal\b': 'float',
-            r'\btexto\b': 'string',
-            r'\bbooleano\b': 'bool',
-            r'\blista\b': 'list',
-            r'\bdicionario\b': 'dict',
-            r'\bqualquer\b': 'any',
-            
-            # Funções
-            r'\bescrever\b': 'print',
-            r'\bescreverln\b': 'println',
-            r'\bcomprimento\b': 'length',
-            r'\bconverter_para_texto\b': 'toString',
-            r'\bconverter_para_inteiro\b': 'toInt',
-            r'\bconverter_para_decimal\b': 'toFloat',
-            
-            # Métodos
-            r'\badicionar\b': 'add',
-            r'\bremover\b': 'remove',
-            r'\bobter\b': 'get',
-            r'\badicionarUltimo\b': 'add',
-            r'\bremoverUltimo\b': 'removeLast',
-            r'\bsubstituir\b': 'replace'
-        }
-        
-        # Aplica as traduções
-        import re
-        resultado = source
-        
-        # Primeiro, aplicar substituições específicas que podem conflitar
-        # Por exemplo, "senao se" deve ser substituído antes de "senao"
-        expressoes_especificas = [
-            (r'\bsenao se\b', 'elif'),
-            (r'\badicionarUltimo\b', 'add'),
-            (r'\bremoverUltimo\b', 'removeLast'),
-            (r'\bconverter_para_texto\b', 'toString'),
-            (r'\bconverter_para_inteiro\b', 'toInt'),
-            (r'\bconverter_para_decimal\b', 'toFloat')
-        ]
-        
-        for padrao, substituto in expressoes_especificas:
-            resultado = re.sub(padrao, substituto, resultado)
-            # Remover esses padrões do dicionário principal
-            if padrao in traducoes:
-                del traducoes[padrao]
-        
-        # Depois, aplicar o restante das substituições
-        for padrao, substituto in traducoes.items():
-            resultado = re.sub(padrao, substituto, resultado)
-        
-        return resultado
-        
-    def set_jit_compiler(self, jit_compiler):
-        """Define o compilador JIT para uso"""
+        """Pré-processa o código fonte, traduzindo comandos em português para NajaScript
+
+        Uma única passada de _PT_PATTERN: strings e comentários casam primeiro
+        e são mantidos, e cada palavra em português é trocada pela sua
+        tradução em _PT_TRANSLATIONS.
+        """
+        return _PT_PATTERN.sub(_translate_pt_match, source)
+        
+    def set_jit_compiler(self, jit_compiler, threshold=DEFAULT_THRESHOLD, background=True, batch=False):
+        """Define o compilador JIT, usado para as funções que passarem de 'threshold'
+        
+        O limite conta chamadas mais iterações de laços da função; a compilação
+        roda em uma thread de fundo (ou na própria chamada, com background=False).
+        Com batch=True, cada programa ou módulo tem as funções aceitas pelo
+        compilador compiladas juntas antes de executar (ver tiered_jit.py).
+        """
         self.jit_compiler = jit_compiler
+        self.tiered_jit = TieredJIT(self, jit_compiler, threshold, background, batch)
+    
+    def jit_report(self):
+        """Linhas com a camada, os contadores e os tempos de compilação de cada função"""
+        if self.tiered_jit is None:
+            return []
+        return self.tiered_jit.report()
+    
+    def set_parse_cache(self, parse_cache):
+        """Define o cache de ASTs usado por parse_file() e ao carregar módulos"""
+        self.parse_cache = parse_cache
+    
+    def parse_file(self, path, source):
+        """Pré-processa e parseia o código de um arquivo, usando o cache de ASTs se houver"""
+        if self.parse_cache is not None:
+            ast = self.parse_cache.parse(path, source, self.preprocess_source)
+        else:
+            ast = Parser(Lexer(self.preprocess_source(source))).parse()
+        if self.parsed_files is not None:
+            self.parsed_files.append((path, ast))
+        return ast
+    
+    def keep_parsed_files(self):
+        """Passa a guardar em parsed_files a AST de cada arquivo parseado daqui em diante
+
+        Usado pelas ferramentas de medição (--profile, --trace-stats,
+        --mem-report) para nomear funções e medir as ASTs; sem elas, as ASTs
+        não ficam retidas pelo interpretador depois de executadas.
+        """
+        if self.parsed_files is None:
+            self.parsed_files = []
+    
+    def set_closure_compiler(self, closure_compiler):
+        """Define o compilador de closures usado por interpret() no lugar do percurso da árvore"""
+        self.closure_compiler = closure_compiler
+    
+    def set_vm(self, vm):
+        """Define a máquina virtual de bytecode usada por interpret() e pelas funções declaradas"""
+        self.vm = vm
+    
+    def set_instrumentation(self, instrumentation):
+        """Instrumenta todos os handlers de execute/evaluate, ou remove a instrumentação com None
+        
+        'instrumentation' (TraceStats, MemoryReport) tem wrap(prefixo,
+        handler). Os handlers são embrulhados nas próprias tabelas de
+        despacho (e em _resolve_handler), então tipos de nó novos são
+        instrumentados sem mudança.
+        """
+        self.instrumentation = instrumentation
+        self._build_dispatch_tables()
+        if instrumentation is not None:
+            for prefix, handlers in (("execute", self._execute_handlers), ("evaluate", self._evaluate_handlers)):
+                for node_class, handler in handlers.items():
+                    handlers[node_class] = instrumentation.wrap(prefix, handler)
+    
+    def completion_value(self, signal):
+        """Consome o sinal que encerrou o corpo de uma função e retorna o valor do return"""
+        if signal is RETURN_SIGNAL:
+            value = self.return_value
+            self.return_value = None
+            return value
+        raise Exception(f"'{signal.kind}' fora de um laço")
+    
+    def make_function(self, declaration, environment):
+        """Cria a função de uma declaração; no modo --vm o corpo executa na máquina virtual"""
+        if self.vm is not None:
+            return self.vm.make_function(declaration, environment)
+        return Function(declaration, environment)
     
     def _setup_builtins(self):
         """Configura as funções nativas da linguagem"""
@@ -975,6 +1243,13 @@ class Interpreter:
             return NajaDict(args)
         self.environment.define("dict", dict_func)
         
+        # memory: bytes retidos pelos objetos do programa, por categoria (ver naja_memory.py)
+        def memory_func():
+            # Importado sob demanda: percorre o heap e só é usado quando chamado
+            from naja_memory import memory_summary
+            return memory_summary(self)
+        self.environment.define("memory", memory_func)
+        
         # Função para adicionar um listener onChange
         def on_change_func(var_name, callback):
             if not isinstance(var_name, str):
@@ -2521,6 +2796,20 @@ class Interpreter:
             else:
                 statements = ast
             
+            # Resolve as variáveis locais em slots antes de executar
+            self.resolver.resolve(statements)
+            
+            # Compilação em lote das funções do módulo (em segundo plano)
+            if self.tiered_jit is not None:
+                self.tiered_jit.compile_module(statements)
+            
+            # Nos modos closures e vm, compila todas as statements antes de executar
+            compiled = None
+            if self.closure_compiler is not None:
+                compiled = self.closure_compiler.compile_statements(statements)
+            elif self.vm is not None:
+                compiled = self.vm.compile_statements(statements)
+            
             # Executa todas as statements
             for i, statement in enumerate(statements):
                 try:
@@ -2530,15 +2819,25 @@ class Interpreter:
                             self.logger.debug(f"\nDEBUG: Executando statement {i}: {statement_type}")
                         else:
                             print(f"\nDEBUG: Executando statement {i}: {statement_type}")
-                        if hasattr(statement, '__dict__'):
-                            for key, value in statement.__dict__.items():
+                        if isinstance(statement, Node):
+                            for key, value in iter_attributes(statement):
                                 if key == 'body' and hasattr(value, '__len__'):
                                     print(f"DEBUG: {key}: [bloco com {len(value)} statements]")
                                 else:
                                     print(f"DEBUG: {key}: {value}")
                 
                     # Executa a statement
-                    result = self.execute(statement)
+                    if compiled is not None:
+                        result = compiled[i]()
+                    else:
+                        result = self.execute(statement)
+                    
+                    # Sinal fora de função ou laço: return encerra a execução com o valor como erro
+                    if type(result) is Completion:
+                        signal, result = result, None
+                        if signal is RETURN_SIGNAL:
+                            raise ReturnException(self.return_value)
+                        raise Exception(f"'{signal.kind}' fora de um laço")
                     
                     if self.debug:
                         if self.logger:
@@ -2584,23 +2883,57 @@ class Interpreter:
         
         return result
     
+    def _build_dispatch_tables(self):
+        """Constrói as tabelas de despacho {classe do nó: método ligado} usadas por execute/evaluate"""
+        self._execute_handlers = {}
+        self._evaluate_handlers = {}
+        
+        for node_class in vars(ast_nodes).values():
+            if not isinstance(node_class, type) or not issubclass(node_class, Node):
+                continue
+            
+            handler = getattr(self, f"execute_{node_class.__name__}", None)
+            if handler is not None:
+                self._execute_handlers[node_class] = handler
+            
+            handler = getattr(self, f"evaluate_{node_class.__name__}", None)
+            if handler is not None:
+                self._evaluate_handlers[node_class] = handler
+    
+    def _resolve_handler(self, prefix, handlers, node_class):
+        """Caminho de fallback: procura o método pelo nome para um tipo de nó fora da tabela"""
+        handler = getattr(self, f"{prefix}_{node_class.__name__}", None)
+        if handler is not None:
+            if self.instrumentation is not None:
+                handler = self.instrumentation.wrap(prefix, handler)
+            # Memoriza para que as próximas chamadas usem o caminho rápido
+            handlers[node_class] = handler
+        return handler
+    
     def execute(self, stmt):
         """Execute uma instrução"""
-        method_name = f"execute_{type(stmt).__name__}"
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(stmt)
-        else:
-            raise Exception(f"Método não implementado: {method_name}")
+        handler = self._execute_handlers.get(type(stmt))
+        if handler is None:
+            handler = self._resolve_handler("execute", self._execute_handlers, type(stmt))
+            if handler is None:
+                raise Exception(f"Método não implementado: execute_{type(stmt).__name__}")
+        return handler(stmt)
     
     def execute_BlockStatement(self, stmt):
         """Executa um bloco de declarações"""
         result = None
         for statement in stmt.statements:
             result = self.execute(statement)
+            if type(result) is Completion:
+                return result
         return result
     
     def evaluate(self, expr):
         """Avalia uma expressão e retorna seu valor"""
+        handler = self._evaluate_handlers.get(type(expr))
+        if handler is not None:
+            return handler(expr)
+        
         if expr is None:
             return None
         
@@ -2610,10 +2943,10 @@ class Interpreter:
             return expr
             
         expr_type = expr.__class__.__name__
-        method_name = f"evaluate_{expr_type}"
+        handler = self._resolve_handler("evaluate", self._evaluate_handlers, type(expr))
         
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(expr)
+        if handler is not None:
+            return handler(expr)
         else:
             # Adicionando mensagem de erro mais clara para depuração
             if self.debug:
@@ -2621,7 +2954,7 @@ class Interpreter:
                     self.logger.error(f"Erro de depuração: Tipo de expressão '{expr_type}' não implementado.")
                     self.logger.error(f"Expressão: {expr}")
                     self.logger.error(f"Tipo Python: {type(expr)}")
-                    self.logger.error(f"Atributos: {dir(expr) if hasattr(expr, '__dict__') else 'N/A'}")
+                    self.logger.error(f"Atributos: {dict(iter_attributes(expr)) if isinstance(expr, Node) else 'N/A'}")
                     if isinstance(expr, str):
                         self.logger.error(f"Conteúdo da string: {expr}")
             
@@ -2629,33 +2962,60 @@ class Interpreter:
             raise Exception(f"Tipo de expressão não implementado: {expr_type}")
     
     def evaluate_Variable(self, expr):
-        """Avalia uma variável"""
+        """Avalia uma variável (também usado para ler o alvo de atribuições compostas)"""
+        slot = expr.slot
+        if slot is not None:
+            environment = self.environment
+            depth = expr.depth
+            while depth:
+                environment = environment.enclosing
+                depth -= 1
+            value = environment.slots[slot]
+            if value is not EMPTY_SLOT:
+                return value
         return self.environment.get(expr.name)
     
+    def _assign_variable(self, node, value):
+        """Atribui a uma variável usando o slot resolvido quando possível"""
+        slot = node.slot
+        if slot is not None:
+            environment = self.environment
+            depth = node.depth
+            while depth:
+                environment = environment.enclosing
+                depth -= 1
+            if environment.slots[slot] is not EMPTY_SLOT and not environment.change_listeners:
+                environment.slots[slot] = value
+                return value
+        return self.environment.assign(node.name, value)
+    
     def evaluate_GetAttr(self, expr):
         """Avalia uma expressão de acesso a atributo (obj.attr)"""
         obj = self.evaluate(expr.object)
-        
+        return self._get_attribute(obj, expr.name)
+    
+    def _get_attribute(self, obj, name):
+        """Obtém o atributo 'name' de um objeto já avaliado"""
         # Verifica se é um módulo
         if isinstance(obj, NajaModule):
-            return obj.get_method(expr.name)
+            return obj.get_method(name)
         
         # Se for uma instância de NajaObject (objetos de classe)
         elif isinstance(obj, NajaObject):
-            return obj._get_property(expr.name)
+            return obj._get_property(name)
         
         # Se for um NajaDict, tenta acessar como propriedade
         elif isinstance(obj, NajaDict):
-            return obj.get(expr.name)
+            return obj.get(name)
         
         # Suporte genérico para objetos Python com atributos
-        elif hasattr(obj, expr.name):
-            attr = getattr(obj, expr.name)
+        elif hasattr(obj, name):
+            attr = getattr(obj, name)
             return attr
         
         # Pode adicionar outros tipos de objetos que suportam acesso a atributos aqui
         
-        raise Exception(f"Objeto do tipo {type(obj).__name__} não possui o atributo '{expr.name}'")
+        raise Exception(f"Objeto do tipo {type(obj).__name__} não possui o atributo '{name}'")
     
     def evaluate_ModuleMethodCall(self, expr):
         """Avalia uma chamada de método de módulo (ModuleName.method())"""
@@ -2812,12 +3172,70 @@ class Interpreter:
         # Avalia o objeto
         obj = self.evaluate(expr.object)
         
-        # Extrai o nome do método
-        method_name = expr.method
+        # Cache inline da chamada: tipo do receptor -> método já resolvido
+        cache = expr.inline_cache
+        if cache is None:
+            cache = self._method_cache(expr)
+        args = expr.arguments
+        if type(obj) is cache.receiver_type and not self.debug:
+            cache.hits += 1
+            if not args:
+                return cache.handler(obj)
+            if len(args) == 1:
+                return cache.handler(obj, self.evaluate(args[0]))
+            return cache.handler(obj, *[self.evaluate(arg) for arg in args])
         
         # Avalia os argumentos
-        arguments = [self.evaluate(arg) for arg in expr.arguments]
-        
+        arguments = [self.evaluate(arg) for arg in args]
+        return cache.dispatch(self, obj, arguments)
+    
+    def _method_cache(self, expr):
+        """Cria e registra o cache inline de um MethodCall
+
+        O registro é fraco: o cache vive enquanto o nó (que o guarda em
+        inline_cache) existir, e ASTs descartadas não ficam presas ao
+        interpretador.
+        """
+        cache = expr.inline_cache = MethodCache(expr)
+        self.method_caches.add(cache)
+        return cache
+    
+    def _resolve_method(self, receiver_type, method_name, count):
+        """Resolve um método para um tipo de receptor, como a cascata de _invoke_method
+
+        Retorna um callable f(obj, *argumentos) válido para qualquer receptor
+        do tipo chamado com 'count' argumentos, ou None quando a resolução
+        depende da instância (módulos, objetos Python genéricos) ou o método
+        não existe. Lança a exceção de aridade dos métodos nativos.
+        """
+        if issubclass(receiver_type, NajaModule):
+            return None
+        if issubclass(receiver_type, NajaObject):
+            return _object_method(self, method_name)
+        if issubclass(receiver_type, NajaList):
+            return _native_method(receiver_type, _LIST_METHODS, method_name, count)
+        if issubclass(receiver_type, NajaDict):
+            return _native_method(receiver_type, _DICT_METHODS, method_name, count)
+        if issubclass(receiver_type, str):
+            return _native_method(receiver_type, _STRING_METHODS, method_name, count)
+        return None
+    
+    def inline_cache_report(self):
+        """Linhas com os contadores de acerto/falha de cada cache inline de MethodCall"""
+        lines = [f"{'local':>10} {'método':20} {'acertos':>9} {'falhas':>7} {'taxa':>6}  tipos"]
+        for cache in sorted(self.method_caches, key=lambda cache: -(cache.hits + cache.misses)):
+            node = cache.node
+            location = f"{node.line}:{node.column}" if node.line is not None else "?"
+            total = cache.hits + cache.misses
+            ratio = cache.hits / total * 100 if total else 0.0
+            types = ", ".join(receiver.__name__ for receiver in cache.entries) or "-"
+            if cache.is_megamorphic():
+                types += " (megamórfico)"
+            lines.append(f"{location:>10} {str(node.method):20} {cache.hits:9d} {cache.misses:7d} {ratio:5.1f}%  {types}")
+        return lines
+    
+    def _invoke_method(self, obj, method_name, arguments):
+        """Chama o método 'method_name' em um objeto já avaliado com argumentos já avaliados"""
         # Log de depuração
         if self.debug:
             if self.logger:
@@ -2841,75 +3259,20 @@ class Interpreter:
             else:
                 raise Exception(f"'{method_name}' no módulo '{obj.name}' não é uma função chamável")
         
-        # Verifica se é um objeto de uma classe definida pelo usuário
-        elif isinstance(obj, NajaObject):
-            try:
-                # Chama o método no objeto
-                return obj._call_method(method_name, self, arguments)
-            except Exception as e:
-                raise Exception(f"Erro ao chamar método '{method_name}' no objeto {obj._class_name}: {e}")
-        
-        # Verifica se o objeto tem o método solicitado
-        elif isinstance(obj, NajaList):
-            if method_name == "length":
-                return obj.length()
-            elif method_name == "get":
-                if len(arguments) != 1:
-                    raise Exception(f"Método get() espera 1 argumento, recebeu {len(arguments)}")
-                return obj.get(arguments[0])
-            elif method_name == "add":
-                if len(arguments) != 1:
-                    raise Exception(f"Método add() espera 1 argumento, recebeu {len(arguments)}")
-                return obj.add(arguments[0])
-            elif method_name == "remove":
-                if len(arguments) != 1:
-                    raise Exception(f"Método remove() espera 1 argumento, recebeu {len(arguments)}")
-                return obj.remove(arguments[0])
-            elif method_name == "removeLast":
-                if len(arguments) != 0:
-                    raise Exception(f"Método removeLast() não espera argumentos, recebeu {len(arguments)}")
-                return obj.removeLast()
-            else:
-                raise Exception(f"Listas não possuem o método '{method_name}'")
+        # Listas, dicionários, strings e objetos de classes do usuário
+        handler = self._resolve_method(type(obj), method_name, len(arguments))
+        if handler is not None:
+            return handler(obj, *arguments)
+        
+        if isinstance(obj, NajaList):
+            raise Exception(f"Listas não possuem o método '{method_name}'")
         elif isinstance(obj, NajaDict):
-            if method_name == "length":
-                return obj.length()
-            elif method_name == "get":
-                if len(arguments) != 1:
-                    raise Exception(f"Método get() espera 1 argumento, recebeu {len(arguments)}")
-                return obj.get(arguments[0])
-            elif method_name == "add":
-                if len(arguments) not in [1, 2]:
-                    raise Exception(f"Método add() espera 1 ou 2 argumentos, recebeu {len(arguments)}")
-                if len(arguments) == 1:
-                    return obj.add(arguments[0])
-                else:
-                    return obj.add(arguments[0], arguments[1])
-            elif method_name == "remove":
-                if len(arguments) != 1:
-                    raise Exception(f"Método remove() espera 1 argumento, recebeu {len(arguments)}")
-                return obj.remove(arguments[0])
-            else:
-                raise Exception(f"Dicionários não possuem o método '{method_name}'")
+            raise Exception(f"Dicionários não possuem o método '{method_name}'")
         elif isinstance(obj, str):
-            if method_name == "length":
-                return len(obj)
-            elif method_name == "substring":
-                if len(arguments) not in [1, 2]:
-                    raise Exception(f"Método substring() espera 1 ou 2 argumentos, recebeu {len(arguments)}")
-                start = arguments[0]
-                if not isinstance(start, int):
-                    raise Exception(f"O índice inicial deve ser um número inteiro")
-                if len(arguments) == 1:
-                    return obj[start:]
-                end = arguments[1]
-                if not isinstance(end, int):
-                    raise Exception(f"O índice final deve ser um número inteiro")
-                return obj[start:end]
-            else:
-                raise Exception(f"Strings não possuem o método '{method_name}'")
+            raise Exception(f"Strings não possuem o método '{method_name}'")
+        
         # Suporte genérico para objetos Python com métodos
-        elif hasattr(obj, method_name):
+        if hasattr(obj, method_name):
             method = getattr(obj, method_name)
             if callable(method):
                 try:
@@ -2940,13 +3303,19 @@ class Interpreter:
         return True
     
     def execute_block(self, statements, environment):
-        """Executa um bloco de código em um ambiente específico"""
+        """Executa um bloco de código em um ambiente específico
+        
+        Retorna None ou o sinal (Completion) de um return/break/continue que
+        interrompeu o bloco.
+        """
         previous_env = self.environment
         self.environment = environment
         
         try:
             for statement in statements:
-                self.execute(statement)
+                result = self.execute(statement)
+                if type(result) is Completion:
+                    return result
         finally:
             self.environment = previous_env
         
@@ -3024,20 +3393,30 @@ class Interpreter:
         condition = self.evaluate(stmt.condition)
         
         if self.is_truthy(condition):
-            return self.execute_block(stmt.then_branch, Environment(self.environment))
+            return self.execute_block(stmt.then_branch, self._block_environment(stmt.then_scope))
         elif stmt.elif_branches:
-            for elif_branch in stmt.elif_branches:
+            for i, elif_branch in enumerate(stmt.elif_branches):
                 elif_condition, elif_body = elif_branch
                 if self.is_truthy(self.evaluate(elif_condition)):
-                    return self.execute_block(elif_body, Environment(self.environment))
+                    scope = stmt.elif_scopes[i] if i < len(stmt.elif_scopes) else None
+                    return self.execute_block(elif_body, self._block_environment(scope))
             
             if stmt.else_branch:
-                return self.execute_block(stmt.else_branch, Environment(self.environment))
+                return self.execute_block(stmt.else_branch, self._block_environment(stmt.else_scope))
         elif stmt.else_branch:
-            return self.execute_block(stmt.else_branch, Environment(self.environment))
+            return self.execute_block(stmt.else_branch, self._block_environment(stmt.else_scope))
         
         return None 
     
+    def _block_environment(self, scope):
+        """Cria o ambiente de um bloco, com slots se o resolver calculou seu escopo"""
+        if scope is None:
+            return Environment(self.environment)
+        if not scope:
+            # Bloco sem declarações: reutiliza o ambiente atual
+            return self.environment
+        return SlotEnvironment(self.environment, scope)
+    
     def execute_ImportStatement(self, stmt):
         """Executa uma declaração de importação de módulo"""
         module_name = stmt.module_name.strip('"').strip("'")
@@ -3119,10 +3498,7 @@ class Interpreter:
             
             try:
                 # Processa e executa o módulo
-                module_source = self.preprocess_source(module_source)
-                lexer = Lexer(module_source)
-                parser = Parser(lexer)
-                ast = parser.parse()
+                ast = self.parse_file(module_path, module_source)
                 self.interpret(ast)
                 
                 # Cria o objeto módulo
@@ -3232,14 +3608,17 @@ class Interpreter:
     
     def execute_WhileStatement(self, stmt):
         """Executa uma instrução while"""
+        profile = self.loop_profiles.get(stmt)
         while self.is_truthy(self.evaluate(stmt.condition)):
-            try:
-                # Executa o corpo do loop em um novo ambiente
-                self.execute_block(stmt.body, self.environment)
-            except BreakException:
-                break
-            except ContinueException:
-                continue
+            if profile is not None:
+                profile.back_edges += 1
+            # Executa o corpo do loop no ambiente atual
+            signal = self.execute_block(stmt.body, self.environment)
+            if signal is not None:
+                if signal is BREAK_SIGNAL:
+                    break
+                if signal is RETURN_SIGNAL:
+                    return signal
         return None
     
     def execute_Assignment(self, stmt):
@@ -3258,7 +3637,7 @@ class Interpreter:
                 raise Exception(f"Não é possível atribuir à propriedade '{stmt.name.name}' em um não-objeto")
         else:
             # Atribuição normal a uma variável
-            self.environment.assign(stmt.name, value)
+            self._assign_variable(stmt, value)
             
         return value
     
@@ -3293,14 +3672,14 @@ class Interpreter:
                 raise Exception(f"Não é possível atribuir à propriedade '{expr.name.name}' em um não-objeto")
         else:
             # Atribuição normal a uma variável
-            self.environment.assign(expr.name, value)
+            self._assign_variable(expr, value)
             
         return value
 
     def execute_ForStatement(self, stmt):
         """Executa uma instrução for"""
         # Cria um novo ambiente para o loop
-        loop_env = Environment(self.environment)
+        loop_env = self._block_environment(stmt.scope)
         
         # Execute a inicialização (primeira parte do for)
         prev_env = self.environment
@@ -3316,32 +3695,35 @@ class Interpreter:
                 self.evaluate(stmt.init)
                 
             # Loop principal
+            profile = self.loop_profiles.get(stmt)
             while True:
                 # Verifica a condição
                 if not self.is_truthy(self.evaluate(stmt.condition)):
                     break
+                if profile is not None:
+                    profile.back_edges += 1
                 
-                try:
-                    # Executa o corpo do loop
-                    self.execute_block(stmt.body, loop_env)
-                    
-                    # Executa a expressão de atualização (terceira parte do for)
-                    self.evaluate(stmt.update)
-                    
-                except BreakException:
-                    break
-                except ContinueException:
-                    # Continua com a próxima iteração, ainda executando a atualização
-                    self.evaluate(stmt.update)
-                    continue
+                # Executa o corpo do loop
+                signal = self.execute_block(stmt.body, loop_env)
+                if signal is not None:
+                    if signal is BREAK_SIGNAL:
+                        break
+                    if signal is RETURN_SIGNAL:
+                        return signal
+                    # continue: segue para a atualização
+                
+                # Executa a expressão de atualização (terceira parte do for)
+                self.evaluate(stmt.update)
         finally:
             # Restaura o ambiente original
             self.environment = prev_env
 
     def execute_FunctionDeclaration(self, stmt):
         """Executa uma declaração de função"""
-        function = Function(stmt, self.environment)
-        
+        return self._declare_function(stmt, self.make_function(stmt, self.environment))
+    
+    def _declare_function(self, stmt, function):
+        """Define no ambiente atual a função criada para uma declaração"""
         # Armazenar a informação de exportação
         if hasattr(stmt, 'exported') and stmt.exported:
             function.declaration.exported = True
@@ -3361,11 +3743,20 @@ class Interpreter:
         return function
 
     def execute_ReturnStatement(self, stmt):
-        """Executa uma declaração de retorno"""
+        """Executa uma declaração de retorno: guarda o valor e sinaliza o fim da função"""
         value = None
         if stmt.value:
             value = self.evaluate(stmt.value)
-        raise ReturnException(value)
+        self.return_value = value
+        return RETURN_SIGNAL
+    
+    def execute_BreakStatement(self, stmt):
+        """Executa um break: sinaliza o fim do laço mais interno"""
+        return BREAK_SIGNAL
+    
+    def execute_ContinueStatement(self, stmt):
+        """Executa um continue: sinaliza o fim da iteração atual"""
+        return CONTINUE_SIGNAL
 
     def execute_FluxDeclaration(self, stmt):
         """Executa uma declaração flux"""
@@ -3481,7 +3872,7 @@ class Interpreter:
                 raise Exception(f"Método '{expr.method}' não encontrado na classe base '{base_class_name}'")
             
             # Criar um Function com o método da classe base
-            function = Function(method, self.environment)
+            function = self.make_function(method, self.environment)
             
             # Avaliar os argumentos
             arguments = [self.evaluate(arg) for arg in expr.arguments]
@@ -3506,7 +3897,7 @@ class Interpreter:
                 
                 try:
                     self.environment = constructor_env
-                    self.execute_block(method.body, constructor_env)
+                    function._execute_body(self, constructor_env)
                     return None
                 finally:
                     self.environment = prev_env
@@ -3553,7 +3944,7 @@ class Interpreter:
                     method_overridden = any(m.name == method.name for m in class_def.methods)
                     
                     if not method_overridden:
-                        method_func = Function(method, self.environment)
+                        method_func = self.make_function(method, self.environment)
                         obj._define_method(method.name, method_func, method.access_modifier)
         
         # Define propriedades do objeto com valores padrão
@@ -3563,7 +3954,7 @@ class Interpreter:
         # Define métodos do objeto
         for method in class_def.methods:
             if method.name != "constructor":  # Construtores são tratados separadamente
-                method_func = Function(method, self.environment)
+                method_func = self.make_function(method, self.environment)
                 obj._define_method(method.name, method_func, method.access_modifier)
         
         # Procura e executa o construtor
@@ -3579,7 +3970,7 @@ class Interpreter:
             arguments = [self.evaluate(arg) for arg in expr.arguments]
             
             # Cria e configura a função construtora
-            constructor_func = Function(constructor, self.environment)
+            constructor_func = self.make_function(constructor, self.environment)
             
             # Configura o ambiente com 'this'
             prev_env = self.environment
@@ -3605,7 +3996,7 @@ class Interpreter:
                 self.environment = constructor_env
                 
                 # Chama o construtor executando seu corpo
-                self.execute_block(constructor.body, constructor_env)
+                constructor_func._execute_body(self, constructor_env)
             finally:
                 # Restaura o ambiente
                 self.environment = prev_env
@@ -3634,7 +4025,7 @@ class Interpreter:
     def execute_CompoundAssignment(self, stmt):
         """Executa uma atribuição composta (+=, -=, etc.)"""
         # Obtém o valor atual da variável
-        current_value = self.environment.get(stmt.name)
+        current_value = self.evaluate_Variable(stmt)
         
         # Obtém o valor a ser combinado
         new_value = self.evaluate(stmt.value)
@@ -3658,14 +4049,14 @@ class Interpreter:
             raise Exception(f"Operador de atribuição composta não suportado: {stmt.operator}")
         
         # Atribui o novo valor
-        self.environment.assign(stmt.name, result)
+        self._assign_variable(stmt, result)
         
         return result
 
     def evaluate_CompoundAssignment(self, expr):
         """Avalia uma atribuição composta como expressão"""
         # Obtém o valor atual da variável
-        current_value = self.environment.get(expr.name)
+        current_value = self.evaluate_Variable(expr)
         
         # Obtém o valor a ser combinado
         new_value = self.evaluate(expr.value)
@@ -3689,7 +4080,7 @@ class Interpreter:
             raise Exception(f"Operador de atribuição composta não suportado: {expr.operator}")
         
         # Atribui o novo valor
-        self.environment.assign(expr.name, result)
+        self._assign_variable(expr, result)
         
         return result
 
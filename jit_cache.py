@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache persistente das funções compiladas pelo JITCompiler (Numba)
+
+O código Python gerado para cada especialização é gravado em um diretório
+compartilhado entre execuções (por padrão ~/.cache/najascript/numba, ou
+$NAJA_JIT_CACHE_DIR), em um subdiretório por entrada, e importado de lá
+como um módulo com njit(cache=True): a Numba guarda o código de máquina
+no __pycache__ ao lado do arquivo e, na execução seguinte, o carrega em
+vez de compilar de novo.
+
+A chave de cada entrada é um hash da AST normalizada da função (a mesma
+do cache do JIT em C), da assinatura da especialização, das versões do
+Python e da Numba e de uma impressão digital do gerador de código.
+
+O arquivo de uma entrada é escrito uma única vez (em um diretório
+temporário publicado com os.replace), então a data e o tamanho, que a
+Numba usa para invalidar o próprio cache, nunca mudam. O tamanho total é
+limitado: ao passar de max_bytes, as entradas usadas há mais tempo (pela
+data de modificação do diretório, renovada a cada acerto) são removidas
+com o código de máquina. Falhas ao ler ou gravar o cache nunca
+interrompem a compilação.
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+
+import numba
+
+from c_jit_cache import DEFAULT_MAX_BYTES, normalized_ast
+
+# Arquivo do módulo gerado dentro do diretório de cada entrada
+SOURCE_NAME = "naja_jit.py"
+
+# Idade a partir da qual um diretório temporário é considerado abandonado
+_STALE_TEMP_SECONDS = 3600
+
+# Versão do formato das entradas (incrementar ao mudar a chave ou o módulo gerado)
+_FORMAT = b"NAJANUMBA2"
+
+# Módulos cujo código determina o Python gerado
+_CODEGEN_MODULES = ("jit_compiler.py", "jit_cache.py", "jit_types.py", "ast_nodes.py")
+
+_codegen_fingerprint = None
+
+
+def default_cache_dir():
+    """Diretório padrão do cache ($NAJA_JIT_CACHE_DIR ou ~/.cache/najascript/numba)"""
+    directory = os.environ.get("NAJA_JIT_CACHE_DIR")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "najascript", "numba")
+
+
+def codegen_fingerprint():
+    """Impressão digital do gerador de código Python"""
+    global _codegen_fingerprint
+    if _codegen_fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(_FORMAT)
+        digest.update(sys.version.encode())
+        digest.update(numba.__version__.encode())
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in _CODEGEN_MODULES:
+            try:
+                with open(os.path.join(base_dir, name), "rb") as file:
+                    digest.update(file.read())
+            except OSError:
+                digest.update(name.encode())
+        _codegen_fingerprint = digest.hexdigest()
+    return _codegen_fingerprint
+
+
+def function_key(ast_function, signature):
+    """Chave de uma especialização: AST normalizada, assinatura e versões"""
+    digest = hashlib.sha256()
+    digest.update(codegen_fingerprint().encode())
+    digest.update(",".join(param_type.__name__ for param_type in signature).encode())
+    digest.update(normalized_ast(ast_function).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class NumbaJITCache:
+    """Cache de módulos gerados (e do código de máquina da Numba) com despejo LRU"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        # Estatísticas da execução atual (código de máquina carregado ou compilado)
+        self.hits = 0
+        self.misses = 0
+
+    def entry_dir(self, key):
+        """Diretório de uma entrada"""
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """Caminho do módulo em cache para a chave, ou None
+
+        Um acerto renova a data de modificação do diretório da entrada, que
+        é a ordem usada no despejo (o arquivo em si nunca é tocado).
+        """
+        path = os.path.join(self.entry_dir(key), SOURCE_NAME)
+        if not os.path.isfile(path):
+            return None
+        try:
+            os.utime(self.entry_dir(key))
+        except OSError:
+            pass
+        return path
+
+    def store(self, key, source):
+        """Grava o módulo gerado de forma atômica e retorna o caminho dele, ou None
+
+        Se outro processo publicou a mesma entrada antes, usa a dele.
+        """
+        temp_dir = os.path.join(self.cache_dir, f"{key}.{os.getpid()}.tmp")
+        try:
+            os.makedirs(temp_dir, exist_ok=True)
+            with open(os.path.join(temp_dir, SOURCE_NAME), "w", encoding="utf-8") as file:
+                file.write(source)
+            os.replace(temp_dir, self.entry_dir(key))
+        except OSError:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return self.lookup(key)
+        self.evict()
+        return os.path.join(self.entry_dir(key), SOURCE_NAME)
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até o cache caber em max_bytes
+
+        Diretórios temporários abandonados também são removidos.
+        """
+        entries = []
+        total = 0
+        now = time.time()
+        try:
+            with os.scandir(self.cache_dir) as scanner:
+                for entry in scanner:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if entry.name.endswith(".tmp"):
+                        if now - mtime > _STALE_TEMP_SECONDS:
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                        continue
+                    if not os.path.isfile(os.path.join(entry.path, SOURCE_NAME)):
+                        continue
+                    size = _tree_size(entry.path)
+                    entries.append((mtime, size, entry.path))
+                    total += size
+        except OSError:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            # Processos que já carregaram o código de máquina continuam com ele na memória
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isfile(os.path.join(path, SOURCE_NAME)) or name.endswith(".tmp"):
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _tree_size(path):
+    """Tamanho total dos arquivos de um diretório (módulo e __pycache__ da Numba)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
@@ -3,214 +3,352 @@
 
 import ast as py_ast
 import inspect
+import sys
+import importlib.util
 from numba import jit, njit
 import numpy as np
 from ast_nodes import *
+from interpreter import NajaList
+from jit_types import (ARITHMETIC_OPERATORS, COMPOUND_OPERATORS, FLOAT_ONLY, INT64_MIN, INT64_MAX,
+                       specialize_function)
+from jit_cache import NumbaJITCache, function_key
+
+# Tipos Numba de cada tipo Python de uma especialização. Uma NajaList de
+# float vira um array NumPy float64 contíguo.
+_NUMBA_TYPES = {
+    int: "int64",
+    float: "float64",
+    NajaList: "float64[::1]",
+}
+
+# Inteiros até 2^53 viram float64 sem arredondamento
+_EXACT_INT = 2 ** 53
+
+# Funções auxiliares para os operadores inteiros (a Numba faz aritmética
+# de 64 bits com wraparound, o NajaScript usa os int do Python)
+_CHECKED_OPERATIONS = {"+": "naja_add", "-": "naja_sub", "*": "naja_mul"}
+
+
+# Funções auxiliares chamadas pelo código gerado. Operações que a Numba não
+# executa como o Python lançam a exceção correspondente, e a chamada é
+# refeita pelo interpretador (que produz o valor exato ou o erro do NajaScript).
+
+@njit
+def naja_add(a, b):
+    r = a + b
+    if (a ^ r) & (b ^ r) < 0:
+        raise OverflowError("Overflow de inteiro de 64 bits")
+    return r
+
+
+@njit
+def naja_sub(a, b):
+    r = a - b
+    if (a ^ b) & (a ^ r) < 0:
+        raise OverflowError("Overflow de inteiro de 64 bits")
+    return r
+
+
+@njit
+def naja_mul(a, b):
+    # O limite é verificado antes de multiplicar: a Numba emite a
+    # multiplicação com 'nsw' e o LLVM removeria um teste feito depois
+    if a == 0 or b == 0:
+        return 0
+    if a > 0:
+        if b > 0:
+            overflow = a > INT64_MAX // b
+        else:
+            overflow = b < _ceil_div(INT64_MIN, a)
+    elif b > 0:
+        overflow = a < _ceil_div(INT64_MIN, b)
+    else:
+        # Ambos negativos: -INT64_MIN não cabe, e INT64_MIN * -1 estoura
+        overflow = a == INT64_MIN or b == INT64_MIN or -a > INT64_MAX // -b
+    if overflow:
+        raise OverflowError("Overflow de inteiro de 64 bits")
+    return a * b
+
+
+@njit
+def _ceil_div(a, b):
+    """Divisão arredondada para cima com b > 0, sem multiplicações que possam estourar"""
+    q = a // b
+    if a % b != 0:
+        q += 1
+    return q
+
+
+@njit
+def naja_neg(a):
+    if a == INT64_MIN:
+        raise OverflowError("Overflow de inteiro de 64 bits")
+    return -a
+
+
+@njit
+def naja_div_int(a, b):
+    if b == 0:
+        raise ZeroDivisionError("Divisão por zero")
+    if a > _EXACT_INT or a < -_EXACT_INT or b > _EXACT_INT or b < -_EXACT_INT:
+        raise OverflowError("Divisão de inteiros sem representação exata em float64")
+    return a / b
+
+
+@njit
+def naja_mod(a, b):
+    if b == 0:
+        raise ZeroDivisionError("Divisão por zero")
+    if b == -1:
+        return 0
+    return a % b
+
+
+@njit
+def naja_get(v, i):
+    if i < 0 or i >= len(v):
+        raise IndexError("Índice fora dos limites da lista")
+    return v[i]
+
+
+# Módulo gravado no cache em disco: importado de um arquivo, njit(cache=True)
+# guarda o código de máquina ao lado dele
+_MODULE_TEMPLATE = """# Gerado pelo JITCompiler do NajaScript: {name}({signature})
+from numba import njit
+from jit_compiler import {runtime}
+
+{code}
+{function} = njit(cache=True)({function})
+"""
+
+# Nomes visíveis para o código gerado (cada função é executada em uma cópia)
+_RUNTIME = {
+    "naja_add": naja_add,
+    "naja_sub": naja_sub,
+    "naja_mul": naja_mul,
+    "naja_neg": naja_neg,
+    "naja_div_int": naja_div_int,
+    "naja_mod": naja_mod,
+    "naja_get": naja_get,
+}
+
 
 class JITCompiler:
     """
     Compilador JIT para NajaScript usando Numba
     """
-    def __init__(self):
-        self.compiled_functions = {}
+    def __init__(self, verbose=True, cache_dir=None, use_cache=True):
+        self.compiled_functions = {}  # Especializações já carregadas nesta execução, pela chave
         self.cached_code = {}
-        
-    def compile_function(self, ast_function, environment):
+        self.verbose = verbose  # Mensagens de progresso (desligadas na compilação em camadas)
+        # Código gerado e compilado em execuções anteriores (ver jit_cache.py)
+        self.cache = NumbaJITCache(cache_dir) if use_cache else None
+    
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+    
+    def compile_function(self, ast_function, environment, signature=None):
         """
         Compila uma função AST para código Python otimizado com JIT
+        
+        Cada assinatura (os tipos Python dos argumentos; por padrão os
+        declarados) gera o seu código Python, já com os tipos inferidos, e é
+        compilada na hora pela Numba só para os tipos correspondentes.
         """
         # Obtém o nome da função
         function_name = ast_function.name
         
-        print(f"JIT: Tentando compilar função: {function_name}")
+        self._log(f"JIT: Tentando compilar função: {function_name}")
+        
+        typed = specialize_function(ast_function, signature)
+        if typed is None or not _consistent_locals(typed):
+            self._log(f"JIT: Função {function_name} não pode ser compilada com essa assinatura")
+            return None
+        # A chave depende da AST, não do nome: funções homônimas de módulos diferentes não colidem
+        key = function_key(ast_function, typed.signature)
         
         # Verifica se já está no cache
-        if function_name in self.compiled_functions:
-            print(f"JIT: Função {function_name} já está compilada, usando versão em cache")
-            return self.compiled_functions[function_name]
+        if key in self.compiled_functions:
+            self._log(f"JIT: Função {function_name} já está compilada, usando versão em cache")
+            return self.compiled_functions[key]
         
         # Converte a AST do NajaScript para código Python
-        py_code = self._convert_to_python(ast_function)
+        py_code = self._convert_to_python(typed)
         
         try:
             # Compila o código Python
-            print(f"JIT: Compilando função {function_name} com Numba")
-            compiled_func = self._compile_with_numba(py_code, function_name)
+            self._log(f"JIT: Compilando função {function_name} com Numba")
+            compiled_func = self._bind(self._compile_with_numba(py_code, typed, key), typed)
             
             # Armazena no cache
-            self.compiled_functions[function_name] = compiled_func
-            print(f"JIT: Função {function_name} compilada com sucesso")
+            self.compiled_functions[key] = compiled_func
+            self._log(f"JIT: Função {function_name} compilada com sucesso")
             
             return compiled_func
         except Exception as e:
-            print(f"JIT: Erro ao compilar função {function_name}: {str(e)}")
+            self._log(f"JIT: Erro ao compilar função {function_name}: {str(e)}")
             return None
     
-    def _convert_to_python(self, ast_function):
+    def _convert_to_python(self, typed):
         """
         Converte uma função AST NajaScript para código Python
         """
+        ast_function = typed.function
+        
         # Extrai parâmetros
-        params = []
-        
-        for param in ast_function.parameters:
-            if isinstance(param, tuple) and len(param) == 2:
-                # Formato (tipo, nome)
-                param_name = param[1]
-                params.append(param_name)
-            elif hasattr(param, 'name'):
-                # Objeto com atributo name
-                param_name = param.name
-                params.append(param_name)
-            else:
-                raise ValueError(f"Formato de parâmetro não suportado: {param}")
+        params = [_python_name(param[1]) for param in ast_function.parameters]
         
         # Inicializa o gerador de código Python
-        code_generator = PythonCodeGenerator()
-        
-        # Gera o código da função
-        if isinstance(ast_function.body, list):
-            # Se o corpo da função for uma lista de declarações, use _generate_block
-            function_body = code_generator._generate_block(ast_function.body)
-        else:
-            # Caso contrário, use o método generate padrão
-            function_body = code_generator.generate(ast_function.body)
-        
-        # Se o corpo da função estiver vazio, adicione um pass
-        if not function_body.strip():
-            function_body = "    pass"
-        
-        # Certifique-se de que o corpo da função está indentado corretamente
-        # Divida o corpo em linhas e adicione a indentação adequada
-        indented_body = []
-        for line in function_body.split('\n'):
-            if line.strip():  # Se a linha não está vazia
-                # Certifique-se de que a linha começa com pelo menos 4 espaços
-                if not line.startswith('    '):
-                    line = '    ' + line
-                indented_body.append(line)
-            else:
-                indented_body.append(line)  # Mantém linhas vazias
+        code_generator = PythonCodeGenerator(typed.types.get)
         
-        # Juntar as linhas novamente
-        processed_body = '\n'.join(indented_body)
+        # O corpo é uma lista de declarações
+        function_body = code_generator._generate_block(ast_function.body)
         
         # Cria o código da função Python com indentação correta
-        py_code = f"""def {ast_function.name}({', '.join(params)}):
-{processed_body}
+        py_code = f"""def {_python_name(ast_function.name)}({', '.join(params)}):
+{function_body}
 """
         
         # Armazena o código fonte para uso posterior
         self.cached_code[ast_function.name] = py_code
-        # Gera o código Python
-        py_code = self._generate_python_code(ast_function, environment)
-        
-        # Compila o código Python
-        try:
-            # Comentado para remover debug
-            # print(f"Código Python gerado:\n{py_code}")  # Debugging
-            
-            # Compila o código Python para uma função
-            compiled_code = compile(py_code, f"<{ast_function.name}>", "exec")
-            
-            # Cria o namespace para a função
-            namespace = {}
-            
-            # Executa o código compilado no namespace criado
-            exec(compiled_code, namespace)
-            
-            # Retorna a função compilada
-            return namespace[ast_function.name]
-        except Exception as e:
-            print(f"Erro ao compilar função {ast_function.name}: {e}")
-            raise
+        return py_code
     
-    def _compile_with_numba(self, py_code, function_name):
+    def _compile_with_numba(self, py_code, typed, key):
         """
         Compila o código Python usando Numba JIT
-        """
-        # Compila o código
-        global_vars = globals()
-        local_vars = {}
-        
-        # Primeiro, execute o código para definir a função no escopo
-        exec(py_code, global_vars, local_vars)
         
-        # Adicione a função ao escopo global para permitir recursão
-        global_vars[function_name] = local_vars[function_name]
-        
-        # Reexecute para garantir que a função recursiva possa se encontrar
-        exec(py_code, global_vars, local_vars)
+        A função é definida em um namespace próprio (com as funções
+        auxiliares), onde o nome dela passa a ser o dispatcher da Numba:
+        chamadas recursivas viram chamadas nativas. Com o cache em disco, o
+        namespace é um módulo importado do diretório da entrada, e a Numba
+        carrega o código de máquina de uma execução anterior em vez de
+        compilar. A compilação é feita já para a assinatura da
+        especialização, e outras ficam desativadas.
+        """
+        function_name = _python_name(typed.function.name)
+        param_types = ", ".join(_NUMBA_TYPES[param_type] for param_type in typed.signature)
+        
+        source_path = None
+        if self.cache is not None:
+            source_path = self.cache.lookup(key)
+            if source_path is None:
+                source_path = self.cache.store(key, _MODULE_TEMPLATE.format(
+                    name=typed.function.name, signature=param_types, runtime=", ".join(_RUNTIME),
+                    code=py_code, function=function_name))
+        
+        if source_path is not None:
+            self._log(f"JIT: Módulo da função {typed.function.name} em {source_path}")
+            jitted_func = getattr(_load_module(source_path, key), function_name)
+        else:
+            namespace = dict(_RUNTIME)
+            
+            # Execute o código para definir a função no namespace
+            exec(py_code, namespace)
+            
+            # Aplica o decorador JIT da Numba para otimização
+            jitted_func = njit(namespace[function_name])
+            namespace[function_name] = jitted_func
         
-        # Obtém a função compilada
-        func = local_vars[function_name]
+        jitted_func.compile(f"{_NUMBA_TYPES[typed.return_type]}({param_types})")
+        jitted_func.disable_compile()
         
-        # Aplica o decorador JIT da Numba para otimização
-        jitted_func = njit(func)
+        if source_path is not None:
+            # Acerto: a Numba carregou o código de máquina do __pycache__ da entrada
+            if jitted_func.stats.cache_hits:
+                self.cache.hits += 1
+            else:
+                self.cache.misses += 1
         
         return jitted_func
     
-    def is_optimizable(self, ast_node):
+    def _bind(self, jitted_func, typed):
+        """Função que converte as NajaList da chamada em arrays float64 para a Numba"""
+        function_name = typed.function.name
+        list_positions = [index for index, param_type in enumerate(typed.signature) if param_type is NajaList]
+        if not list_positions:
+            return jitted_func
+        
+        def native_function(*args):
+            args = list(args)
+            for index in list_positions:
+                elements = args[index]._elements
+                if not FLOAT_ONLY.issuperset(map(type, elements)):
+                    raise TypeError(f"Lista com elementos que não são float em '{function_name}'")
+                args[index] = np.array(elements, dtype=np.float64)
+            return jitted_func(*args)
+        
+        return native_function
+    
+    def is_optimizable(self, ast_node, signature=None):
         """
         Verifica se um nó AST pode ser otimizado pelo JIT
+        
+        'signature' são os tipos Python dos argumentos observados (int, float
+        ou NajaList de float); sem ela, valem os tipos declarados. Os tipos de
+        cada expressão e variável local são inferidos pelo TypeChecker
+        (jit_types.py), que recusa o que a Numba não executaria com a mesma
+        semântica do interpretador.
         """
-        # Por enquanto, apenas funções com operações numéricas são otimizáveis
         if isinstance(ast_node, FunctionDeclaration):
-            # Verifica se só tem operações numéricas
-            return self._contains_only_numeric_ops(ast_node.body)
+            typed = specialize_function(ast_node, signature)
+            return typed is not None and _consistent_locals(typed)
         
         return False
+
+
+def _load_module(path, key):
+    """Importa o módulo gerado de uma entrada do cache em disco"""
+    name = f"naja_jit_{key[:16]}"
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # O código de máquina em cache reimporta o módulo pelo nome ao ser carregado
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def _python_name(name):
+    """Nome Python de uma variável ou função (sem colidir com palavras reservadas e auxiliares)"""
+    return f"_{name}"
+
+
+def _consistent_locals(typed):
+    """Verifica se variáveis locais homônimas (em escopos irmãos) têm o mesmo tipo
     
-    def _contains_only_numeric_ops(self, statements):
-        """
-        Verifica se um bloco de código contém apenas operações numéricas
-        """
-        # Implementação simplificada - deve ser expandida
-        for stmt in statements:
-            if not self._is_numeric_operation(stmt):
-                return False
-                
-        return True
-    
-    def _is_numeric_operation(self, statement):
-        """
-        Verifica se uma declaração envolve apenas operações numéricas
-        """
-        # Implementação simplificada - deve ser expandida
-        if isinstance(statement, ExpressionStatement):
-            expr = statement.expression
-            return self._is_numeric_expression(expr)
-        elif isinstance(statement, ReturnStatement):
-            return self._is_numeric_expression(statement.value)
-        
-        # Por padrão, assume não numérico
-        return False
-    
-    def _is_numeric_expression(self, expression):
-        """
-        Verifica se uma expressão é numérica
-        """
-        if isinstance(expression, BinaryOperation):
-            return self._is_numeric_expression(expression.left) and self._is_numeric_expression(expression.right)
-        elif isinstance(expression, UnaryOperation):
-            return self._is_numeric_expression(expression.operand)
-        elif isinstance(expression, IntegerLiteral) or isinstance(expression, FloatLiteral):
-            return True
-        
-        # Por padrão, assume não numérico
-        return False
+    No Python gerado elas são uma só variável, e a Numba unificaria os tipos.
+    """
+    declared = {}
+    for node, node_type in typed.types.items():
+        if isinstance(node, VarDeclaration) and declared.setdefault(node.name, node_type) is not node_type:
+            return False
+    return True
 
 
 class PythonCodeGenerator:
     """
     Gerador de código Python a partir de AST NajaScript
     """
-    def __init__(self):
+    def __init__(self, expression_type=None):
         self.indent_level = 0
-        
+        # Tipo Python (int/float/NajaList) de cada expressão e declaração, inferido
+        # pelo TypeChecker: aritmética int vira naja_add/..., listas viram arrays
+        self.expression_type = expression_type
+        # Atualização de cada laço aberto (None no while): um continue dentro
+        # de um for precisa executá-la antes de voltar à condição
+        self.loop_updates = []
+    
     def generate(self, ast_node):
         """
         Gera código Python a partir de nós AST
+        
+        A primeira linha volta sem indentação; as demais, já indentadas.
         """
         method_name = f"_generate_{ast_node.__class__.__name__.lower()}"
         generator = getattr(self, method_name, self._generate_default)
@@ -233,11 +371,11 @@ class PythonCodeGenerator:
             stmt_code = self.generate(stmt)
             code.append(self._indent(stmt_code))
         
+        if not code:
+            code.append(self._indent("pass"))
+        
         self.indent_level -= 1
         
-        if not code:
-            return self._indent("pass")
-            
         return "\n".join(code)
     
     def _indent(self, code):
@@ -246,6 +384,9 @@ class PythonCodeGenerator:
         """
         return "    " * self.indent_level + code
     
+    def _type(self, node):
+        return self.expression_type(node) if self.expression_type is not None else None
+    
     # Implementações específicas para cada tipo de nó
     
     def _generate_expressionstatement(self, stmt):
@@ -261,6 +402,10 @@ class PythonCodeGenerator:
         left = self.generate(expr.left)
         right = self.generate(expr.right)
         
+        # Aritmética de uma especialização: com as funções auxiliares verificadas
+        if expr.operator in ARITHMETIC_OPERATORS and self.expression_type is not None:
+            return self._arithmetic(expr.operator, left, right, self._type(expr.left), self._type(expr.right))
+        
         # Mapeamento de operadores NajaScript para Python
         op_map = {
             "+": "+",
@@ -283,9 +428,24 @@ class PythonCodeGenerator:
         
         return f"({left} {op} {right})"
     
+    def _arithmetic(self, operator, left, right, left_type, right_type):
+        """Operação aritmética com a semântica do NajaScript para os tipos dos operandos"""
+        both_int = left_type is int and right_type is int
+        if operator in _CHECKED_OPERATIONS and both_int:
+            return f"{_CHECKED_OPERATIONS[operator]}({left}, {right})"
+        if operator == "/" and both_int:
+            return f"naja_div_int({left}, {right})"
+        if operator == "%":
+            return f"naja_mod({left}, {right})"
+        # float64: a divisão por zero já lança ZeroDivisionError na Numba
+        return f"({left} {operator} {right})"
+    
     def _generate_unaryoperation(self, expr):
         operand = self.generate(expr.operand)
         
+        if expr.operator == "-" and self._type(expr) is int:
+            return f"naja_neg({operand})"
+        
         # Mapeamento de operadores unários
         op_map = {
             "-": "-",
@@ -300,10 +460,43 @@ class PythonCodeGenerator:
         return str(expr.value)
     
     def _generate_floatliteral(self, expr):
-        return str(expr.value)
+        # repr() é a menor representação que volta ao mesmo float
+        return repr(float(expr.value))
     
     def _generate_variable(self, expr):
-        return expr.name
+        return _python_name(expr.name)
+    
+    def _generate_vardeclaration(self, stmt):
+        """Variável local (tipo inferido do valor inicial)"""
+        if stmt.value is not None:
+            value = self.generate(stmt.value)
+        else:
+            value = "0.0" if self._type(stmt) is float else "0"
+        return f"{_python_name(stmt.name)} = {value}"
+    
+    def _generate_assignment(self, stmt):
+        return f"{_python_name(stmt.name)} = {self.generate(stmt.value)}"
+    
+    def _generate_compoundassignment(self, stmt):
+        """Atribuição composta (+=, -=, ...) como atribuição simples verificada"""
+        name = _python_name(stmt.name)
+        value = self._arithmetic(COMPOUND_OPERATORS[stmt.operator], name, self.generate(stmt.value),
+                                 self._type(stmt), self._type(stmt.value))
+        return f"{name} = {value}"
+    
+    def _generate_methodcall(self, expr):
+        """length() e get(i) de uma NajaList, lida como array float64"""
+        name = self.generate(expr.object)
+        if expr.method == "length":
+            return f"len({name})"
+        return f"naja_get({name}, {self.generate(expr.arguments[0])})"
+    
+    def _generate_blockstatement(self, stmt):
+        # Python não tem blocos: as variáveis locais já têm nomes únicos por tipo
+        self.indent_level -= 1
+        code = self._generate_block(stmt.statements)
+        self.indent_level += 1
+        return code.lstrip(" ")
     
     def _generate_ifstatement(self, stmt):
         condition = self.generate(stmt.condition)
@@ -313,16 +506,56 @@ class PythonCodeGenerator:
         
         if stmt.else_branch:
             else_branch = self._generate_block(stmt.else_branch)
-            code += f"\nelse:\n{else_branch}"
+            code += f"\n{self._indent('else:')}\n{else_branch}"
         
         return code
     
+    def _generate_whilestatement(self, stmt):
+        condition = self.generate(stmt.condition)
+        self.loop_updates.append(None)
+        body = self._generate_block(stmt.body)
+        self.loop_updates.pop()
+        
+        return f"while {condition}:\n{body}"
+    
+    def _generate_forstatement(self, stmt):
+        """for (inicialização; condição; atualização) como while"""
+        lines = []
+        if stmt.init is not None:
+            lines.append(self.generate(stmt.init))
+        condition = self.generate(stmt.condition) if stmt.condition is not None else "True"
+        lines.append(self._indent(f"while {condition}:"))
+        
+        update = None
+        if stmt.update is not None:
+            self.indent_level += 1
+            update = self.generate(stmt.update)
+            self.indent_level -= 1
+        self.loop_updates.append(update)
+        lines.append(self._generate_block(stmt.body))
+        self.loop_updates.pop()
+        if update is not None:
+            self.indent_level += 1
+            lines.append(self._indent(update))
+            self.indent_level -= 1
+        
+        return "\n".join(lines).lstrip(" ")
+    
+    def _generate_breakstatement(self, stmt):
+        return "break"
+    
+    def _generate_continuestatement(self, stmt):
+        update = self.loop_updates[-1] if self.loop_updates else None
+        if update is None:
+            return "continue"
+        return f"{update}\n{self._indent('continue')}"
+    
     def _generate_functioncall(self, expr):
-        func_name = expr.name if isinstance(expr.name, str) else self.generate(expr.name)
+        func_name = _python_name(expr.name) if isinstance(expr.name, str) else self.generate(expr.name)
         args = []
         
         if expr.arguments:
             for arg in expr.arguments:
                 args.append(self.generate(arg))
         
-        return f"{func_name}({', '.join(args)})" 
\ No newline at end of file
+        return f"{func_name}({', '.join(args)})"
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inferência de tipos compartilhada pelos compiladores JIT do NajaScript
+
+O CCodeGenerator (c_jit_compiler.py) e o PythonCodeGenerator da Numba
+(jit_compiler.py) só geram código para funções em que o tipo de cada
+expressão é conhecido: int (64 bits, com verificação de overflow), float
+ou NajaList de float (lida como um buffer de double). O TypeChecker
+infere esses tipos a partir da assinatura de uma especialização e
+recusa o que não teria a mesma semântica do interpretador;
+specialize_functions resolve os tipos de retorno de um grupo de funções
+que se chamam entre si.
+"""
+
+from ast_nodes import *
+from lexer import TokenType
+from interpreter import NajaList
+
+# Operadores aritméticos aceitos. '+', '-' e '*' inteiros são verificados
+# contra overflow de 64 bits; '/' é sempre divisão real e '%' só é aceito
+# entre inteiros, com o sinal do divisor
+ARITHMETIC_OPERATORS = {"+", "-", "*", "/", "%"}
+COMPARISON_OPERATORS = {"==", "!=", "<", ">", "<=", ">="}
+LOGICAL_OPERATORS = {"&&", "||"}
+
+# Atribuições compostas aceitas -> operador binário equivalente
+COMPOUND_OPERATORS = {
+    TokenType.PLUS_ASSIGN: "+",
+    TokenType.MINUS_ASSIGN: "-",
+    TokenType.MULTIPLY_ASSIGN: "*",
+    TokenType.DIVIDE_ASSIGN: "/",
+    TokenType.MODULO_ASSIGN: "%",
+}
+
+# Tipos dos argumentos aceitos: as listas são passadas ao código nativo como
+# um buffer de double, então todos os elementos precisam ser float
+SUPPORTED_TYPES = (int, float, NajaList)
+FLOAT_ONLY = frozenset((float,))
+
+# Tipos declarados dos parâmetros, usados quando não há assinatura observada
+_DECLARED_TYPES = {"int": int, "float": float}
+
+# Valores de um int64 (literais maiores ficam no interpretador)
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def specialize_function(ast_function, signature=None):
+    """TypeChecker de uma função sozinha (só chama a si mesma), ou None
+
+    Sem 'signature', valem os tipos declarados dos parâmetros.
+    """
+    if signature is None:
+        signature = declared_signature(ast_function)
+    if signature is None or not valid_signature(ast_function, signature):
+        return None
+    return specialize_functions({ast_function: tuple(signature)}).get(ast_function)
+
+
+def specialize_functions(signatures):
+    """Tipos das funções {declaração: assinatura} que podem ser compiladas juntas
+    
+    Cada função pode chamar diretamente as outras (e a si mesma). O tipo
+    de retorno é inferido: começa como int e passa a float quando algum
+    return da função produz float, até nada mudar; então todos os return
+    de cada função precisam ter o mesmo tipo. Funções recusadas saem do
+    conjunto, e as que dependiam delas são recusadas na volta seguinte.
+    
+    :return: {declaração: TypeChecker}
+    """
+    signatures = dict(signatures)
+    return_types = {function: int for function in signatures}
+    while signatures:
+        callees = {function.name: (signature, return_types[function])
+                   for function, signature in signatures.items()}
+        checked = {function: TypeChecker(function, signature, callees).check()
+                   for function, signature in signatures.items()}
+        rejected = [function for function, checker in checked.items() if checker is None]
+        changed = [function for function, checker in checked.items()
+                   if checker is not None and checker.return_type is not return_types[function]]
+        for function in rejected:
+            del signatures[function]
+        for function in changed:
+            return_types[function] = checked[function].return_type
+        if rejected or changed:
+            continue
+        # Estável: um return int numa função float mudaria o tipo do valor devolvido
+        mixed = [function for function, checker in checked.items() if len(checker.return_types) != 1]
+        if not mixed:
+            return checked
+        for function in mixed:
+            del signatures[function]
+    return {}
+
+
+def declared_signature(ast_function):
+    """Assinatura com os tipos declarados dos parâmetros, ou None"""
+    signature = tuple(_DECLARED_TYPES.get(param[0]) if isinstance(param, tuple) else None
+                      for param in ast_function.parameters)
+    return signature if all(param_type in SUPPORTED_TYPES for param_type in signature) else None
+
+
+def valid_signature(ast_function, signature):
+    """Verifica se a assinatura tem um tipo aceito para cada parâmetro"""
+    return (len(signature) == len(ast_function.parameters)
+            and all(param_type in SUPPORTED_TYPES for param_type in signature))
+
+
+class TypeChecker:
+    """Inferência de tipos de uma função para os geradores de código dos JIT
+    
+    Percorre o corpo com os tipos da assinatura e de 'callees' (nome ->
+    (assinatura, tipo de retorno) das funções compiladas junto com ela) e
+    registra em 'types' o tipo Python de cada expressão, variável local e
+    atribuição composta. Uma variável local tem o tipo do seu valor inicial
+    (o interpretador não converte para o tipo declarado); atribuições que
+    mudariam esse tipo, nomes redeclarados e qualquer construção sem
+    tradução fiel para o código nativo recusam a função. Listas só aparecem como
+    parâmetros, em get(i)/length() ou repassadas a outra função.
+    """
+    
+    def __init__(self, function, signature, callees):
+        self.function = function
+        self.signature = signature
+        self.callees = callees
+        self.types = {}            # {nó: int, float ou NajaList}
+        self.return_types = set()  # Tipos produzidos pelos return
+        self.return_type = None
+        self.loop_depth = 0
+    
+    def check(self):
+        """Retorna self com os tipos inferidos, ou None se a função não puder ser compilada"""
+        scope = {param[1]: param_type for param, param_type in zip(self.function.parameters, self.signature)}
+        if not (self._block(self.function.body, scope) and _always_returns(self.function.body)):
+            return None
+        self.return_type = float if float in self.return_types else int
+        return self
+    
+    # Statements
+    
+    def _block(self, statements, scope):
+        """Verifica as statements de um bloco em um escopo próprio"""
+        scope = dict(scope)
+        return all(self._statement(stmt, scope) for stmt in statements)
+    
+    def _statement(self, stmt, scope):
+        if isinstance(stmt, ReturnStatement):
+            value_type = self._numeric(stmt.value, scope) if stmt.value is not None else None
+            if value_type is None:
+                return False
+            self.return_types.add(value_type)
+            return True
+        if isinstance(stmt, ExpressionStatement):
+            if isinstance(stmt.expression, (Assignment, CompoundAssignment)):
+                return self._statement(stmt.expression, scope)
+            return self._expression(stmt.expression, scope) is not None
+        if isinstance(stmt, VarDeclaration):
+            if stmt.name in scope:
+                return False
+            if stmt.value is None:
+                var_type = _DECLARED_TYPES.get(stmt.var_type)
+            else:
+                var_type = self._numeric(stmt.value, scope)
+            if var_type not in (int, float):
+                return False
+            scope[stmt.name] = self.types[stmt] = var_type
+            return True
+        if isinstance(stmt, Assignment):
+            var_type = scope.get(stmt.name) if isinstance(stmt.name, str) else None
+            return var_type in (int, float) and self._numeric(stmt.value, scope) is var_type
+        if isinstance(stmt, CompoundAssignment):
+            var_type = scope.get(stmt.name)
+            operator = COMPOUND_OPERATORS.get(stmt.operator)
+            if var_type not in (int, float) or operator is None:
+                return False
+            self.types[stmt] = var_type
+            value_type = self._numeric(stmt.value, scope)
+            return value_type is not None and arithmetic_type(operator, var_type, value_type) is var_type
+        if isinstance(stmt, IfStatement):
+            # O gerador não traduz elif
+            return (not stmt.elif_branches
+                    and self._condition(stmt.condition, scope)
+                    and self._block(stmt.then_branch, scope)
+                    and self._block(stmt.else_branch or [], scope))
+        if isinstance(stmt, WhileStatement):
+            return self._condition(stmt.condition, scope) and self._loop_body(stmt.body, scope)
+        if isinstance(stmt, ForStatement):
+            # A variável do for pertence ao escopo do laço
+            loop_scope = dict(scope)
+            return ((stmt.init is None or self._statement(stmt.init, loop_scope))
+                    and (stmt.condition is None or self._condition(stmt.condition, loop_scope))
+                    and (stmt.update is None or self._statement(_as_statement(stmt.update), loop_scope))
+                    and self._loop_body(stmt.body, loop_scope))
+        if isinstance(stmt, BlockStatement):
+            return self._block(stmt.statements, scope)
+        if isinstance(stmt, (BreakStatement, ContinueStatement)):
+            return self.loop_depth > 0
+        return False
+    
+    def _loop_body(self, body, scope):
+        self.loop_depth += 1
+        try:
+            return self._block(body, scope)
+        finally:
+            self.loop_depth -= 1
+    
+    # Expressões
+    
+    def _condition(self, expression, scope):
+        """Condição de if/while/for: comparações, &&/||, ! ou uma expressão numérica"""
+        if isinstance(expression, BinaryOperation):
+            if expression.operator in COMPARISON_OPERATORS:
+                return (self._numeric(expression.left, scope) is not None
+                        and self._numeric(expression.right, scope) is not None)
+            if expression.operator in LOGICAL_OPERATORS:
+                return self._condition(expression.left, scope) and self._condition(expression.right, scope)
+        if isinstance(expression, UnaryOperation) and expression.operator == "!":
+            return self._condition(expression.operand, scope)
+        return self._numeric(expression, scope) is not None
+    
+    def _numeric(self, expression, scope):
+        """Tipo de uma expressão int ou float, ou None"""
+        expression_type = self._expression(expression, scope)
+        return expression_type if expression_type in (int, float) else None
+    
+    def _expression(self, expression, scope):
+        """Tipo Python de uma expressão (registrado em self.types), ou None"""
+        expression_type = self._infer(expression, scope)
+        if expression_type is not None:
+            self.types[expression] = expression_type
+        return expression_type
+    
+    def _infer(self, expression, scope):
+        if isinstance(expression, IntegerLiteral):
+            return int if INT64_MIN <= expression.value <= INT64_MAX else None
+        if isinstance(expression, FloatLiteral):
+            return float
+        if isinstance(expression, Variable):
+            return scope.get(expression.name)
+        if isinstance(expression, BinaryOperation):
+            if expression.operator not in ARITHMETIC_OPERATORS:
+                return None
+            left = self._numeric(expression.left, scope)
+            right = self._numeric(expression.right, scope)
+            if left is None or right is None:
+                return None
+            return arithmetic_type(expression.operator, left, right)
+        if isinstance(expression, UnaryOperation):
+            return self._numeric(expression.operand, scope) if expression.operator == "-" else None
+        if isinstance(expression, FunctionCall):
+            return self._call(expression, scope)
+        if isinstance(expression, MethodCall):
+            return self._list_method(expression, scope)
+        return None
+    
+    def _call(self, expression, scope):
+        """Chamada direta no código nativo: só com a assinatura exata da função chamada"""
+        callee = self.callees.get(expression.name) if isinstance(expression.name, str) else None
+        if callee is None or len(expression.arguments) != len(callee[0]):
+            return None
+        signature, return_type = callee
+        for argument, param_type in zip(expression.arguments, signature):
+            if param_type is NajaList:
+                # Listas são repassadas como o buffer e o tamanho do parâmetro
+                if not isinstance(argument, Variable) or self._expression(argument, scope) is not NajaList:
+                    return None
+            elif self._numeric(argument, scope) is not param_type:
+                return None
+        return return_type
+    
+    def _list_method(self, expression, scope):
+        """get(i) e length() de uma lista de float"""
+        if not isinstance(expression.object, Variable) or self._expression(expression.object, scope) is not NajaList:
+            return None
+        arguments = expression.arguments
+        if expression.method == "length" and not arguments:
+            return int
+        if expression.method == "get" and len(arguments) == 1:
+            return float if self._numeric(arguments[0], scope) is int else None
+        return None
+
+
+def arithmetic_type(operator, left, right):
+    """Tipo do resultado de uma operação aritmética, como no Python, ou None se não for aceita"""
+    if operator == "/":
+        return float
+    if operator == "%":
+        # O resto de float segue outra regra de sinal no Python
+        return int if left is int and right is int else None
+    return float if float in (left, right) else int
+
+
+def _as_statement(node):
+    """Atualização do for como statement (o parser a produz como expressão)"""
+    return node.expression if isinstance(node, ExpressionStatement) else node
+
+
+def _always_returns(statements):
+    """Verifica se todo caminho de execução de um bloco termina em return"""
+    if not statements:
+        return False
+    last = statements[-1]
+    if isinstance(last, ReturnStatement):
+        return True
+    if isinstance(last, IfStatement):
+        return (bool(last.else_branch) and not last.elif_branches
+                and _always_returns(last.then_branch) and _always_returns(last.else_branch))
+    if isinstance(last, BlockStatement):
+        return _always_returns(last.statements)
+    return False 
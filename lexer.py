@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import re
 from enum import Enum, auto
 
 class TokenType(Enum):
@@ -132,6 +133,8 @@ class TokenType(Enum):
     OR = auto()
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+
     def __init__(self, type, value=None, line=0, column=0):
         self.type = type
         self.value = value
@@ -144,8 +147,59 @@ class Token:
     def __repr__(self):
         return self.__str__()
 
+# Expressão regular mestre do lexer: espaços e comentários seguidos de no
+# máximo um lexema, com um grupo por classe de lexema. Casos raros (dígitos e
+# letras não ASCII fora de identificadores comuns, strings e comentários não
+# finalizados, caracteres inválidos) caem no grupo 'fallback' ou deixam o
+# lexema vazio, e são tratados pelo lexer caractere a caractere.
+_MASTER_PATTERN = re.compile(r"""
+    (?:\s+|(?:\#|//)[^\n]*|/\*.*?\*/)*
+    (?:
+        (?P<name>[A-Za-z_]\w*|[^\W\d\x00-\x7f]\w*)
+      | (?P<number>[0-9]+(?:\.[0-9]*(?![0-9])|(?![0-9.]))(?![^\x00-\x7f]))
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<fallback>/\*|["'])
+      | (?P<op>\*\*=|\*\*|\.\.\.|->|&&|\|\||[-+*/%=!<>]=|[-+*/%=!<>?:(){}\[\];,.@])
+    )?
+""", re.VERBOSE | re.DOTALL)
+
+_ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+
+_ESCAPES = {'n': '\n', 't': '\t', '\\': '\\'}
+
+_OPERATORS = {
+    '+': TokenType.PLUS, '+=': TokenType.PLUS_ASSIGN,
+    '-': TokenType.MINUS, '-=': TokenType.MINUS_ASSIGN, '->': TokenType.ARROW,
+    '*': TokenType.MULTIPLY, '*=': TokenType.MULTIPLY_ASSIGN,
+    '**': TokenType.POWER, '**=': TokenType.POWER_ASSIGN,
+    '/': TokenType.DIVIDE, '/=': TokenType.DIVIDE_ASSIGN,
+    '%': TokenType.MODULO, '%=': TokenType.MODULO_ASSIGN,
+    '...': TokenType.SPREAD, '@': TokenType.DECORATOR,
+    '=': TokenType.ASSIGN, '==': TokenType.EQ,
+    '!': TokenType.NOT, '!=': TokenType.NEQ,
+    '&&': TokenType.AND, '||': TokenType.OR,
+    '<': TokenType.LT, '<=': TokenType.LTE,
+    '>': TokenType.GT, '>=': TokenType.GTE,
+    '?': TokenType.TERNARY, ':': TokenType.COLON,
+    '(': TokenType.LPAREN, ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE, '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET, ']': TokenType.RBRACKET,
+    ';': TokenType.SEMICOLON, ',': TokenType.COMMA, '.': TokenType.DOT,
+}
+
+
+def _unescape(body, quote):
+    """Processa as sequências de escape de uma string como Lexer.string"""
+    def replace(match):
+        char = match.group(1)
+        if char in _ESCAPES:
+            return _ESCAPES[char]
+        return char if char == quote else '\\' + char
+    return _ESCAPE_PATTERN.sub(replace, body)
+
+
 class Lexer:
-    def __init__(self, source):
+    def __init__(self, source, legacy=False):
         # Remover BOM UTF-8 se presente
         if source and len(source) >= 1 and source[0] == '\ufeff':
             self.source = source[1:]
@@ -231,6 +285,12 @@ class Lexer:
             'map': TokenType.MAP,
             'tuple': TokenType.TUPLE,
         }
+
+        # Fluxo de tokens da expressão regular mestre (None = lexer caractere a caractere)
+        self._stream = None if legacy else self.tokens()
+    
+    def error(self, message):
+        raise Exception(f"{message} na linha {self.line}, coluna {self.column}")
     
     def advance(self):
         self.position += 1
@@ -335,6 +395,126 @@ class Lexer:
     
     def get_next_token(self):
         """Obtém o próximo token da entrada"""
+        if self._stream is None:
+            return self._scan_token()
+
+        token = next(self._stream, None)
+        if token is None:
+            # O fluxo já terminou: continuar devolvendo EOF como o lexer caractere a caractere
+            token = Token(TokenType.EOF, None, self.line, self.column)
+        return token
+    
+    def tokens(self):
+        """Gera os tokens sob demanda, terminando com EOF
+
+        Cada iteração casa os espaços e comentários seguintes e um lexema
+        inteiro com _MASTER_PATTERN. A linha e a coluna seguem exatamente as
+        regras de advance(): a linha de um token é a da posição logo após ele
+        (contando um '\\n' que esteja nessa posição) e a coluna é a do seu
+        primeiro caractere. position é sincronizado a cada token para que
+        peek() continue valendo durante o parse.
+        """
+        source = self.source
+        length = len(source)
+        finditer = _MASTER_PATTERN.finditer
+        count = source.count
+        rfind = source.rfind
+        keywords = self.keywords
+        operators = _OPERATORS
+        identifier_type = TokenType.IDENTIFIER
+        string_type = TokenType.STRING_LIT
+
+        position = self.position
+        line = self.line
+        # Índice do último '\\n' contado; advance() nunca conta um '\\n' na posição 0
+        last_newline = -1
+        counted = 1
+
+        while position < length:
+            for match in finditer(source, position):
+                kind = match.lastgroup
+                if kind == 'name':
+                    text = match.group(kind)
+                    if text[0] > '\x7f' and not text[0].isalpha():
+                        break
+                    token_type = keywords.get(text, identifier_type)
+                    value = text
+                elif kind == 'op':
+                    text = match.group(kind)
+                    token_type = operators[text]
+                    value = text
+                elif kind == 'number':
+                    text = match.group(kind)
+                    if '.' in text:
+                        token_type, value = TokenType.FLOAT_LIT, float(text)
+                    else:
+                        token_type, value = TokenType.INTEGER, int(text)
+                elif kind == 'string':
+                    text = match.group(kind)
+                    value = text[1:-1]
+                    if '\\' in value:
+                        value = _unescape(value, text[0])
+                    token_type = string_type
+                else:
+                    # Fim do código ou caso raro
+                    break
+
+                end = match.end()
+                start = end - len(text)
+
+                # Linha na posição logo após o token e coluna do seu início
+                newlines = count('\n', counted, end + 1)
+                if newlines:
+                    line += newlines
+                    newline = rfind('\n', counted, start + 1)
+                    if newline != -1:
+                        last_newline = newline
+                    column = start - last_newline
+                    last_newline = rfind('\n', counted, end + 1)
+                else:
+                    column = start - last_newline
+                counted = end + 1
+
+                self.position = end
+                yield Token(token_type, value, line, column)
+
+            start = match.start(kind) if kind is not None else match.end()
+            if start >= length:
+                # Só restavam espaços e comentários
+                break
+
+            # Caso raro: delegar ao lexer caractere a caractere a partir desta posição
+            newlines = count('\n', counted, start + 1)
+            if newlines:
+                line += newlines
+                last_newline = rfind('\n', counted, start + 1)
+            counted = max(counted, start + 1)
+            self.position = start
+            self.current_char = source[start]
+            self.line = line
+            self.column = start - last_newline
+            token = self._scan_token()
+            position = self.position
+            newlines = count('\n', counted, position + 1)
+            if newlines:
+                line += newlines
+                last_newline = rfind('\n', counted, position + 1)
+            counted = position + 1
+            yield token
+
+        if counted <= length:
+            newlines = count('\n', counted, length + 1)
+            if newlines:
+                line += newlines
+                last_newline = rfind('\n', counted, length + 1)
+        self.position = length
+        self.current_char = None
+        self.line = line
+        self.column = length - last_newline
+        yield Token(TokenType.EOF, None, line, self.column)
+    
+    def _scan_token(self):
+        """Obtém o próximo token avançando caractere a caractere"""
         while self.current_char is not None:
             # Espaços em branco
             if self.current_char.isspace():
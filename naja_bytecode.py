@@ -1,564 +1,841 @@
-from enum import Enum, auto
-from dataclasses import dataclass
-from typing import List, Union, Any
-from ast_nodes import FunctionCall, Assignment
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Máquina virtual de bytecode do NajaScript
+
+O NajaBytecodeCompiler traduz a AST (já anotada pelo resolver) em código
+para uma máquina de registradores:
+
+  - cada instrução é uma tupla de inteiros: o opcode seguido dos operandos
+  - operandos de valor são registradores; os literais ficam no pool de
+    constantes do CodeObject e ocupam o fim do arquivo de registradores, de
+    modo que a constante k é o registrador -(k + 1) e não precisa ser
+    carregada por nenhuma instrução
+  - variáveis locais resolvidas são lidas e escritas direto nos slots do
+    SlotEnvironment (profundidade, slot); as demais usam a busca por nome
+  - saltos são emitidos com alvo provisório e corrigidos quando o destino
+    é conhecido
+
+O BytecodeInterpreter executa esse código em um único laço de despacho, sem
+E/S, sobre os mesmos ambientes, funções e objetos do interpretador de árvore
+e com a mesma semântica. Corpos de funções, métodos e construtores são
+compilados na primeira chamada. Nós sem tradução (try, switch, new,
+import, ...) viram instruções EXEC/EVAL que os delegam ao interpretador.
+
+O naja_llvm traduz esse mesmo código para código de máquina (--jit llvm).
+"""
+
 import sys
+import operator
+from functools import partial
+
+from ast_nodes import *
+from environment import Environment, SlotEnvironment, EMPTY_SLOT
+from interpreter import Function, Completion, NajaObject, NajaList, NajaDict
+from closure_compiler import (
+    _COMPOUND_OPERATORS, _CALL_INTERPRETER, _CALL_NATIVE,
+    _default_factory, _classify_callee, _call_other,
+)
 
 # Aumenta o limite de recursão
 sys.setrecursionlimit(10000)
 
-class OpCode(Enum):
-    # Operações de pilha
-    PUSH = auto()      # Empilha um valor
-    POP = auto()       # Desempilha um valor
-    DUP = auto()       # Duplica o valor no topo da pilha
-    
-    # Operações aritméticas
-    ADD = auto()       # Soma os dois valores do topo da pilha
-    SUB = auto()       # Subtrai os dois valores do topo da pilha
-    MUL = auto()       # Multiplica os dois valores do topo da pilha
-    DIV = auto()       # Divide os dois valores do topo da pilha
-    
-    # Operações de controle de fluxo
-    JMP = auto()       # Salta para um endereço específico
-    JMP_IF = auto()    # Salta se a condição for verdadeira
-    CALL = auto()      # Chama uma função
-    RET = auto()       # Retorna de uma função
-    
-    # Operações de memória
-    LOAD = auto()      # Carrega uma variável
-    STORE = auto()     # Armazena em uma variável
-    
-    # Operações de comparação
-    EQ = auto()        # Igual
-    LT = auto()        # Menor que
-    GT = auto()        # Maior que
-    LE = auto()        # Menor ou igual
-    GE = auto()        # Maior ou igual
-    NE = auto()        # Diferente
-
-@dataclass
-class Instruction:
-    opcode: OpCode
-    operands: List[Any] = None
-    
-    def __init__(self, opcode: OpCode, *operands):
-        self.opcode = opcode
-        self.operands = list(operands) if operands else []
-
-class Frame:
-    def __init__(self, variables, instructions, return_address=None):
-        self.variables = variables  # Variáveis locais do frame
+# Opcodes e operandos. Os de 0 a 10 são os mais frequentes e são testados
+# primeiro pelo laço de despacho.
+LOAD_LOCAL = 0      # dst, slot, nome          registrador <- slot do ambiente atual
+STORE_LOCAL = 1     # src, slot, nome          slot do ambiente atual <- registrador
+JUMP_IF_FALSE = 2   # cond, alvo
+JUMP_IF_NOT_LT = 3  # a, b, alvo               salta se 'a < b' for falso
+JUMP = 4            # alvo
+LT = 5              # dst, a, b
+ADD = 6             # dst, a, b                soma ou concatenação de strings
+SUB = 7             # dst, a, b
+LOAD_NAME = 8       # dst, nome                busca por nome no ambiente
+CALL = 9            # dst, callee, sítio, argumentos...
+CALL_METHOD = 10    # dst, objeto, cache, argumentos...
+LOAD_DEREF = 11     # dst, profundidade, slot, nome
+STORE_DEREF = 12    # src, profundidade, slot, nome
+STORE_NAME = 13     # src, nome
+MUL = 14            # dst, a, b
+LE = 15             # dst, a, b
+GT = 16             # dst, a, b
+GE = 17             # dst, a, b
+EQ = 18             # dst, a, b
+NE = 19             # dst, a, b
+BINARY = 20         # dst, a, b, função        /, %, ** e atribuições compostas
+AND = 21            # dst, a, b
+OR = 22             # dst, a, b
+NEG = 23            # dst, a
+NOT = 24            # dst, a
+GET_ATTR = 25       # dst, objeto, nome
+SET_ATTR = 26       # objeto, nome, src
+BUILD_LIST = 27     # dst, elementos...
+BUILD_DICT = 28     # dst, itens...
+DEFINE = 29         # dst, src, nome, fábrica do valor padrão, const
+FUNCTION = 30       # dst, declaração
+ENTER_BLOCK = 31    # escopo                   novo ambiente de bloco
+LEAVE_BLOCK = 32    #                          volta ao ambiente pai
+RETURN = 33         # src
+EVAL = 34           # dst, nó                  expressão avaliada pelo interpretador
+EXEC = 35           # dst, nó                  statement executada pelo interpretador
+LOOP = 36           # alvo, laço               JUMP de volta que conta um back-edge (só com --jit)
+
+OPCODE_NAMES = (
+    "LOAD_LOCAL", "STORE_LOCAL", "JUMP_IF_FALSE", "JUMP_IF_NOT_LT", "JUMP", "LT",
+    "ADD", "SUB", "LOAD_NAME", "CALL", "CALL_METHOD", "LOAD_DEREF", "STORE_DEREF",
+    "STORE_NAME", "MUL", "LE", "GT", "GE", "EQ", "NE", "BINARY", "AND", "OR", "NEG",
+    "NOT", "GET_ATTR", "SET_ATTR", "BUILD_LIST", "BUILD_DICT", "DEFINE", "FUNCTION",
+    "ENTER_BLOCK", "LEAVE_BLOCK", "RETURN", "EVAL", "EXEC", "LOOP",
+)
+
+# Operadores binários com opcode próprio
+_BINARY_OPCODES = {
+    "+": ADD, "-": SUB, "*": MUL,
+    "<": LT, "<=": LE, ">": GT, ">=": GE, "==": EQ, "!=": NE,
+    "&&": AND, "and": AND, "||": OR, "or": OR,
+}
+
+# Operadores binários executados por BINARY com a função do pool de objetos
+_BINARY_FUNCTIONS = {
+    "/": operator.truediv,
+    "%": operator.mod,
+    "**": operator.pow,
+}
+
+
+class CodeObject:
+    """Código compilado de um corpo de função ou de uma statement de nível superior"""
+    __slots__ = ('name', 'instructions', 'constants', 'names', 'objects', 'registers')
+
+    def __init__(self, name, instructions, constants, names, objects, temporaries):
+        self.name = name
         self.instructions = instructions
-        self.pc = 0  # Program counter
-        self.return_address = return_address
+        self.constants = constants
+        self.names = names        # Nomes de variáveis e atributos
+        self.objects = objects    # Sítios de chamada, escopos, nós e declarações
+        # Modelo do arquivo de registradores: temporários seguidos das constantes
+        # em ordem inversa (a constante k é o registrador -(k + 1))
+        self.registers = [None] * temporaries + constants[::-1]
+
+    def disassemble(self):
+        """Linhas legíveis com cada instrução e seus operandos"""
+        lines = [f"{self.name}: {len(self.instructions)} instruções, "
+                 f"{len(self.registers) - len(self.constants)} temporários, "
+                 f"{len(self.constants)} constantes"]
+        for pc, instruction in enumerate(self.instructions):
+            operands = " ".join(str(operand) for operand in instruction[1:])
+            lines.append(f"{pc:5d}  {OPCODE_NAMES[instruction[0]]:14} {operands}")
+        return lines
+
+
+class CallSite:
+    """Ponto de chamada de função: nome para erros e tipo de chamada por classe do callee"""
+    __slots__ = ('name', 'kinds')
+
+    def __init__(self, name):
+        self.name = name
+        self.kinds = {}
+
+
+class VMFunction(Function):
+    """Função NajaScript cujo corpo executa na máquina virtual"""
+    def __init__(self, declaration, environment, vm):
+        super().__init__(declaration, environment)
+        self.vm = vm
+
+    def _execute_body(self, interpreter, environment):
+        """Executa o bytecode do corpo no ambiente já preparado com os parâmetros"""
+        result = self.vm.run(self.vm.code_for(self.declaration), environment)
+        if type(result) is Completion:
+            # Sinal de uma statement delegada ao interpretador
+            return interpreter.completion_value(result)
+        return result
+
 
 class NajaBytecodeCompiler:
-    """Compila AST NajaScript para bytecode"""
-    
-    def __init__(self):
-        self.code = []
-        self.constants = []
-        self.names = []
-        self.current_scope = None
-        self.scopes = []
-        self.interpreter = None
-        self.debug = False  # Desabilitando depuração
-        
-    def debug_print(self, msg):
-        """Imprime mensagens de depuração, se habilitado"""
-        if self.debug:
-            print(f"DEBUG: {msg}")
-            
-    def compile(self, ast_node) -> List[Instruction]:
-        """Compila um nó AST para uma lista de instruções bytecode"""
-        method = f"compile_{ast_node.__class__.__name__.lower()}"
-        if hasattr(self, method):
-            result = getattr(self, method)(ast_node)
-            if self.debug:
-                print(f"\nCompilando {ast_node.__class__.__name__}:")
-                for i, instr in enumerate(result):
-                    print(f"{i}: {instr.opcode.name} {instr.operands}")
-            return result
-        raise NotImplementedError(f"Compilação não implementada para {ast_node.__class__.__name__}")
-    
-    def compile_program(self, node):
-        """Compila o nó raiz Program"""
-        instructions = []
-        for statement in node.statements:
-            instructions.extend(self.compile(statement))
-        return instructions
-    
-    def compile_functiondeclaration(self, node):
-        """Compila uma declaração de função"""
-        # Compila o corpo da função
-        func_instructions = []
-        
-        # Carrega os parâmetros da função
-        for i, (param_type, param_name) in enumerate(node.parameters):
-            func_instructions.append(Instruction(OpCode.LOAD, f"arg{i}"))
-            func_instructions.append(Instruction(OpCode.STORE, param_name))
-        
-        # Compila o corpo da função
-        for stmt in node.body:
-            func_instructions.extend(self.compile(stmt))
-            
-        # Adiciona retorno implícito se necessário
-        if not func_instructions or func_instructions[-1].opcode != OpCode.RET:
-            func_instructions.append(Instruction(OpCode.PUSH, 0))  # Valor padrão de retorno
-            func_instructions.append(Instruction(OpCode.RET))
-        
-        # Armazena a função no interpretador
-        if hasattr(self, 'interpreter'):
-            self.interpreter.functions[node.name] = func_instructions
-        else:
-            # Se não tiver interpretador, cria um dicionário temporário
-            if not hasattr(self, '_functions'):
-                self._functions = {}
-            self._functions[node.name] = func_instructions
-        
-        return []  # Não gera instruções no escopo atual
-    
-    def compile_binaryoperation(self, node):
-        """Compila uma operação binária"""
-        instructions = []
-        
-        # Compila operandos
-        instructions.extend(self.compile(node.left))
-        instructions.extend(self.compile(node.right))
-        
-        # Mapeia operador para opcode
-        op_map = {
-            "+": OpCode.ADD,
-            "-": OpCode.SUB,
-            "*": OpCode.MUL,
-            "/": OpCode.DIV,
-            "==": OpCode.EQ,
-            "<": OpCode.LT,
-            ">": OpCode.GT,
-            "<=": OpCode.LE,
-            ">=": OpCode.GE,
-            "!=": OpCode.NE
+    """Compila nós da AST em CodeObjects para o BytecodeInterpreter"""
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self._statement_compilers = {
+            ExpressionStatement: self._compile_ExpressionStatement,
+            VarDeclaration: self._compile_VarDeclaration,
+            Assignment: self._compile_Assignment,
+            CompoundAssignment: self._compile_CompoundAssignment,
+            IfStatement: self._compile_IfStatement,
+            WhileStatement: self._compile_WhileStatement,
+            ForStatement: self._compile_ForStatement,
+            BlockStatement: self._compile_BlockStatement,
+            ReturnStatement: self._compile_ReturnStatement,
+            BreakStatement: self._compile_BreakStatement,
+            ContinueStatement: self._compile_ContinueStatement,
+            FunctionDeclaration: self._compile_FunctionDeclaration,
         }
-        
-        if node.operator in op_map:
-            instructions.append(Instruction(op_map[node.operator]))
+        self._expression_compilers = {
+            IntegerLiteral: self._compile_Literal,
+            FloatLiteral: self._compile_Literal,
+            StringLiteral: self._compile_Literal,
+            BooleanLiteral: self._compile_Literal,
+            NullLiteral: self._compile_NullLiteral,
+            Variable: self._compile_Variable,
+            BinaryOperation: self._compile_BinaryOperation,
+            UnaryOperation: self._compile_UnaryOperation,
+            FunctionCall: self._compile_FunctionCall,
+            MethodCall: self._compile_MethodCall,
+            GetAttr: self._compile_GetAttr,
+            Assignment: self._compile_Assignment,
+            CompoundAssignment: self._compile_CompoundAssignment,
+            ListLiteral: self._compile_ListLiteral,
+            DictLiteral: self._compile_DictLiteral,
+        }
+        self._begin(None, False)
+
+    # ------------------------------------------------------------------
+    # Pontos de entrada
+    # ------------------------------------------------------------------
+
+    def compile_function(self, declaration):
+        """Compila o corpo de uma função, método ou construtor"""
+        self._begin(declaration.name, True)
+        for stmt in declaration.body:
+            self._statement(stmt)
+        self._emit(RETURN, self._constant(None))
+        return self._finish()
+
+    def compile_statement(self, stmt):
+        """Compila uma statement de nível superior; o código retorna o valor dela"""
+        self._begin(f"<{type(stmt).__name__}>", False)
+        self._emit(RETURN, self._statement(stmt))
+        return self._finish()
+
+    # ------------------------------------------------------------------
+    # Emissão
+    # ------------------------------------------------------------------
+
+    def _begin(self, name, in_function):
+        self._name_of_code = name
+        self._in_function = in_function
+        self._instructions = []
+        self._constants = []
+        self._constant_index = {}
+        self._names = []
+        self._name_index = {}
+        self._objects = []
+        self._temp = 0
+        self._temporaries = 0
+        self._block_depth = 0  # ENTER_BLOCKs abertos no ponto de emissão
+        self._loops = []       # (profundidade de blocos, saltos de break, saltos de continue)
+
+    def _finish(self):
+        code = CodeObject(self._name_of_code, [tuple(instruction) for instruction in self._instructions],
+                          self._constants, self._names, self._objects, self._temporaries)
+        self._begin(None, False)
+        return code
+
+    def _emit(self, opcode, *operands):
+        """Acrescenta uma instrução e retorna sua posição"""
+        self._instructions.append([opcode, *operands])
+        return len(self._instructions) - 1
+
+    def _emit_jump(self, opcode, *operands):
+        """Emite um salto com alvo provisório, a ser corrigido por _patch"""
+        return self._emit(opcode, *operands, -1)
+
+    def _patch(self, position, target=None):
+        """Faz o salto em 'position' apontar para 'target' (ou a próxima instrução)"""
+        self._instructions[position][-1] = len(self._instructions) if target is None else target
+
+    def _new_register(self):
+        register = self._temp
+        self._temp += 1
+        if self._temp > self._temporaries:
+            self._temporaries = self._temp
+        return register
+
+    def _constant(self, value):
+        """Registrador da constante no pool (valores iguais de tipos iguais são compartilhados)"""
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self._constants)
+            self._constants.append(value)
+        return -(index + 1)
+
+    def _name(self, name):
+        """Índice de um nome no pool de nomes"""
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self._names)
+            self._names.append(name)
+        return index
+
+    def _object(self, value):
+        """Índice de um objeto (sítio, escopo, nó, ...) no pool de objetos"""
+        self._objects.append(value)
+        return len(self._objects) - 1
+
+    def _emit_load(self, dst, node):
+        """Leitura de variável: slot local, slot de um ambiente externo ou nome"""
+        name = self._name(node.name)
+        if node.slot is None:
+            self._emit(LOAD_NAME, dst, name)
+        elif node.depth == 0:
+            self._emit(LOAD_LOCAL, dst, node.slot, name)
         else:
-            raise ValueError(f"Operador não suportado: {node.operator}")
-            
-        return instructions
-    
-    def compile_integerliteral(self, node):
-        """Compila um literal inteiro"""
-        return [Instruction(OpCode.PUSH, node.value)]
-    
-    def compile_stringliteral(self, node):
-        """Compila um literal string"""
-        return [Instruction(OpCode.PUSH, node.value)]
-    
-    def compile_identifier(self, node):
-        """Compila um identificador"""
-        return [Instruction(OpCode.LOAD, node.name)]
-    
-    def compile_returnstatement(self, node):
-        """Compila uma instrução return"""
-        instructions = []
-        if node.value:
-            instructions.extend(self.compile(node.value))
-        instructions.append(Instruction(OpCode.RET))
-        return instructions
-        
-    def compile_ifstatement(self, node):
-        """Compila uma instrução if"""
-        instructions = []
-        
-        # Compila a condição
-        instructions.extend(self.compile(node.condition))
-        
-        # Reserva espaço para o salto (será preenchido depois)
-        jmp_if_idx = len(instructions)
-        instructions.append(Instruction(OpCode.JMP_IF, 0))  # placeholder
-        
-        # Compila o bloco then
-        then_instructions = []
-        for stmt in node.then_branch:
-            then_instructions.extend(self.compile(stmt))
-            
-        # Adiciona salto para o fim do if
-        end_idx = len(instructions) + len(then_instructions)
-        if node.else_branch:
-            # Se houver else, precisamos pular ele também
-            else_instructions = []
-            for stmt in node.else_branch:
-                else_instructions.extend(self.compile(stmt))
-            end_idx += len(else_instructions)
-            instructions.append(Instruction(OpCode.JMP, end_idx))
-        
-        # Atualiza o endereço do salto condicional
-        if node.else_branch:
-            instructions[jmp_if_idx].operands[0] = len(instructions) + len(then_instructions)
+            self._emit(LOAD_DEREF, dst, node.depth, node.slot, name)
+
+    def _emit_store(self, src, node):
+        """Escrita em variável, com as mesmas regras de Interpreter._assign_variable"""
+        name = self._name(node.name)
+        if node.slot is None:
+            self._emit(STORE_NAME, src, name)
+        elif node.depth == 0:
+            self._emit(STORE_LOCAL, src, node.slot, name)
         else:
-            instructions[jmp_if_idx].operands[0] = end_idx
-        
-        # Adiciona as instruções do bloco then
-        instructions.extend(then_instructions)
-        
-        # Se houver else, compila também
-        if node.else_branch:
-            else_instructions = []
-            for stmt in node.else_branch:
-                else_instructions.extend(self.compile(stmt))
-            instructions.extend(else_instructions)
-            
-        return instructions
-        
-    def compile_whilestatement(self, node):
-        """Compila uma instrução while"""
-        instructions = []
-        
-        # Marca o início do loop
-        loop_start = len(instructions)
-        
-        # Compila a condição
-        condition_instructions = self.compile(node.condition)
-        instructions.extend(condition_instructions)
-        
-        # Reserva espaço para o salto (será preenchido depois)
-        jmp_if_idx = len(instructions)
-        instructions.append(Instruction(OpCode.JMP_IF, 0))  # placeholder
-        
-        # Compila o corpo do loop
-        body_instructions = []
-        for stmt in node.body:
-            body_instructions.extend(self.compile(stmt))
-            
-        # Adiciona as instruções do corpo
-        instructions.extend(body_instructions)
-        
-        # Adiciona salto de volta para o início
-        instructions.append(Instruction(OpCode.JMP, loop_start))
-        
-        # Atualiza o endereço do salto condicional para pular todo o corpo se a condição for falsa
-        instructions[jmp_if_idx].operands[0] = len(instructions)
-        
-        return instructions
-        
-    def compile_functioncall(self, node):
-        """Compila uma chamada de função"""
-        instructions = []
-        
-        # Compila os argumentos
-        for arg in node.arguments:
-            instructions.extend(self.compile(arg))
-            
-        # Adiciona a chamada da função
-        instructions.append(Instruction(OpCode.CALL, node.name, len(node.arguments)))
-        
-        return instructions
-
-    def compile_variable(self, node):
-        """Compila uma referência a variável"""
-        return [Instruction(OpCode.LOAD, node.name)]
-
-    def compile_expressionstatement(self, node):
-        """Compila uma expressão como statement"""
-        instructions = self.compile(node.expression)
-        # Não descarta o resultado de chamadas de função ou atribuições
-        if not isinstance(node.expression, (FunctionCall, Assignment)):
-            instructions.append(Instruction(OpCode.POP))
-        return instructions
-
-    def compile_vardeclaration(self, node):
-        """Compila uma declaração de variável"""
-        instructions = []
-        if node.value:
-            instructions.extend(self.compile(node.value))
+            self._emit(STORE_DEREF, src, node.depth, node.slot, name)
+
+    def _fallback(self, opcode, node):
+        """Delega o nó ao interpretador de árvore"""
+        dst = self._new_register()
+        self._emit(opcode, dst, self._object(node))
+        return dst
+
+    # ------------------------------------------------------------------
+    # Expressões (retornam o registrador com o valor)
+    # ------------------------------------------------------------------
+
+    def _expression(self, expr):
+        if expr is None:
+            return self._constant(None)
+        compiler = self._expression_compilers.get(type(expr))
+        if compiler is not None:
+            return compiler(expr)
+        return self._fallback(EVAL, expr)
+
+    def _compile_Literal(self, expr):
+        return self._constant(expr.value)
+
+    def _compile_NullLiteral(self, expr):
+        return self._constant(None)
+
+    def _compile_Variable(self, expr):
+        dst = self._new_register()
+        self._emit_load(dst, expr)
+        return dst
+
+    def _compile_BinaryOperation(self, expr):
+        opcode = _BINARY_OPCODES.get(expr.operator)
+        function = _BINARY_FUNCTIONS.get(expr.operator)
+        if opcode is None and function is None:
+            # Operador desconhecido: o interpretador avalia os operandos e gera o erro
+            return self._fallback(EVAL, expr)
+
+        left = self._expression(expr.left)
+        right = self._expression(expr.right)
+        dst = self._new_register()
+        if opcode is not None:
+            self._emit(opcode, dst, left, right)
         else:
-            # Se não houver valor inicial, usa 0 como valor padrão
-            instructions.append(Instruction(OpCode.PUSH, 0))
-        instructions.append(Instruction(OpCode.STORE, node.name))
-        return instructions
-
-    def compile_assignment(self, node):
-        """Compila uma atribuição de variável"""
-        instructions = []
-        
-        # Compila o valor a ser atribuído
-        instructions.extend(self.compile(node.value))
-        
-        # Duplica o valor no topo da pilha para que possamos retorná-lo após a atribuição
-        instructions.append(Instruction(OpCode.DUP))
-        
-        # Armazena o valor na variável
-        instructions.append(Instruction(OpCode.STORE, node.name))
-        
-        # O valor duplicado permanece na pilha como resultado da expressão
-        return instructions
-
-    def compile_listliteral(self, node):
-        """Compila um literal de lista"""
-        instructions = []
-        
-        # Compila cada elemento da lista
-        for element in node.elements:
-            instructions.extend(self.compile(element))
-        
-        # Cria a lista com os elementos compilados
-        instructions.append(Instruction(OpCode.PUSH, len(node.elements)))
-        instructions.append(Instruction(OpCode.CALL, "list", len(node.elements)))
-        
-        return instructions
-
-    def set_interpreter(self, interpreter):
-        """Define o interpretador e transfere as funções compiladas"""
-        self.interpreter = interpreter
-        if hasattr(self, '_functions'):
-            for name, instructions in self._functions.items():
-                interpreter.functions[name] = instructions
-            delattr(self, '_functions')
+            self._emit(BINARY, dst, left, right, self._object(function))
+        return dst
 
-class BytecodeInterpreter:
-    def __init__(self):
-        self.stack = []  # Pilha de valores
-        self.frames = []  # Pilha de frames de execução
-        self.functions = {
-            'println': self.native_println
-        }  # Funções definidas
-        self.current_frame = None
-    
-    def execute(self, instructions):
-        """Executa uma sequência de instruções"""
-        # Cria o frame inicial com variáveis globais
-        self.current_frame = Frame({}, instructions)
-        self.frames.append(self.current_frame)
-        
-        # Contador de instruções para evitar loops infinitos
-        max_instructions = 1000000  # Limite máximo de instruções
-        instruction_count = 0
-        
-        # Loop principal de execução
-        try:
-            while self.frames and instruction_count < max_instructions:
-                # Obtém o frame atual
-                frame = self.frames[-1]
-                
-                # Verifica se chegamos ao fim das instruções
-                if frame.pc >= len(frame.instructions):
-                    old_frame = self.frames.pop()
-                    print(f"\nFrame finalizado: {old_frame.variables}")
-                    if self.frames:
-                        self.current_frame = self.frames[-1]
-                        print(f"Retornando para frame: {self.current_frame.variables}")
-                    else:
-                        print("Execução finalizada")
-                        break
-                
-                # Obtém a próxima instrução
-                instruction = frame.instructions[frame.pc]
-                old_pc = frame.pc
-                frame.pc += 1
-                instruction_count += 1
-                
-                # Debug: imprime a instrução atual e estado
-                print(f"\nFrame {len(self.frames)-1}, PC: {old_pc}")
-                print(f"Executando: {instruction.opcode.name} {instruction.operands}")
-                print(f"Variáveis locais: {frame.variables}")
-                print(f"Pilha antes: {self.stack}")
-                
-                # Executa a instrução
-                method = f"execute_{instruction.opcode.name.lower()}"
-                should_stop = getattr(self, method)(instruction)
-                
-                # Se a instrução retornou True, terminamos a execução
-                if should_stop:
-                    print("Execução finalizada por retorno")
-                    break
-                
-                # Debug: imprime o estado após execução
-                print(f"Pilha depois: {self.stack}")
-                print(f"PC após execução: {frame.pc}")
-                
-            if instruction_count >= max_instructions:
-                raise RuntimeError("Limite máximo de instruções excedido - possível loop infinito")
-                
-        except Exception as e:
-            print(f"\nErro durante a execução: {e}")
-            print(f"Estado final:")
-            print(f"- Frames ativos: {len(self.frames)}")
-            print(f"- Pilha: {self.stack}")
-            print(f"- Variáveis do frame atual: {self.current_frame.variables}")
-            raise
-    
-    def execute_load(self, instruction):
-        """Carrega uma variável"""
-        name = instruction.operands[0]
-        # Procura a variável no frame atual
-        value = self.current_frame.variables.get(name)
-        if value is None:
-            # Se não encontrar no frame atual, procura nos frames anteriores
-            for frame in reversed(self.frames[:-1]):
-                value = frame.variables.get(name)
-                if value is not None:
-                    break
-            # Se ainda não encontrou, usa 0 como padrão
-            if value is None:
-                value = 0
-        self.stack.append(value)
-    
-    def execute_store(self, instruction):
-        """Armazena em uma variável"""
-        name = instruction.operands[0]
-        value = self.stack.pop()
-        # Armazena no frame atual
-        self.current_frame.variables[name] = value
-    
-    def execute_call(self, instruction):
-        """Executa uma chamada de função"""
-        # Obtém o nome da função e número de argumentos
-        func_name = instruction.operands[0]
-        num_args = instruction.operands[1]
-        
-        # Obtém os argumentos da pilha
-        args = []
-        for _ in range(num_args):
-            if not self.stack:
-                raise IndexError("Pilha vazia ao tentar obter argumentos da função")
-            args.insert(0, self.stack.pop())
-            
-        # Procura a função
-        func = self.functions.get(func_name)
-        if func is None:
-            raise ValueError(f"Função não encontrada: {func_name}")
-            
-        if callable(func):
-            # Se for uma função nativa
-            result = func(*args)
-            if result is not None:
-                self.stack.append(result)
+    def _compile_UnaryOperation(self, expr):
+        if expr.operator == "-":
+            opcode = NEG
+        elif expr.operator == "!":
+            opcode = NOT
         else:
-            # Se for uma função compilada
-            # Cria novo escopo para a função
-            new_variables = {f"arg{i}": arg for i, arg in enumerate(args)}
-            
-            # Cria um novo frame para a função
-            new_frame = Frame(new_variables, func)
-            self.frames.append(new_frame)
-            self.current_frame = new_frame
-            self.current_frame.pc = 0  # Garante que começamos do início da função
-
-    def execute_return(self, instruction):
-        """Executa uma instrução de retorno"""
-        # Se houver um valor de retorno, ele já está na pilha
-        return_value = None
-        if self.stack:
-            return_value = self.stack.pop()
-        
-        # Remove o frame atual
-        if self.frames:
-            old_frame = self.frames.pop()
-            print(f"\nFrame finalizado: {old_frame.variables}")
-            
-            if self.frames:
-                # Restaura o frame anterior
-                self.current_frame = self.frames[-1]
-                # Empilha o valor de retorno no frame anterior
-                if return_value is not None:
-                    self.stack.append(return_value)
-                print(f"Retornando para frame: {self.current_frame.variables}")
-            else:
-                # Se não houver mais frames, terminamos a execução
-                print("Execução finalizada")
-                return True  # Indica que a execução deve terminar
-        return False  # Indica que a execução deve continuar
-
-    def native_println(self, *args):
-        """Função nativa println"""
-        print(*args)
-        return None
-        
-    def execute_push(self, instruction):
-        """Empilha um valor"""
-        self.stack.append(instruction.operands[0])
-        
-    def execute_pop(self, instruction):
-        """Desempilha um valor"""
-        if self.stack:  # Só remove se houver algo na pilha
-            return self.stack.pop()
-        return None
-        
-    def execute_add(self, instruction):
-        """Soma os dois valores do topo da pilha"""
-        b = self.stack.pop()
-        a = self.stack.pop()
-        self.stack.append(a + b)
-        
-    def execute_sub(self, instruction):
-        """Subtrai os dois valores do topo da pilha"""
-        b = self.stack.pop()
-        a = self.stack.pop()
-        self.stack.append(a - b)
-        
-    def execute_mul(self, instruction):
-        """Multiplica os dois valores do topo da pilha"""
-        b = self.stack.pop()
-        a = self.stack.pop()
-        self.stack.append(a * b)
-        
-    def execute_div(self, instruction):
-        """Divide os dois valores do topo da pilha"""
-        b = self.stack.pop()
-        a = self.stack.pop()
-        self.stack.append(a / b)
-        
-    def execute_ret(self, instruction):
-        """Retorna um valor"""
-        if self.stack:
-            return self.stack.pop()
-        return None
-        
-    def execute_jmp(self, instruction):
-        """Salta para um endereço específico"""
-        target = instruction.operands[0]
-        if target >= 0 and target < len(self.current_frame.instructions):
-            self.current_frame.pc = target
-            print(f"Saltando para instrução {target}")
+            return self._fallback(EVAL, expr)
+
+        operand = self._expression(expr.operand)
+        dst = self._new_register()
+        self._emit(opcode, dst, operand)
+        return dst
+
+    def _compile_FunctionCall(self, expr):
+        function_name = None
+        if isinstance(expr.name, Variable):
+            function_name = expr.name.name
+        elif isinstance(expr.name, str):
+            function_name = expr.name
+
+        # Como no interpretador, funções chamadas pelo nome são buscadas no ambiente
+        if function_name:
+            callee = self._new_register()
+            self._emit(LOAD_NAME, callee, self._name(function_name))
+            error_name = function_name
         else:
-            raise ValueError(f"Endereço de salto inválido: {target}")
-        
-    def execute_jmp_if(self, instruction):
-        """Salta se a condição for falsa"""
-        if not self.stack:
-            raise IndexError("Pilha vazia ao tentar avaliar condição de salto")
-            
-        condition = self.stack.pop()
-        target = instruction.operands[0]
-        
-        print(f"Avaliando salto condicional: condição = {condition}, alvo = {target}")
-        
-        if condition == 0:  # Se a condição for falsa
-            if target >= 0 and target < len(self.current_frame.instructions):
-                self.current_frame.pc = target
-                print(f"Condição falsa, saltando para {target}")
-            else:
-                raise ValueError(f"Endereço de salto inválido: {target}")
+            callee = self._expression(expr.name)
+            error_name = str(expr.name)
+
+        arguments = [self._expression(arg) for arg in expr.arguments]
+        dst = self._new_register()
+        self._emit(CALL, dst, callee, self._object(CallSite(error_name)), *arguments)
+        return dst
+
+    def _compile_MethodCall(self, expr):
+        obj = self._expression(expr.object)
+        arguments = [self._expression(arg) for arg in expr.arguments]
+        # Mesmo cache inline do interpretador de árvore (um por nó)
+        cache = expr.inline_cache or self.interpreter._method_cache(expr)
+        dst = self._new_register()
+        self._emit(CALL_METHOD, dst, obj, self._object(cache), *arguments)
+        return dst
+
+    def _compile_GetAttr(self, expr):
+        obj = self._expression(expr.object)
+        dst = self._new_register()
+        self._emit(GET_ATTR, dst, obj, self._name(expr.name))
+        return dst
+
+    def _compile_Assignment(self, expr):
+        value = self._expression(expr.value)
+        if isinstance(expr.name, GetAttr):
+            obj = self._expression(expr.name.object)
+            self._emit(SET_ATTR, obj, self._name(expr.name.name), value)
+        else:
+            self._emit_store(value, expr)
+        return value
+
+    def _compile_CompoundAssignment(self, expr):
+        function = _COMPOUND_OPERATORS.get(expr.operator)
+        if function is None:
+            return self._fallback(EVAL, expr)
+
+        current = self._new_register()
+        self._emit_load(current, expr)
+        value = self._expression(expr.value)
+        dst = self._new_register()
+        self._emit(BINARY, dst, current, value, self._object(function))
+        self._emit_store(dst, expr)
+        return dst
+
+    def _compile_ListLiteral(self, expr):
+        elements = [self._expression(element) for element in expr.elements]
+        dst = self._new_register()
+        self._emit(BUILD_LIST, dst, *elements)
+        return dst
+
+    def _compile_DictLiteral(self, expr):
+        items = [self._expression(item) for item in expr.items]
+        dst = self._new_register()
+        self._emit(BUILD_DICT, dst, *items)
+        return dst
+
+    # ------------------------------------------------------------------
+    # Statements (retornam o registrador com o valor da statement)
+    # ------------------------------------------------------------------
+
+    def _statement(self, stmt):
+        # Temporários de uma statement ficam livres para as seguintes
+        mark = self._temp
+        compiler = self._statement_compilers.get(type(stmt))
+        if compiler is not None:
+            result = compiler(stmt)
+        else:
+            result = self._fallback(EXEC, stmt)
+        self._temp = mark
+        return result
+
+    def _block(self, statements, scope):
+        """Corpo de if/else: ambiente novo, com slots, ou o atual se o bloco foi elidido"""
+        enters = scope is None or bool(scope)
+        if enters:
+            self._emit(ENTER_BLOCK, self._object(scope))
+            self._block_depth += 1
+        for stmt in statements:
+            self._statement(stmt)
+        if enters:
+            self._emit(LEAVE_BLOCK)
+            self._block_depth -= 1
+
+    def _loop_body(self, statements):
+        """Compila o corpo de um laço e retorna os saltos de (break, continue) a corrigir"""
+        loop = (self._block_depth, [], [])
+        self._loops.append(loop)
+        for stmt in statements:
+            self._statement(stmt)
+        self._loops.pop()
+        return loop[1], loop[2]
+
+    def _emit_back_edge(self, loop, start):
+        """Salto de volta ao início do laço e sua posição
+
+        Com a compilação em camadas ligada é um LOOP, que conta as iterações
+        como back-edges da função (interpreter.loop_profiles), como o
+        interpretador de árvore; sem ela, um JUMP comum.
+        """
+        position = len(self._instructions)
+        if self.interpreter.tiered_jit is None:
+            self._emit(JUMP, start)
         else:
-            print("Condição verdadeira, continuando sequencialmente")
-
-    def execute_le(self, instruction):
-        """Compara se o primeiro valor é menor ou igual ao segundo"""
-        if len(self.stack) < 2:
-            raise IndexError("Pilha não tem elementos suficientes para comparação")
-            
-        b = self.stack.pop()
-        a = self.stack.pop()
-        result = 1 if a <= b else 0
-        print(f"Comparando {a} <= {b} = {result}")
-        self.stack.append(result)
-
-    def execute_dup(self, instruction):
-        """Duplica o valor no topo da pilha"""
-        if not self.stack:
-            raise IndexError("Pilha vazia ao tentar duplicar o topo")
-        value = self.stack[-1]  # Obtém o valor do topo sem remover
-        self.stack.append(value)  # Adiciona uma cópia na pilha
-        return None 
\ No newline at end of file
+            self._emit(LOOP, start, self._object(loop))
+        return position
+
+    def _emit_condition_jump(self, condition):
+        """Salto para quando a condição é falsa; 'a < b' vira um único JUMP_IF_NOT_LT"""
+        if isinstance(condition, BinaryOperation) and condition.operator == "<":
+            left = self._expression(condition.left)
+            right = self._expression(condition.right)
+            return self._emit_jump(JUMP_IF_NOT_LT, left, right)
+        return self._emit_jump(JUMP_IF_FALSE, self._expression(condition))
+
+    def _compile_ExpressionStatement(self, stmt):
+        return self._expression(stmt.expression)
+
+    def _compile_VarDeclaration(self, stmt):
+        # Declarações exportadas têm lógica de exportação e depuração própria
+        if stmt.exported:
+            return self._fallback(EXEC, stmt)
+
+        value = self._expression(stmt.value) if stmt.value else self._constant(None)
+        dst = self._new_register()
+        self._emit(DEFINE, dst, value, self._name(stmt.name),
+                   self._object(_default_factory(stmt.var_type)), 1 if stmt.is_const else 0)
+        return dst
+
+    def _compile_IfStatement(self, stmt):
+        end_jumps = []
+
+        skip = self._emit_condition_jump(stmt.condition)
+        self._block(stmt.then_branch, stmt.then_scope)
+        end_jumps.append(self._emit_jump(JUMP))
+        self._patch(skip)
+
+        for i, (elif_condition, elif_body) in enumerate(stmt.elif_branches or []):
+            scope = stmt.elif_scopes[i] if i < len(stmt.elif_scopes) else None
+            skip = self._emit_condition_jump(elif_condition)
+            self._block(elif_body, scope)
+            end_jumps.append(self._emit_jump(JUMP))
+            self._patch(skip)
+
+        if stmt.else_branch:
+            self._block(stmt.else_branch, stmt.else_scope)
+
+        for jump in end_jumps:
+            self._patch(jump)
+        return self._constant(None)
+
+    def _compile_WhileStatement(self, stmt):
+        # O corpo do while executa no ambiente atual
+        start = len(self._instructions)
+        exit_jump = self._emit_condition_jump(stmt.condition)
+        breaks, continues = self._loop_body(stmt.body)
+        back_edge = self._emit_back_edge(stmt, start)
+        self._patch(exit_jump)
+        for jump in breaks:
+            self._patch(jump)
+        for jump in continues:
+            self._patch(jump, back_edge)
+        return self._constant(None)
+
+    def _compile_ForStatement(self, stmt):
+        # Um único ambiente para inicialização, condição, corpo e atualização
+        enters = stmt.scope is None or bool(stmt.scope)
+        if enters:
+            self._emit(ENTER_BLOCK, self._object(stmt.scope))
+            self._block_depth += 1
+
+        if isinstance(stmt.init, VarDeclaration):
+            self._compile_VarDeclaration(stmt.init)
+        else:
+            self._expression(stmt.init)
+
+        start = len(self._instructions)
+        exit_jump = self._emit_condition_jump(stmt.condition)
+        breaks, continues = self._loop_body(stmt.body)
+        for jump in continues:
+            self._patch(jump)
+        self._expression(stmt.update)
+        self._emit_back_edge(stmt, start)
+        self._patch(exit_jump)
+        for jump in breaks:
+            self._patch(jump)
+
+        if enters:
+            self._emit(LEAVE_BLOCK)
+            self._block_depth -= 1
+        return self._constant(None)
+
+    def _compile_BlockStatement(self, stmt):
+        result = self._constant(None)
+        for block_stmt in stmt.statements:
+            result = self._statement(block_stmt)
+        return result
+
+    def _compile_ReturnStatement(self, stmt):
+        # Fora de funções o return continua sendo a exceção do interpretador
+        if not self._in_function:
+            return self._fallback(EXEC, stmt)
+
+        value = self._expression(stmt.value) if stmt.value else self._constant(None)
+        self._emit(RETURN, value)
+        return self._constant(None)
+
+    def _compile_BreakStatement(self, stmt):
+        return self._compile_loop_exit(stmt, 1)
+
+    def _compile_ContinueStatement(self, stmt):
+        return self._compile_loop_exit(stmt, 2)
+
+    def _compile_loop_exit(self, stmt, kind):
+        """break/continue saem dos blocos abertos no laço e saltam; fora de laço, EXEC"""
+        if not self._loops:
+            return self._fallback(EXEC, stmt)
+
+        loop = self._loops[-1]
+        for _ in range(self._block_depth - loop[0]):
+            self._emit(LEAVE_BLOCK)
+        loop[kind].append(self._emit_jump(JUMP))
+        return self._constant(None)
+
+    def _compile_FunctionDeclaration(self, stmt):
+        dst = self._new_register()
+        self._emit(FUNCTION, dst, self._object(stmt))
+        return dst
+
+
+class BytecodeInterpreter:
+    """Máquina virtual de registradores que executa o código do NajaBytecodeCompiler"""
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.compiler = NajaBytecodeCompiler(interpreter)
+        self._function_code = {}  # {declaração: CodeObject}, compilado na primeira chamada
+
+    def make_function(self, declaration, environment):
+        """Cria a função de uma declaração com o corpo executado pela máquina virtual"""
+        return VMFunction(declaration, environment, self)
+
+    def code_for(self, declaration):
+        """CodeObject do corpo de uma declaração de função"""
+        code = self._function_code.get(declaration)
+        if code is None:
+            code = self._function_code[declaration] = self.compiler.compile_function(declaration)
+        return code
+
+    def compile_statements(self, statements):
+        """Compila statements de nível superior em funções sem argumentos que as executam"""
+        return [partial(self.run_statement, self.compiler.compile_statement(stmt))
+                for stmt in statements]
+
+    def run_statement(self, code):
+        """Executa o código de uma statement de nível superior no ambiente atual"""
+        return self.run(code, self.interpreter.environment)
+
+    def run(self, code, environment):
+        """Executa um CodeObject no ambiente dado e retorna o valor de RETURN"""
+        interpreter = self.interpreter
+        previous_env = interpreter.environment
+        interpreter.environment = env = environment
+        slots = env.slots if isinstance(env, SlotEnvironment) else None
+
+        instructions = code.instructions
+        regs = code.registers[:]
+        names = code.names
+        objects = code.objects
+        is_truthy = interpreter.is_truthy
+        pc = 0
+
+        try:
+            while True:
+                instruction = instructions[pc]
+                pc += 1
+                op = instruction[0]
+
+                if op < 11:
+                    if op == LOAD_LOCAL:
+                        _, dst, slot, name = instruction
+                        value = slots[slot]
+                        if value is EMPTY_SLOT:
+                            value = env.get(names[name])
+                        regs[dst] = value
+                    elif op == STORE_LOCAL:
+                        _, src, slot, name = instruction
+                        if slots[slot] is not EMPTY_SLOT and not env.change_listeners:
+                            slots[slot] = regs[src]
+                        else:
+                            env.assign(names[name], regs[src])
+                    elif op == JUMP_IF_FALSE:
+                        value = regs[instruction[1]]
+                        if value is not True and (value is False or not is_truthy(value)):
+                            pc = instruction[2]
+                    elif op == JUMP_IF_NOT_LT:
+                        value = regs[instruction[1]] < regs[instruction[2]]
+                        if value is not True and (value is False or not is_truthy(value)):
+                            pc = instruction[3]
+                    elif op == JUMP:
+                        pc = instruction[1]
+                    elif op == LT:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] < regs[b]
+                    elif op == ADD:
+                        _, dst, a, b = instruction
+                        left = regs[a]
+                        right = regs[b]
+                        # Concatenação de strings
+                        if isinstance(left, str) or isinstance(right, str):
+                            regs[dst] = str(left) + str(right)
+                        else:
+                            regs[dst] = left + right
+                    elif op == SUB:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] - regs[b]
+                    elif op == LOAD_NAME:
+                        regs[instruction[1]] = env.get(names[instruction[2]])
+                    elif op == CALL:
+                        callee = regs[instruction[2]]
+                        site = objects[instruction[3]]
+                        count = len(instruction) - 4
+                        if count == 0:
+                            arguments = []
+                        elif count == 1:
+                            arguments = [regs[instruction[4]]]
+                        elif count == 2:
+                            arguments = [regs[instruction[4]], regs[instruction[5]]]
+                        else:
+                            arguments = [regs[register] for register in instruction[4:]]
+
+                        kind = site.kinds.get(type(callee))
+                        if kind is None:
+                            kind = site.kinds[type(callee)] = _classify_callee(callee)
+                        if kind == _CALL_INTERPRETER:
+                            regs[instruction[1]] = callee(interpreter, arguments)
+                        elif kind == _CALL_NATIVE:
+                            regs[instruction[1]] = callee(*arguments)
+                        else:
+                            regs[instruction[1]] = _call_other(interpreter, callee, arguments, site.name)
+                    else:  # CALL_METHOD
+                        obj = regs[instruction[2]]
+                        cache = objects[instruction[3]]
+                        count = len(instruction) - 4
+                        if type(obj) is cache.receiver_type and not interpreter.debug:
+                            cache.hits += 1
+                            if count == 0:
+                                regs[instruction[1]] = cache.handler(obj)
+                            elif count == 1:
+                                regs[instruction[1]] = cache.handler(obj, regs[instruction[4]])
+                            else:
+                                regs[instruction[1]] = cache.handler(
+                                    obj, *[regs[register] for register in instruction[4:]])
+                        else:
+                            regs[instruction[1]] = cache.dispatch(
+                                interpreter, obj, [regs[register] for register in instruction[4:]])
+
+                elif op < 21:
+                    if op == LOAD_DEREF:
+                        _, dst, depth, slot, name = instruction
+                        environment = env
+                        while depth:
+                            environment = environment.enclosing
+                            depth -= 1
+                        value = environment.slots[slot]
+                        if value is EMPTY_SLOT:
+                            value = env.get(names[name])
+                        regs[dst] = value
+                    elif op == STORE_DEREF:
+                        _, src, depth, slot, name = instruction
+                        environment = env
+                        while depth:
+                            environment = environment.enclosing
+                            depth -= 1
+                        if environment.slots[slot] is not EMPTY_SLOT and not environment.change_listeners:
+                            environment.slots[slot] = regs[src]
+                        else:
+                            env.assign(names[name], regs[src])
+                    elif op == STORE_NAME:
+                        env.assign(names[instruction[2]], regs[instruction[1]])
+                    elif op == MUL:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] * regs[b]
+                    elif op == LE:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] <= regs[b]
+                    elif op == GT:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] > regs[b]
+                    elif op == GE:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] >= regs[b]
+                    elif op == EQ:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] == regs[b]
+                    elif op == NE:
+                        _, dst, a, b = instruction
+                        regs[dst] = regs[a] != regs[b]
+                    else:  # BINARY
+                        _, dst, a, b, function = instruction
+                        regs[dst] = objects[function](regs[a], regs[b])
+
+                elif op == AND:
+                    _, dst, a, b = instruction
+                    regs[dst] = is_truthy(regs[a]) and is_truthy(regs[b])
+                elif op == OR:
+                    _, dst, a, b = instruction
+                    regs[dst] = is_truthy(regs[a]) or is_truthy(regs[b])
+                elif op == NEG:
+                    value = regs[instruction[2]]
+                    if not isinstance(value, (int, float)):
+                        raise TypeError(f"Operador '-' não suportado para {type(value)}")
+                    regs[instruction[1]] = -value
+                elif op == NOT:
+                    regs[instruction[1]] = not is_truthy(regs[instruction[2]])
+                elif op == GET_ATTR:
+                    _, dst, obj, name = instruction
+                    regs[dst] = interpreter._get_attribute(regs[obj], names[name])
+                elif op == SET_ATTR:
+                    _, obj, name, src = instruction
+                    obj = regs[obj]
+                    if not isinstance(obj, NajaObject):
+                        raise Exception(f"Não é possível atribuir à propriedade '{names[name]}' em um não-objeto")
+                    obj._set_property(names[name], regs[src])
+                elif op == BUILD_LIST:
+                    regs[instruction[1]] = NajaList([regs[register] for register in instruction[2:]])
+                elif op == BUILD_DICT:
+                    regs[instruction[1]] = NajaDict([regs[register] for register in instruction[2:]])
+                elif op == DEFINE:
+                    _, dst, src, name, factory, is_const = instruction
+                    value = regs[src]
+                    if value is None and objects[factory] is not None:
+                        value = objects[factory]()
+                    if is_const:
+                        env.define_const(names[name], value)
+                    else:
+                        env.define(names[name], value)
+                    regs[dst] = value
+                elif op == FUNCTION:
+                    declaration = objects[instruction[2]]
+                    function = interpreter.make_function(declaration, env)
+                    regs[instruction[1]] = interpreter._declare_function(declaration, function)
+                elif op == ENTER_BLOCK:
+                    scope = objects[instruction[1]]
+                    if scope is None:
+                        env = Environment(env)
+                        slots = None
+                    else:
+                        env = SlotEnvironment(env, scope)
+                        slots = env.slots
+                    interpreter.environment = env
+                elif op == LEAVE_BLOCK:
+                    env = env.enclosing
+                    slots = env.slots if isinstance(env, SlotEnvironment) else None
+                    interpreter.environment = env
+                elif op == RETURN:
+                    return regs[instruction[1]]
+                elif op == EVAL:
+                    regs[instruction[1]] = interpreter.evaluate(objects[instruction[2]])
+                elif op == EXEC:
+                    result = regs[instruction[1]] = interpreter.execute(objects[instruction[2]])
+                    if type(result) is Completion:
+                        # return/break/continue fora de laço: o chamador consome o sinal
+                        return result
+                elif op == LOOP:
+                    profile = interpreter.loop_profiles.get(objects[instruction[2]])
+                    if profile is not None:
+                        profile.back_edges += 1
+                    pc = instruction[1]
+                else:
+                    raise Exception(f"Opcode desconhecido: {op}")
+        finally:
+            interpreter.environment = previous_env
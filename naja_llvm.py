@@ -1,144 +1,936 @@
-from typing import List, Dict, Any
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compilação JIT do bytecode do NajaScript com o LLVM
+
+O NajaLLVMGenerator traduz o CodeObject de uma função (o código de
+registradores do NajaBytecodeCompiler, ver naja_bytecode.py) em um
+ir.Module especializado para os tipos dos argumentos de uma chamada. O
+LLVMJITCompiler otimiza o módulo, gera código de máquina no próprio
+processo com o MCJIT do llvmlite e o chama pelo ctypes. É o compilador da
+opção --jit llvm: não precisa de gcc nem de Numba.
+
+Tradução:
+
+  - os tipos (int, float, bool ou NajaList de float) são inferidos por uma
+    análise de fluxo sobre os blocos básicos: cada variável local, um par
+    (escopo, slot), tem em cada ponto o tipo do último valor atribuído; os
+    temporários vivem dentro de um bloco básico
+  - int é i64 com checagem de overflow, float é double e uma lista é o
+    endereço de um buffer de double com o tamanho (só leitura)
+  - ENTER_BLOCK e LEAVE_BLOCK não geram código: só dizem a que escopo
+    cada (profundidade, slot) se refere
+  - chamadas da função a si mesma com a mesma assinatura são diretas
+  - toda instrução sem tradução para esses tipos (LOAD_NAME de outros
+    nomes, EVAL, EXEC, strings, objetos, listas novas, ...) vira uma saída
+
+Uma saída, um overflow, uma divisão por zero ou um índice fora da lista
+marcam naja_error e fazem a função retornar; o Python lança a exceção e a
+chamada é refeita pelo interpretador, que produz o resultado exato ou o
+erro do NajaScript. O código nativo não tem efeitos visíveis fora da
+chamada (não escreve em variáveis externas nem modifica listas), então
+refazer a chamada é seguro.
+"""
+
+import ctypes
+import operator
+from array import array
+
+import llvmlite.binding as llvm
 from llvmlite import ir
-from naja_bytecode import OpCode, Instruction
+
+from ast_nodes import FunctionDeclaration
+from interpreter import NajaList
+from jit_types import FLOAT_ONLY, declared_signature
+from naja_bytecode import (
+    NajaBytecodeCompiler,
+    LOAD_LOCAL, STORE_LOCAL, JUMP_IF_FALSE, JUMP_IF_NOT_LT, JUMP, LT, ADD, SUB,
+    LOAD_NAME, CALL, CALL_METHOD, LOAD_DEREF, STORE_DEREF, MUL, LE, GT, GE, EQ, NE,
+    BINARY, AND, OR, NEG, NOT, DEFINE, ENTER_BLOCK, LEAVE_BLOCK, RETURN,
+)
+
+# Inicializa o LLVM (versões recentes do llvmlite fazem isso sozinhas)
+try:
+    llvm.initialize()
+except RuntimeError:
+    pass
+llvm.initialize_native_target()
+llvm.initialize_native_asmprinter()
+
+# Códigos de naja_error: a chamada é refeita pelo interpretador
+_OVERFLOW = 1
+_ZERO_DIVISION = 2
+_INDEX_ERROR = 3
+_INEXACT = 4
+_UNSUPPORTED = 5
+_RECURSION = 6
+
+_NATIVE_ERRORS = {
+    _OVERFLOW: (OverflowError, "Overflow de inteiro de 64 bits"),
+    _ZERO_DIVISION: (ZeroDivisionError, "Divisão por zero"),
+    _INDEX_ERROR: (IndexError, "Índice fora dos limites da lista"),
+    _INEXACT: (OverflowError, "Inteiro sem representação exata em double"),
+    _UNSUPPORTED: (TypeError, "Operação sem tradução nativa"),
+    _RECURSION: (RecursionError, "Recursão profunda demais para o código nativo"),
+}
+
+# Chamadas recursivas aninhadas no código nativo (o interpretador usa 10000)
+MAX_NATIVE_DEPTH = 10000
+
+# Inteiros até 2^53 viram double sem arredondamento
+_EXACT_INT = 2 ** 53
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+I1 = ir.IntType(1)
+I8 = ir.IntType(8)
+I32 = ir.IntType(32)
+I64 = ir.IntType(64)
+F64 = ir.DoubleType()
+LIST = ir.LiteralStructType([F64.as_pointer(), I64])
+
+# Tipos Python dos valores traduzidos -> tipo LLVM interno
+_LLVM_TYPES = {int: I64, float: F64, bool: I1, NajaList: LIST}
+NUMERIC = (int, float, bool)
+
+# Tipos Python dos argumentos -> (tipos LLVM dos parâmetros, tipos ctypes).
+# bool passa como um byte; uma NajaList de float vira o buffer e o tamanho.
+_ARGUMENT_TYPES = {
+    int: ((I64,), (ctypes.c_longlong,)),
+    float: ((F64,), (ctypes.c_double,)),
+    bool: ((I8,), (ctypes.c_bool,)),
+    NajaList: ((F64.as_pointer(), I64), (ctypes.c_void_p, ctypes.c_longlong)),
+}
+_RETURN_TYPES = {int: (I64, ctypes.c_longlong), float: (F64, ctypes.c_double), bool: (I8, ctypes.c_bool)}
+
+# Registrador com a própria função (LOAD_NAME do nome dela) e variável com
+# tipos diferentes conforme o caminho
+_SELF = "self"
+_CONFLICT = "conflito"
+
+# Escopo do corpo da função na pilha de escopos (os blocos usam o pc do ENTER_BLOCK)
+_FUNCTION_SCOPE = -1
+
+# Operadores de comparação: predicado do icmp/fcmp
+_COMPARISONS = {LT: "<", LE: "<=", GT: ">", GE: ">=", EQ: "==", NE: "!="}
+_ARITHMETIC = {ADD: "+", SUB: "-", MUL: "*"}
+# Funções de BINARY (operadores e atribuições compostas)
+_BINARY_OPERATORS = {
+    operator.add: "+", operator.sub: "-", operator.mul: "*",
+    operator.truediv: "/", operator.mod: "%", operator.pow: "**",
+}
+_JUMPS = (JUMP, JUMP_IF_FALSE, JUMP_IF_NOT_LT)
+
 
 class NajaLLVMGenerator:
-    """Gera LLVM IR a partir do bytecode NajaScript"""
-    
-    def __init__(self):
-        # Inicializa o módulo LLVM
-        self.module = ir.Module(name="naja_module")
+    """Gera LLVM IR a partir do CodeObject de uma função para uma assinatura
+
+    analyze() infere os tipos e o tipo de retorno (lança Exception se a
+    função não puder ser traduzida); generate() produz o ir.Module com a
+    função exportada 'symbol' e o indicador 'naja_error'.
+    """
+
+    def __init__(self, code, declaration, signature):
+        self.code = code
+        self.declaration = declaration
+        self.signature = tuple(signature)
+        self.symbol = f"naja_jit_{declaration.name}"
+        self.instructions = code.instructions
+        self.return_type = None
+        self.recursive = False
+        self.entry_states = {}  # {início do bloco: estado na entrada}
+        self.blocks = self._split_blocks()
+
+        # Estado da geração (None durante a análise)
+        self.module = None
         self.builder = None
-        
-        # Tipos LLVM comuns
-        self.void_t = ir.VoidType()
-        self.int32_t = ir.IntType(32)
-        self.float_t = ir.DoubleType()
-        self.bool_t = ir.IntType(1)
-        
-        # Estado da geração
-        self.functions: Dict[str, ir.Function] = {}
-        self.blocks: List[ir.Block] = []
-        self.variables: Dict[str, ir.AllocaInstr] = {}
-        self.stack: List[ir.Value] = []
-        
-    def generate(self, instructions: List[Instruction]) -> ir.Module:
-        """Gera LLVM IR a partir de uma lista de instruções bytecode"""
-        # Cria a função main
-        func_type = ir.FunctionType(self.int32_t, [])
-        main_func = ir.Function(self.module, func_type, name="main")
-        
-        # Cria o bloco de entrada
-        block = main_func.append_basic_block(name="entry")
-        self.builder = ir.IRBuilder(block)
-        
-        # Processa cada instrução
-        for instruction in instructions:
-            self._process_instruction(instruction)
-            
-        # Retorna 0 por padrão
-        self.builder.ret(ir.Constant(self.int32_t, 0))
-        
-        return self.module
-        
-    def _process_instruction(self, instruction: Instruction):
-        """Processa uma única instrução bytecode"""
-        opcode = instruction.opcode
-        
-        if opcode == OpCode.PUSH:
-            value = instruction.operands[0]
-            if isinstance(value, int):
-                const = ir.Constant(self.int32_t, value)
-            elif isinstance(value, float):
-                const = ir.Constant(self.float_t, value)
-            elif isinstance(value, bool):
-                const = ir.Constant(self.bool_t, int(value))
+        self.function = None
+
+    # ------------------------------------------------------------------
+    # Análise
+    # ------------------------------------------------------------------
+
+    def analyze(self):
+        """Infere os tipos de todos os blocos e retorna o tipo de retorno
+
+        Como em jit_types.specialize_functions, as chamadas recursivas
+        começam supondo retorno int e a análise é refeita se os return
+        produzirem outro tipo.
+        """
+        if self.declaration.scope is None:
+            raise Exception("Escopo dinâmico")
+        tried = set()
+        self.return_type = int
+        while True:
+            tried.add(self.return_type)
+            returned = self._analyze_pass()
+            if not returned:
+                raise Exception("Nenhum caminho retorna em código nativo")
+            if returned == {self.return_type}:
+                return self.return_type
+            others = returned - tried
+            if len(others) != 1:
+                raise Exception("Retornos de tipos diferentes")
+            self.return_type = others.pop()
+
+    def _analyze_pass(self):
+        """Propaga os estados até o ponto fixo; retorna os tipos dos return nativos"""
+        self.entry_states = {0: self._initial_state()}
+        self.returned = set()
+        pending = [0]
+        while pending:
+            start = pending.pop()
+            for target, state in self._run_block(start, self.entry_states[start]):
+                current = self.entry_states.get(target)
+                merged = state if current is None else _merge(current, state)
+                if merged != current:
+                    self.entry_states[target] = merged
+                    pending.append(target)
+
+        # Os return só contam com os estados finais
+        self.returned = set()
+        for start, state in self.entry_states.items():
+            self._run_block(start, state)
+        return self.returned
+
+    def _split_blocks(self):
+        """{início: fim} dos blocos básicos do código"""
+        leaders = {0}
+        for pc, instruction in enumerate(self.instructions):
+            op = instruction[0]
+            if op in _JUMPS:
+                leaders.add(instruction[-1])
+            if op in _JUMPS or op == RETURN:
+                leaders.add(pc + 1)
+        leaders = sorted(leader for leader in leaders if leader < len(self.instructions))
+        return dict(zip(leaders, leaders[1:] + [len(self.instructions)]))
+
+    def _initial_state(self):
+        """Estado na entrada: os parâmetros definidos com os tipos da assinatura"""
+        if len(self.signature) != len(self.declaration.parameters):
+            raise Exception("Quantidade de argumentos diferente da de parâmetros")
+        types = {}
+        for name, param_type in zip(self.parameter_names(), self.signature):
+            types[(_FUNCTION_SCOPE, self.declaration.scope[name])] = param_type
+        return ((_FUNCTION_SCOPE,), types, frozenset(types), frozenset())
+
+    def parameter_names(self):
+        """Nomes dos parâmetros, como em Function.__call__"""
+        names = []
+        for param in self.declaration.parameters:
+            if hasattr(param, 'name'):
+                names.append(param.name)
+            elif isinstance(param, tuple) and len(param) > 1:
+                names.append(param[1])
+            else:
+                names.append(str(param))
+        return names
+
+    def _scope_names(self, scope_id):
+        """{nome: slot} do escopo de um bloco ou da função (None se dinâmico)"""
+        if scope_id == _FUNCTION_SCOPE:
+            return self.declaration.scope
+        return self.code.objects[self.instructions[scope_id][1]]
+
+    # ------------------------------------------------------------------
+    # Blocos básicos (análise e tradução)
+    # ------------------------------------------------------------------
+
+    def _run_block(self, start, state):
+        """Percorre um bloco básico a partir do estado de entrada
+
+        Retorna [(destino, estado na saída)]. Com self.builder definido,
+        também gera o código do bloco; sem ele, só os tipos são calculados
+        (os valores LLVM ficam None).
+        """
+        scopes, types, maybe, consts = state
+        types = dict(types)
+        regs = {}  # {registrador: (tipo, valor LLVM)}
+        names = self.code.names
+        objects = self.code.objects
+
+        for pc in range(start, self.blocks[start]):
+            instruction = self.instructions[pc]
+            op = instruction[0]
+
+            if op == LOAD_LOCAL or op == LOAD_DEREF:
+                depth, slot = (0, instruction[2]) if op == LOAD_LOCAL else instruction[2:4]
+                key = _variable(scopes, depth, slot)
+                var_type = types.get(key)
+                if var_type is None or var_type is _CONFLICT:
+                    # Variável possivelmente não definida aqui: busca por nome
+                    return self._exit(_UNSUPPORTED)
+                regs[instruction[1]] = (var_type, self._load(key, var_type))
+
+            elif op == STORE_LOCAL or op == STORE_DEREF:
+                depth, slot = (0, instruction[2]) if op == STORE_LOCAL else instruction[2:4]
+                key = _variable(scopes, depth, slot)
+                value = self._register(regs, instruction[1])
+                if key not in types or key in consts or value[0] not in _LLVM_TYPES:
+                    return self._exit(_UNSUPPORTED)
+                types[key] = value[0]
+                self._store(key, value)
+
+            elif op == DEFINE:
+                _, dst, src, name, factory, is_const = instruction
+                value = self._register(regs, src)
+                if value[0] is type(None) and objects[factory] is not None:
+                    value = self._constant(objects[factory]())
+                slot = (self._scope_names(scopes[-1]) or {}).get(names[name])
+                key = (scopes[-1], slot)
+                if slot is None or key in consts or value[0] not in _LLVM_TYPES:
+                    return self._exit(_UNSUPPORTED)
+                if is_const:
+                    consts = consts | {key}
+                types[key] = value[0]
+                maybe = maybe | {key}
+                self._store(key, value)
+                regs[dst] = value
+
+            elif op == ENTER_BLOCK:
+                scopes = scopes + (pc,)
+                types, maybe, consts = _forget(pc, types, maybe, consts)
+
+            elif op == LEAVE_BLOCK:
+                if len(scopes) < 2:
+                    raise Exception("LEAVE_BLOCK sem bloco aberto")
+                types, maybe, consts = _forget(scopes[-1], types, maybe, consts)
+                scopes = scopes[:-1]
+
+            elif op == JUMP:
+                self._branch(instruction[1])
+                return [(instruction[1], (scopes, types, maybe, consts))]
+
+            elif op == JUMP_IF_FALSE or op == JUMP_IF_NOT_LT:
+                if op == JUMP_IF_FALSE:
+                    condition = self._truthy(self._register(regs, instruction[1]))
+                else:
+                    condition = self._compare(LT, self._register(regs, instruction[1]),
+                                              self._register(regs, instruction[2]))
+                if condition is None:
+                    return self._exit(_UNSUPPORTED)
+                state = (scopes, types, maybe, consts)
+                target = instruction[-1]
+                if self.builder is not None:
+                    self.builder.cbranch(condition[1], self.labels[pc + 1], self.labels[target])
+                return [(pc + 1, state), (target, state)]
+
+            elif op == RETURN:
+                value = self._register(regs, instruction[1])
+                if value[0] not in _RETURN_TYPES:
+                    return self._exit(_UNSUPPORTED)
+                self.returned.add(value[0])
+                if self.builder is not None:
+                    result = value[1]
+                    if value[0] is bool:
+                        result = self.builder.zext(result, I8)
+                    self._return(result)
+                return []
+
+            else:
+                result = self._operation(instruction, regs)
+                if result is None:
+                    return self._exit(_UNSUPPORTED)
+                regs[instruction[1]] = result
+
+        end = self.blocks[start]
+        if end >= len(self.instructions):
+            raise Exception("Fim do código sem RETURN")
+        self._branch(end)
+        return [(end, (scopes, types, maybe, consts))]
+
+    def _operation(self, instruction, regs):
+        """Instruções que produzem um valor em dst; None se não há tradução"""
+        op = instruction[0]
+        if op in _ARITHMETIC:
+            return self._arithmetic(_ARITHMETIC[op], self._register(regs, instruction[2]),
+                                    self._register(regs, instruction[3]))
+        if op in _COMPARISONS:
+            return self._compare(op, self._register(regs, instruction[2]),
+                                 self._register(regs, instruction[3]))
+        if op == BINARY:
+            symbol = _BINARY_OPERATORS.get(self.code.objects[instruction[4]])
+            if symbol is None:
+                return None
+            return self._arithmetic(symbol, self._register(regs, instruction[2]),
+                                    self._register(regs, instruction[3]))
+        if op == AND or op == OR:
+            left = self._truthy(self._register(regs, instruction[2]))
+            right = self._truthy(self._register(regs, instruction[3]))
+            if left is None or right is None:
+                return None
+            if self.builder is None:
+                return (bool, None)
+            combine = self.builder.and_ if op == AND else self.builder.or_
+            return (bool, combine(left[1], right[1]))
+        if op == NOT:
+            value = self._truthy(self._register(regs, instruction[2]))
+            if value is None:
+                return None
+            return (bool, None if self.builder is None else self.builder.not_(value[1]))
+        if op == NEG:
+            return self._negate(self._register(regs, instruction[2]))
+        if op == LOAD_NAME:
+            # Só a própria função (chamadas recursivas)
+            if self.code.names[instruction[2]] == self.declaration.name:
+                return (_SELF, None)
+            return None
+        if op == CALL:
+            return self._call_self(self._register(regs, instruction[2]),
+                                   [self._register(regs, register) for register in instruction[4:]])
+        if op == CALL_METHOD:
+            method = self.code.objects[instruction[3]].node.method
+            return self._list_method(method, self._register(regs, instruction[2]),
+                                     [self._register(regs, register) for register in instruction[4:]])
+        # STORE_NAME, GET_ATTR, SET_ATTR, BUILD_LIST, BUILD_DICT, FUNCTION, EVAL, EXEC
+        return None
+
+    def _register(self, regs, register):
+        """(tipo, valor) de um registrador; constantes são registradores negativos"""
+        if register < 0:
+            return self._constant(self.code.constants[-register - 1])
+        value = regs.get(register)
+        if value is None:
+            raise Exception(f"Temporário {register} lido fora do bloco em que foi escrito")
+        return value
+
+    def _constant(self, value):
+        """(tipo, valor) de uma constante; tipo None se ela não tiver tradução"""
+        value_type = type(value)
+        if value is None:
+            return (value_type, None)
+        if value_type not in NUMERIC or (value_type is int and not _INT64_MIN <= value <= _INT64_MAX):
+            return (None, None)
+        if self.builder is None:
+            return (value_type, None)
+        return (value_type, ir.Constant(_LLVM_TYPES[value_type], value))
+
+    # ------------------------------------------------------------------
+    # Operações
+    # ------------------------------------------------------------------
+
+    def _arithmetic(self, symbol, left, right):
+        """+, -, *, /, % e ** com os tipos e resultados do Python"""
+        if left[0] not in NUMERIC or right[0] not in NUMERIC:
+            return None
+        is_float = float in (left[0], right[0])
+        if symbol == "/":
+            return self._divide(left, right)
+        if symbol == "**" and not is_float:
+            return self._int_power(left, right)
+        result_type = float if is_float else int
+        if self.builder is None:
+            return (result_type, None)
+
+        builder = self.builder
+        if is_float:
+            a, b = self._as_float(left), self._as_float(right)
+            if symbol == "+":
+                return (float, builder.fadd(a, b))
+            if symbol == "-":
+                return (float, builder.fsub(a, b))
+            if symbol == "*":
+                return (float, builder.fmul(a, b))
+            if symbol == "%":
+                return (float, self._float_modulo(a, b))
+            return (float, self._float_power(a, b))
+
+        a, b = self._as_int(left), self._as_int(right)
+        if symbol == "%":
+            return (int, self._int_modulo(a, b))
+        operation = {"+": builder.sadd_with_overflow, "-": builder.ssub_with_overflow,
+                     "*": builder.smul_with_overflow}[symbol]
+        pair = operation(a, b)
+        self._check(builder.extract_value(pair, 1), _OVERFLOW)
+        return (int, builder.extract_value(pair, 0))
+
+    def _divide(self, left, right):
+        """Divisão real: inteiros só se forem exatos em double"""
+        if self.builder is None:
+            return (float, None)
+        if left[0] is not float and right[0] is not float:
+            self._check_exact(self._as_int(left))
+            self._check_exact(self._as_int(right))
+        a, b = self._as_float(left), self._as_float(right)
+        self._check(self.builder.fcmp_ordered("==", b, ir.Constant(F64, 0.0)), _ZERO_DIVISION)
+        return (float, self.builder.fdiv(a, b))
+
+    def _int_modulo(self, a, b):
+        """Resto com o sinal do divisor, como o % do Python"""
+        builder = self.builder
+        zero = ir.Constant(I64, 0)
+        self._check(builder.icmp_signed("==", b, zero), _ZERO_DIVISION)
+        # x % -1 é 0 (e srem com INT64_MIN / -1 não é definido)
+        minus_one = builder.icmp_signed("==", b, ir.Constant(I64, -1))
+        remainder = builder.srem(a, builder.select(minus_one, ir.Constant(I64, 1), b))
+        adjust = builder.and_(builder.icmp_signed("!=", remainder, zero),
+                              builder.icmp_signed("<", builder.xor(remainder, b), zero))
+        return builder.select(adjust, builder.add(remainder, b), remainder)
+
+    def _float_modulo(self, a, b):
+        """Resto de float como o float_rem do CPython"""
+        builder = self.builder
+        zero = ir.Constant(F64, 0.0)
+        self._check(builder.fcmp_ordered("==", b, zero), _ZERO_DIVISION)
+        remainder = builder.frem(a, b)
+        nonzero = builder.fcmp_unordered("!=", remainder, zero)
+        different_signs = builder.xor(builder.fcmp_ordered("<", b, zero),
+                                      builder.fcmp_ordered("<", remainder, zero))
+        adjusted = builder.select(builder.and_(nonzero, different_signs),
+                                  builder.fadd(remainder, b), remainder)
+        copysign = self.module.globals.get("llvm.copysign.f64")
+        if copysign is None:
+            copysign = ir.Function(self.module, ir.FunctionType(F64, [F64, F64]), name="llvm.copysign.f64")
+        return builder.select(nonzero, adjusted, builder.call(copysign, [zero, b]))
+
+    def _float_power(self, a, b):
+        """Potência de float; bases não positivas e resultados não finitos ficam no interpretador"""
+        builder = self.builder
+        self._check(builder.not_(builder.fcmp_ordered(">", a, ir.Constant(F64, 0.0))), _UNSUPPORTED)
+        result = builder.call(self.module.declare_intrinsic("llvm.pow", [F64]), [a, b])
+        magnitude = builder.call(self.module.declare_intrinsic("llvm.fabs", [F64]), [result])
+        self._check(builder.not_(builder.fcmp_ordered("<", magnitude, ir.Constant(F64, float("inf")))),
+                    _OVERFLOW)
+        return result
+
+    def _int_power(self, left, right):
+        """Potência de inteiros com expoente não negativo (o negativo dá float no Python)"""
+        if self.builder is None:
+            return (int, None)
+        base, exponent = self._as_int(left), self._as_int(right)
+        self._check(self.builder.icmp_signed("<", exponent, ir.Constant(I64, 0)), _UNSUPPORTED)
+        result = self.builder.call(self._power_function(), [base, exponent])
+        self._check_error()
+        return (int, result)
+
+    def _power_function(self):
+        """Função interna naja_ipow(base, expoente) por quadrados sucessivos"""
+        function = self.module.globals.get("naja_ipow")
+        if function is not None:
+            return function
+        function = ir.Function(self.module, ir.FunctionType(I64, [I64, I64]), name="naja_ipow")
+        function.linkage = "internal"
+        base, exponent = function.args
+        entry = function.append_basic_block("entry")
+        loop = function.append_basic_block("loop")
+        multiply = function.append_basic_block("multiply")
+        square = function.append_basic_block("square")
+        done = function.append_basic_block("done")
+        overflow = function.append_basic_block("overflow")
+
+        builder = ir.IRBuilder(entry)
+        builder.branch(loop)
+
+        builder.position_at_end(loop)
+        result = builder.phi(I64)
+        factor = builder.phi(I64)
+        remaining = builder.phi(I64)
+        result.add_incoming(ir.Constant(I64, 1), entry)
+        factor.add_incoming(base, entry)
+        remaining.add_incoming(exponent, entry)
+        odd = builder.trunc(remaining, I1)
+        product = builder.smul_with_overflow(result, factor)
+        builder.cbranch(builder.and_(odd, builder.extract_value(product, 1)), overflow, multiply)
+
+        builder.position_at_end(multiply)
+        new_result = builder.select(odd, builder.extract_value(product, 0), result)
+        shifted = builder.ashr(remaining, ir.Constant(I64, 1))
+        builder.cbranch(builder.icmp_signed("==", shifted, ir.Constant(I64, 0)), done, square)
+
+        builder.position_at_end(square)
+        squared = builder.smul_with_overflow(factor, factor)
+        result.add_incoming(new_result, square)
+        factor.add_incoming(builder.extract_value(squared, 0), square)
+        remaining.add_incoming(shifted, square)
+        builder.cbranch(builder.extract_value(squared, 1), overflow, loop)
+
+        builder.position_at_end(done)
+        builder.ret(new_result)
+
+        builder.position_at_end(overflow)
+        builder.store(ir.Constant(I32, _OVERFLOW), self.error)
+        builder.ret(ir.Constant(I64, 0))
+        return function
+
+    def _negate(self, value):
+        if value[0] not in NUMERIC:
+            return None
+        result_type = float if value[0] is float else int
+        if self.builder is None:
+            return (result_type, None)
+        if value[0] is float:
+            return (float, self.builder.fneg(value[1]))
+        pair = self.builder.ssub_with_overflow(ir.Constant(I64, 0), self._as_int(value))
+        self._check(self.builder.extract_value(pair, 1), _OVERFLOW)
+        return (int, self.builder.extract_value(pair, 0))
+
+    def _compare(self, op, left, right):
+        """Comparação numérica exata, como entre int e float no Python"""
+        if left[0] not in NUMERIC or right[0] not in NUMERIC:
+            return None
+        if self.builder is None:
+            return (bool, None)
+        predicate = _COMPARISONS[op]
+        if left[0] is not float and right[0] is not float:
+            return (bool, self.builder.icmp_signed(predicate, self._as_int(left), self._as_int(right)))
+        for value in (left, right):
+            if value[0] is int:
+                self._check_exact(value[1])
+        a, b = self._as_float(left), self._as_float(right)
+        if op == NE:
+            return (bool, self.builder.fcmp_unordered(predicate, a, b))
+        return (bool, self.builder.fcmp_ordered(predicate, a, b))
+
+    def _truthy(self, value):
+        """Valor de verdade de Interpreter.is_truthy como i1"""
+        value_type = value[0]
+        if value_type not in _LLVM_TYPES:
+            return None
+        if self.builder is None or value_type is bool:
+            return (bool, value[1])
+        if value_type is int:
+            return (bool, self.builder.icmp_signed("!=", value[1], ir.Constant(I64, 0)))
+        if value_type is float:
+            return (bool, self.builder.fcmp_unordered("!=", value[1], ir.Constant(F64, 0.0)))
+        length = self.builder.extract_value(value[1], 1)
+        return (bool, self.builder.icmp_signed(">", length, ir.Constant(I64, 0)))
+
+    def _call_self(self, callee, arguments):
+        """Chamada direta da própria função, com exatamente a mesma assinatura"""
+        if callee[0] is not _SELF or tuple(argument[0] for argument in arguments) != self.signature:
+            return None
+        self.recursive = True
+        if self.builder is None:
+            return (self.return_type, None)
+        values = []
+        for argument_type, value in arguments:
+            if argument_type is NajaList:
+                values.extend((self.builder.extract_value(value, 0), self.builder.extract_value(value, 1)))
+            elif argument_type is bool:
+                values.append(self.builder.zext(value, I8))
             else:
-                raise ValueError(f"Tipo não suportado: {type(value)}")
-            self.stack.append(const)
-            
-        elif opcode == OpCode.POP:
-            self.stack.pop()
-            
-        elif opcode == OpCode.ADD:
-            right = self.stack.pop()
-            left = self.stack.pop()
-            result = self.builder.add(left, right)
-            self.stack.append(result)
-            
-        elif opcode == OpCode.SUB:
-            right = self.stack.pop()
-            left = self.stack.pop()
-            result = self.builder.sub(left, right)
-            self.stack.append(result)
-            
-        elif opcode == OpCode.MUL:
-            right = self.stack.pop()
-            left = self.stack.pop()
-            result = self.builder.mul(left, right)
-            self.stack.append(result)
-            
-        elif opcode == OpCode.DIV:
-            right = self.stack.pop()
-            left = self.stack.pop()
-            result = self.builder.sdiv(left, right)  # Divisão com sinal
-            self.stack.append(result)
-            
-        elif opcode == OpCode.LOAD:
-            name = instruction.operands[0]
-            if name not in self.variables:
-                # Aloca variável se não existir
-                alloca = self.builder.alloca(self.int32_t, name=name)
-                self.variables[name] = alloca
-                self.builder.store(ir.Constant(self.int32_t, 0), alloca)
-            
-            # Carrega valor da variável
-            value = self.builder.load(self.variables[name])
-            self.stack.append(value)
-            
-        elif opcode == OpCode.STORE:
-            name = instruction.operands[0]
-            value = self.stack.pop()
-            
-            if name not in self.variables:
-                # Aloca variável se não existir
-                alloca = self.builder.alloca(self.int32_t, name=name)
-                self.variables[name] = alloca
-                
-            # Armazena valor na variável
-            self.builder.store(value, self.variables[name])
-            
-        elif opcode == OpCode.RET:
-            if self.stack:
-                value = self.stack.pop()
-                self.builder.ret(value)
+                values.append(value)
+        result = self.builder.call(self.function, values)
+        self._check_error()
+        if self.return_type is bool:
+            result = self.builder.trunc(result, I1)
+        return (self.return_type, result)
+
+    def _list_method(self, method, obj, arguments):
+        """length() e get(i) de uma lista de float"""
+        if obj[0] is not NajaList:
+            return None
+        if method == "length" and not arguments:
+            return (int, None if self.builder is None else self.builder.extract_value(obj[1], 1))
+        if method != "get" or len(arguments) != 1 or arguments[0][0] not in (int, bool):
+            return None
+        if self.builder is None:
+            return (float, None)
+        index = self._as_int(arguments[0])
+        length = self.builder.extract_value(obj[1], 1)
+        # Comparação sem sinal: índices negativos também ficam fora
+        self._check(self.builder.icmp_unsigned(">=", index, length), _INDEX_ERROR)
+        address = self.builder.gep(self.builder.extract_value(obj[1], 0), [index])
+        return (float, self.builder.load(address))
+
+    # ------------------------------------------------------------------
+    # Geração
+    # ------------------------------------------------------------------
+
+    def generate(self, triple="", data_layout=""):
+        """Gera o ir.Module da função (analyze() precisa ter sido chamado)"""
+        self.module = ir.Module(name=self.symbol)
+        self.module.triple = triple
+        self.module.data_layout = data_layout
+        self.error = ir.GlobalVariable(self.module, I32, "naja_error")
+        self.error.initializer = ir.Constant(I32, 0)
+        if self.recursive:
+            self.depth = ir.GlobalVariable(self.module, I32, "naja_depth")
+            self.depth.initializer = ir.Constant(I32, 0)
+
+        parameters = [llvm_type for param_type in self.signature for llvm_type in _ARGUMENT_TYPES[param_type][0]]
+        function_type = ir.FunctionType(_RETURN_TYPES[self.return_type][0], parameters)
+        self.function = ir.Function(self.module, function_type, name=self.symbol)
+        # O bloco de entrada só tem as allocas e salta para 'start'
+        entry = self.function.append_basic_block("entry")
+        start = self.function.append_basic_block("start")
+        self.labels = {pc: self.function.append_basic_block(f"pc{pc}") for pc in sorted(self.entry_states)}
+        self.variables = {}   # {((escopo, slot), tipo): alloca}
+        self.exits = {}       # {código de erro: bloco de saída}
+        self.allocas = ir.IRBuilder(entry)
+        self.builder = ir.IRBuilder(start)
+
+        if self.recursive:
+            depth = self.builder.add(self.builder.load(self.depth), ir.Constant(I32, 1))
+            self.builder.store(depth, self.depth)
+            self._check(self.builder.icmp_signed(">", depth, ir.Constant(I32, MAX_NATIVE_DEPTH)), _RECURSION)
+
+        arguments = iter(self.function.args)
+        for name, param_type in zip(self.parameter_names(), self.signature):
+            if param_type is NajaList:
+                value = ir.Constant(LIST, ir.Undefined)
+                value = self.builder.insert_value(value, next(arguments), 0)
+                value = self.builder.insert_value(value, next(arguments), 1)
+            elif param_type is bool:
+                value = self.builder.icmp_signed("!=", next(arguments), ir.Constant(I8, 0))
             else:
-                self.builder.ret(ir.Constant(self.int32_t, 0))
-                
-        elif opcode == OpCode.CALL:
-            func_name = instruction.operands[0]
-            arg_count = instruction.operands[1]
-            
-            # Obtém argumentos da pilha
-            args = []
-            for _ in range(arg_count):
-                args.insert(0, self.stack.pop())
-                
-            # Obtém ou cria a função
-            if func_name not in self.functions:
-                # Cria tipo da função (todos os args são int32 por enquanto)
-                func_type = ir.FunctionType(self.int32_t, [self.int32_t] * arg_count)
-                func = ir.Function(self.module, func_type, name=func_name)
-                self.functions[func_name] = func
-                
-            # Chama a função
-            result = self.builder.call(self.functions[func_name], args)
-            self.stack.append(result)
-            
-        else:
-            raise NotImplementedError(f"Operação LLVM não implementada: {opcode}")
-            
-    def optimize(self):
-        """Aplica otimizações no código LLVM IR gerado"""
-        # TODO: Implementar otimizações usando o LLVM optimization pass manager
-        pass 
\ No newline at end of file
+                value = next(arguments)
+            self._store((_FUNCTION_SCOPE, self.declaration.scope[name]), (param_type, value))
+        self.builder.branch(self.labels[0])
+
+        self.returned = set()
+        for pc, label in self.labels.items():
+            self.builder.position_at_end(label)
+            self._run_block(pc, self.entry_states[pc])
+        self.allocas.branch(start)
+        return self.module
+
+    def _load(self, key, var_type):
+        if self.builder is None:
+            return None
+        return self.builder.load(self._slot(key, var_type))
+
+    def _store(self, key, value):
+        if self.builder is not None:
+            self.builder.store(value[1], self._slot(key, value[0]))
+
+    def _slot(self, key, var_type):
+        """alloca de uma variável com um tipo, no bloco de entrada (vira registrador no mem2reg)"""
+        slot = self.variables.get((key, var_type))
+        if slot is None:
+            slot = self.variables[(key, var_type)] = self.allocas.alloca(
+                _LLVM_TYPES[var_type], name=f"v{key[0]}_{key[1]}".replace("-", "f"))
+        return slot
+
+    def _branch(self, target):
+        if self.builder is not None:
+            self.builder.branch(self.labels[target])
+
+    def _return(self, value):
+        """ret, descontando a chamada do contador de recursão"""
+        if self.recursive:
+            depth = self.builder.load(self.depth)
+            self.builder.store(self.builder.sub(depth, ir.Constant(I32, 1)), self.depth)
+        self.builder.ret(value)
+
+    def _exit(self, code):
+        """Termina o bloco com uma saída para o interpretador"""
+        if self.builder is not None:
+            self.builder.branch(self._exit_block(code))
+        return []
+
+    def _exit_block(self, code):
+        """Bloco que marca naja_error com o código (0: já marcado) e retorna"""
+        block = self.exits.get(code)
+        if block is None:
+            block = self.exits[code] = self.function.append_basic_block(f"exit{code}")
+            with self.builder.goto_block(block):
+                if code:
+                    self.builder.store(ir.Constant(I32, code), self.error)
+                self._return(ir.Constant(self.function.function_type.return_type, 0))
+        return block
+
+    def _check(self, condition, code):
+        """Sai com o código se a condição for verdadeira"""
+        if self.builder is None:
+            return
+        block = self.function.append_basic_block()
+        self.builder.cbranch(condition, self._exit_block(code), block)
+        self.builder.position_at_end(block)
+
+    def _check_error(self):
+        """Propaga um erro marcado por uma chamada"""
+        flag = self.builder.load(self.error)
+        self._check(self.builder.icmp_signed("!=", flag, ir.Constant(I32, 0)), 0)
+
+    def _check_exact(self, value):
+        """Sai se o inteiro não tiver representação exata em double"""
+        builder = self.builder
+        limit = ir.Constant(I64, _EXACT_INT)
+        outside = builder.or_(builder.icmp_signed(">", value, limit),
+                              builder.icmp_signed("<", value, ir.Constant(I64, -_EXACT_INT)))
+        self._check(outside, _INEXACT)
+
+    def _as_int(self, value):
+        if value[0] is bool:
+            return self.builder.zext(value[1], I64)
+        return value[1]
+
+    def _as_float(self, value):
+        if value[0] is float:
+            return value[1]
+        if value[0] is bool:
+            return self.builder.uitofp(value[1], F64)
+        return self.builder.sitofp(value[1], F64)
+
+
+def _variable(scopes, depth, slot):
+    """Chave (escopo, slot) de uma variável; None se ela estiver fora da função"""
+    index = len(scopes) - 1 - depth
+    return (scopes[index], slot) if index >= 0 else None
+
+
+def _forget(scope_id, types, maybe, consts):
+    """Remove do estado as variáveis de um escopo (bloco novo ou que acabou)"""
+    types = {key: var_type for key, var_type in types.items() if key[0] != scope_id}
+    maybe = frozenset(key for key in maybe if key[0] != scope_id)
+    consts = frozenset(key for key in consts if key[0] != scope_id)
+    return types, maybe, consts
+
+
+def _merge(a, b):
+    """Estado na junção de dois caminhos"""
+    if a[0] != b[0]:
+        raise Exception("Caminhos chegam com escopos diferentes")
+    types = {key: (var_type if b[1][key] is var_type else _CONFLICT)
+             for key, var_type in a[1].items() if key in b[1]}
+    return (a[0], types, a[2] | b[2], a[3] | b[3])
+
+
+def optimize_module(llvm_module, target_machine):
+    """Otimiza um módulo com o pipeline -O3 do LLVM"""
+    if hasattr(llvm, "create_pass_builder"):
+        # Gerenciador de passes novo (llvmlite >= 0.44)
+        pass_builder = llvm.create_pass_builder(target_machine, llvm.PipelineTuningOptions(speed_level=3))
+        pass_builder.getModulePassManager().run(llvm_module, pass_builder)
+        return
+    pmb = llvm.create_pass_manager_builder()
+    pmb.opt_level = 3
+    pm = llvm.create_module_pass_manager()
+    pmb.populate(pm)
+    pm.run(llvm_module)
+
+
+class LLVMJITCompiler:
+    """
+    Compilador JIT que gera código de máquina no próprio processo com o MCJIT
+
+    Tem a interface usada pelo TieredJIT (is_optimizable e compile_function,
+    como o CJITCompiler). O 'interpreter' fornece os caches de método
+    usados pelo NajaBytecodeCompiler.
+
+    O bytecode de cada função é gerado em is_optimizable, que o TieredJIT
+    chama na thread principal: gerá-lo cria os caches inline dos MethodCall
+    (expr.inline_cache e interpreter.method_caches), que a thread principal
+    também altera. A thread de compilação só lê o bytecode já pronto.
+    """
+    def __init__(self, interpreter, verbose=True):
+        self.interpreter = interpreter
+        self.verbose = verbose
+        self.compiled_functions = {}  # {(declaração, assinatura): função}, nesta execução
+        self._bytecode = {}  # {declaração: CodeObject}, gerado na thread principal
+        self._engines = []  # Mantêm vivo o código de máquina das funções carregadas
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def is_optimizable(self, ast_node, signature=None):
+        """
+        Verifica se uma função pode ser traduzida para a assinatura
+
+        'signature' são os tipos Python dos argumentos (int, float, bool ou
+        NajaList de float); sem ela, valem os tipos declarados. A função é
+        aceita se algum caminho do corpo chega a um return em código nativo.
+        """
+        try:
+            if isinstance(ast_node, FunctionDeclaration) and ast_node not in self._bytecode:
+                self._bytecode[ast_node] = NajaBytecodeCompiler(self.interpreter).compile_function(ast_node)
+            return self._generator(ast_node, signature) is not None
+        except Exception:
+            return False
+
+    def compile_function(self, ast_function, environment, signature=None):
+        """
+        Compila uma função para código de máquina
+
+        :param ast_function: Nó AST da função a ser compilada
+        :param environment: Ambiente de execução (não usado: o código só lê os argumentos)
+        :param signature: Tipos Python dos argumentos da especialização (padrão: os declarados)
+        :return: Função Python que chama o código nativo
+        """
+        generator = self._generator(ast_function, signature)
+        if generator is None:
+            raise Exception(f"Função '{ast_function.name}' não pode ser compilada com essa assinatura")
+        key = (ast_function, generator.signature)
+        if key in self.compiled_functions:
+            return self.compiled_functions[key]
+
+        self._log(f"LLVMJITCompiler: Compilando função '{ast_function.name}' "
+                  f"({', '.join(param_type.__name__ for param_type in generator.signature) or 'void'})")
+        target_machine = llvm.Target.from_default_triple().create_target_machine(opt=3)
+        module = generator.generate(llvm.get_process_triple(), str(target_machine.target_data))
+        llvm_module = llvm.parse_assembly(str(module))
+        llvm_module.verify()
+        optimize_module(llvm_module, target_machine)
+
+        engine = llvm.create_mcjit_compiler(llvm_module, target_machine)
+        engine.finalize_object()
+        self._engines.append(engine)
+        native_function = self._bind(engine, generator)
+        self.compiled_functions[key] = native_function
+        return native_function
+
+    def _generator(self, declaration, signature):
+        """NajaLLVMGenerator já analisado para a assinatura, ou None"""
+        if not isinstance(declaration, FunctionDeclaration):
+            return None
+        if signature is None:
+            signature = declared_signature(declaration)
+        if signature is None or any(param_type not in _ARGUMENT_TYPES for param_type in signature):
+            return None
+        code = self._bytecode.get(declaration)
+        if code is None:
+            # Chamada direta, fora do TieredJIT: já está na thread do chamador
+            code = self._bytecode[declaration] = NajaBytecodeCompiler(self.interpreter).compile_function(declaration)
+        generator = NajaLLVMGenerator(code, declaration, signature)
+        generator.analyze()
+        return generator
+
+    def _bind(self, engine, generator):
+        """Função Python que chama o código nativo e verifica naja_error
+
+        Listas são copiadas para um array('d') contíguo, como no CJITCompiler.
+        """
+        function_name = generator.declaration.name
+        signature = generator.signature
+        argument_types = [c_type for param_type in signature for c_type in _ARGUMENT_TYPES[param_type][1]]
+        function_type = ctypes.CFUNCTYPE(_RETURN_TYPES[generator.return_type][1], *argument_types)
+        c_func = function_type(engine.get_function_address(generator.symbol))
+        error = ctypes.c_int.from_address(engine.get_global_value_address("naja_error"))
+
+        def check_error():
+            code = error.value
+            error.value = 0
+            exception_type, message = _NATIVE_ERRORS.get(code, (ArithmeticError, f"Erro {code}"))
+            raise exception_type(f"{message} em '{function_name}'")
+
+        list_positions = [index for index, param_type in enumerate(signature) if param_type is NajaList]
+        if not list_positions:
+            def native_function(*args):
+                result = c_func(*args)
+                if error.value:
+                    check_error()
+                return result
+
+            return native_function
+
+        def native_function(*args):
+            c_args = list(args)
+            # Mantém os buffers vivos durante a chamada
+            buffers = []
+            for index in reversed(list_positions):
+                elements = args[index]._elements
+                if not FLOAT_ONLY.issuperset(map(type, elements)):
+                    raise TypeError(f"Lista com elementos que não são float em '{function_name}'")
+                buffer = array('d', elements)
+                buffers.append(buffer)
+                c_args[index:index + 1] = (buffer.buffer_info()[0], len(buffer))
+
+            result = c_func(*c_args)
+            if error.value:
+                check_error()
+            return result
+
+        return native_function
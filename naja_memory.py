@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Relatório de memória de programas NajaScript (--mem-report e memory())
+
+Cada instantâneo percorre os objetos alcançáveis a partir do interpretador
+(ambiente global, ambientes das chamadas em andamento, módulos importados
+e nativos) com gc.get_referents. Cada objeto do runtime (Environment,
+Function, NajaList, NajaDict, NajaObject, ambientes de módulo, objetos
+nativos como o Storage...) é um dono, e os objetos Python que ele alcança
+primeiro (dicionários, listas, strings, números) contam no tamanho retido
+dele; assim cada byte é contado uma única vez, no primeiro dono
+encontrado. As ASTs dos arquivos parseados são contadas à parte, nó a nó,
+pela linha de cada nó. O tracemalloc dá o total do heap Python e as
+linhas do interpretador que mais cresceram entre instantâneos.
+
+Com --mem-report, enquanto o programa roda, os construtores dos objetos do
+runtime guardam a linha NajaScript da instrução que os criou, e o relatório
+agrupa os donos por essa linha; --mem-interval grava instantâneos
+periódicos e mostra o crescimento entre eles. Sem --mem-report, memory()
+funciona igual, mas sem a linha de criação.
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import types
+import weakref
+import tracemalloc
+
+from ast_nodes import walk, Node
+from environment import Environment, SlotEnvironment
+from interpreter import (Interpreter, Function, NajaModule, NajaList, NajaDict, NajaSet, NajaMap, NajaTuple,
+                         NajaVector, NajaObject)
+from naja_profiler import FunctionIndex
+from naja_trace import Instrumentation, _location
+
+_ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+_CALL_CODE = Function.__call__.__code__
+
+# Classes cujos construtores guardam a linha de criação (as subclasses de Function usam o da base,
+# SlotEnvironment não chama o de Environment)
+_RECORDED_CLASSES = (Environment, SlotEnvironment, NajaList, NajaDict, NajaSet, NajaMap, NajaTuple, NajaVector,
+                     NajaObject, Function, NajaModule)
+
+# Objetos que o percurso não conta nem atravessa: código, classes, módulos Python e o interpretador
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+                  types.CodeType, types.FrameType, weakref.ReferenceType, Interpreter, Node)
+_CONTAINER_TYPES = (dict, list, tuple, set, frozenset)
+
+_SKIP, _LEAF, _CONTAINER, _OWNER = range(4)
+
+# Instruções entre as verificações do relógio para os instantâneos periódicos
+_CHECK_EVERY = 1000
+
+
+class MemoryReport(Instrumentation):
+    """Instantâneos da memória de um interpretador, com a linha de criação dos objetos após start()"""
+
+    def __init__(self, interpreter, interval=0.0, limit=15):
+        super().__init__(interpreter)
+        self.interval = interval  # Segundos entre instantâneos periódicos (0: só os pedidos)
+        self.limit = limit  # Locais de alocação guardados por instantâneo
+        self.snapshots = []
+        self._functions = FunctionIndex(interpreter)
+        self._origins = {}  # id(objeto) -> (weakref, (arquivo, linha) de criação)
+        self._line = (None, None)  # (arquivo, linha) da instrução em execução
+        self._kinds = {}  # classe -> _SKIP, _LEAF, _CONTAINER ou _OWNER
+        self._tracemalloc_snapshot = None
+        self._started = None
+        self._stop_tracemalloc = False
+        self._next_snapshot = None
+        self._countdown = _CHECK_EVERY
+
+    def start(self):
+        """Liga o tracemalloc e passa a guardar a linha de criação dos objetos do runtime"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._stop_tracemalloc = True
+        self._started = time.perf_counter()
+        if self.interval:
+            self._next_snapshot = self._started + self.interval
+        self.interpreter.memory_report = self
+        self.interpreter.set_instrumentation(self)
+        self._patch(Function, "__call__", self._traced_call(Function.__call__))
+        for cls in _RECORDED_CLASSES:
+            self._patch(cls, "__init__", self._recording_init(cls.__init__))
+        self._patch_module_loading()
+
+    def stop(self):
+        """Grava o instantâneo final e desfaz a instrumentação"""
+        if self._started is None:
+            return
+        try:
+            self.snapshot("final")
+        finally:
+            self._restore()
+            self.interpreter.set_instrumentation(None)
+            self.interpreter.memory_report = None
+            self._started = None
+            if self._stop_tracemalloc:
+                tracemalloc.stop()
+                self._stop_tracemalloc = False
+
+    def wrap(self, prefix, handler):
+        """Handler de instrução que marca a linha atual; expressões não são embrulhadas"""
+        if prefix != "execute":
+            return handler
+        interpreter = self.interpreter
+
+        def traced(stmt):
+            outer_line, self._line = self._line, (self._file or interpreter.current_file, stmt.line)
+            if self._next_snapshot is not None:
+                self._countdown -= 1
+                if not self._countdown:
+                    self._countdown = _CHECK_EVERY
+                    if time.perf_counter() >= self._next_snapshot:
+                        self.snapshot("periódico")
+                        self._next_snapshot = time.perf_counter() + self.interval
+            try:
+                return handler(stmt)
+            finally:
+                self._line = outer_line
+
+        return traced
+
+    def _traced_call(self, call):
+        """Function.__call__ que acompanha o arquivo da função em execução"""
+        def traced_call(function, interpreter, arguments):
+            if interpreter is not self.interpreter:
+                return call(function, interpreter, arguments)
+            outer_file = self._file
+            self._file = self._functions.label(function.declaration, outer_file or interpreter.current_file)[1]
+            try:
+                return call(function, interpreter, arguments)
+            finally:
+                self._file = outer_file
+
+        return traced_call
+
+    def _recording_init(self, init):
+        """__init__ que guarda a linha NajaScript da instrução que criou o objeto"""
+        origins = self._origins
+
+        def recording_init(obj, *args, **kwargs):
+            init(obj, *args, **kwargs)
+            key = id(obj)
+            origins[key] = (weakref.ref(obj, lambda _, key=key: origins.pop(key, None)), self._line)
+
+        return recording_init
+
+    def _origin(self, obj):
+        """(arquivo, linha) de criação de um objeto, ou (None, None) se desconhecida"""
+        entry = self._origins.get(id(obj))
+        if entry is not None and entry[0]() is obj:
+            return entry[1]
+        return (None, None)
+
+    def snapshot(self, reason="memory()"):
+        """Mede a memória agora; com start() ativo, o instantâneo entra na série do relatório"""
+        if tracemalloc.is_tracing():
+            python_current, python_peak = tracemalloc.get_traced_memory()
+        else:
+            python_current = python_peak = None
+        categories, sites = self._measure()
+        snapshot = {
+            "motivo": reason,
+            "tempo_s": time.perf_counter() - self._started if self._started is not None else 0.0,
+            "python_atual_bytes": python_current,
+            "python_pico_bytes": python_peak,
+            "categorias": {name: {"objetos": count, "bytes": size}
+                           for name, (count, size) in sorted(categories.items(), key=lambda item: -item[1][1])},
+            "locais": [{"categoria": category, "arquivo": file, "linha": line, "objetos": count, "bytes": size}
+                       for (category, file, line), (count, size) in sorted(sites.items(),
+                                                                           key=lambda item: -item[1][1])[:self.limit]],
+        }
+        if self._started is not None:
+            snapshot["crescimento_python"] = self._python_growth()
+            self.snapshots.append(snapshot)
+        return snapshot
+
+    def _measure(self):
+        """{categoria: [objetos, bytes]} e {(categoria, arquivo, linha): [objetos, bytes]}"""
+        categories = {}
+        sites = {}
+        module_envs = {id(module.environment): name for name, module in self.interpreter.imported_modules.items()
+                       if isinstance(module, NajaModule)}
+
+        root = (_entry(categories, "interpretador"), _entry(sites, ("interpretador", None, None)))
+        stack = [(obj, root) for obj in self._roots()]
+        seen = set()
+        while stack:
+            obj, owner = stack.pop()
+            key = id(obj)
+            if key in seen:
+                continue
+            cls = type(obj)
+            kind = self._kinds.get(cls)
+            if kind is None:
+                kind = self._kinds[cls] = _kind(cls)
+            if kind == _SKIP:
+                continue
+            seen.add(key)
+            if kind == _OWNER:
+                category = _category(obj, cls, module_envs)
+                owner = (_entry(categories, category), _entry(sites, (category,) + self._origin(obj)))
+                owner[0][0] += 1
+                owner[1][0] += 1
+            size = sys.getsizeof(obj)
+            owner[0][1] += size
+            owner[1][1] += size
+            if kind != _LEAF:
+                stack.extend((ref, owner) for ref in gc.get_referents(obj))
+
+        # ASTs: cada nó na linha em que aparece no arquivo
+        for path, ast in self.interpreter.parsed_files or ():
+            for node in walk(ast):
+                key = id(node)
+                if key in seen:
+                    continue
+                seen.add(key)
+                size = sys.getsizeof(node)
+                if hasattr(node, "__dict__"):
+                    size += sys.getsizeof(node.__dict__)
+                for entry in (_entry(categories, "AST"), _entry(sites, ("AST", path, node.line))):
+                    entry[0] += 1
+                    entry[1] += size
+        return categories, sites
+
+    def _roots(self):
+        """Objetos a partir dos quais o percurso começa"""
+        interpreter = self.interpreter
+        roots = [interpreter.globals, interpreter.environment, interpreter.imported_modules, interpreter.modules,
+                 interpreter.type_registry]
+        # Ambientes das chamadas em andamento, que só as pilhas Python referenciam
+        frame = sys._getframe()
+        while frame is not None:
+            if frame.f_code is _CALL_CODE:
+                roots.append(frame.f_locals.get("environment"))
+            frame = frame.f_back
+        return [root for root in roots if root is not None]
+
+    def _python_growth(self, limit=5):
+        """Linhas Python que mais cresceram desde o último instantâneo, pelo tracemalloc"""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot()
+        previous, self._tracemalloc_snapshot = self._tracemalloc_snapshot, snapshot
+        if previous is None:
+            return []
+        growth = []
+        for stat in snapshot.compare_to(previous, "lineno"):
+            if stat.size_diff <= 0 or len(growth) == limit:
+                break
+            frame = stat.traceback[0]
+            # As alocações do próprio relatório não interessam
+            if frame.filename in (__file__, tracemalloc.__file__):
+                continue
+            growth.append({"arquivo": frame.filename, "linha": frame.lineno, "bytes": stat.size_diff})
+        return growth
+
+    def write_json(self, path):
+        """Grava a série de instantâneos em JSON"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"intervalo_s": self.interval, "instantaneos": self.snapshots}, file,
+                      ensure_ascii=False, indent=2)
+
+    def report(self, limit=15):
+        """Linhas do último instantâneo e do crescimento entre os instantâneos"""
+        if not self.snapshots:
+            return []
+        last = self.snapshots[-1]
+        lines = []
+        if last["python_atual_bytes"] is not None:
+            lines.append(f"Heap Python (tracemalloc): atual {_kb(last['python_atual_bytes'])}, "
+                         f"pico {_kb(last['python_pico_bytes'])}")
+        lines.append(f"{'objetos':>9} {'retido':>11}  categoria")
+        for name, entry in list(last["categorias"].items())[:limit]:
+            lines.append(f"{entry['objetos']:9d} {_kb(entry['bytes']):>11}  {name}")
+        lines.append("")
+        lines.append(f"{'objetos':>9} {'retido':>11}  local de criação")
+        for site in last["locais"][:limit]:
+            location = _location(site["arquivo"], site["linha"])
+            lines.append(f"{site['objetos']:9d} {_kb(site['bytes']):>11}  {site['categoria']} em {location}")
+
+        if len(self.snapshots) > 1:
+            lines.append("")
+            lines.append("Crescimento entre instantâneos:")
+            for previous, current in zip(self.snapshots, self.snapshots[1:]):
+                lines.append(f"  {current['tempo_s']:7.2f}s ({current['motivo']}): " + _growth(previous, current))
+                for site in current.get("crescimento_python", []):
+                    lines.append(f"           +{_kb(site['bytes'])} em {_location(site['arquivo'], site['linha'])}")
+        return lines
+
+
+def memory_summary(interpreter):
+    """Valor do builtin memory(): NajaDict {categoria: bytes retidos}, com 'total' e 'python'"""
+    report = interpreter.memory_report
+    if report is None:
+        # Medição avulsa: não deixa o interpretador guardando as ASTs dos próximos arquivos
+        keeping = interpreter.parsed_files is not None
+        report = MemoryReport(interpreter)
+        if not keeping:
+            interpreter.parsed_files = None
+    snapshot = report.snapshot()
+    summary = NajaDict()
+    summary.add("total", sum(entry["bytes"] for entry in snapshot["categorias"].values()))
+    if snapshot["python_atual_bytes"] is not None:
+        summary.add("python", snapshot["python_atual_bytes"])
+    for name, entry in snapshot["categorias"].items():
+        summary.add(name, entry["bytes"])
+    return summary
+
+
+def _kind(cls):
+    """Como o percurso trata as instâncias de 'cls'"""
+    if issubclass(cls, _SKIPPED_TYPES):
+        return _SKIP
+    if cls in _CONTAINER_TYPES:
+        return _CONTAINER
+    module = sys.modules.get(cls.__module__)
+    path = getattr(module, "__file__", None)
+    if path and os.path.dirname(os.path.abspath(path)) == _ROOT_DIR:
+        return _OWNER
+    return _LEAF
+
+
+def _category(obj, cls, module_envs):
+    """Categoria de um objeto dono no relatório"""
+    if issubclass(cls, Environment):
+        name = module_envs.get(id(obj))
+        return f"módulo {name}" if name else "Environment"
+    if issubclass(cls, Function):
+        return "Function"
+    return cls.__name__
+
+
+def _entry(table, key):
+    """[objetos, bytes] de 'key' em 'table', criado se preciso"""
+    entry = table.get(key)
+    if entry is None:
+        entry = table[key] = [0, 0]
+    return entry
+
+
+def _growth(previous, current):
+    """Resumo da variação por categoria entre dois instantâneos"""
+    parts = []
+    if previous["python_atual_bytes"] is not None and current["python_atual_bytes"] is not None:
+        parts.append(f"python {_signed_kb(current['python_atual_bytes'] - previous['python_atual_bytes'])}")
+    changes = []
+    for name in set(previous["categorias"]) | set(current["categorias"]):
+        before = previous["categorias"].get(name, {"objetos": 0, "bytes": 0})
+        after = current["categorias"].get(name, {"objetos": 0, "bytes": 0})
+        if after["bytes"] != before["bytes"]:
+            changes.append((after["bytes"] - before["bytes"], after["objetos"] - before["objetos"], name))
+    for size, count, name in sorted(changes, key=lambda change: -abs(change[0]))[:5]:
+        parts.append(f"{name} {count:+d} ({_signed_kb(size)})")
+    return "; ".join(parts) or "sem variação"
+
+
+def _kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+def _signed_kb(size):
+    return f"{size / 1024:+.1f} KB"
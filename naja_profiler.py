@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Profiler por amostragem de programas NajaScript (--profile)
+
+Uma thread de fundo lê, a intervalos fixos, a pilha Python da thread que
+executa o interpretador (sys._current_frames) e a traduz para a pilha do
+NajaScript: cada Function.__call__ é um quadro da função chamada, cada
+_load_module é um quadro do módulo sendo carregado e o Interpreter.execute
+mais interno dá a instrução atual, com a sua linha, como folha da pilha.
+Como nada é instalado no interpretador (nem sys.settrace nem contadores em
+execute), o profiler desligado não custa nada e, ligado, o custo fica só
+na thread de amostragem.
+
+As pilhas são gravadas no formato collapsed (uma linha "a;b;c N" por
+pilha, lido pelo flamegraph.pl, inferno e speedscope) e no formato JSON do
+speedscope, com as amostras em ordem e o peso de cada uma em milissegundos.
+
+Nos modos --closures e --vm os corpos não passam por Interpreter.execute,
+então as pilhas têm só as funções, sem a instrução atual; funções que já
+rodam compiladas pelo JIT aparecem sem nada abaixo delas.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter
+
+from ast_nodes import walk, FunctionDeclaration, ClassDeclaration
+from interpreter import Interpreter, Function
+
+DEFAULT_INTERVAL = 0.005
+
+# Códigos das funções do interpretador reconhecidas na pilha Python
+_CALL_CODE = Function.__call__.__code__
+_EXECUTE_CODE = Interpreter.execute.__code__
+_MODULE_CODE = Interpreter._load_module.__code__
+
+
+class FunctionIndex:
+    """Nome e arquivo das funções e métodos dos arquivos parseados por um interpretador
+
+    Criado antes de parsear o programa, para que o interpretador guarde as
+    ASTs desde o arquivo principal (Interpreter.keep_parsed_files).
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        interpreter.keep_parsed_files()
+        self._labels = {}  # declaração -> (nome, arquivo)
+        self._indexed_files = 0
+
+    def label(self, declaration, file=None):
+        """(nome, arquivo) de uma função; métodos aparecem como Classe.método"""
+        if declaration not in self._labels:
+            self._index_files()
+        return self._labels.get(declaration, (getattr(declaration, "name", "?"), file))
+
+    def _index_files(self):
+        """Registra as funções e métodos dos arquivos parseados desde a última vez"""
+        parsed = self.interpreter.parsed_files or []
+        for path, ast in parsed[self._indexed_files:]:
+            for node in walk(ast):
+                if isinstance(node, ClassDeclaration):
+                    for method in node.methods:
+                        self._labels[method] = (f"{node.name}.{method.name}", path)
+                elif isinstance(node, FunctionDeclaration) and node not in self._labels:
+                    self._labels[node] = (node.name, path)
+        self._indexed_files = len(parsed)
+
+
+class SamplingProfiler:
+    """Amostra a pilha do NajaScript da thread do interpretador a cada 'interval' segundos"""
+
+    def __init__(self, interpreter, interval=DEFAULT_INTERVAL):
+        self.interpreter = interpreter
+        self.interval = interval
+        self.samples = []  # [(pilha, instrução), segundos, amostras], amostras seguidas iguais somadas
+        self.sample_count = 0
+        self.elapsed = 0.0
+        self._functions = FunctionIndex(interpreter)
+        self._root = None
+        self._thread_id = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._switch_interval = None
+
+    def start(self):
+        """Começa a amostrar a thread atual"""
+        main_file = self.interpreter.current_file
+        self._root = (f"<{os.path.basename(main_file)}>" if main_file else "<programa>", main_file, None)
+        self._thread_id = threading.get_ident()
+        # A thread de amostragem só roda quando o interpretador solta o GIL
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="naja-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a amostragem"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        """Laço da thread de amostragem"""
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            now = time.perf_counter()
+            weight, last = now - last, now
+            if frame is None:
+                continue
+            key = self._stack(frame)
+            del frame
+            self.sample_count += 1
+            self.elapsed += weight
+            if self.samples and self.samples[-1][0] == key:
+                self.samples[-1][1] += weight
+                self.samples[-1][2] += 1
+            else:
+                self.samples.append([key, weight, 1])
+
+    def _stack(self, frame):
+        """(pilha, instrução) do NajaScript a partir de uma pilha Python
+
+        A pilha vai da raiz para a função atual; cada quadro é (nome,
+        arquivo, linha), com a linha da declaração das funções. A instrução
+        é o quadro do tipo da instrução atual com a sua linha, ou None.
+        """
+        python_frames = []
+        while frame is not None:
+            code = frame.f_code
+            if code is _CALL_CODE or code is _EXECUTE_CODE or code is _MODULE_CODE:
+                python_frames.append(frame)
+            frame = frame.f_back
+
+        stack = [self._root]
+        file = self._root[1]
+        statement = None
+        for frame in reversed(python_frames):
+            code = frame.f_code
+            if code is _EXECUTE_CODE:
+                statement = frame.f_locals.get("stmt")
+                continue
+            if code is _CALL_CODE:
+                function = frame.f_locals.get("self")
+                if not isinstance(function, Function):
+                    continue
+                name, file = self._functions.label(function.declaration, file)
+                stack.append((name, file, function.declaration.line))
+            else:
+                # Enquanto o módulo é procurado o caminho ainda não existe
+                module_name = frame.f_locals.get("module_name")
+                file = frame.f_locals.get("module_path")
+                stack.append((f"<{module_name}>", file, None))
+            statement = None
+        if statement is not None:
+            statement = (type(statement).__name__, file, statement.line)
+        return tuple(stack), statement
+
+    @staticmethod
+    def _frame_name(frame):
+        """Nome de um quadro nas saídas: 'nome (arquivo:linha)'"""
+        name, file, line = frame
+        if file is None:
+            return name
+        location = os.path.basename(file) if line is None else f"{os.path.basename(file)}:{line}"
+        return f"{name} ({location})"
+
+    @staticmethod
+    def _full_stack(key):
+        """Quadros de uma amostra, com a instrução atual como folha"""
+        stack, statement = key
+        return stack if statement is None else stack + (statement,)
+
+    def collapsed(self):
+        """Linhas no formato collapsed: quadros separados por ';' e a quantidade de amostras"""
+        counts = Counter()
+        for key, _, count in self.samples:
+            counts[self._full_stack(key)] += count
+        return [f"{';'.join(self._frame_name(frame) for frame in stack)} {count}"
+                for stack, count in sorted(counts.items(), key=lambda item: -item[1])]
+
+    def write_collapsed(self, path):
+        """Grava as pilhas no formato collapsed (flamegraph.pl, inferno, speedscope)"""
+        with open(path, "w", encoding="utf-8") as file:
+            for line in self.collapsed():
+                file.write(line + "\n")
+
+    def speedscope(self, name="NajaScript"):
+        """Perfil no formato de arquivo do speedscope (https://www.speedscope.app)"""
+        frames = {}
+        samples = []
+        weights = []
+        for key, weight, _ in self.samples:
+            indexes = []
+            for frame in self._full_stack(key):
+                if frame not in frames:
+                    frames[frame] = len(frames)
+                indexes.append(frames[frame])
+            samples.append(indexes)
+            weights.append(weight * 1000)
+        shared = []
+        for frame_name, file, line in frames:
+            entry = {"name": frame_name}
+            if file is not None:
+                entry["file"] = file
+            if line is not None:
+                entry["line"] = line
+            shared.append(entry)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": shared},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "activeProfileIndex": 0,
+            "exporter": "najascript --profile",
+        }
+
+    def write_speedscope(self, path, name="NajaScript"):
+        """Grava o perfil no formato JSON do speedscope"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.speedscope(name), file, ensure_ascii=False)
+
+    def report(self, limit=15):
+        """Linhas com as funções e as instruções mais quentes (tempo próprio e total)"""
+        own = Counter()
+        total = Counter()
+        statements = Counter()
+        for (stack, statement), weight, _ in self.samples:
+            own[stack[-1]] += weight
+            for frame in set(stack):
+                total[frame] += weight
+            if statement is not None:
+                statements[statement] += weight
+
+        elapsed = self.elapsed or 1.0
+        lines = [f"{self.sample_count} amostras a cada {self.interval * 1000:.1f} ms ({self.elapsed:.2f} s)",
+                 f"{'próprio':>8} {'total':>7}  função"]
+        for frame, weight in own.most_common(limit):
+            lines.append(f"{weight / elapsed * 100:7.1f}% {total[frame] / elapsed * 100:6.1f}%  {self._frame_name(frame)}")
+        if statements:
+            lines.append("")
+            lines.append(f"{'amostras':>8}  instrução")
+            for frame, weight in statements.most_common(limit):
+                lines.append(f"{weight / elapsed * 100:7.1f}%  {self._frame_name(frame)}")
+        return lines
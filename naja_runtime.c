@@ -0,0 +1,1430 @@
+/*
+ * Runtime dos executáveis gerados pelo compilador AOT do NajaScript
+ *
+ * Todo valor é um NajaValue* com contagem de referências: None, booleanos,
+ * inteiros de 64 bits, floats, strings UTF-8 imutáveis, listas que crescem
+ * sob demanda e dicionários com ordem de inserção. O código gerado pelo
+ * AOTCompiler (aot_compiler.py) só manipula ponteiros e chama as funções
+ * naja_* deste arquivo, que reproduzem a semântica do interpretador
+ * (conversões para texto como str() do Python, concatenação com '+',
+ * divisão sempre em float, resto com o sinal do divisor, métodos nativos de
+ * listas, dicionários e strings e as mesmas mensagens de erro).
+ *
+ * Convenção de referências: as funções recebem os argumentos emprestados e
+ * retornam uma referência nova, que o chamador libera com naja_decref.
+ * Valores imortais (None, booleanos, inteiros pequenos e as constantes do
+ * programa) têm contagem negativa e nunca são liberados. Ciclos (uma lista
+ * que contém a si mesma) não são coletados.
+ *
+ * Um erro de execução imprime a mensagem em stderr e encerra o processo com
+ * código 1.
+ */
+
+#include <math.h>
+#include <stdarg.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef enum {
+    NAJA_NONE,
+    NAJA_BOOL,
+    NAJA_INT,
+    NAJA_FLOAT,
+    NAJA_STRING,
+    NAJA_LIST,
+    NAJA_DICT
+} NajaType;
+
+typedef struct NajaValue NajaValue;
+
+typedef struct {
+    NajaValue *key;     /* NULL: entrada removida */
+    NajaValue *value;
+} NajaEntry;
+
+struct NajaValue {
+    long long refcount;     /* negativo: valor imortal */
+    NajaType type;
+    union {
+        long long integer;  /* NAJA_INT e NAJA_BOOL */
+        double number;
+        struct {
+            char *data;         /* bytes UTF-8 terminados em '\0' */
+            long long size;     /* bytes */
+            long long length;   /* caracteres (pontos de código) */
+        } string;
+        struct {
+            NajaValue **items;
+            long long length;
+            long long capacity;
+        } list;
+        struct {
+            NajaEntry *entries; /* em ordem de inserção */
+            long long used;     /* entradas ocupadas, incluindo removidas */
+            long long capacity;
+            long long length;   /* entradas vivas */
+            long long *index;   /* tabela hash: posição em entries ou -1 */
+            long long index_size;
+        } dict;
+        NajaValue *next_free;
+    } as;
+};
+
+/* Tipos das declarações sem valor inicial (ver naja_default) */
+enum {
+    NAJA_DEFAULT_ANY,
+    NAJA_DEFAULT_INT,
+    NAJA_DEFAULT_FLOAT,
+    NAJA_DEFAULT_STRING,
+    NAJA_DEFAULT_BOOL,
+    NAJA_DEFAULT_LIST,
+    NAJA_DEFAULT_DICT
+};
+
+/* Métodos nativos conhecidos pelo compilador (ver naja_method) */
+enum {
+    NAJA_METHOD_LENGTH,
+    NAJA_METHOD_GET,
+    NAJA_METHOD_ADD,
+    NAJA_METHOD_REMOVE,
+    NAJA_METHOD_REMOVE_LAST,
+    NAJA_METHOD_SUBSTRING
+};
+
+#define NAJA_SMALL_INT_MIN (-5)
+#define NAJA_SMALL_INT_MAX 1024
+
+static NajaValue none_value = { -1, NAJA_NONE, { 0 } };
+static NajaValue true_value = { -1, NAJA_BOOL, { 1 } };
+static NajaValue false_value = { -1, NAJA_BOOL, { 0 } };
+static NajaValue small_ints[NAJA_SMALL_INT_MAX - NAJA_SMALL_INT_MIN + 1];
+
+/* Valores liberados, reutilizados pelas próximas alocações */
+static NajaValue *free_values = NULL;
+
+NajaValue *naja_str(NajaValue *value);
+
+/* ------------------------------------------------------------------------
+ * Texto auxiliar
+ * ------------------------------------------------------------------------ */
+
+typedef struct {
+    char *data;
+    long long size;
+    long long capacity;
+} NajaBuffer;
+
+static void naja_fatal(const char *format, ...);
+
+static void buffer_reserve(NajaBuffer *buffer, long long extra)
+{
+    if (buffer->size + extra + 1 <= buffer->capacity)
+        return;
+    long long capacity = buffer->capacity ? buffer->capacity : 64;
+    while (capacity < buffer->size + extra + 1)
+        capacity *= 2;
+    char *data = realloc(buffer->data, (size_t) capacity);
+    if (data == NULL)
+        naja_fatal("memória insuficiente");
+    buffer->data = data;
+    buffer->capacity = capacity;
+}
+
+static void buffer_append(NajaBuffer *buffer, const char *data, long long size)
+{
+    buffer_reserve(buffer, size);
+    memcpy(buffer->data + buffer->size, data, (size_t) size);
+    buffer->size += size;
+    buffer->data[buffer->size] = '\0';
+}
+
+static void buffer_append_text(NajaBuffer *buffer, const char *text)
+{
+    buffer_append(buffer, text, (long long) strlen(text));
+}
+
+/* Representação de um float como repr() do Python: o menor número de
+ * dígitos que volta ao mesmo valor, em notação científica fora de
+ * 1e-4 <= |x| < 1e16 e sempre com ".0" quando inteiro. */
+static void format_float(NajaBuffer *buffer, double number)
+{
+    char text[40];
+    char digits[24];
+    int count = 0;
+    int exponent;
+    int precision;
+    const char *cursor;
+
+    if (isnan(number)) {
+        buffer_append_text(buffer, "nan");
+        return;
+    }
+    if (isinf(number)) {
+        buffer_append_text(buffer, number > 0 ? "inf" : "-inf");
+        return;
+    }
+    for (precision = 1; precision < 17; precision++) {
+        snprintf(text, sizeof text, "%.*e", precision - 1, number);
+        if (strtod(text, NULL) == number)
+            break;
+    }
+    snprintf(text, sizeof text, "%.*e", precision - 1, number);
+
+    cursor = text;
+    if (*cursor == '-') {
+        buffer_append(buffer, "-", 1);
+        cursor++;
+    }
+    for (; *cursor != 'e'; cursor++) {
+        if (*cursor != '.')
+            digits[count++] = *cursor;
+    }
+    exponent = atoi(cursor + 1);
+    /* Zeros finais não fazem parte da representação mais curta */
+    while (count > 1 && digits[count - 1] == '0')
+        count--;
+    digits[count] = '\0';
+
+    int point = exponent + 1;
+    if (point > -4 && point <= 16) {
+        if (point <= 0) {
+            buffer_append(buffer, "0.", 2);
+            for (int i = 0; i < -point; i++)
+                buffer_append(buffer, "0", 1);
+            buffer_append(buffer, digits, count);
+        } else if (point >= count) {
+            buffer_append(buffer, digits, count);
+            for (int i = count; i < point; i++)
+                buffer_append(buffer, "0", 1);
+            buffer_append(buffer, ".0", 2);
+        } else {
+            buffer_append(buffer, digits, point);
+            buffer_append(buffer, ".", 1);
+            buffer_append(buffer, digits + point, count - point);
+        }
+    } else {
+        buffer_append(buffer, digits, 1);
+        if (count > 1) {
+            buffer_append(buffer, ".", 1);
+            buffer_append(buffer, digits + 1, count - 1);
+        }
+        snprintf(text, sizeof text, "e%c%02d", exponent < 0 ? '-' : '+', abs(exponent));
+        buffer_append_text(buffer, text);
+    }
+}
+
+/* Acrescenta str(value) ao buffer */
+static void format_value(NajaBuffer *buffer, NajaValue *value)
+{
+    char text[32];
+
+    switch (value->type) {
+    case NAJA_NONE:
+        buffer_append_text(buffer, "None");
+        break;
+    case NAJA_BOOL:
+        buffer_append_text(buffer, value->as.integer ? "True" : "False");
+        break;
+    case NAJA_INT:
+        snprintf(text, sizeof text, "%lld", value->as.integer);
+        buffer_append_text(buffer, text);
+        break;
+    case NAJA_FLOAT:
+        format_float(buffer, value->as.number);
+        break;
+    case NAJA_STRING:
+        buffer_append(buffer, value->as.string.data, value->as.string.size);
+        break;
+    case NAJA_LIST:
+        buffer_append(buffer, "[", 1);
+        for (long long i = 0; i < value->as.list.length; i++) {
+            if (i > 0)
+                buffer_append(buffer, ", ", 2);
+            format_value(buffer, value->as.list.items[i]);
+        }
+        buffer_append(buffer, "]", 1);
+        break;
+    case NAJA_DICT: {
+        int first = 1;
+        buffer_append(buffer, "{", 1);
+        for (long long i = 0; i < value->as.dict.used; i++) {
+            NajaEntry *entry = &value->as.dict.entries[i];
+            if (entry->key == NULL)
+                continue;
+            if (!first)
+                buffer_append(buffer, ", ", 2);
+            first = 0;
+            format_value(buffer, entry->key);
+            buffer_append(buffer, ": ", 2);
+            format_value(buffer, entry->value);
+        }
+        buffer_append(buffer, "}", 1);
+        break;
+    }
+    }
+}
+
+/* Nome do tipo Python correspondente, usado nas mensagens de erro */
+static const char *type_name(NajaValue *value)
+{
+    switch (value->type) {
+    case NAJA_NONE:
+        return "NoneType";
+    case NAJA_BOOL:
+        return "bool";
+    case NAJA_INT:
+        return "int";
+    case NAJA_FLOAT:
+        return "float";
+    case NAJA_STRING:
+        return "str";
+    case NAJA_LIST:
+        return "NajaList";
+    case NAJA_DICT:
+        return "NajaDict";
+    }
+    return "?";
+}
+
+/* ------------------------------------------------------------------------
+ * Erros
+ * ------------------------------------------------------------------------ */
+
+static void naja_fatal(const char *format, ...)
+{
+    va_list arguments;
+
+    fflush(stdout);
+    fputs("Erro durante a execução: ", stderr);
+    va_start(arguments, format);
+    vfprintf(stderr, format, arguments);
+    va_end(arguments);
+    fputc('\n', stderr);
+    exit(1);
+}
+
+/* Erro cuja mensagem inclui str(value) no lugar de %s */
+static void naja_fatal_value(const char *format, NajaValue *value)
+{
+    NajaBuffer buffer = { NULL, 0, 0 };
+
+    format_value(&buffer, value);
+    naja_fatal(format, buffer.data);
+}
+
+static void operand_error(const char *operator, NajaValue *left, NajaValue *right)
+{
+    naja_fatal("unsupported operand type(s) for %s: '%s' and '%s'", operator, type_name(left), type_name(right));
+}
+
+static void comparison_error(const char *operator, NajaValue *left, NajaValue *right)
+{
+    naja_fatal("'%s' not supported between instances of '%s' and '%s'", operator, type_name(left), type_name(right));
+}
+
+/* ------------------------------------------------------------------------
+ * Alocação e contagem de referências
+ * ------------------------------------------------------------------------ */
+
+static NajaValue *naja_alloc(NajaType type)
+{
+    NajaValue *value = free_values;
+
+    if (value != NULL) {
+        free_values = value->as.next_free;
+    } else {
+        value = malloc(sizeof *value);
+        if (value == NULL)
+            naja_fatal("memória insuficiente");
+    }
+    value->refcount = 1;
+    value->type = type;
+    return value;
+}
+
+void naja_decref(NajaValue *value);
+
+static void naja_free(NajaValue *value)
+{
+    switch (value->type) {
+    case NAJA_STRING:
+        free(value->as.string.data);
+        break;
+    case NAJA_LIST:
+        for (long long i = 0; i < value->as.list.length; i++)
+            naja_decref(value->as.list.items[i]);
+        free(value->as.list.items);
+        break;
+    case NAJA_DICT:
+        for (long long i = 0; i < value->as.dict.used; i++) {
+            naja_decref(value->as.dict.entries[i].key);
+            naja_decref(value->as.dict.entries[i].value);
+        }
+        free(value->as.dict.entries);
+        free(value->as.dict.index);
+        break;
+    default:
+        break;
+    }
+    value->as.next_free = free_values;
+    free_values = value;
+}
+
+void naja_incref(NajaValue *value)
+{
+    if (value != NULL && value->refcount >= 0)
+        value->refcount++;
+}
+
+void naja_decref(NajaValue *value)
+{
+    if (value == NULL || value->refcount < 0)
+        return;
+    if (--value->refcount == 0)
+        naja_free(value);
+}
+
+/* Erro detectado pelo compilador que só acontece se o código for executado */
+void naja_raise(const char *message)
+{
+    naja_fatal("%s", message);
+}
+
+/* Lê uma variável: erro se ela ainda não foi definida, senão uma nova referência */
+NajaValue *naja_load(NajaValue *value, const char *name)
+{
+    if (value == NULL)
+        naja_fatal("Variável ou função '%s' não definida.", name);
+    if (value->refcount >= 0)
+        value->refcount++;
+    return value;
+}
+
+/* Libera o valor antigo de uma variável atribuída (erro se ela não foi definida) */
+void naja_release_assigned(NajaValue *old, const char *name)
+{
+    if (old == NULL)
+        naja_fatal("Variável '%s' não definida.", name);
+    naja_decref(old);
+}
+
+/* ------------------------------------------------------------------------
+ * Construtores
+ * ------------------------------------------------------------------------ */
+
+NajaValue *naja_none(void)
+{
+    return &none_value;
+}
+
+NajaValue *naja_bool(int flag)
+{
+    return flag ? &true_value : &false_value;
+}
+
+static NajaValue *naja_int(long long integer)
+{
+    if (integer >= NAJA_SMALL_INT_MIN && integer <= NAJA_SMALL_INT_MAX)
+        return &small_ints[integer - NAJA_SMALL_INT_MIN];
+    NajaValue *value = naja_alloc(NAJA_INT);
+    value->as.integer = integer;
+    return value;
+}
+
+static NajaValue *naja_float(double number)
+{
+    NajaValue *value = naja_alloc(NAJA_FLOAT);
+    value->as.number = number;
+    return value;
+}
+
+/* String que passa a ser dona de 'data' (alocado com malloc, com '\0' no fim) */
+static NajaValue *naja_string_take(char *data, long long size)
+{
+    NajaValue *value = naja_alloc(NAJA_STRING);
+    long long length = 0;
+
+    for (long long i = 0; i < size; i++) {
+        /* Bytes de continuação do UTF-8 não iniciam um caractere */
+        if (((unsigned char) data[i] & 0xC0) != 0x80)
+            length++;
+    }
+    value->as.string.data = data;
+    value->as.string.size = size;
+    value->as.string.length = length;
+    return value;
+}
+
+static NajaValue *naja_string(const char *data, long long size)
+{
+    char *copy = malloc((size_t) size + 1);
+
+    if (copy == NULL)
+        naja_fatal("memória insuficiente");
+    memcpy(copy, data, (size_t) size);
+    copy[size] = '\0';
+    return naja_string_take(copy, size);
+}
+
+static NajaValue *naja_buffer_string(NajaBuffer *buffer)
+{
+    if (buffer->data == NULL)
+        return naja_string("", 0);
+    return naja_string_take(buffer->data, buffer->size);
+}
+
+/* Constantes do programa: criadas uma vez na inicialização e nunca liberadas */
+NajaValue *naja_const_int(long long integer)
+{
+    NajaValue *value = naja_int(integer);
+    value->refcount = -1;
+    return value;
+}
+
+NajaValue *naja_const_float(double number)
+{
+    NajaValue *value = naja_float(number);
+    value->refcount = -1;
+    return value;
+}
+
+NajaValue *naja_const_string(const char *data, long long size)
+{
+    NajaValue *value = naja_string(data, size);
+    value->refcount = -1;
+    return value;
+}
+
+NajaValue *naja_list_new(long long capacity)
+{
+    NajaValue *value = naja_alloc(NAJA_LIST);
+
+    value->as.list.items = NULL;
+    value->as.list.length = 0;
+    value->as.list.capacity = 0;
+    if (capacity > 0) {
+        value->as.list.items = malloc((size_t) capacity * sizeof(NajaValue *));
+        if (value->as.list.items == NULL)
+            naja_fatal("memória insuficiente");
+        value->as.list.capacity = capacity;
+    }
+    return value;
+}
+
+/* Acrescenta um elemento (emprestado) ao fim da lista */
+void naja_list_append(NajaValue *list, NajaValue *item)
+{
+    if (list->as.list.length == list->as.list.capacity) {
+        long long capacity = list->as.list.capacity ? list->as.list.capacity * 2 : 8;
+        NajaValue **items = realloc(list->as.list.items, (size_t) capacity * sizeof(NajaValue *));
+        if (items == NULL)
+            naja_fatal("memória insuficiente");
+        list->as.list.items = items;
+        list->as.list.capacity = capacity;
+    }
+    naja_incref(item);
+    list->as.list.items[list->as.list.length++] = item;
+}
+
+NajaValue *naja_dict_new(void)
+{
+    NajaValue *value = naja_alloc(NAJA_DICT);
+
+    value->as.dict.entries = NULL;
+    value->as.dict.used = 0;
+    value->as.dict.capacity = 0;
+    value->as.dict.length = 0;
+    value->as.dict.index = NULL;
+    value->as.dict.index_size = 0;
+    return value;
+}
+
+/* ------------------------------------------------------------------------
+ * Verdade, igualdade e ordem
+ * ------------------------------------------------------------------------ */
+
+static int is_integer(NajaValue *value)
+{
+    return value->type == NAJA_INT || value->type == NAJA_BOOL;
+}
+
+static int is_number(NajaValue *value)
+{
+    return value->type == NAJA_INT || value->type == NAJA_BOOL || value->type == NAJA_FLOAT;
+}
+
+static double as_double(NajaValue *value)
+{
+    return value->type == NAJA_FLOAT ? value->as.number : (double) value->as.integer;
+}
+
+int naja_truthy(NajaValue *value)
+{
+    switch (value->type) {
+    case NAJA_NONE:
+        return 0;
+    case NAJA_BOOL:
+    case NAJA_INT:
+        return value->as.integer != 0;
+    case NAJA_FLOAT:
+        return value->as.number != 0.0;
+    case NAJA_STRING:
+        return value->as.string.size > 0;
+    case NAJA_LIST:
+        return value->as.list.length > 0;
+    case NAJA_DICT:
+        return value->as.dict.length > 0;
+    }
+    return 1;
+}
+
+/* Compara um inteiro com um float sem perder precisão: -1, 0, 1 ou 2 (NaN) */
+static int compare_int_float(long long integer, double number)
+{
+    if (isnan(number))
+        return 2;
+    if (number >= 9223372036854775808.0)
+        return -1;
+    if (number < -9223372036854775808.0)
+        return 1;
+    double whole = floor(number);
+    long long truncated = (long long) whole;
+    if (integer != truncated)
+        return integer < truncated ? -1 : 1;
+    return number > whole ? -1 : 0;
+}
+
+/* Ordem entre números: -1, 0, 1 ou 2 (não ordenados, NaN) */
+static int compare_numbers(NajaValue *left, NajaValue *right)
+{
+    if (is_integer(left) && is_integer(right))
+        return left->as.integer < right->as.integer ? -1 : left->as.integer > right->as.integer;
+    if (is_integer(left))
+        return compare_int_float(left->as.integer, right->as.number);
+    if (is_integer(right)) {
+        int order = compare_int_float(right->as.integer, left->as.number);
+        return order == 2 ? 2 : -order;
+    }
+    if (left->as.number < right->as.number)
+        return -1;
+    if (left->as.number > right->as.number)
+        return 1;
+    return left->as.number == right->as.number ? 0 : 2;
+}
+
+static int compare_strings(NajaValue *left, NajaValue *right)
+{
+    long long size = left->as.string.size < right->as.string.size ? left->as.string.size : right->as.string.size;
+    int order = memcmp(left->as.string.data, right->as.string.data, (size_t) size);
+
+    if (order != 0)
+        return order < 0 ? -1 : 1;
+    if (left->as.string.size != right->as.string.size)
+        return left->as.string.size < right->as.string.size ? -1 : 1;
+    return 0;
+}
+
+/* Igualdade do ==: números entre si, strings pelo conteúdo, listas e dicionários pela identidade */
+static int values_equal(NajaValue *left, NajaValue *right)
+{
+    if (is_number(left) && is_number(right))
+        return compare_numbers(left, right) == 0;
+    if (left->type == NAJA_STRING && right->type == NAJA_STRING)
+        return left->as.string.size == right->as.string.size
+            && memcmp(left->as.string.data, right->as.string.data, (size_t) left->as.string.size) == 0;
+    if (left->type == NAJA_NONE && right->type == NAJA_NONE)
+        return 1;
+    return left == right;
+}
+
+/* Ordem do <, <=, > e >= (erro de tipo como no Python) */
+static int order_values(const char *operator, NajaValue *left, NajaValue *right)
+{
+    if (is_number(left) && is_number(right))
+        return compare_numbers(left, right);
+    if (left->type == NAJA_STRING && right->type == NAJA_STRING)
+        return compare_strings(left, right);
+    comparison_error(operator, left, right);
+    return 2;
+}
+
+NajaValue *naja_eq(NajaValue *left, NajaValue *right)
+{
+    return naja_bool(values_equal(left, right));
+}
+
+NajaValue *naja_ne(NajaValue *left, NajaValue *right)
+{
+    return naja_bool(!values_equal(left, right));
+}
+
+NajaValue *naja_lt(NajaValue *left, NajaValue *right)
+{
+    return naja_bool(order_values("<", left, right) == -1);
+}
+
+NajaValue *naja_le(NajaValue *left, NajaValue *right)
+{
+    int order = order_values("<=", left, right);
+    return naja_bool(order == -1 || order == 0);
+}
+
+NajaValue *naja_gt(NajaValue *left, NajaValue *right)
+{
+    return naja_bool(order_values(">", left, right) == 1);
+}
+
+NajaValue *naja_ge(NajaValue *left, NajaValue *right)
+{
+    int order = order_values(">=", left, right);
+    return naja_bool(order == 1 || order == 0);
+}
+
+/* && e || avaliam os dois lados e resultam em um booleano, como no interpretador */
+NajaValue *naja_and(NajaValue *left, NajaValue *right)
+{
+    return naja_bool(naja_truthy(left) && naja_truthy(right));
+}
+
+NajaValue *naja_or(NajaValue *left, NajaValue *right)
+{
+    return naja_bool(naja_truthy(left) || naja_truthy(right));
+}
+
+NajaValue *naja_not(NajaValue *value)
+{
+    return naja_bool(!naja_truthy(value));
+}
+
+/* ------------------------------------------------------------------------
+ * Aritmética
+ * ------------------------------------------------------------------------ */
+
+static NajaValue *overflow_error(void)
+{
+    naja_fatal("estouro de inteiro: os inteiros compilados têm 64 bits");
+    return NULL;
+}
+
+static NajaValue *repeat_string(NajaValue *string, long long times)
+{
+    NajaBuffer buffer = { NULL, 0, 0 };
+
+    for (long long i = 0; i < times; i++)
+        buffer_append(&buffer, string->as.string.data, string->as.string.size);
+    return naja_buffer_string(&buffer);
+}
+
+NajaValue *naja_add(NajaValue *left, NajaValue *right)
+{
+    long long result;
+
+    if (left->type == NAJA_INT && right->type == NAJA_INT) {
+        if (__builtin_add_overflow(left->as.integer, right->as.integer, &result))
+            return overflow_error();
+        return naja_int(result);
+    }
+    if (left->type == NAJA_STRING || right->type == NAJA_STRING) {
+        /* Concatenação: str(left) + str(right) */
+        NajaBuffer buffer = { NULL, 0, 0 };
+        format_value(&buffer, left);
+        format_value(&buffer, right);
+        return naja_buffer_string(&buffer);
+    }
+    if (is_integer(left) && is_integer(right)) {
+        if (__builtin_add_overflow(left->as.integer, right->as.integer, &result))
+            return overflow_error();
+        return naja_int(result);
+    }
+    if (is_number(left) && is_number(right))
+        return naja_float(as_double(left) + as_double(right));
+    operand_error("+", left, right);
+    return NULL;
+}
+
+/* x += y: sem a conversão para texto do '+', como o interpretador */
+NajaValue *naja_inplace_add(NajaValue *left, NajaValue *right)
+{
+    if (left->type == NAJA_STRING && right->type != NAJA_STRING)
+        naja_fatal("can only concatenate str (not \"%s\") to str", type_name(right));
+    if (right->type == NAJA_STRING && left->type != NAJA_STRING)
+        operand_error("+", left, right);
+    return naja_add(left, right);
+}
+
+NajaValue *naja_sub(NajaValue *left, NajaValue *right)
+{
+    long long result;
+
+    if (is_integer(left) && is_integer(right)) {
+        if (__builtin_sub_overflow(left->as.integer, right->as.integer, &result))
+            return overflow_error();
+        return naja_int(result);
+    }
+    if (is_number(left) && is_number(right))
+        return naja_float(as_double(left) - as_double(right));
+    operand_error("-", left, right);
+    return NULL;
+}
+
+NajaValue *naja_mul(NajaValue *left, NajaValue *right)
+{
+    long long result;
+
+    if (is_integer(left) && is_integer(right)) {
+        if (__builtin_mul_overflow(left->as.integer, right->as.integer, &result))
+            return overflow_error();
+        return naja_int(result);
+    }
+    if (is_number(left) && is_number(right))
+        return naja_float(as_double(left) * as_double(right));
+    /* Repetição de strings */
+    if (left->type == NAJA_STRING && is_integer(right))
+        return repeat_string(left, right->as.integer);
+    if (right->type == NAJA_STRING && is_integer(left))
+        return repeat_string(right, left->as.integer);
+    if (left->type == NAJA_STRING)
+        naja_fatal("can't multiply sequence by non-int of type '%s'", type_name(right));
+    if (right->type == NAJA_STRING)
+        naja_fatal("can't multiply sequence by non-int of type '%s'", type_name(left));
+    operand_error("*", left, right);
+    return NULL;
+}
+
+NajaValue *naja_div(NajaValue *left, NajaValue *right)
+{
+    if (!is_number(left) || !is_number(right))
+        operand_error("/", left, right);
+    if (as_double(right) == 0.0) {
+        if (is_integer(left) && is_integer(right))
+            naja_fatal("division by zero");
+        naja_fatal("float division by zero");
+    }
+    return naja_float(as_double(left) / as_double(right));
+}
+
+NajaValue *naja_mod(NajaValue *left, NajaValue *right)
+{
+    if (is_integer(left) && is_integer(right)) {
+        long long divisor = right->as.integer;
+        if (divisor == 0)
+            naja_fatal("integer modulo by zero");
+        if (divisor == -1)
+            return naja_int(0);
+        long long result = left->as.integer % divisor;
+        /* Resto com o sinal do divisor, como no Python */
+        if (result != 0 && ((result < 0) != (divisor < 0)))
+            result += divisor;
+        return naja_int(result);
+    }
+    if (is_number(left) && is_number(right)) {
+        double divisor = as_double(right);
+        if (divisor == 0.0)
+            naja_fatal("float modulo");
+        double result = fmod(as_double(left), divisor);
+        if (result != 0.0) {
+            if ((divisor < 0) != (result < 0))
+                result += divisor;
+        } else {
+            result = copysign(0.0, divisor);
+        }
+        return naja_float(result);
+    }
+    operand_error("%", left, right);
+    return NULL;
+}
+
+NajaValue *naja_pow(NajaValue *left, NajaValue *right)
+{
+    if (is_integer(left) && is_integer(right) && right->as.integer >= 0) {
+        long long base = left->as.integer;
+        long long exponent = right->as.integer;
+        long long result = 1;
+        while (exponent > 0) {
+            if ((exponent & 1) && __builtin_mul_overflow(result, base, &result))
+                return overflow_error();
+            exponent >>= 1;
+            if (exponent > 0 && __builtin_mul_overflow(base, base, &base))
+                return overflow_error();
+        }
+        return naja_int(result);
+    }
+    if (is_number(left) && is_number(right)) {
+        double base = as_double(left);
+        double exponent = as_double(right);
+        if (base == 0.0 && exponent < 0.0)
+            naja_fatal("0.0 cannot be raised to a negative power");
+        if (base < 0.0 && exponent != floor(exponent) && isfinite(exponent))
+            naja_fatal("potência de base negativa com expoente fracionário (resultado complexo) não suportada");
+        double result = pow(base, exponent);
+        if (isinf(result) && isfinite(base) && isfinite(exponent))
+            naja_fatal("(34, 'Numerical result out of range')");
+        return naja_float(result);
+    }
+    operand_error("** or pow()", left, right);
+    return NULL;
+}
+
+NajaValue *naja_neg(NajaValue *value)
+{
+    if (is_integer(value)) {
+        if (value->as.integer == -9223372036854775807LL - 1)
+            return overflow_error();
+        return naja_int(-value->as.integer);
+    }
+    if (value->type == NAJA_FLOAT)
+        return naja_float(-value->as.number);
+    naja_fatal("Operador '-' não suportado para <class '%s'>", type_name(value));
+    return NULL;
+}
+
+/* ------------------------------------------------------------------------
+ * Saída e conversões
+ * ------------------------------------------------------------------------ */
+
+/* Escreve str(value), precedido de um espaço se não for o primeiro argumento */
+void naja_print(NajaValue *value, int separator)
+{
+    if (separator)
+        fputc(' ', stdout);
+    if (value->type == NAJA_STRING) {
+        fwrite(value->as.string.data, 1, (size_t) value->as.string.size, stdout);
+        return;
+    }
+    NajaBuffer buffer = { NULL, 0, 0 };
+    format_value(&buffer, value);
+    fwrite(buffer.data, 1, (size_t) buffer.size, stdout);
+    free(buffer.data);
+}
+
+void naja_print_end(int newline)
+{
+    if (newline)
+        fputc('\n', stdout);
+}
+
+/* str(value) */
+NajaValue *naja_str(NajaValue *value)
+{
+    if (value->type == NAJA_STRING) {
+        naja_incref(value);
+        return value;
+    }
+    NajaBuffer buffer = { NULL, 0, 0 };
+    format_value(&buffer, value);
+    return naja_buffer_string(&buffer);
+}
+
+/* Valor de uma declaração: o padrão do tipo declarado quando o valor é None */
+NajaValue *naja_default(NajaValue *value, int kind)
+{
+    if (value->type != NAJA_NONE || kind == NAJA_DEFAULT_ANY) {
+        naja_incref(value);
+        return value;
+    }
+    switch (kind) {
+    case NAJA_DEFAULT_INT:
+        return naja_int(0);
+    case NAJA_DEFAULT_FLOAT:
+        return naja_float(0.0);
+    case NAJA_DEFAULT_STRING:
+        return naja_string("", 0);
+    case NAJA_DEFAULT_BOOL:
+        return naja_bool(0);
+    case NAJA_DEFAULT_LIST:
+        return naja_list_new(0);
+    case NAJA_DEFAULT_DICT:
+        return naja_dict_new();
+    }
+    return naja_none();
+}
+
+/* ------------------------------------------------------------------------
+ * Dicionários
+ * ------------------------------------------------------------------------ */
+
+static unsigned long long mix_hash(unsigned long long hash)
+{
+    hash ^= hash >> 33;
+    hash *= 0xff51afd7ed558ccdULL;
+    hash ^= hash >> 33;
+    hash *= 0xc4ceb9fe1a85ec53ULL;
+    hash ^= hash >> 33;
+    return hash;
+}
+
+/* Hash compatível com a igualdade: 1, 1.0 e True são a mesma chave */
+static unsigned long long hash_value(NajaValue *value)
+{
+    switch (value->type) {
+    case NAJA_NONE:
+        return 0x9e3779b97f4a7c15ULL;
+    case NAJA_BOOL:
+    case NAJA_INT:
+        return mix_hash((unsigned long long) value->as.integer);
+    case NAJA_FLOAT: {
+        double number = value->as.number;
+        if (number == floor(number) && number >= -9223372036854775808.0 && number < 9223372036854775808.0)
+            return mix_hash((unsigned long long) (long long) number);
+        unsigned long long bits;
+        memcpy(&bits, &number, sizeof bits);
+        return mix_hash(bits);
+    }
+    case NAJA_STRING: {
+        unsigned long long hash = 0xcbf29ce484222325ULL;
+        for (long long i = 0; i < value->as.string.size; i++) {
+            hash ^= (unsigned char) value->as.string.data[i];
+            hash *= 0x100000001b3ULL;
+        }
+        return mix_hash(hash);
+    }
+    default:
+        /* Listas e dicionários são chaves pela identidade */
+        return mix_hash((unsigned long long) (size_t) value);
+    }
+}
+
+/* Posição da chave em entries, ou -1 */
+static long long dict_find(NajaValue *dict, NajaValue *key, unsigned long long hash)
+{
+    if (dict->as.dict.index_size == 0)
+        return -1;
+    long long mask = dict->as.dict.index_size - 1;
+    long long slot = (long long) (hash & (unsigned long long) mask);
+    while (dict->as.dict.index[slot] != -1) {
+        NajaEntry *entry = &dict->as.dict.entries[dict->as.dict.index[slot]];
+        if (entry->key != NULL && (entry->key == key || values_equal(entry->key, key)))
+            return dict->as.dict.index[slot];
+        slot = (slot + 1) & mask;
+    }
+    return -1;
+}
+
+static void dict_insert_index(NajaValue *dict, long long position, unsigned long long hash)
+{
+    long long mask = dict->as.dict.index_size - 1;
+    long long slot = (long long) (hash & (unsigned long long) mask);
+    while (dict->as.dict.index[slot] != -1)
+        slot = (slot + 1) & mask;
+    dict->as.dict.index[slot] = position;
+}
+
+/* Garante espaço para mais uma entrada, descartando as removidas ou crescendo */
+static void dict_reserve(NajaValue *dict)
+{
+    if (dict->as.dict.used < dict->as.dict.capacity)
+        return;
+    long long live = 0;
+    for (long long i = 0; i < dict->as.dict.used; i++) {
+        if (dict->as.dict.entries[i].key != NULL)
+            dict->as.dict.entries[live++] = dict->as.dict.entries[i];
+    }
+    dict->as.dict.used = live;
+    if (live >= dict->as.dict.capacity / 2) {
+        long long capacity = dict->as.dict.capacity ? dict->as.dict.capacity * 2 : 8;
+        NajaEntry *entries = realloc(dict->as.dict.entries, (size_t) capacity * sizeof(NajaEntry));
+        if (entries == NULL)
+            naja_fatal("memória insuficiente");
+        dict->as.dict.entries = entries;
+        dict->as.dict.capacity = capacity;
+    }
+    /* A tabela hash tem pelo menos o dobro de posições que entradas */
+    long long index_size = 16;
+    while (index_size < dict->as.dict.capacity * 2)
+        index_size *= 2;
+    free(dict->as.dict.index);
+    dict->as.dict.index = malloc((size_t) index_size * sizeof(long long));
+    if (dict->as.dict.index == NULL)
+        naja_fatal("memória insuficiente");
+    dict->as.dict.index_size = index_size;
+    memset(dict->as.dict.index, 0xff, (size_t) index_size * sizeof(long long));
+    for (long long i = 0; i < live; i++)
+        dict_insert_index(dict, i, hash_value(dict->as.dict.entries[i].key));
+}
+
+/* dict[key] = value (referências emprestadas) */
+static void dict_set(NajaValue *dict, NajaValue *key, NajaValue *value)
+{
+    unsigned long long hash = hash_value(key);
+    long long position = dict_find(dict, key, hash);
+
+    naja_incref(value);
+    if (position >= 0) {
+        NajaValue *old = dict->as.dict.entries[position].value;
+        dict->as.dict.entries[position].value = value;
+        naja_decref(old);
+        return;
+    }
+    dict_reserve(dict);
+    naja_incref(key);
+    position = dict->as.dict.used++;
+    dict->as.dict.entries[position].key = key;
+    dict->as.dict.entries[position].value = value;
+    dict->as.dict.length++;
+    dict_insert_index(dict, position, hash);
+}
+
+/* Acrescenta um valor com a próxima chave automática (literais e add com um argumento) */
+void naja_dict_append(NajaValue *dict, NajaValue *value)
+{
+    NajaValue *key = naja_int(dict->as.dict.length);
+    dict_set(dict, key, value);
+    naja_decref(key);
+}
+
+/* ------------------------------------------------------------------------
+ * Métodos nativos
+ * ------------------------------------------------------------------------ */
+
+/* Quantidades de argumentos aceitas, como _LIST_METHODS, _DICT_METHODS e _STRING_METHODS */
+typedef struct {
+    int method;
+    int arities;    /* bit n: aceita n argumentos; 0: argumentos ignorados */
+} NajaMethodEntry;
+
+static const NajaMethodEntry list_methods[] = {
+    { NAJA_METHOD_LENGTH, 0 },
+    { NAJA_METHOD_GET, 1 << 1 },
+    { NAJA_METHOD_ADD, 1 << 1 },
+    { NAJA_METHOD_REMOVE, 1 << 1 },
+    { NAJA_METHOD_REMOVE_LAST, 1 << 0 },
+    { -1, 0 }
+};
+
+static const NajaMethodEntry dict_methods[] = {
+    { NAJA_METHOD_LENGTH, 0 },
+    { NAJA_METHOD_GET, 1 << 1 },
+    { NAJA_METHOD_ADD, (1 << 1) | (1 << 2) },
+    { NAJA_METHOD_REMOVE, 1 << 1 },
+    { -1, 0 }
+};
+
+static const NajaMethodEntry string_methods[] = {
+    { NAJA_METHOD_LENGTH, 0 },
+    { NAJA_METHOD_SUBSTRING, (1 << 1) | (1 << 2) },
+    { -1, 0 }
+};
+
+static void arity_error(const char *name, int arities, long long count)
+{
+    if (arities == 1 << 0)
+        naja_fatal("Método %s() não espera argumentos, recebeu %lld", name, count);
+    if (arities == 1 << 1)
+        naja_fatal("Método %s() espera 1 argumento, recebeu %lld", name, count);
+    naja_fatal("Método %s() espera 1 ou 2 argumentos, recebeu %lld", name, count);
+}
+
+/* Verifica se o tipo tem o método e aceita 'count' argumentos */
+static void check_method(const NajaMethodEntry *table, const char *kind, int method, const char *name, long long count)
+{
+    for (; table->method >= 0; table++) {
+        if (table->method != method)
+            continue;
+        if (table->arities != 0 && !(table->arities & (1 << count)))
+            arity_error(name, table->arities, count);
+        return;
+    }
+    naja_fatal("%s não possuem o método '%s'", kind, name);
+}
+
+static long long list_index(NajaValue *list, NajaValue *index)
+{
+    if (is_integer(index)) {
+        if (index->as.integer >= 0 && index->as.integer < list->as.list.length)
+            return index->as.integer;
+        naja_fatal_value("Índice %s fora dos limites da lista", index);
+    }
+    if (index->type == NAJA_FLOAT) {
+        if (index->as.number >= 0 && index->as.number < (double) list->as.list.length)
+            naja_fatal("list indices must be integers or slices, not float");
+        naja_fatal_value("Índice %s fora dos limites da lista", index);
+    }
+    comparison_error("<=", &small_ints[-NAJA_SMALL_INT_MIN], index);
+    return -1;
+}
+
+static NajaValue *list_pop(NajaValue *list, long long position)
+{
+    NajaValue *item = list->as.list.items[position];
+
+    memmove(&list->as.list.items[position], &list->as.list.items[position + 1],
+            (size_t) (list->as.list.length - position - 1) * sizeof(NajaValue *));
+    list->as.list.length--;
+    return item;
+}
+
+static NajaValue *list_method(NajaValue *list, int method, NajaValue **arguments)
+{
+    switch (method) {
+    case NAJA_METHOD_LENGTH:
+        return naja_int(list->as.list.length);
+    case NAJA_METHOD_GET: {
+        NajaValue *item = list->as.list.items[list_index(list, arguments[0])];
+        naja_incref(item);
+        return item;
+    }
+    case NAJA_METHOD_ADD:
+        naja_list_append(list, arguments[0]);
+        naja_incref(arguments[0]);
+        return arguments[0];
+    case NAJA_METHOD_REMOVE: {
+        NajaValue *target = arguments[0];
+        if (is_integer(target)) {
+            if (target->as.integer >= 0 && target->as.integer < list->as.list.length)
+                return list_pop(list, target->as.integer);
+            naja_fatal_value("Índice %s fora dos limites da lista", target);
+        }
+        for (long long i = 0; i < list->as.list.length; i++) {
+            NajaValue *item = list->as.list.items[i];
+            if (item == target || values_equal(item, target)) {
+                naja_decref(list_pop(list, i));
+                naja_incref(target);
+                return target;
+            }
+        }
+        naja_fatal_value("Valor %s não encontrado na lista", target);
+        return NULL;
+    }
+    case NAJA_METHOD_REMOVE_LAST:
+        if (list->as.list.length == 0)
+            naja_fatal("Não é possível remover de uma lista vazia");
+        return list_pop(list, list->as.list.length - 1);
+    }
+    return NULL;
+}
+
+static NajaValue *dict_method(NajaValue *dict, int method, long long count, NajaValue **arguments)
+{
+    switch (method) {
+    case NAJA_METHOD_LENGTH:
+        return naja_int(dict->as.dict.length);
+    case NAJA_METHOD_GET: {
+        long long position = dict_find(dict, arguments[0], hash_value(arguments[0]));
+        if (position < 0)
+            naja_fatal_value("Chave %s não encontrada no dicionário", arguments[0]);
+        NajaValue *value = dict->as.dict.entries[position].value;
+        naja_incref(value);
+        return value;
+    }
+    case NAJA_METHOD_ADD:
+        /* add(key) e add(key, None) usam o tamanho atual como chave */
+        if (count == 1 || arguments[1]->type == NAJA_NONE) {
+            naja_dict_append(dict, arguments[0]);
+            naja_incref(arguments[0]);
+            return arguments[0];
+        }
+        dict_set(dict, arguments[0], arguments[1]);
+        naja_incref(arguments[1]);
+        return arguments[1];
+    case NAJA_METHOD_REMOVE: {
+        long long position = dict_find(dict, arguments[0], hash_value(arguments[0]));
+        if (position < 0)
+            naja_fatal_value("Chave %s não encontrada no dicionário", arguments[0]);
+        NajaEntry *entry = &dict->as.dict.entries[position];
+        NajaValue *value = entry->value;
+        naja_decref(entry->key);
+        entry->key = NULL;
+        entry->value = NULL;
+        dict->as.dict.length--;
+        return value;
+    }
+    }
+    return NULL;
+}
+
+/* Posição em bytes do caractere 'index' de uma string */
+static long long string_offset(NajaValue *string, long long index)
+{
+    if (string->as.string.size == string->as.string.length)
+        return index;
+    long long offset = 0;
+    for (long long seen = 0; offset < string->as.string.size; offset++) {
+        if (((unsigned char) string->as.string.data[offset] & 0xC0) != 0x80) {
+            if (seen == index)
+                return offset;
+            seen++;
+        }
+    }
+    return offset;
+}
+
+/* Índice de um corte string[start:end] como no Python */
+static long long slice_index(long long index, long long length)
+{
+    if (index < 0) {
+        index += length;
+        if (index < 0)
+            index = 0;
+    }
+    return index > length ? length : index;
+}
+
+static NajaValue *string_method(NajaValue *string, int method, long long count, NajaValue **arguments)
+{
+    if (method == NAJA_METHOD_LENGTH)
+        return naja_int(string->as.string.length);
+
+    long long length = string->as.string.length;
+    if (!is_integer(arguments[0]))
+        naja_fatal("O índice inicial deve ser um número inteiro");
+    long long start = slice_index(arguments[0]->as.integer, length);
+    long long end = length;
+    if (count == 2) {
+        if (!is_integer(arguments[1]))
+            naja_fatal("O índice final deve ser um número inteiro");
+        end = slice_index(arguments[1]->as.integer, length);
+    }
+    if (end <= start)
+        return naja_string("", 0);
+    long long first = string_offset(string, start);
+    return naja_string(string->as.string.data + first, string_offset(string, end) - first);
+}
+
+/* Chamada obj.name(argumentos) de um método nativo ('method' é -1 para nomes desconhecidos) */
+NajaValue *naja_method(NajaValue *object, int method, const char *name, long long count, NajaValue **arguments)
+{
+    switch (object->type) {
+    case NAJA_LIST:
+        check_method(list_methods, "Listas", method, name, count);
+        return list_method(object, method, arguments);
+    case NAJA_DICT:
+        check_method(dict_methods, "Dicionários", method, name, count);
+        return dict_method(object, method, count, arguments);
+    case NAJA_STRING:
+        check_method(string_methods, "Strings", method, name, count);
+        return string_method(object, method, count, arguments);
+    default:
+        naja_fatal("O objeto do tipo %s não possui o método '%s'", type_name(object), name);
+    }
+    return NULL;
+}
+
+/* obj.name: dicionários devolvem o valor da chave 'name' */
+NajaValue *naja_get_attr(NajaValue *object, const char *name)
+{
+    if (object->type != NAJA_DICT)
+        naja_fatal("Objeto do tipo %s não possui o atributo '%s'", type_name(object), name);
+    NajaValue *key = naja_string(name, (long long) strlen(name));
+    NajaValue *arguments[1] = { key };
+    NajaValue *value = dict_method(object, NAJA_METHOD_GET, 1, arguments);
+    naja_decref(key);
+    return value;
+}
+
+/* ------------------------------------------------------------------------
+ * Funções nativas
+ * ------------------------------------------------------------------------ */
+
+/* input([prompt]): a linha lida, sem a quebra de linha ('prompt' pode ser NULL) */
+NajaValue *naja_builtin_input(NajaValue *prompt)
+{
+    NajaBuffer buffer = { NULL, 0, 0 };
+    int character;
+
+    if (prompt != NULL)
+        naja_print(prompt, 0);
+    fflush(stdout);
+    while ((character = fgetc(stdin)) != EOF && character != '\n') {
+        char byte = (char) character;
+        buffer_append(&buffer, &byte, 1);
+    }
+    if (character == EOF && buffer.size == 0)
+        naja_fatal("EOF when reading a line");
+    return naja_buffer_string(&buffer);
+}
+
+NajaValue *naja_builtin_abs(NajaValue *value)
+{
+    if (is_integer(value)) {
+        if (value->as.integer == -9223372036854775807LL - 1)
+            return overflow_error();
+        return naja_int(value->as.integer < 0 ? -value->as.integer : value->as.integer);
+    }
+    if (value->type == NAJA_FLOAT)
+        return naja_float(fabs(value->as.number));
+    naja_fatal("bad operand type for abs(): '%s'", type_name(value));
+    return NULL;
+}
+
+/* round(x): inteiro mais próximo, empates para o par */
+NajaValue *naja_builtin_round(NajaValue *value)
+{
+    if (is_integer(value))
+        return naja_int(value->as.integer);
+    if (value->type != NAJA_FLOAT)
+        naja_fatal("type %s doesn't define __round__ method", type_name(value));
+    double number = value->as.number;
+    if (isnan(number))
+        naja_fatal("cannot convert float NaN to integer");
+    if (isinf(number))
+        naja_fatal("cannot convert float infinity to integer");
+    double rounded = nearbyint(number);
+    if (rounded >= 9223372036854775808.0 || rounded < -9223372036854775808.0)
+        return overflow_error();
+    return naja_int((long long) rounded);
+}
+
+/* round(x, n) */
+NajaValue *naja_builtin_round2(NajaValue *value, NajaValue *digits)
+{
+    if (!is_integer(digits))
+        naja_fatal("'%s' object cannot be interpreted as an integer", type_name(digits));
+    if (is_integer(value) && digits->as.integer >= 0)
+        return naja_int(value->as.integer);
+    if (!is_number(value))
+        naja_fatal("type %s doesn't define __round__ method", type_name(value));
+    double scale = pow(10.0, (double) digits->as.integer);
+    double scaled = as_double(value) * scale;
+    if (!isfinite(scaled))
+        return naja_float(as_double(value));
+    double result = nearbyint(scaled) / scale;
+    if (is_integer(value))
+        return naja_int((long long) result);
+    return naja_float(result);
+}
+
+NajaValue *naja_builtin_sqrt(NajaValue *value)
+{
+    if (!is_number(value))
+        naja_fatal("must be real number, not %s", type_name(value));
+    double number = as_double(value);
+    if (number < 0.0)
+        naja_fatal("math domain error");
+    return naja_float(sqrt(number));
+}
+
+/* min(a, b) e max(a, b): mantém o primeiro em caso de empate, como o Python */
+NajaValue *naja_builtin_min(NajaValue *left, NajaValue *right)
+{
+    NajaValue *result = order_values("<", right, left) == -1 ? right : left;
+    naja_incref(result);
+    return result;
+}
+
+NajaValue *naja_builtin_max(NajaValue *left, NajaValue *right)
+{
+    NajaValue *result = order_values(">", right, left) == 1 ? right : left;
+    naja_incref(result);
+    return result;
+}
+
+/* ------------------------------------------------------------------------
+ * Início e fim do programa
+ * ------------------------------------------------------------------------ */
+
+void naja_init(void)
+{
+    for (long long i = NAJA_SMALL_INT_MIN; i <= NAJA_SMALL_INT_MAX; i++) {
+        NajaValue *value = &small_ints[i - NAJA_SMALL_INT_MIN];
+        value->refcount = -1;
+        value->type = NAJA_INT;
+        value->as.integer = i;
+    }
+}
+
+int naja_finish(void)
+{
+    fflush(stdout);
+    return 0;
+}
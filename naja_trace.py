@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Contadores exatos de execução de programas NajaScript (--trace-stats)
+
+Ao contrário do profiler por amostragem (naja_profiler.py), aqui cada
+evento é contado: o TraceStats embrulha todos os handlers das tabelas de
+despacho de Interpreter.execute/evaluate (Interpreter.set_instrumentation),
+então cada instrução e expressão executada é contada pela sua linha, e
+tipos de nó novos entram na contagem sem mudar nada. Durante a medição,
+Function.__call__ e os construtores de NajaList, NajaDict, NajaObject e
+dos ambientes também são embrulhados, para contar chamadas e tempo por
+FunctionDeclaration e alocações por tipo e por linha; tudo é restaurado
+em stop().
+
+O tempo próprio de uma linha exclui as instruções aninhadas (corpos de
+laços e das funções chamadas); o de uma função exclui as funções que ela
+chama. O tempo total conta só a ativação mais externa de funções e linhas
+recursivas. A instrumentação custa várias vezes o tempo do programa, então
+os tempos servem para comparar linhas e funções entre si.
+
+Nos modos --closures e --vm os corpos não passam por execute/evaluate:
+só as chamadas de função e as alocações são contadas.
+"""
+
+import os
+import json
+import time
+from collections import Counter
+
+from interpreter import Function, NajaList, NajaDict, NajaObject
+from environment import Environment, SlotEnvironment
+from naja_profiler import FunctionIndex
+
+# Classes cujas alocações são contadas (SlotEnvironment não chama Environment.__init__)
+_ALLOCATED_CLASSES = (NajaList, NajaDict, NajaObject, Environment, SlotEnvironment)
+
+# Marca de atributo ausente do próprio alvo em _patch() (o valor vinha da classe)
+_MISSING = object()
+
+
+class Instrumentation:
+    """Base das instrumentações: troca atributos do runtime e os restaura depois"""
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self._file = None  # Arquivo da função em execução (None: interpreter.current_file)
+        self._originals = []  # (alvo, atributo, valor original) restaurados em _restore()
+
+    def _patch(self, target, name, value):
+        """Troca um atributo de 'target' guardando o original (_MISSING se vinha da classe)"""
+        self._originals.append((target, name, vars(target).get(name, _MISSING)))
+        setattr(target, name, value)
+
+    def _restore(self):
+        """Desfaz todas as trocas de _patch(), da última para a primeira"""
+        for target, name, original in reversed(self._originals):
+            if original is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, original)
+        self._originals = []
+
+    def _patch_module_loading(self):
+        """Faz o corpo de um módulo importado dentro de uma função contar no arquivo do módulo"""
+        load_module = self.interpreter._load_module
+
+        def traced_load_module(module_name):
+            outer_file, self._file = self._file, None
+            try:
+                return load_module(module_name)
+            finally:
+                self._file = outer_file
+
+        self._patch(self.interpreter, "_load_module", traced_load_module)
+
+
+class TraceStats(Instrumentation):
+    """Conta execuções, tempo e alocações de um interpretador entre start() e stop()"""
+
+    def __init__(self, interpreter):
+        super().__init__(interpreter)
+        self.lines = {}  # (arquivo, linha) -> [instruções, avaliações, próprio, total, profundidade]
+        self.functions = {}  # declaração -> [chamadas, próprio, total, profundidade]
+        self.node_counts = Counter()  # nome do tipo de nó -> execuções/avaliações
+        self.allocations = Counter()  # nome da classe -> objetos criados
+        self.allocation_sites = Counter()  # (classe, arquivo, linha) -> objetos criados
+        self.elapsed = 0.0
+        self._functions = FunctionIndex(interpreter)
+        self._line = (None, None)  # (arquivo, linha) da instrução em execução
+        self._line_child = 0.0  # Tempo das instruções aninhadas na instrução atual
+        self._call_child = 0.0  # Tempo das chamadas aninhadas na função atual
+        self._started = None
+
+    def wrap(self, prefix, handler):
+        """Embrulha um handler de execute ('execute') ou de evaluate ('evaluate')"""
+        if prefix == "execute":
+            return self._wrap_statement(handler)
+        return self._wrap_expression(handler)
+
+    def _wrap_statement(self, handler):
+        """Handler de instrução que conta a linha e mede o tempo próprio e total"""
+        interpreter = self.interpreter
+        lines = self.lines
+        node_counts = self.node_counts
+        perf_counter = time.perf_counter
+
+        def traced(stmt):
+            node_counts[type(stmt).__name__] += 1
+            key = (self._file or interpreter.current_file, stmt.line)
+            entry = lines.get(key)
+            if entry is None:
+                entry = lines[key] = [0, 0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[4] += 1
+            outer_line, self._line = self._line, key
+            outer_child, self._line_child = self._line_child, 0.0
+            start = perf_counter()
+            try:
+                return handler(stmt)
+            finally:
+                elapsed = perf_counter() - start
+                entry[2] += elapsed - self._line_child
+                entry[4] -= 1
+                if not entry[4]:
+                    entry[3] += elapsed
+                self._line_child = outer_child + elapsed
+                self._line = outer_line
+
+        return traced
+
+    def _wrap_expression(self, handler):
+        """Handler de expressão que conta a avaliação na sua linha"""
+        interpreter = self.interpreter
+        lines = self.lines
+        node_counts = self.node_counts
+
+        def traced(expr):
+            node_counts[type(expr).__name__] += 1
+            key = (self._file or interpreter.current_file, expr.line)
+            entry = lines.get(key)
+            if entry is None:
+                entry = lines[key] = [0, 0, 0.0, 0.0, 0]
+            entry[1] += 1
+            return handler(expr)
+
+        return traced
+
+    def start(self):
+        """Instrumenta o interpretador e as classes do runtime"""
+        self.interpreter.set_instrumentation(self)
+        self._patch(Function, "__call__", self._traced_call(Function.__call__))
+        for cls in _ALLOCATED_CLASSES:
+            self._patch(cls, "__init__", self._counted_init(cls, cls.__init__))
+        self._patch_module_loading()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """Desfaz a instrumentação; os contadores continuam disponíveis"""
+        if self._started is None:
+            return
+        self.elapsed += time.perf_counter() - self._started
+        self._started = None
+        self._restore()
+        self.interpreter.set_instrumentation(None)
+
+    def _traced_call(self, call):
+        """Function.__call__ que conta chamadas e tempo por FunctionDeclaration"""
+        functions = self.functions
+        perf_counter = time.perf_counter
+
+        def traced_call(function, interpreter, arguments):
+            if interpreter is not self.interpreter:
+                return call(function, interpreter, arguments)
+            declaration = function.declaration
+            entry = functions.get(declaration)
+            if entry is None:
+                entry = functions[declaration] = [0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[3] += 1
+            outer_file = self._file
+            self._file = self._functions.label(declaration, outer_file or interpreter.current_file)[1]
+            outer_child, self._call_child = self._call_child, 0.0
+            start = perf_counter()
+            try:
+                return call(function, interpreter, arguments)
+            finally:
+                elapsed = perf_counter() - start
+                entry[1] += elapsed - self._call_child
+                entry[3] -= 1
+                if not entry[3]:
+                    entry[2] += elapsed
+                self._call_child = outer_child + elapsed
+                self._file = outer_file
+
+        return traced_call
+
+    def _counted_init(self, cls, init):
+        """__init__ de 'cls' que conta a alocação pela classe e pela linha atual"""
+        name = cls.__name__
+        allocations = self.allocations
+        sites = self.allocation_sites
+
+        def counted_init(obj, *args, **kwargs):
+            allocations[name] += 1
+            sites[(name,) + self._line] += 1
+            init(obj, *args, **kwargs)
+
+        return counted_init
+
+    def _function_name(self, declaration):
+        """'nome (arquivo:linha)' de uma FunctionDeclaration"""
+        name, file = self._functions.label(declaration)
+        return f"{name} ({_location(file, declaration.line)})"
+
+    def to_json(self):
+        """Contadores em um dicionário serializável em JSON, ordenados por tempo"""
+        functions = []
+        for declaration, (calls, own, total, _) in sorted(self.functions.items(), key=lambda item: -item[1][1]):
+            name, file = self._functions.label(declaration)
+            functions.append({"nome": name, "arquivo": file, "linha": declaration.line, "chamadas": calls,
+                              "tempo_proprio_s": own, "tempo_total_s": total})
+        lines = []
+        for (file, line), (statements, expressions, own, total, _) in sorted(self.lines.items(),
+                                                                             key=lambda item: -item[1][2]):
+            lines.append({"arquivo": file, "linha": line, "instrucoes": statements, "avaliacoes": expressions,
+                          "tempo_proprio_s": own, "tempo_total_s": total})
+        sites = [{"classe": name, "arquivo": file, "linha": line, "alocacoes": count}
+                 for (name, file, line), count in self.allocation_sites.most_common()]
+        return {
+            "tempo_s": self.elapsed,
+            "funcoes": functions,
+            "linhas": lines,
+            "nos": dict(self.node_counts.most_common()),
+            "alocacoes": dict(self.allocations.most_common()),
+            "locais_de_alocacao": sites,
+        }
+
+    def write_json(self, path):
+        """Grava os contadores em JSON"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_json(), file, ensure_ascii=False, indent=2)
+
+    def report(self, limit=15):
+        """Linhas das tabelas de funções, linhas e alocações, das mais caras para as mais baratas"""
+        report = [f"{'chamadas':>9} {'próprio':>10} {'total':>10}  função"]
+        for declaration, (calls, own, total, _) in sorted(self.functions.items(),
+                                                          key=lambda item: -item[1][1])[:limit]:
+            report.append(f"{calls:9d} {own * 1000:8.1f}ms {total * 1000:8.1f}ms  {self._function_name(declaration)}")
+
+        if self.lines:
+            report.append("")
+            report.append(f"{'instruções':>10} {'avaliações':>10} {'próprio':>10} {'total':>10}  linha")
+            for (file, line), (statements, expressions, own, total, _) in sorted(self.lines.items(),
+                                                                                 key=lambda item: -item[1][2])[:limit]:
+                report.append(f"{statements:10d} {expressions:10d} {own * 1000:8.1f}ms {total * 1000:8.1f}ms  "
+                              f"{_location(file, line)}")
+
+        if self.allocations:
+            report.append("")
+            report.append(", ".join(f"{name}: {count}" for name, count in self.allocations.most_common()))
+            report.append(f"{'alocações':>10}  local")
+            for (name, file, line), count in self.allocation_sites.most_common(limit):
+                report.append(f"{count:10d}  {name} em {_location(file, line)}")
+        return report
+
+
+def _location(file, line):
+    """'arquivo:linha' com o nome base do arquivo"""
+    name = os.path.basename(file) if file else "?"
+    return name if line is None else f"{name}:{line}"
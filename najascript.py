@@ -8,13 +8,11 @@ import traceback
 import time
 
 try:
-    from lexer import Lexer
-    from parser_naja import Parser
-    from interpreter import Interpreter, Environment
-    from naja_bytecode import NajaBytecodeCompiler, BytecodeInterpreter
-    from naja_llvm import NajaLLVMGenerator
+    from interpreter import Interpreter
+    from naja_bytecode import BytecodeInterpreter
     from ast_nodes import ImportStatement
-    from llvmlite import binding as llvm
+    from parse_cache import ParseCache
+    from tiered_jit import DEFAULT_THRESHOLD
 except Exception as e:
     print(f"Erro ao importar módulos: {e}")
     traceback.print_exc()
@@ -29,6 +27,8 @@ logger = logging.getLogger('naja')
 
 def initialize_llvm():
     """Inicializa o LLVM"""
+    # Importado sob demanda: o llvmlite é opcional e caro de carregar na inicialização
+    from llvmlite import binding as llvm
     llvm.initialize()
     llvm.initialize_native_target()
     llvm.initialize_native_asmprinter()
@@ -47,13 +47,98 @@ def main():
     parser.add_argument('--module-path', action='append', help='Caminhos adicionais para buscar módulos')
     parser.add_argument('--pt', action='store_true', help='Habilitar suporte a português')
     parser.add_argument('--debug', action='store_true', help='Mostrar informações de depuração')
+    parser.add_argument('--closures', action='store_true', help='Compilar a AST em closures Python antes de executar')
+    parser.add_argument('--vm', action='store_true', help='Compilar para bytecode e executar na máquina virtual de registradores')
+    parser.add_argument('--no-cache', action='store_true', help='Não ler nem gravar os caches em disco (ASTs em __najacache__ e código compilado pelo JIT)')
+    parser.add_argument('--ic-stats', action='store_true', help='Mostrar acertos/falhas dos caches inline de chamadas de método')
+    parser.add_argument('--jit', choices=['c', 'numba', 'llvm'],
+                        help='Compilar funções quentes em segundo plano (gcc, Numba ou MCJIT do llvmlite)')
+    parser.add_argument('--jit-threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help='Chamadas + iterações de laço para uma função ser compilada (padrão: %(default)s)')
+    parser.add_argument('--jit-batch', action='store_true',
+                        help='Com --jit c, compilar juntas as funções numéricas de cada módulo ao carregá-lo')
+    parser.add_argument('--jit-jobs', type=int, default=1,
+                        help='Processos gcc em paralelo na compilação em lote de módulos grandes')
+    parser.add_argument('--jit-cache-dir',
+                        help='Diretório do cache em disco do código compilado pelo JIT (padrão: ~/.cache/najascript)')
+    parser.add_argument('--jit-stats', action='store_true', help='Mostrar a camada e os tempos de compilação de cada função')
+    parser.add_argument('--aot', metavar='SAIDA',
+                        help='Compilar o script para um executável nativo (LLVM + gcc) em vez de executá-lo')
+    parser.add_argument('--profile', action='store_true',
+                        help='Amostrar a pilha do NajaScript e gravar as pilhas nos formatos collapsed e speedscope')
+    parser.add_argument('--profile-output', metavar='PREFIXO',
+                        help='Prefixo dos arquivos PREFIXO.folded e PREFIXO.speedscope.json (padrão: <script>.perfil)')
+    parser.add_argument('--profile-interval', type=float, default=5.0,
+                        help='Intervalo entre amostras do --profile em milissegundos (padrão: %(default)s)')
+    parser.add_argument('--trace-stats', action='store_true',
+                        help='Contar execuções, tempo e alocações por função e por linha (exato, porém lento)')
+    parser.add_argument('--trace-output', metavar='ARQUIVO',
+                        help='JSON com os contadores do --trace-stats (padrão: <script>.trace.json)')
+    parser.add_argument('--mem-report', action='store_true',
+                        help='Relatório de memória retida por categoria e por linha de criação ao final da execução')
+    parser.add_argument('--mem-interval', type=float, default=0.0, metavar='SEGUNDOS',
+                        help='Com --mem-report, gravar instantâneos periódicos e mostrar o crescimento entre eles')
+    parser.add_argument('--mem-output', metavar='ARQUIVO',
+                        help='JSON com os instantâneos do --mem-report (padrão: <script>.mem.json)')
     args = parser.parse_args()
+    if args.mem_report and args.trace_stats:
+        parser.error("--mem-report e --trace-stats não podem ser usados juntos")
+    if args.closures and args.vm:
+        parser.error("--closures e --vm não podem ser usados juntos")
 
     # Criar o interpretador
     interpreter = Interpreter()
     interpreter.debug = args.debug  # Usar o argumento de linha de comando
     interpreter.logger = logger
     
+    # Cache de ASTs em disco (invalidado por mudanças no código, na versão e em --pt)
+    interpreter.set_parse_cache(ParseCache(pt=args.pt, enabled=not args.no_cache))
+    
+    # Modo compilador de closures
+    if args.closures:
+        from closure_compiler import ClosureCompiler
+        interpreter.set_closure_compiler(ClosureCompiler(interpreter))
+    
+    # Modo máquina virtual de bytecode
+    elif args.vm:
+        interpreter.set_vm(BytecodeInterpreter(interpreter))
+    
+    # Compilação em camadas: funções quentes vão para o compilador JIT em segundo plano
+    if args.jit:
+        try:
+            if args.jit == 'numba':
+                from jit_compiler import JITCompiler
+                jit_compiler = JITCompiler(verbose=args.debug, cache_dir=args.jit_cache_dir,
+                                           use_cache=not args.no_cache)
+            elif args.jit == 'llvm':
+                from naja_llvm import LLVMJITCompiler
+                jit_compiler = LLVMJITCompiler(interpreter, verbose=args.debug)
+            else:
+                from c_jit_compiler import CJITCompiler
+                jit_compiler = CJITCompiler(verbose=args.debug, cache_dir=args.jit_cache_dir,
+                                            use_cache=not args.no_cache, jobs=args.jit_jobs)
+            interpreter.set_jit_compiler(jit_compiler, threshold=args.jit_threshold, batch=args.jit_batch)
+        except ImportError as e:
+            print(f"JIT indisponível, executando sem compilação: {e}")
+    
+    # Profiler por amostragem: sem --profile nada é instalado no interpretador
+    profiler = None
+    if args.profile:
+        from naja_profiler import SamplingProfiler
+        profiler = SamplingProfiler(interpreter, interval=args.profile_interval / 1000)
+    
+    # Contadores exatos por função, linha e alocação
+    trace_stats = None
+    if args.trace_stats:
+        from naja_trace import TraceStats
+        trace_stats = TraceStats(interpreter)
+    
+    # Relatório de memória (tracemalloc + percurso dos objetos do interpretador)
+    memory_report = None
+    if args.mem_report:
+        from naja_memory import MemoryReport
+        memory_report = MemoryReport(interpreter, interval=args.mem_interval)
+    
     # Log de início
     logger.info("Iniciando interpretador NajaScript")
     
@@ -84,17 +169,41 @@ def main():
             with open(args.file, 'r', encoding='utf-8') as file:
                 source = file.read()
             
-            # Pré-processamento do código (suporte a português)
-            source = interpreter.preprocess_source(source)
-
-            # Iniciar o lexer e parser
-            lexer = Lexer(source)
-            parser = Parser(lexer)
-            ast = parser.parse()
+            # Pré-processamento (suporte a português), lexer e parser, ou AST do cache
+            ast = interpreter.parse_file(args.file, source)
+            
+            # Compilação antecipada para um executável nativo
+            if args.aot:
+                try:
+                    from aot_compiler import AOTCompiler
+                except ImportError as e:
+                    print(f"Compilador AOT indisponível (requer llvmlite): {e}")
+                    sys.exit(1)
+                try:
+                    output_file = AOTCompiler().compile(ast, output_file=args.aot)
+                except Exception as e:
+                    print(f"Erro durante a compilação: {str(e)}")
+                    sys.exit(1)
+                print(f"Executável gerado: {output_file}")
+                return
             
             # Executar o código
             interpreter.current_file = os.path.abspath(args.file)
-            resultado = interpreter.interpret(ast)
+            if profiler:
+                profiler.start()
+            if trace_stats:
+                trace_stats.start()
+            if memory_report:
+                memory_report.start()
+            try:
+                resultado = interpreter.interpret(ast)
+            finally:
+                if memory_report:
+                    memory_report.stop()
+                if trace_stats:
+                    trace_stats.stop()
+                if profiler:
+                    profiler.stop()
             
             if resultado is not None:
                 print(resultado)
@@ -107,6 +216,46 @@ def main():
     else:
         print("Nenhum arquivo fornecido para execução")
     
+    # Estatísticas dos caches inline de MethodCall
+    if args.ic_stats:
+        print("\nCaches inline de chamadas de método:")
+        for line in interpreter.inline_cache_report():
+            print(line)
+    
+    # Camada e tempos de compilação de cada função
+    if args.jit_stats:
+        print("\nCompilação em camadas:")
+        for line in interpreter.jit_report():
+            print(line)
+    
+    # Perfil por amostragem: resumo na tela e pilhas em disco
+    if profiler and args.file:
+        prefix = args.profile_output or os.path.splitext(os.path.basename(args.file))[0] + '.perfil'
+        profiler.write_collapsed(prefix + '.folded')
+        profiler.write_speedscope(prefix + '.speedscope.json', name=os.path.basename(args.file))
+        print("\nPerfil:")
+        for line in profiler.report():
+            print(line)
+        print(f"Pilhas gravadas em {prefix}.folded e {prefix}.speedscope.json")
+    
+    # Contadores exatos: tabelas na tela e JSON em disco
+    if trace_stats and args.file:
+        output = args.trace_output or os.path.splitext(os.path.basename(args.file))[0] + '.trace.json'
+        trace_stats.write_json(output)
+        print("\nEstatísticas de execução:")
+        for line in trace_stats.report():
+            print(line)
+        print(f"Contadores gravados em {output}")
+    
+    # Memória: último instantâneo e crescimento na tela, série completa em JSON
+    if memory_report and args.file:
+        output = args.mem_output or os.path.splitext(os.path.basename(args.file))[0] + '.mem.json'
+        memory_report.write_json(output)
+        print("\nMemória:")
+        for line in memory_report.report():
+            print(line)
+        print(f"Instantâneos gravados em {output}")
+    
     # Exibir tempo de execução
     end_time = time.time()
     execution_time = end_time - start_time
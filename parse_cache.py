@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache persistente de ASTs do NajaScript
+
+Guarda a AST de cada arquivo .naja em um diretório __najacache__ ao lado do
+arquivo, como o __pycache__ do Python, para que execuções seguintes pulem o
+pré-processamento, o lexer e o parser.
+
+Cada entrada é um pickle da AST precedido de um cabeçalho com a chave da
+entrada: um hash do conteúdo do código-fonte, da versão do interpretador
+(versão do NajaScript mais uma impressão digital dos módulos do front-end)
+e das flags que afetam o parse (--pt). Qualquer mudança em um desses itens
+gera uma chave diferente e a entrada é refeita. Falhas ao ler ou gravar o
+cache nunca interrompem a execução: o arquivo é simplesmente parseado.
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+
+from lexer import Lexer
+from parser_naja import Parser
+
+NAJA_VERSION = "1.2.0"
+CACHE_DIR_NAME = "__najacache__"
+CACHE_SUFFIX = ".ast"
+
+# Cabeçalho dos arquivos de cache (incrementar ao mudar o formato)
+_MAGIC = b"NAJAAST1"
+
+# Módulos cujo código determina a AST produzida
+_FRONTEND_MODULES = ("lexer.py", "parser_naja.py", "ast_nodes.py", "interpreter.py", "parse_cache.py")
+
+_interpreter_fingerprint = None
+
+
+def interpreter_fingerprint():
+    """Impressão digital da versão do interpretador e dos módulos do front-end"""
+    global _interpreter_fingerprint
+    if _interpreter_fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(NAJA_VERSION.encode())
+        digest.update(sys.version.encode())
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in _FRONTEND_MODULES:
+            try:
+                with open(os.path.join(base_dir, name), "rb") as file:
+                    digest.update(file.read())
+            except OSError:
+                digest.update(name.encode())
+        _interpreter_fingerprint = digest.hexdigest()
+    return _interpreter_fingerprint
+
+
+class ParseCache:
+    """Cache de ASTs em disco indexado pelo conteúdo do código-fonte"""
+
+    def __init__(self, pt=False, enabled=True):
+        self.pt = pt
+        self.enabled = enabled
+        # Estatísticas da execução atual
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(self, source):
+        """Chave da entrada: conteúdo, versão do interpretador e flags"""
+        digest = hashlib.sha256()
+        digest.update(interpreter_fingerprint().encode())
+        digest.update(b"pt=1" if self.pt else b"pt=0")
+        digest.update(source.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest().encode()
+
+    def cache_path(self, path):
+        """Caminho do arquivo de cache de um arquivo .naja"""
+        directory, filename = os.path.split(os.path.abspath(path))
+        return os.path.join(directory, CACHE_DIR_NAME, filename + CACHE_SUFFIX)
+
+    def parse(self, path, source, preprocess):
+        """Retorna a AST de 'source', lida do cache ou parseada e gravada nele
+
+        'preprocess' é a função de pré-processamento do interpretador
+        (Interpreter.preprocess_source), aplicada apenas quando há parse.
+        """
+        if not self.enabled or path is None:
+            return self._parse(source, preprocess)
+
+        key = self.cache_key(source)
+        cache_path = self.cache_path(path)
+
+        ast = self._read(cache_path, key)
+        if ast is not None:
+            self.hits += 1
+            return ast
+
+        self.misses += 1
+        ast = self._parse(source, preprocess)
+        self._write(cache_path, key, ast)
+        return ast
+
+    def _parse(self, source, preprocess):
+        return Parser(Lexer(preprocess(source))).parse()
+
+    def _read(self, cache_path, key):
+        """Lê uma entrada válida para a chave ou retorna None"""
+        try:
+            with open(cache_path, "rb") as file:
+                if file.read(len(_MAGIC)) != _MAGIC or file.read(len(key)) != key:
+                    return None
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError,
+                IndexError, TypeError, ValueError):
+            return None
+
+    def _write(self, cache_path, key, ast):
+        """Grava a entrada de forma atômica; erros são ignorados"""
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            data = pickle.dumps(ast, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(temp_path, "wb") as file:
+                file.write(_MAGIC)
+                file.write(key)
+                file.write(data)
+            os.replace(temp_path, cache_path)
+        except (OSError, pickle.PicklingError, RecursionError, TypeError, AttributeError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -1,13 +1,51 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import functools
+
 from lexer import TokenType
 from ast_nodes import *
 
+def _spanned(parse_method):
+    """Registra no nó produzido por um método do parser a posição do primeiro e do último token"""
+    @functools.wraps(parse_method)
+    def wrapper(self, *args, **kwargs):
+        start = self.current_token
+        node = parse_method(self, *args, **kwargs)
+        if isinstance(node, Node) and node.line is None:
+            _fill_span(node, start, self.previous_token or start)
+        return node
+    return wrapper
+
+def _fill_span(node, start, end):
+    """Define a posição de um nó e deriva a dos descendentes criados sem posição
+
+    Nós intermediários construídos dentro do mesmo método (por exemplo, o
+    'a + b' de 'a + b + c') recebem a posição do primeiro ao último filho;
+    nós sem filhos posicionados herdam a posição de 'node'.
+    """
+    node.line, node.column = start.line, start.column
+    node.end_line, node.end_column = end.line, end.column
+    
+    # Pós-ordem iterativa sobre os descendentes ainda sem posição
+    pending = [(child, False) for child in iter_child_nodes(node) if child.line is None]
+    while pending:
+        current, expanded = pending.pop()
+        if not expanded:
+            pending.append((current, True))
+            pending.extend((child, False) for child in iter_child_nodes(current) if child.line is None)
+            continue
+        
+        spanned = [child for child in iter_child_nodes(current) if child.line is not None]
+        first, last = (spanned[0], spanned[-1]) if spanned else (node, node)
+        current.line, current.column = first.line, first.column
+        current.end_line, current.end_column = last.end_line, last.end_column
+
 class Parser:
     def __init__(self, lexer):
         self.lexer = lexer
         self.current_token = self.lexer.get_next_token()
+        self.previous_token = None  # Último token consumido, usado nas posições dos nós
     
     def error(self, message):
         raise Exception(f"Erro sintático na linha {self.current_token.line}, coluna {self.current_token.column}: {message}")
@@ -15,6 +53,7 @@ class Parser:
     def eat(self, token_type):
         if self.current_token.type == token_type:
             token = self.current_token
+            self.previous_token = token
             self.current_token = self.lexer.get_next_token()
             return token
         else:
@@ -26,6 +65,7 @@ class Parser:
         self.eat(TokenType.EOF)
         return program
     
+    @_spanned
     def program(self):
         """
         program : statement_list
@@ -45,6 +85,7 @@ class Parser:
         
         return statements
     
+    @_spanned
     def statement(self):
         """
         statement : var_declaration
@@ -730,6 +771,7 @@ class Parser:
         
         return left
     
+    @_spanned
     def primary_expression(self):
         """
         primary_expression : IDENTIFIER
@@ -1125,6 +1167,7 @@ class Parser:
         
         return arguments
     
+    @_spanned
     def parse_decorator(self):
         """
         decorator : '@' IDENTIFIER ['(' argument_list ')']
@@ -1223,6 +1266,7 @@ class Parser:
         class_decl.decorators = decorators
         return class_decl
     
+    @_spanned
     def class_member(self):
         """
         class_member : property_declaration | method_declaration | constructor_declaration
@@ -1463,6 +1507,7 @@ class Parser:
         
         return InterfaceDeclaration(name, methods, extends, generic_params)
     
+    @_spanned
     def interface_method(self):
         """
         interface_method : ['async'] 'fun' IDENTIFIER ['<' IDENTIFIER (',' IDENTIFIER)* '>'] '(' parameter_list ')' [':' type] ';'
@@ -1554,6 +1599,7 @@ class Parser:
         
         return TryStatement(try_block, catch_clauses, finally_block)
     
+    @_spanned
     def catch_clause(self):
         """
         catch_clause : 'catch' '(' [type] IDENTIFIER ')' '{' statement_list '}'
@@ -1612,6 +1658,7 @@ class Parser:
         
         return MatchStatement(expression, cases)
     
+    @_spanned
     def match_case(self):
         """
         match_case : expression [WHEN expression] '=>' (expression | '{' statement_list '}') ';'
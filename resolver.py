@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Resolvedor estático de variáveis para NajaScript
+
+Percorre a AST produzida pelo parser antes da execução e anota cada
+Variable, Assignment e CompoundAssignment que se refere a uma variável
+local com o par (depth, slot). 'depth' é o número de ambientes a subir a
+partir do ambiente atual e 'slot' é o índice no array de slots do
+SlotEnvironment daquele nível.
+
+Os escopos espelham exatamente os ambientes criados pelo interpretador:
+
+  - chamada de função: um ambiente com parâmetros e corpo
+  - cada ramo de if/elif/else: um ambiente novo
+  - for: um único ambiente para inicialização e corpo
+  - while e blocos: executam no ambiente atual
+
+O escopo global, os corpos de métodos de classe (que recebem 'this' em um
+ambiente montado em tempo de execução) e qualquer escopo que contenha
+import/export continuam dinâmicos: referências que chegam até eles não são
+anotadas e usam a busca por nome de Environment.
+
+O resolver também decide duas otimizações de alocação de ambientes:
+
+  - elisão de blocos: um escopo que não declara nada é gravado no nó como
+    {} e o interpretador reutiliza o ambiente atual em vez de criar um novo
+    (e o bloco não conta na profundidade das variáveis)
+  - pool de frames: funções cujo corpo não pode capturar o ambiente da
+    chamada (funções aninhadas, classes, new, flux, import/export, super,
+    await) são marcadas com pool_frames e reutilizam seus SlotEnvironment
+"""
+
+from ast_nodes import *
+
+
+# Nós que podem guardar uma referência ao ambiente em que são executados
+_CAPTURING_NODES = (
+    FunctionDeclaration, ClassDeclaration, NewExpression, FluxDeclaration,
+    ImportStatement, ExportStatement, SuperExpression, AwaitExpression,
+)
+
+
+class Resolver:
+    """Anota a AST com as posições (profundidade, slot) das variáveis locais"""
+
+    def __init__(self, elide_blocks=True, pool_frames=True):
+        # Pilha de escopos: dicionário {nome: slot} ou None para escopo dinâmico
+        self.scopes = []
+        self.elide_blocks = elide_blocks
+        self.pool_frames = pool_frames
+
+    def resolve(self, ast):
+        """Resolve um Program (ou lista de statements) no escopo global dinâmico"""
+        statements = ast.statements if isinstance(ast, Program) else ast
+        self.scopes = [None]
+        self._resolve_statements(statements)
+        return ast
+
+    # ------------------------------------------------------------------
+    # Escopos
+    # ------------------------------------------------------------------
+
+    def _new_scope(self, statements, names=()):
+        """Cria o escopo de um ambiente novo ou None se ele precisar ser dinâmico"""
+        scope = {}
+        for name in names:
+            scope.setdefault(name, len(scope))
+        if not self._declare(statements, scope):
+            return None
+        return scope
+
+    def _declare(self, statements, scope):
+        """Registra os nomes declarados diretamente no ambiente; False se o escopo for dinâmico"""
+        for stmt in statements or []:
+            if isinstance(stmt, (ImportStatement, ExportStatement)):
+                return False
+            if isinstance(stmt, (VarDeclaration, FunctionDeclaration, ClassDeclaration, FluxDeclaration)):
+                scope.setdefault(stmt.name, len(scope))
+            elif isinstance(stmt, BlockStatement):
+                if not self._declare(stmt.statements, scope):
+                    return False
+            elif isinstance(stmt, WhileStatement):
+                # O corpo do while executa no ambiente atual
+                if not self._declare(stmt.body, scope):
+                    return False
+        return True
+
+    def _lookup(self, name):
+        """Procura um nome nos escopos estáticos; retorna (depth, slot) ou None"""
+        depth = 0
+        for scope in reversed(self.scopes):
+            if scope is None:
+                return None
+            slot = scope.get(name)
+            if slot is not None:
+                return depth, slot
+            depth += 1
+        return None
+
+    def _annotate(self, node, name):
+        """Grava em um nó a posição resolvida de um nome"""
+        resolved = self._lookup(name) if isinstance(name, str) else None
+        if resolved is None:
+            node.depth = None
+            node.slot = None
+        else:
+            node.depth, node.slot = resolved
+
+    def _is_elided(self, scope):
+        """Verifica se o escopo não declara nada e pode reutilizar o ambiente atual"""
+        return self.elide_blocks and scope is not None and not scope
+
+    def _node_scope(self, scope):
+        """Escopo gravado no nó: None (dinâmico), {} (bloco elidido) ou {nome: slot}"""
+        if scope is not None and not scope and not self.elide_blocks:
+            return None
+        return scope
+
+    def _resolve_in_scope(self, scope, statements):
+        """Resolve uma lista de statements dentro de um escopo novo"""
+        if self._is_elided(scope):
+            # Bloco elidido executa no ambiente atual
+            self._resolve_statements(statements)
+            return
+
+        self.scopes.append(scope)
+        try:
+            self._resolve_statements(statements)
+        finally:
+            self.scopes.pop()
+
+    # ------------------------------------------------------------------
+    # Percurso
+    # ------------------------------------------------------------------
+
+    def _resolve_statements(self, statements):
+        for stmt in statements or []:
+            self._resolve(stmt)
+
+    def _resolve(self, node):
+        if isinstance(node, Variable):
+            self._annotate(node, node.name)
+        elif isinstance(node, (Assignment, CompoundAssignment)):
+            self._annotate(node, node.name)
+            if not isinstance(node.name, str):
+                self._resolve(node.name)
+            self._resolve(node.value)
+        elif isinstance(node, ClassDeclaration):
+            self._resolve_class(node)
+        elif isinstance(node, FunctionDeclaration):
+            self._resolve_function(node)
+        elif isinstance(node, IfStatement):
+            self._resolve_if(node)
+        elif isinstance(node, ForStatement):
+            self._resolve_for(node)
+        elif isinstance(node, Node):
+            self._resolve_children(node)
+
+    def _resolve_children(self, node):
+        """Resolve genericamente os filhos de um nó sem escopo próprio"""
+        for child in iter_child_nodes(node):
+            self._resolve(child)
+
+    def _resolve_function(self, stmt):
+        names = [_parameter_name(param) for param in stmt.parameters]
+        scope = self._new_scope(stmt.body, names)
+        stmt.scope = self._node_scope(scope)
+        stmt.pool_frames = (self.pool_frames and bool(scope) and not stmt.is_async
+                            and not _captures_environment(stmt.body))
+        self._resolve_in_scope(scope, stmt.body)
+
+    def _resolve_class(self, stmt):
+        for prop in stmt.properties:
+            if prop.value is not None:
+                self._resolve(prop.value)
+        for method in stmt.methods:
+            # Métodos e construtores executam com 'this' em um ambiente dinâmico
+            method.scope = None
+            method.pool_frames = False
+            self._resolve_in_scope(None, method.body)
+
+    def _resolve_if(self, stmt):
+        self._resolve(stmt.condition)
+
+        scope = self._new_scope(stmt.then_branch)
+        stmt.then_scope = self._node_scope(scope)
+        self._resolve_in_scope(scope, stmt.then_branch)
+
+        stmt.elif_scopes = []
+        for elif_condition, elif_body in stmt.elif_branches:
+            self._resolve(elif_condition)
+            scope = self._new_scope(elif_body)
+            stmt.elif_scopes.append(self._node_scope(scope))
+            self._resolve_in_scope(scope, elif_body)
+
+        stmt.else_scope = None
+        if stmt.else_branch:
+            scope = self._new_scope(stmt.else_branch)
+            stmt.else_scope = self._node_scope(scope)
+            self._resolve_in_scope(scope, stmt.else_branch)
+
+    def _resolve_for(self, stmt):
+        init = [stmt.init] if isinstance(stmt.init, VarDeclaration) else []
+        scope = self._new_scope(init + list(stmt.body or []))
+        stmt.scope = self._node_scope(scope)
+
+        self._resolve_in_scope(scope, [stmt.init, stmt.condition, stmt.update] + list(stmt.body or []))
+
+
+def _captures_environment(statements):
+    """Verifica se algum nó das statements pode guardar o ambiente da chamada"""
+    return any(isinstance(node, _CAPTURING_NODES) for node in walk(statements or []))
+
+
+def _parameter_name(param):
+    """Nome de um parâmetro, com as mesmas regras de Function.__call__"""
+    if hasattr(param, 'name'):
+        return param.name
+    elif isinstance(param, tuple) and len(param) > 1:
+        return param[1]
+    return str(param)
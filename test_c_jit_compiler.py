@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do JIT em C: o cache em disco das bibliotecas (despejo LRU,
+publicação atômica com processos concorrentes, entradas corrompidas) e o
+código gerado para float e listas de float, que tem que dar exatamente o
+valor do interpretador
+"""
+
+import os
+import time
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from interpreter import Interpreter, NajaList
+from c_jit_cache import CJITCache, CACHE_SUFFIX, function_key
+from c_jit_compiler import CJITCompiler, _GCC_FLAGS
+
+needs_gcc = pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc não encontrado")
+
+PROGRAM = """
+fun trapezio(float a, float b, int n) {
+    float h = (b - a) / n;
+    float soma = (a * a + b * b) / 2;
+    for (int i = 1; i < n; i = i + 1) {
+        float x = a + i * h;
+        soma += x * x;
+    }
+    return soma * h;
+}
+fun razao(int a, int b) {
+    return a / b + 0.1;
+}
+fun produto(any u, any v) {
+    float soma = 0.0;
+    for (int i = 0; i < u.length(); i = i + 1) {
+        soma += u.get(i) * v.get(i);
+    }
+    return soma;
+}
+fun maximo(any v) {
+    float m = v.get(0);
+    for (int i = 1; i < v.length(); i = i + 1) {
+        if (v.get(i) > m) {
+            m = v.get(i);
+        }
+    }
+    return m;
+}
+"""
+
+_U = [k * 0.37 - 3.1 for k in range(50)]
+_V = [1.0 / (k + 1) for k in range(50)]
+
+CASES = [
+    ("trapezio", (float, float, int), [0.0, 2.5, 1000]),
+    ("trapezio", (float, float, int), [-1.3, 0.7, 77]),
+    ("razao", (int, int), [7, 3]),
+    ("razao", (int, int), [-9, 4]),
+    ("produto", (NajaList, NajaList), [NajaList(_U), NajaList(_V)]),
+    ("maximo", (NajaList,), [NajaList(_V[::-1] + _U)]),
+]
+
+
+def _interpreter(jit_compiler=None):
+    """Interpretador com as funções de PROGRAM definidas"""
+    interpreter = Interpreter()
+    if jit_compiler is not None:
+        interpreter.set_jit_compiler(jit_compiler, threshold=1, background=False)
+    interpreter.interpret(interpreter.parse_file("c_jit.naja", PROGRAM))
+    return interpreter
+
+
+def _declaration(interpreter, name):
+    return interpreter.globals.get(name).declaration
+
+
+def _compile_and_call(cache_dir):
+    """Executado em outro processo: compila trapezio com o cache compartilhado e a chama"""
+    interpreter = _interpreter()
+    compiler = CJITCompiler(verbose=False, cache_dir=cache_dir)
+    compiled = compiler.compile_function(_declaration(interpreter, "trapezio"), interpreter.globals,
+                                         signature=(float, float, int))
+    return compiled(0.0, 2.5, 1000)
+
+
+# ----------------------------------------------------------------------
+# Cache em disco
+# ----------------------------------------------------------------------
+
+def _store(cache, key, size, age=0):
+    """Publica uma entrada falsa de 'size' bytes com a data de uso 'age' segundos atrás"""
+    temp_path = cache.temp_path(key)
+    with open(temp_path, "wb") as file:
+        file.write(b"\0" * size)
+    path = cache.store(key, temp_path)
+    if age:
+        moment = time.time() - age
+        os.utime(path, (moment, moment))
+    return path
+
+
+def _entries(cache_dir):
+    return sorted(name[:-len(CACHE_SUFFIX)] for name in os.listdir(cache_dir) if name.endswith(CACHE_SUFFIX))
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = CJITCache(str(tmp_path), max_bytes=250)
+    _store(cache, "a", 100, age=300)
+    _store(cache, "b", 100, age=200)
+    assert _entries(tmp_path) == ["a", "b"]
+
+    # Um acerto renova a entrada mais antiga
+    assert cache.lookup("a") == cache.cache_path("a")
+    assert cache.lookup("x") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    _store(cache, "c", 100, age=100)
+    assert _entries(tmp_path) == ["a", "c"]
+    # 'c' (usada há 100 s) é mais antiga que 'a' (renovada agora)
+    _store(cache, "d", 100)
+    assert _entries(tmp_path) == ["a", "d"]
+
+
+def test_lru_order_follows_mtime(tmp_path):
+    """Despeja na ordem da data de uso até caber, mesmo com a entrada nova maior que as outras"""
+    cache = CJITCache(str(tmp_path), max_bytes=1000)
+    for index, key in enumerate("abcde"):
+        _store(cache, key, 200, age=500 - index * 100)
+    os.utime(cache.cache_path("b"))
+    cache.max_bytes = 600
+    _store(cache, "f", 300)
+    assert _entries(tmp_path) == ["b", "f"]
+
+
+def test_stale_temporaries_are_removed(tmp_path):
+    cache = CJITCache(str(tmp_path))
+    old = cache.temp_path("velho")
+    recent = cache.temp_path("recente")
+    for path in (old, recent):
+        with open(path, "wb") as file:
+            file.write(b"incompleto")
+    moment = time.time() - 2 * 3600
+    os.utime(old, (moment, moment))
+    cache.evict()
+    assert not os.path.exists(old)
+    assert os.path.exists(recent)
+    # Temporários nunca são vistos como entradas
+    assert cache.lookup("recente") is None
+
+
+def test_store_failure_keeps_temporary(tmp_path):
+    cache = CJITCache(str(tmp_path / "cache"))
+    temp_path = cache.temp_path("k")
+    with open(temp_path, "wb") as file:
+        file.write(b"so")
+    shutil.rmtree(tmp_path / "cache")
+    assert cache.store("k", temp_path) == temp_path
+
+
+@needs_gcc
+def test_concurrent_writers_publish_one_complete_library(tmp_path):
+    """Processos que compilam a mesma função ao mesmo tempo deixam uma entrada válida"""
+    interpreter = _interpreter()
+    expected = interpreter.globals.get("trapezio")(interpreter, [0.0, 2.5, 1000])
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_compile_and_call, [str(tmp_path)] * 4))
+    assert results == [expected] * 4
+    names = os.listdir(tmp_path)
+    assert len(names) == 1 and names[0].endswith(CACHE_SUFFIX) and ".tmp" not in names[0]
+    # A entrada publicada carrega e funciona em um processo novo
+    assert _compile_and_call(str(tmp_path)) == expected
+
+
+@needs_gcc
+def test_corrupt_entry_is_recompiled(tmp_path):
+    interpreter = _interpreter()
+    declaration = _declaration(interpreter, "trapezio")
+    signature = (float, float, int)
+    cache = CJITCache(str(tmp_path))
+    path = cache.cache_path(function_key(declaration, signature, _GCC_FLAGS))
+    with open(path, "wb") as file:
+        file.write(b"isto nao e uma biblioteca")
+
+    compiled = CJITCompiler(verbose=False, cache_dir=str(tmp_path)).compile_function(
+        declaration, interpreter.globals, signature=signature)
+    assert compiled(0.0, 2.5, 1000) == interpreter.globals.get("trapezio")(interpreter, [0.0, 2.5, 1000])
+    with open(path, "rb") as file:
+        assert file.read(4) == b"\x7fELF"
+
+
+# ----------------------------------------------------------------------
+# Código gerado para float e listas
+# ----------------------------------------------------------------------
+
+@needs_gcc
+@pytest.mark.parametrize("name, signature, arguments", CASES)
+def test_compiled_matches_interpreter(name, signature, arguments):
+    interpreter = _interpreter()
+    expected = interpreter.globals.get(name)(interpreter, arguments)
+    assert isinstance(expected, float)
+
+    compiled = CJITCompiler(verbose=False, use_cache=False).compile_function(
+        _declaration(interpreter, name), interpreter.globals, signature=signature)
+    assert compiled(*arguments) == expected
+
+
+@needs_gcc
+@pytest.mark.parametrize("name, signature, arguments", CASES)
+def test_tiered_matches_interpreter(name, signature, arguments):
+    """Na execução em camadas, a versão compilada é instalada e dá o mesmo valor"""
+    interpreter = _interpreter()
+    expected = interpreter.globals.get(name)(interpreter, arguments)
+
+    tiered = _interpreter(CJITCompiler(verbose=False, use_cache=False))
+    function = tiered.globals.get(name)
+    for _ in range(3):
+        assert function(tiered, arguments) == expected
+    assert function.compiled_version is not None
+
+
+@needs_gcc
+def test_list_guards():
+    """Listas com elementos que não são float e índices fora da lista não rodam em C"""
+    interpreter = _interpreter()
+    produto = CJITCompiler(verbose=False, use_cache=False).compile_function(
+        _declaration(interpreter, "produto"), interpreter.globals, signature=(NajaList, NajaList))
+    with pytest.raises(TypeError):
+        produto(NajaList([1.0, 2]), NajaList([1.0, 1.0]))
+    with pytest.raises(IndexError):
+        produto(NajaList([1.0, 2.0]), NajaList([1.0]))
+
+    tiered = _interpreter(CJITCompiler(verbose=False, use_cache=False))
+    function = tiered.globals.get("produto")
+    for _ in range(3):
+        function(tiered, [NajaList([0.5, 1.5]), NajaList([2.0, 4.0])])
+    assert function.compiled_version is not None
+    # Elementos int: a chamada é interpretada e dá o valor do interpretador
+    assert function(tiered, [NajaList([1, 2]), NajaList([3.0, 4.0])]) == 11.0
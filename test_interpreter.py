@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do controle de fluxo por sinais (RETURN_SIGNAL, BREAK_SIGNAL,
+CONTINUE_SIGNAL e completion_value) e dos caches inline de MethodCall nos
+três modos de execução
+"""
+
+import gc
+
+import pytest
+
+from interpreter import NajaList, NajaDict, INLINE_CACHE_SIZE
+from conftest import make_interpreter
+
+
+def test_return_from_nested_loops(run_naja, mode):
+    """return dentro de while dentro de for encerra a função com o valor"""
+    source = """
+fun procura(int alvo) {
+    for (int i = 0; i < 5; i = i + 1) {
+        int j = 0;
+        while (j < 5) {
+            if (i * j == alvo) {
+                return i * 10 + j;
+            }
+            j = j + 1;
+        }
+    }
+    return -1;
+}
+println(procura(6));
+println(procura(7));
+println(procura(0));
+"""
+    assert run_naja(source, mode) == "23\n-1\n0\n"
+
+
+def test_break_and_continue_inside_if(run_naja, mode):
+    """break/continue dentro de if e elif afetam o laço mais interno"""
+    source = """
+int soma = 0;
+for (int i = 0; i < 10; i = i + 1) {
+    if (i % 2 == 0) {
+        continue;
+    }
+    if (i > 7) {
+        break;
+    }
+    soma = soma + i;
+}
+println(soma);
+int k = 0;
+int pares = 0;
+while (true) {
+    k = k + 1;
+    if (k > 6) {
+        break;
+    } elif (k % 2 == 1) {
+        continue;
+    }
+    pares = pares + k;
+}
+println(pares);
+int internos = 0;
+for (int a = 0; a < 3; a = a + 1) {
+    for (int b = 0; b < 3; b = b + 1) {
+        if (b == 1) {
+            break;
+        }
+        internos = internos + 1;
+    }
+}
+println(internos);
+"""
+    assert run_naja(source, mode) == "16\n12\n3\n"
+
+
+def test_break_and_continue_in_loop_inside_function(run_naja, mode):
+    """Os sinais de laço param no laço da função, que segue até o return"""
+    source = """
+fun conta(int limite) {
+    int n = 0;
+    int i = 0;
+    while (true) {
+        i = i + 1;
+        if (i > limite) {
+            break;
+        }
+        if (i == 2) {
+            continue;
+        }
+        n = n + 1;
+    }
+    return n;
+}
+println(conta(5));
+"""
+    assert run_naja(source, mode) == "4\n"
+
+
+def test_return_without_value(run_naja, mode):
+    """return sem valor, ou sem return, devolve null"""
+    source = """
+fun nada() {
+    return;
+}
+fun talvez(int x) {
+    if (x > 0) {
+        return;
+    }
+    x = 1;
+}
+println(nada());
+println(talvez(1));
+println(talvez(0));
+"""
+    assert run_naja(source, mode) == "None\nNone\nNone\n"
+
+
+@pytest.mark.parametrize("statement", ["break", "continue"])
+def test_loop_signal_outside_loop(run_naja, mode, statement, capsys):
+    """break/continue fora de laço é erro, no programa e dentro de função"""
+    assert run_naja(f"println(1);\n{statement};\nprintln(2);\n", mode) == (
+        f"1\nErro durante a interpretação: '{statement}' fora de um laço\n")
+    # O sinal não vira o resultado do programa (que o najascript.py imprimiria)
+    interpreter = make_interpreter(mode)
+    assert interpreter.interpret(interpreter.parse_file("sinais.naja", f"{statement};\n")) is None
+    capsys.readouterr()
+    assert run_naja(f"if (true) {{\n    {statement};\n}}\nprintln(2);\n", mode) == (
+        f"Erro durante a interpretação: '{statement}' fora de um laço\n")
+
+    # Dentro de função, o sinal não escapa para o laço de quem chamou
+    interpreter = make_interpreter(mode)
+    source = f"""
+fun sai() {{
+    {statement};
+}}
+int voltas = 0;
+while (voltas < 3) {{
+    voltas = voltas + 1;
+    sai();
+}}
+"""
+    interpreter.interpret(interpreter.parse_file("sinais.naja", source))
+    assert interpreter.error == f"'{statement}' fora de um laço"
+    assert interpreter.globals.get("voltas") == 1
+    with pytest.raises(Exception, match="fora de um laço"):
+        interpreter.globals.get("sai")(interpreter, [])
+
+
+def _method_cache(interpreter, method):
+    """Único cache inline registrado para chamadas de 'method'"""
+    caches = [cache for cache in interpreter.method_caches if cache.node.method == method]
+    assert len(caches) == 1
+    return caches[0]
+
+
+def test_inline_cache_monomorphic(mode):
+    """Um só tipo de receptor: a primeira chamada resolve, as demais acertam"""
+    interpreter = make_interpreter(mode)
+    interpreter.interpret(interpreter.parse_file("cache.naja", """
+list l = [];
+for (int i = 0; i < 10; i = i + 1) {
+    l.add(i);
+}
+"""))
+    cache = _method_cache(interpreter, "add")
+    assert (cache.hits, cache.misses) == (9, 1)
+    assert list(cache.entries) == [NajaList]
+    assert not cache.is_megamorphic()
+
+
+def test_inline_cache_polymorphic(mode):
+    """Cada tipo novo é uma falha; depois todos acertam"""
+    interpreter = make_interpreter(mode)
+    interpreter.interpret(interpreter.parse_file("cache.naja", """
+fun tamanho(any x) {
+    return x.length();
+}
+dict d = {};
+d.add("a", 1);
+list valores = [[1, 2], d, "abc"];
+int total = 0;
+for (int i = 0; i < 12; i = i + 1) {
+    total = total + tamanho(valores.get(i % 3));
+}
+"""))
+    assert interpreter.globals.get("total") == 4 * (2 + 1 + 3)
+    cache = _method_cache(interpreter, "length")
+    assert (cache.hits, cache.misses) == (9, 3)
+    assert list(cache.entries) == [NajaList, NajaDict, str]
+    assert not cache.is_megamorphic()
+
+
+def test_inline_cache_megamorphic(mode):
+    """Com mais de INLINE_CACHE_SIZE tipos, os excedentes falham sempre e usam _invoke_method"""
+    class Texto(str):
+        pass
+
+    class OutroTexto(str):
+        pass
+
+    interpreter = make_interpreter(mode)
+    interpreter.interpret(interpreter.parse_file("cache.naja", """
+fun tamanho(any x) {
+    return x.length();
+}
+"""))
+    receivers = [NajaList([1]), NajaDict(), "ab", Texto("abc"), OutroTexto("abcd")]
+    assert len(receivers) == INLINE_CACHE_SIZE + 1
+    tamanho = interpreter.globals.get("tamanho")
+    for _ in range(3):
+        assert [tamanho(interpreter, [receiver]) for receiver in receivers] == [1, 0, 2, 3, 4]
+    cache = _method_cache(interpreter, "length")
+    assert len(cache.entries) == INLINE_CACHE_SIZE
+    assert OutroTexto not in cache.entries
+    assert (cache.hits, cache.misses) == (2 * INLINE_CACHE_SIZE, INLINE_CACHE_SIZE + 3)
+    assert cache.is_megamorphic()
+    assert "(megamórfico)" in "\n".join(interpreter.inline_cache_report())
+
+
+def test_inline_caches_do_not_pin_discarded_asts(mode):
+    """O registro de caches é fraco: um programa descartado leva os seus caches junto"""
+    interpreter = make_interpreter(mode)
+    interpreter.interpret(interpreter.parse_file("a.naja", "list l = [];\nl.add(1);\n"))
+    assert [cache.node.method for cache in interpreter.method_caches] == ["add"]
+    interpreter.interpret(interpreter.parse_file("b.naja", "string s = \"x\";\nprintln(s.length());\n"))
+    gc.collect()
+    assert [cache.node.method for cache in interpreter.method_caches] == ["length"]
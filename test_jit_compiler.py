@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do JIT com Numba: os operadores inteiros verificados nunca devolvem
+valores de 64 bits com wraparound, e a execução em camadas produz o mesmo
+resultado que o interpretador
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("numba")
+
+from interpreter import Interpreter
+from jit_compiler import JITCompiler, naja_mul
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+PROGRAM = """
+fun fact(int n) {
+    if (n <= 1) {
+        return 1;
+    }
+    return n * fact(n - 1);
+}
+fun big(int n) {
+    int r = 1;
+    for (int i = 0; i < n; i = i + 1) {
+        r = r * 3;
+    }
+    return r;
+}
+"""
+
+
+def _interpreter(jit_compiler=None):
+    """Interpretador com as funções de PROGRAM definidas"""
+    interpreter = Interpreter()
+    if jit_compiler is not None:
+        interpreter.set_jit_compiler(jit_compiler, threshold=1, background=False)
+    interpreter.interpret(interpreter.parse_file("overflow.naja", PROGRAM))
+    return interpreter
+
+
+def _declaration(interpreter, name):
+    return interpreter.globals.get(name).declaration
+
+
+def test_naja_mul_checks_before_multiplying():
+    """naja_mul levanta OverflowError exatamente quando o produto não cabe em int64"""
+    values = [0, 1, -1, 2, -2, 3, -3, 3037000499, 3037000500, -3037000499, -3037000500,
+              3 * 10 ** 9, 4 * 10 ** 9, INT64_MIN, INT64_MIN + 1, INT64_MAX, INT64_MAX - 1]
+    for a in values:
+        for b in values:
+            product = a * b
+            if INT64_MIN <= product <= INT64_MAX:
+                assert naja_mul(a, b) == product
+            else:
+                with pytest.raises(OverflowError):
+                    naja_mul(a, b)
+
+
+@pytest.mark.parametrize("name, argument", [("fact", 25), ("big", 100000)])
+def test_overflow_matches_interpreter(name, argument):
+    """A função compilada recusa o overflow, e a chamada em camadas dá o valor do interpretador"""
+    interpreter = _interpreter()
+    expected = interpreter.globals.get(name)(interpreter, [argument])
+    assert expected > INT64_MAX
+
+    compiled = JITCompiler(verbose=False, use_cache=False).compile_function(
+        _declaration(interpreter, name), interpreter.globals, signature=(int,))
+    assert compiled is not None
+    with pytest.raises(OverflowError):
+        compiled(argument)
+
+    tiered = _interpreter(JITCompiler(verbose=False, use_cache=False))
+    function = tiered.globals.get(name)
+    for _ in range(3):
+        # Com threshold=1 a versão compilada é instalada nas primeiras chamadas
+        assert function(tiered, [2]) == interpreter.globals.get(name)(interpreter, [2])
+    assert function.compiled_version is not None
+    assert function(tiered, [argument]) == expected
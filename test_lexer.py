@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paridade entre o lexer da expressão regular mestre (Lexer.tokens) e o
+lexer caractere a caractere (legacy=True): mesmos tipos, valores, linhas e
+colunas de cada token, e os mesmos erros nas mesmas posições
+"""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from lexer import Lexer
+
+EXAMPLES = sorted((Path(__file__).parent / "exemplos").glob("*.naja"))
+
+# Pedaços de código combinados pelo fuzz: lexemas comuns, espaços, comentários,
+# números de borda, strings com escapes e os casos raros tratados pelo fallback
+_FRAGMENTS = [
+    "int", "x", "_y1", "fun", "return", "while", "ação", "π", "ℕ", "x²", "日本",
+    "0", "42", "3.14", "1.", "1..2", "1.2.3", "007", "12abc", "٣", "²", "1²",
+    '"a"', '"a\\nb"', '"\\"q\\""', "'s'", "'\\''", '"\\t\\\\"', '"\\x"', '""', '"ã"',
+    "+", "-", "*", "/", "%", "**", "**=", "+=", "-=", "->", "==", "!=", "<=", ">=",
+    "&&", "||", "!", "?", ":", "...", "..", ".", "@", "(", ")", "{", "}", "[", "]", ";", ",",
+    " ", "  ", "\t", "\n", "\r\n", "\n\n", "# comentário\n", "// linha\n", "/* bloco */",
+    "/* várias\nlinhas */", "/**/", "/*/", "*/",
+]
+
+# Finais que fazem o lexer parar com erro ou no fallback
+_ENDINGS = ["", '"sem fim', "'sem fim", "/* sem fim", "$", "`", "&", "|", "\\", "~", "\x00",
+            "# fim sem quebra", "/", "\n"]
+
+
+def _scan(source, legacy):
+    """Tokens (tipo, valor, linha, coluna) até o EOF, ou o erro levantado no caminho"""
+    lexer = Lexer(source, legacy=legacy)
+    tokens = []
+    try:
+        while True:
+            token = lexer.get_next_token()
+            tokens.append((token.type, token.value, token.line, token.column))
+            if token.type.name == "EOF":
+                return tokens, None
+    except Exception as error:
+        return tokens, str(error)
+
+
+def _assert_same(source):
+    expected = _scan(source, legacy=True)
+    assert _scan(source, legacy=False) == expected, repr(source)
+
+
+@pytest.mark.parametrize("example", EXAMPLES, ids=[example.name for example in EXAMPLES])
+def test_examples(example):
+    _assert_same(example.read_text(encoding="utf-8").lstrip("﻿"))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_fuzz(seed):
+    """Programas aleatórios de pedaços, com um final que pode ser um erro"""
+    rng = random.Random(seed)
+    for _ in range(100):
+        pieces = rng.choices(_FRAGMENTS, k=rng.randint(1, 40))
+        _assert_same("".join(pieces) + rng.choice(_ENDINGS))
+
+
+@pytest.mark.parametrize("source, message", [
+    ('int x = "sem fim', "linha 1"),
+    ("x = 1;\n  $", "Caractere inválido '$' na linha 2, coluna 3"),
+    ("a\n/* sem fim", "linha 2"),
+])
+def test_errors_have_the_same_position(source, message):
+    tokens, error = _scan(source, legacy=False)
+    assert error is not None and message in error
+    assert (tokens, error) == _scan(source, legacy=True)
+
+
+def test_eof_is_repeated():
+    """Depois do EOF, get_next_token continua devolvendo EOF na mesma posição"""
+    for legacy in (True, False):
+        lexer = Lexer("x\n", legacy=legacy)
+        tokens = [lexer.get_next_token() for _ in range(4)]
+        assert [token.type.name for token in tokens] == ["IDENTIFIER", "EOF", "EOF", "EOF"]
+        assert len({(token.line, token.column) for token in tokens[1:]}) == 1
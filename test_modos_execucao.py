@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paridade entre os modos de execução: cada exemplo em exemplos/ deve
+produzir a mesma saída no interpretador de árvore, com --closures e com --vm
+"""
+
+import os
+import re
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).parent
+EXAMPLES = sorted((ROOT_DIR / "exemplos").glob("*.naja"))
+
+# Exemplos cuja saída muda a cada execução (UUID e data atual)
+_NONDETERMINISTIC = {"test_basic_modern_features.naja"}
+
+_ELAPSED = re.compile(r"\nTempo de execução: [\d.]+ segundos\n$")
+# Reprs com endereço de memória (e a classe da função, que cada modo tem a sua)
+_ADDRESS = re.compile(r"<[\w.<>]+ (object )?at 0x[0-9a-f]+>")
+
+
+def _run(example, mode, work_dir):
+    """Saída normalizada de um exemplo em um modo"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    result = subprocess.run([sys.executable, str(ROOT_DIR / "najascript.py"), "--no-cache", *mode, str(example)],
+                            cwd=work_dir, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                            timeout=60, env=env)
+    return result.returncode, _ADDRESS.sub("<objeto>", _ELAPSED.sub("", result.stdout))
+
+
+@pytest.mark.parametrize("example", EXAMPLES, ids=[example.name for example in EXAMPLES])
+def test_modes_match_tree_walker(example, tmp_path):
+    """--closures e --vm têm o mesmo código de saída e a mesma saída do interpretador"""
+    if example.name in _NONDETERMINISTIC:
+        pytest.skip("saída não determinística")
+    expected = _run(example, [], tmp_path)
+    assert _run(example, ["--closures"], tmp_path) == expected
+    assert _run(example, ["--vm"], tmp_path) == expected
+
+
+def test_closures_and_vm_are_exclusive(tmp_path):
+    """--closures com --vm é erro de uso, em vez de um dos modos ganhar em silêncio"""
+    script = tmp_path / "vazio.naja"
+    script.write_text("println(1);\n", encoding="utf-8")
+    result = subprocess.run([sys.executable, str(ROOT_DIR / "najascript.py"), "--no-cache", "--closures", "--vm",
+                             str(script)], cwd=tmp_path, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 2
+    assert "--closures e --vm não podem ser usados juntos" in result.stderr
+    assert result.stdout == ""
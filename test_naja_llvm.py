@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do JIT com o MCJIT do llvmlite (--jit llvm): a saída é a do
+interpretador e o bytecode (com os seus caches inline) é gerado na thread
+principal, nunca na thread de compilação
+"""
+
+import sys
+import threading
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("llvmlite")
+
+from interpreter import Interpreter, NajaList
+from naja_bytecode import NajaBytecodeCompiler
+from naja_llvm import LLVMJITCompiler
+
+ROOT_DIR = Path(__file__).parent
+
+PROGRAM = """
+fun trapezio(float a, float b, int n) {
+    float h = (b - a) / n;
+    float soma = (a * a + b * b) / 2;
+    for (int i = 1; i < n; i = i + 1) {
+        float x = a + i * h;
+        soma += x * x;
+    }
+    return soma * h;
+}
+fun produto(any u, any v) {
+    float soma = 0.0;
+    for (int i = 0; i < u.length(); i = i + 1) {
+        soma += u.get(i) * v.get(i);
+    }
+    return soma;
+}
+fun media(any u, int n) {
+    if (n > 100) {
+        float soma = 0.0;
+        for (int i = 0; i < u.length(); i = i + 1) {
+            soma += u.get(i);
+        }
+        return soma / u.length();
+    }
+    return n * 0.5;
+}
+fun fatorial(int n) {
+    int r = 1;
+    while (n > 1) {
+        r = r * n;
+        n = n - 1;
+    }
+    return r;
+}
+list u = [];
+list v = [];
+for (int k = 0; k < 40; k = k + 1) {
+    u.add(k * 0.37 - 3.1);
+    v.add(1.0 / (k + 1));
+}
+float total = 0.0;
+int inteiros = 0;
+for (int i = 0; i < 60; i = i + 1) {
+    total += trapezio(-1.3, i * 0.1, 50 + i);
+    total += produto(u, v);
+    inteiros = inteiros + fatorial(i % 12);
+    total += media(u, i);
+}
+println(media(u, 1000));
+println(total);
+println(inteiros);
+println(produto(u, v));
+"""
+
+
+def _run(work_dir, *flags):
+    script = work_dir / "llvm.naja"
+    script.write_text(PROGRAM, encoding="utf-8")
+    result = subprocess.run([sys.executable, str(ROOT_DIR / "najascript.py"), "--no-cache", *flags, str(script)],
+                            cwd=work_dir, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0
+    assert "Erro" not in result.stdout
+    return result.stdout.split("\nTempo de execução")[0]
+
+
+def test_jit_llvm_matches_interpreter(tmp_path):
+    expected = _run(tmp_path)
+    assert _run(tmp_path, "--jit", "llvm", "--jit-threshold", "2") == expected
+
+
+def test_bytecode_is_generated_on_the_main_thread(monkeypatch):
+    """Com a compilação em segundo plano, bytecode e caches inline só são criados pela thread principal
+
+    Os MethodCall do if de 'media' nunca rodam antes da compilação: os seus
+    caches nascem quando o bytecode é gerado.
+    """
+    threads = []
+    compile_function = NajaBytecodeCompiler.compile_function
+    create_cache = Interpreter._method_cache
+
+    def recording_compile_function(self, declaration):
+        threads.append(threading.current_thread())
+        return compile_function(self, declaration)
+
+    def recording_method_cache(self, expr):
+        threads.append(threading.current_thread())
+        return create_cache(self, expr)
+
+    monkeypatch.setattr(NajaBytecodeCompiler, "compile_function", recording_compile_function)
+    monkeypatch.setattr(Interpreter, "_method_cache", recording_method_cache)
+    interpreter = Interpreter()
+    compiler = LLVMJITCompiler(interpreter, verbose=False)
+    interpreter.set_jit_compiler(compiler, threshold=2, background=True)
+    interpreter.interpret(interpreter.parse_file("llvm.naja", PROGRAM))
+    interpreter.tiered_jit.wait()
+
+    assert not hasattr(interpreter, "error")
+    assert threads and set(threads) == {threading.main_thread()}
+    for name, signature in (("produto", (NajaList, NajaList)), ("media", (NajaList, int))):
+        declaration = interpreter.globals.get(name).declaration
+        assert (declaration, signature) in compiler.compiled_functions
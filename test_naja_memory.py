@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do builtin memory(): o relatório funciona sem --mem-report e não
+esconde variáveis do programa chamadas memory
+"""
+
+from interpreter import NajaDict
+from conftest import make_interpreter
+
+
+def test_variable_shadows_builtin(run_naja, mode):
+    """Uma variável chamada memory (global ou local) esconde o builtin, como na versão sem ele"""
+    source = """
+int memory = 5;
+println(memory);
+memory = memory + 1;
+println(memory);
+fun f() {
+    int memory = 7;
+    return memory;
+}
+println(f());
+"""
+    assert run_naja(source, mode) == "5\n6\n7\n"
+
+
+def test_function_shadows_builtin(run_naja, mode):
+    """Uma função do programa chamada memory substitui o builtin"""
+    source = """
+fun memory() {
+    return "do programa";
+}
+println(memory());
+"""
+    assert run_naja(source, mode) == "do programa\n"
+
+
+def test_memory_without_report():
+    """Sem --mem-report, memory() mede o heap na hora e não passa a guardar ASTs"""
+    interpreter = make_interpreter()
+    interpreter.interpret(interpreter.parse_file("memoria.naja", "list l = [1, 2, 3];\ndict d = {};\n"))
+    summary = interpreter.globals.get("memory")()
+    assert isinstance(summary, NajaDict)
+    assert summary.get("total") > 0
+    assert interpreter.parsed_files is None
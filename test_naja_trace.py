@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da troca e restauração de atributos do runtime pela instrumentação
+(Instrumentation._patch/_restore), base do --trace-stats e do --mem-report
+"""
+
+from interpreter import Function
+from naja_trace import Instrumentation, TraceStats
+from conftest import make_interpreter
+
+
+class Alvo:
+    valor = "da classe"
+
+
+def test_restore_keeps_instance_attribute_that_is_none():
+    alvo = Alvo()
+    alvo.nulo = None
+    instrumentation = Instrumentation(make_interpreter("arvore"))
+    instrumentation._patch(alvo, "nulo", "trocado")
+    instrumentation._patch(alvo, "valor", "trocado")
+    assert (alvo.nulo, alvo.valor) == ("trocado", "trocado")
+
+    instrumentation._restore()
+    assert vars(alvo) == {"nulo": None}
+    assert alvo.valor == "da classe"
+
+
+def test_stop_restores_runtime(run_naja):
+    """Depois do stop(), Function e o interpretador voltam a ser os originais"""
+    call = Function.__call__
+    interpreter = make_interpreter("arvore")
+    trace = TraceStats(interpreter)
+    trace.start()
+    assert run_naja("fun f() {\n    return 1;\n}\nprintln(f());\n", interpreter=interpreter) == "1\n"
+    trace.stop()
+    assert Function.__call__ is call
+    assert "_load_module" not in vars(interpreter)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do cache de ASTs em __najacache__ (parse_cache.py): entradas velhas
+são ignoradas, entradas corrompidas caem em um parse novo e --no-cache
+não lê nem grava nada
+"""
+
+import os
+import sys
+import pickle
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import parse_cache
+from parse_cache import ParseCache, CACHE_DIR_NAME, _MAGIC
+
+ROOT_DIR = Path(__file__).parent
+
+
+class CountingPreprocess:
+    """Pré-processamento identidade que conta os parses de verdade"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, source):
+        self.calls += 1
+        return source
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "programa.naja"
+    path.write_text("int x = 1;\n", encoding="utf-8")
+    return path
+
+
+def _parse(path, pt=False, enabled=True):
+    """(valor inicial de x, houve parse) de uma leitura pelo cache"""
+    preprocess = CountingPreprocess()
+    ast = ParseCache(pt=pt, enabled=enabled).parse(str(path), path.read_text(encoding="utf-8"), preprocess)
+    return ast.statements[0].value.value, preprocess.calls == 1
+
+
+def _cache_file(path):
+    return Path(ParseCache().cache_path(str(path)))
+
+
+def test_second_parse_hits(script):
+    assert _parse(script) == (1, True)
+    assert _cache_file(script).exists()
+    assert _parse(script) == (1, False)
+
+
+def test_changed_source_is_reparsed(script):
+    _parse(script)
+    script.write_text("int x = 2;\n", encoding="utf-8")
+    assert _parse(script) == (2, True)
+    assert _parse(script) == (2, False)
+
+
+def test_pt_flag_is_part_of_the_key(script):
+    _parse(script, pt=False)
+    assert _parse(script, pt=True) == (1, True)
+    # A entrada agora é a do --pt: sem ele, o arquivo é parseado de novo
+    assert _parse(script, pt=False) == (1, True)
+
+
+def test_interpreter_fingerprint_is_part_of_the_key(script, monkeypatch):
+    _parse(script)
+    monkeypatch.setattr(parse_cache, "_interpreter_fingerprint", "outra versão do interpretador")
+    assert _parse(script) == (1, True)
+    assert _parse(script) == (1, False)
+
+
+def test_fingerprint_covers_frontend_modules():
+    """Mudar o lexer, o parser ou os nós da AST tem que invalidar o cache"""
+    for name in ("lexer.py", "parser_naja.py", "ast_nodes.py"):
+        assert name in parse_cache._FRONTEND_MODULES
+
+
+@pytest.mark.parametrize("payload", [
+    b"",  # pickle vazio
+    None,  # pickle truncado no meio
+    b"isto nao e um pickle",
+    b"cmodulo_inexistente\nClasse\n.",  # classe que não existe mais
+])
+def test_corrupt_entry_falls_back_to_parse(script, payload):
+    _parse(script)
+    cache_file = _cache_file(script)
+    data = cache_file.read_bytes()
+    header = len(_MAGIC) + len(ParseCache().cache_key(script.read_text(encoding="utf-8")))
+    if payload is None:
+        payload = data[header:header + (len(data) - header) // 2]
+    cache_file.write_bytes(data[:header] + payload)
+
+    assert _parse(script) == (1, True)
+    # A entrada é regravada inteira
+    assert _parse(script) == (1, False)
+
+
+def test_truncated_header_falls_back_to_parse(script):
+    _parse(script)
+    _cache_file(script).write_bytes(_MAGIC[:3])
+    assert _parse(script) == (1, True)
+
+
+def test_unreadable_cache_dir_does_not_fail(script):
+    """Um arquivo no lugar do diretório do cache só impede a gravação"""
+    (script.parent / CACHE_DIR_NAME).write_text("não é um diretório", encoding="utf-8")
+    assert _parse(script) == (1, True)
+    assert _parse(script) == (1, True)
+
+
+def test_disabled_cache_neither_reads_nor_writes(script):
+    _parse(script, enabled=False)
+    assert not (script.parent / CACHE_DIR_NAME).exists()
+
+    # Entrada válida para o código atual, mas com outra AST: desligado, o cache não a lê
+    cache_file = _cache_file(script)
+    other = ParseCache(enabled=False).parse(None, "int x = 3;\n", CountingPreprocess())
+    cache_file.parent.mkdir()
+    cache_file.write_bytes(_MAGIC + ParseCache().cache_key(script.read_text(encoding="utf-8")) + pickle.dumps(other))
+    assert _parse(script) == (3, False)
+    before = cache_file.read_bytes()
+    assert _parse(script, enabled=False) == (1, True)
+    assert cache_file.read_bytes() == before
+
+
+def test_no_cache_flag(tmp_path, script):
+    """najascript.py --no-cache não cria o __najacache__; sem a flag, cria"""
+    def run(*flags):
+        result = subprocess.run([sys.executable, str(ROOT_DIR / "najascript.py"), *flags, str(script)],
+                                cwd=tmp_path, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                                timeout=60)
+        assert result.returncode == 0
+        assert "Erro" not in result.stdout
+
+    run("--no-cache")
+    assert not (tmp_path / CACHE_DIR_NAME).exists()
+    run()
+    assert (tmp_path / CACHE_DIR_NAME / "programa.naja.ast").exists()
+    for leftover in os.listdir(tmp_path / CACHE_DIR_NAME):
+        assert not leftover.endswith(".tmp")
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da resolução estática de variáveis (resolver.py), dos
+SlotEnvironment e do pool de frames: a busca por (profundidade, slot) e a
+reutilização de ambientes têm que dar os mesmos resultados da busca por
+nome do interpretador original, nos três modos
+"""
+
+import pytest
+
+from ast_nodes import walk, Variable, FunctionDeclaration
+from environment import Environment, SlotEnvironment, EMPTY_SLOT
+from lexer import Lexer
+from parser_naja import Parser
+from resolver import Resolver
+from interpreter import FRAME_POOL_LIMIT
+from conftest import make_interpreter
+
+
+def _resolved(source):
+    """AST de 'source' anotada pelo Resolver"""
+    return Resolver().resolve(Parser(Lexer(source)).parse())
+
+
+def _function(ast, name):
+    return next(node for node in walk(ast.statements)
+                if isinstance(node, FunctionDeclaration) and node.name == name)
+
+
+def test_shadowing(run_naja, mode):
+    """Declarações em função, if e for escondem a global só dentro do seu escopo"""
+    source = """
+int x = 1;
+fun f() {
+    int x = 2;
+    if (true) {
+        int x = 3;
+        println(x);
+    }
+    println(x);
+    return x;
+}
+println(f());
+println(x);
+for (int x = 10; x < 12; x = x + 1) {
+    println(x);
+}
+println(x);
+"""
+    assert run_naja(source, mode) == "3\n2\n2\n1\n10\n11\n1\n"
+
+
+def test_closures_capture_loop_variables(run_naja, mode):
+    """O for tem um único ambiente: as closures criadas no corpo veem o último valor"""
+    source = """
+list fs = [];
+for (int i = 0; i < 3; i = i + 1) {
+    fun get() {
+        return i;
+    }
+    fs.add(get);
+}
+for (int k = 0; k < 3; k = k + 1) {
+    var g = fs.get(k);
+    println(g());
+}
+fun fabrica() {
+    list out = [];
+    int j = 0;
+    while (j < 3) {
+        int v = j * 10;
+        fun ler() {
+            return v;
+        }
+        out.add(ler);
+        j = j + 1;
+    }
+    return out;
+}
+list ls = fabrica();
+var l0 = ls.get(0);
+println(l0());
+"""
+    assert run_naja(source, mode) == "3\n3\n3\n20\n"
+
+
+def test_closures_keep_their_own_frame(run_naja, mode):
+    """Cada chamada de contador() tem o seu n"""
+    source = """
+fun contador() {
+    int n = 0;
+    fun inc() {
+        n = n + 1;
+        return n;
+    }
+    return inc;
+}
+var c1 = contador();
+var c2 = contador();
+c1();
+c1();
+println(c1());
+println(c2());
+"""
+    assert run_naja(source, mode) == "3\n1\n"
+
+
+def test_global_and_local_assignment(run_naja, mode):
+    """Atribuição sem declaração altera a global; com declaração, fica na função"""
+    source = """
+int total = 0;
+int y = 100;
+fun soma(int n) {
+    total = total + n;
+    int y = n;
+    y = y * 2;
+    return y;
+}
+println(soma(3));
+println(soma(4));
+println(total);
+println(y);
+"""
+    assert run_naja(source, mode) == "6\n8\n7\n100\n"
+
+
+def test_name_declared_only_in_dead_code(run_naja, mode):
+    """Um slot nunca preenchido (EMPTY_SLOT) cai na busca por nome, como antes"""
+    source = """
+int y = 10;
+fun g() {
+    while (false) {
+        int y = 1;
+    }
+    return y;
+}
+fun h() {
+    while (false) {
+        int y = 1;
+    }
+    y = 5;
+}
+println(g());
+h();
+println(y);
+"""
+    assert run_naja(source, mode) == "10\n5\n"
+
+
+def test_name_declared_only_in_dead_branch(run_naja, mode):
+    """Um nome declarado só em um ramo de if não existe depois dele"""
+    source = """
+fun f() {
+    if (false) {
+        int z = 1;
+    }
+    return z;
+}
+println(f());
+"""
+    output = run_naja(source, mode)
+    assert "Erro durante a interpretação" in output
+    assert "'z' não definida" in output
+
+
+def test_branch_declarations_are_not_function_slots():
+    """Variáveis de um ramo de if ganham o escopo do ramo, não um slot da função"""
+    ast = _resolved("""
+fun f(int a) {
+    int b = a;
+    while (false) {
+        int c = 1;
+    }
+    if (a > 0) {
+        int d = b;
+    }
+    return d;
+}
+""")
+    function = _function(ast, "f")
+    assert function.scope == {"a": 0, "b": 1, "c": 2}
+    assert function.body[2].then_scope == {"d": 0}
+    # O 'd' do return não é resolvido: fica com a busca por nome
+    ret = [node for node in walk(function.body[3]) if isinstance(node, Variable)]
+    assert [(node.name, node.depth, node.slot) for node in ret] == [("d", None, None)]
+    # O 'b' dentro do if sobe um nível até o slot da função
+    inner = [node for node in walk(function.body[2].then_branch) if isinstance(node, Variable)]
+    assert [(node.name, node.depth, node.slot) for node in inner] == [("b", 1, 1)]
+
+
+def test_global_scope_stays_dynamic():
+    """Referências a globais não são anotadas"""
+    ast = _resolved("int g = 1;\nfun f() {\n    return g;\n}\n")
+    variables = [node for node in walk(ast.statements) if isinstance(node, Variable)]
+    assert [(node.name, node.depth, node.slot) for node in variables] == [("g", None, None)]
+
+
+def test_empty_slot_is_not_defined():
+    """is_defined/get/assign de um slot vazio consultam o ambiente pai"""
+    parent = Environment()
+    env = SlotEnvironment(parent, {"a": 0, "b": 1})
+    assert env.slots == [EMPTY_SLOT, EMPTY_SLOT]
+    assert not env.is_defined("a")
+    with pytest.raises(RuntimeError):
+        env.get("a")
+    with pytest.raises(RuntimeError):
+        env.assign("a", 1)
+
+    parent.define("a", 1)
+    assert env.is_defined("a")
+    assert env.get("a") == 1
+    env.assign("a", 2)
+    assert parent.get("a") == 2
+    assert env.slots[0] is EMPTY_SLOT
+
+    env.define("a", 3)
+    assert env.get("a") == 3
+    assert parent.get("a") == 2
+    env.assign("a", 4)
+    assert env.slots[0] == 4
+    assert parent.get("a") == 2
+
+
+def test_dynamic_names_leave_the_slot():
+    """Constantes e funções vão para os dicionários e o slot fica vazio"""
+    env = SlotEnvironment(Environment(), {"c": 0, "f": 1})
+    env.define("c", 1)
+    env.define("c", 2, is_const=True)
+    assert env.slots[0] is EMPTY_SLOT
+    assert env.get("c") == 2
+    with pytest.raises(RuntimeError):
+        env.assign("c", 3)
+    assert not env.is_reusable()
+
+    env.define("f", len)
+    assert env.slots[1] is EMPTY_SLOT
+    assert env.get("f") is len
+    assert env.is_defined("f")
+
+
+def _defined(source, mode):
+    """Interpretador do modo pedido depois de executar 'source'"""
+    interpreter = make_interpreter(mode)
+    interpreter.interpret(interpreter.parse_file("pool.naja", source))
+    return interpreter
+
+
+def test_escaping_closure_disables_pooling(mode):
+    """Uma função que cria closures não reutiliza frames: cada closure fica com o seu"""
+    interpreter = _defined("""
+fun outer(int a) {
+    int b = a * 10;
+    fun inner() {
+        return a + b;
+    }
+    return inner;
+}
+""", mode)
+    outer = interpreter.globals.get("outer")
+    assert not outer.declaration.pool_frames
+    first = outer(interpreter, [1])
+    second = outer(interpreter, [2])
+    assert first(interpreter, []) == 11
+    assert second(interpreter, []) == 22
+    assert first(interpreter, []) == 11
+    assert not outer._frame_pool
+
+
+def test_closure_from_called_function_outlives_pooled_frame(mode):
+    """Uma closure criada por outra função, chamada de dentro de um frame do pool, não o referencia"""
+    interpreter = _defined("""
+fun fazer(int v) {
+    fun ler() {
+        return v;
+    }
+    return ler;
+}
+fun usar(int n) {
+    int dobro = n * 2;
+    return fazer(dobro);
+}
+""", mode)
+    usar = interpreter.globals.get("usar")
+    assert usar.declaration.pool_frames
+    closures = [usar(interpreter, [n]) for n in range(5)]
+    assert len(usar._frame_pool) == 1
+    assert [closure(interpreter, []) for closure in closures] == [0, 2, 4, 6, 8]
+
+
+def test_recursion_reenters_pooled_function(mode):
+    """Chamadas recursivas além do tamanho do pool mantêm as suas variáveis"""
+    interpreter = _defined("""
+fun depth(int n) {
+    int mine = n * 2;
+    if (n > 0) {
+        int sub = depth(n - 1);
+        if (mine != n * 2) {
+            return -1000;
+        }
+        return sub + mine;
+    }
+    return mine;
+}
+""", mode)
+    depth = interpreter.globals.get("depth")
+    assert depth.declaration.pool_frames
+    n = FRAME_POOL_LIMIT * 2
+    expected = n * (n + 1)
+    assert depth(interpreter, [n]) == expected
+    assert len(depth._frame_pool) == FRAME_POOL_LIMIT
+    # A segunda rodada usa frames do pool e ainda cria novos para o restante da pilha
+    assert depth(interpreter, [n]) == expected
+    assert depth(interpreter, [3]) == 12
+
+
+def test_exception_unwinds_through_pooled_frames(mode):
+    """Frames liberados por um erro de execução voltam ao pool vazios para a próxima chamada"""
+    interpreter = _defined("""
+int marca = 0;
+fun desce(int n, bool lancar) {
+    bool definir = lancar;
+    while (definir) {
+        int marca = n;
+        definir = false;
+    }
+    if (n == 0) {
+        if (lancar) {
+            return variavel_inexistente;
+        }
+        return marca;
+    }
+    return desce(n - 1, lancar) + marca;
+}
+""", mode)
+    desce = interpreter.globals.get("desce")
+    assert desce.declaration.pool_frames
+    with pytest.raises(RuntimeError, match="variavel_inexistente"):
+        desce(interpreter, [10, True])
+    assert desce._frame_pool
+    assert interpreter.environment is interpreter.globals
+    # Sem a declaração, 'marca' é a global em todos os níveis (slots não herdados da chamada anterior)
+    assert desce(interpreter, [10, False]) == 0
+    interpreter.globals.assign("marca", 1)
+    assert desce(interpreter, [10, False]) == 11
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compilação em camadas (tiering) do NajaScript
+
+Toda função começa interpretada. O TieredJIT conta as chamadas de cada
+declaração de função (em Function.__call__) e as iterações dos laços do seu
+corpo (back-edges, contadas nos três modos: pelo interpretador de árvore,
+pelas closures de --closures e pelo opcode LOOP de --vm). Quando a soma
+passa do limite, a declaração é enviada ao compilador JIT configurado
+(JITCompiler com Numba, CJITCompiler com gcc ou LLVMJITCompiler com o
+MCJIT do llvmlite), se o is_optimizable dele aceitá-la para os tipos dos
+argumentos daquela chamada.
+
+A compilação roda em uma thread de fundo, então o interpretador nunca
+espera por ela: as chamadas seguem interpretadas até a versão compilada
+ficar pronta, e a primeira chamada depois disso instala uma GuardedFunction
+em Function.compiled_version. Não há substituição no meio de uma chamada
+(OSR): uma função chamada uma única vez com um laço quente só é trocada
+se for chamada de novo.
+
+Guardas e desotimização: cada versão compilada é uma especialização para
+uma assinatura (a tupla dos tipos dos argumentos, como (int, int) ou
+(float, float)), registrada quando foi compilada. A GuardedFunction confere
+a assinatura de cada chamada (e se os int cabem em 64 bits) e só chama
+código nativo compatível. Uma assinatura nova vira outra especialização,
+até MAX_SPECIALIZATIONS; as demais falhas de guarda fazem a chamada ser
+interpretada (GuardFailure). Se as falhas passarem de DEOPT_LIMIT e dos
+acertos, a função é desotimizada de vez e não paga mais nada pelo JIT.
+
+Compilação em lote: com batch=True (e um compilador que tenha
+compile_module, como o CJITCompiler), cada módulo interpretado tem todas as
+funções aceitas pelo compilador enviadas de uma vez, sem esperar que
+fiquem quentes, para os tipos declarados dos parâmetros. O lote vira uma
+única biblioteca em que as funções se chamam diretamente; outras
+assinaturas seguem o caminho normal das especializações.
+
+O estado de cada função (camada, especializações, contadores e tempos)
+pode ser consultado com stats() ou report().
+"""
+
+import time
+import queue
+import threading
+
+from ast_nodes import WhileStatement, ForStatement, IfStatement, BlockStatement, FunctionDeclaration
+
+# Camadas de uma função (e de cada especialização)
+TIER_INTERPRETED = "interpretada"
+TIER_QUEUED = "na fila"
+TIER_COMPILING = "compilando"
+TIER_COMPILED = "compilada"
+TIER_REJECTED = "rejeitada"         # is_optimizable recusou a declaração
+TIER_FAILED = "falhou"              # o compilador lançou erro ou não retornou código
+TIER_DEOPTIMIZED = "desotimizada"   # falhas de guarda demais: só interpretada
+
+DEFAULT_THRESHOLD = 1000
+MAX_SPECIALIZATIONS = 4  # Assinaturas compiladas (ou tentadas) por função
+DEOPT_LIMIT = 100        # Falhas de guarda para desotimizar, se também superarem os acertos
+SAMPLE_CALLS = 16        # Chamadas examinadas em busca de tipos novos a cada pedido recusado
+
+# Faixa dos int passados ao código nativo (o ctypes trunca valores maiores)
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+class GuardFailure(Exception):
+    """Os argumentos não passaram pelas guardas: a chamada deve ser interpretada"""
+    def __init__(self, deoptimize=False):
+        super().__init__()
+        self.deoptimize = deoptimize  # A função foi desotimizada: remover compiled_version
+
+
+class Specialization:
+    """Versão compilada de uma função para uma assinatura de argumentos"""
+    __slots__ = ('signature', 'tier', 'error', 'queued_at', 'started_at', 'finished_at')
+
+    def __init__(self, signature):
+        self.signature = signature
+        self.tier = TIER_QUEUED
+        self.error = None
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+
+    def compile_time(self):
+        """Segundos gastos pelo compilador"""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+class GuardedFunction:
+    """Código nativo de uma função protegido por guardas de tipo dos argumentos
+
+    É o valor instalado em Function.compiled_version. natives mapeia cada
+    assinatura compilada para (função nativa, posições dos argumentos int).
+    """
+    __slots__ = ('jit', 'profile', 'natives', 'hits')
+
+    def __init__(self, jit, profile):
+        self.jit = jit
+        self.profile = profile
+        self.natives = {}
+        self.hits = 0
+
+    def __call__(self, *arguments):
+        signature = tuple(map(type, arguments))
+        entry = self.natives.get(signature)
+        if entry is not None:
+            native, int_positions = entry
+            for position in int_positions:
+                value = arguments[position]
+                if value < _INT64_MIN or value > _INT64_MAX:
+                    break
+            else:
+                self.hits += 1
+                try:
+                    return native(*arguments)
+                except Exception:
+                    # O código nativo não tratou estes valores: conta como falha de guarda
+                    pass
+        return self.jit.guard_failed(self.profile, signature)
+
+
+class FunctionProfile:
+    """Contadores e estado de compilação de uma declaração de função"""
+    __slots__ = ('declaration', 'environment', 'calls', 'back_edges', 'tier', 'guarded',
+                 'specializations', 'guard_failures', 'hot_at_calls', 'next_request', 'samples_left')
+
+    def __init__(self, declaration, guarded_factory, threshold):
+        self.declaration = declaration
+        self.environment = None   # Ambiente de definição, passado ao compilador
+        self.calls = 0
+        self.back_edges = 0
+        self.tier = TIER_INTERPRETED
+        self.guarded = guarded_factory(self)
+        self.specializations = {}  # {assinatura: Specialization}
+        self.guard_failures = 0
+        self.hot_at_calls = None   # Chamadas quando o limite foi atingido
+        self.next_request = threshold  # Contagem para o próximo pedido de compilação
+        self.samples_left = SAMPLE_CALLS
+
+    @property
+    def name(self):
+        return self.declaration.name
+
+    def queue_time(self):
+        """Segundos entre o primeiro pedido de compilação e o início dele"""
+        for specialization in self.specializations.values():
+            if specialization.started_at is not None:
+                return specialization.started_at - specialization.queued_at
+        return None
+
+    def compile_time(self):
+        """Segundos gastos pelo compilador em todas as especializações"""
+        times = [s.compile_time() for s in self.specializations.values() if s.compile_time() is not None]
+        return sum(times) if times else None
+
+    def error(self):
+        """Primeiro erro de compilação, se houver"""
+        for specialization in self.specializations.values():
+            if specialization.error:
+                return specialization.error
+        return None
+
+
+class TieredJIT:
+    """Detecta funções quentes e as compila em segundo plano com um compilador JIT"""
+
+    def __init__(self, interpreter, compiler, threshold=DEFAULT_THRESHOLD, background=True, batch=False):
+        self.interpreter = interpreter
+        self.compiler = compiler
+        self.threshold = threshold
+        self.background = background
+        self.batch = batch and hasattr(compiler, "compile_module")
+        self._profiles = {}  # {declaração: FunctionProfile}
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()  # Estado das especializações (thread principal x compilação)
+
+    # ------------------------------------------------------------------
+    # Contagem (chamado pelo interpretador)
+    # ------------------------------------------------------------------
+
+    def profile_for(self, declaration):
+        """Perfil de uma declaração, criado na primeira chamada
+
+        Os laços do corpo (fora de funções aninhadas) são registrados em
+        interpreter.loop_profiles para que suas iterações contem como
+        back-edges desta função.
+        """
+        profile = self._profiles.get(declaration)
+        if profile is None:
+            profile = self._profiles[declaration] = FunctionProfile(
+                declaration, lambda profile: GuardedFunction(self, profile), self.threshold)
+            for loop in _loops_of(declaration.body):
+                self.interpreter.loop_profiles[loop] = profile
+        return profile
+
+    def record_call(self, function, arguments):
+        """Conta uma chamada interpretada e instala a versão compilada se já estiver pronta"""
+        profile = self.profile_for(function.declaration)
+        profile.calls += 1
+
+        tier = profile.tier
+        if tier is TIER_COMPILED:
+            function.compiled_version = profile.guarded
+        elif ((tier is TIER_INTERPRETED or tier is TIER_REJECTED)
+              and profile.calls + profile.back_edges >= profile.next_request):
+            # Rejeitada para outros tipos: procura tipos novos em algumas chamadas,
+            # em intervalos que dobram
+            signature = _signature(arguments)
+            if signature not in profile.specializations and len(profile.specializations) < MAX_SPECIALIZATIONS:
+                profile.next_request *= 2
+                if profile.hot_at_calls is None:
+                    profile.hot_at_calls = profile.calls
+                profile.environment = function.environment
+                self._request(profile, signature)
+            else:
+                profile.samples_left -= 1
+                if profile.samples_left <= 0:
+                    profile.next_request *= 2
+                    profile.samples_left = SAMPLE_CALLS
+
+    def guard_failed(self, profile, signature):
+        """Trata uma chamada que não passou pelas guardas; sempre lança GuardFailure
+
+        Uma assinatura nova é enviada ao compilador (a chamada é interpretada
+        enquanto isso). As demais falhas são contadas e, se passarem de
+        DEOPT_LIMIT e dos acertos, a função é desotimizada.
+        """
+        if profile.tier is TIER_DEOPTIMIZED:
+            raise GuardFailure(deoptimize=True)
+
+        specialization = profile.specializations.get(signature)
+        if specialization is None and len(profile.specializations) < MAX_SPECIALIZATIONS:
+            specialization = self._request(profile, signature)
+        if specialization is not None and specialization.tier in (TIER_QUEUED, TIER_COMPILING):
+            raise GuardFailure()
+
+        profile.guard_failures += 1
+        if profile.guard_failures >= DEOPT_LIMIT and profile.guard_failures > profile.guarded.hits:
+            with self._lock:
+                profile.tier = TIER_DEOPTIMIZED
+                profile.guarded.natives.clear()
+            raise GuardFailure(deoptimize=True)
+        raise GuardFailure()
+
+    def _request(self, profile, signature):
+        """Cria a especialização de uma assinatura e a envia ao compilador, se ele a aceitar"""
+        specialization = Specialization(signature)
+        with self._lock:
+            profile.specializations[signature] = specialization
+            if not self.compiler.is_optimizable(profile.declaration, signature):
+                specialization.tier = TIER_REJECTED
+            self._update_tier(profile)
+        if specialization.tier is not TIER_REJECTED:
+            self._submit(self._compile, profile, specialization)
+        return specialization
+
+    def compile_module(self, statements):
+        """Envia ao compilador, em um único lote, as funções de um módulo que ele aceitar
+
+        Chamado pelo interpretador antes de executar cada programa ou módulo
+        quando batch=True. Cada função aceita ganha a especialização dos
+        tipos declarados, na fila até o lote ficar pronto.
+        """
+        if not self.batch:
+            return
+        declarations = [stmt for stmt in statements if isinstance(stmt, FunctionDeclaration)]
+        accepted = self.compiler.specialize_module(declarations)
+        entries = []
+        with self._lock:
+            for declaration, (signature, _) in accepted.items():
+                profile = self.profile_for(declaration)
+                if signature not in profile.specializations:
+                    specialization = profile.specializations[signature] = Specialization(signature)
+                    self._update_tier(profile)
+                    entries.append((profile, specialization))
+        if entries:
+            self._submit(self._compile_batch, entries)
+
+    def _submit(self, job, *arguments):
+        """Executa uma compilação na thread de fundo (ou já, com background=False)"""
+        if not self.background:
+            job(*arguments)
+            return
+        self._queue.put((job, arguments))
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run_worker, name="naja-jit", daemon=True)
+            self._worker.start()
+
+    def _update_tier(self, profile):
+        """Camada da função a partir das especializações (com self._lock adquirido)"""
+        if profile.tier is TIER_DEOPTIMIZED:
+            return
+        tiers = [specialization.tier for specialization in profile.specializations.values()]
+        for tier in (TIER_COMPILED, TIER_COMPILING, TIER_QUEUED, TIER_FAILED, TIER_REJECTED):
+            if tier in tiers:
+                profile.tier = tier
+                return
+        profile.tier = TIER_INTERPRETED
+
+    # ------------------------------------------------------------------
+    # Compilação
+    # ------------------------------------------------------------------
+
+    def _run_worker(self):
+        """Laço da thread de fundo: compila as especializações na ordem dos pedidos"""
+        while True:
+            job, arguments = self._queue.get()
+            try:
+                job(*arguments)
+            finally:
+                self._queue.task_done()
+
+    def _compile(self, profile, specialization):
+        with self._lock:
+            specialization.tier = TIER_COMPILING
+            self._update_tier(profile)
+        specialization.started_at = time.perf_counter()
+        signature = specialization.signature
+        try:
+            native = self.compiler.compile_function(profile.declaration, profile.environment, signature)
+        except Exception as e:
+            native = None
+            specialization.error = str(e)
+        specialization.finished_at = time.perf_counter()
+
+        with self._lock:
+            self._finish(profile, specialization, native)
+
+    def _compile_batch(self, entries):
+        """Compila um lote [(perfil, especialização)] com uma chamada a compile_module"""
+        with self._lock:
+            for profile, specialization in entries:
+                specialization.tier = TIER_COMPILING
+                self._update_tier(profile)
+        started_at = time.perf_counter()
+        try:
+            natives = self.compiler.compile_module([profile.declaration for profile, _ in entries])
+            error = None
+        except Exception as e:
+            natives = {}
+            error = str(e)
+        finished_at = time.perf_counter()
+
+        with self._lock:
+            for profile, specialization in entries:
+                # O tempo do lote inteiro aparece em cada função dele
+                specialization.started_at = started_at
+                specialization.finished_at = finished_at
+                signature, native = natives.get(profile.declaration, (None, None))
+                if signature != specialization.signature:
+                    native = None
+                    specialization.error = error or "Função fora do lote compilado"
+                self._finish(profile, specialization, native)
+
+    def _finish(self, profile, specialization, native):
+        """Registra o resultado de uma compilação (com self._lock adquirido)"""
+        signature = specialization.signature
+        if native is None:
+            specialization.tier = TIER_FAILED
+        else:
+            specialization.tier = TIER_COMPILED
+            if profile.tier is not TIER_DEOPTIMIZED:
+                int_positions = tuple(i for i, arg_type in enumerate(signature) if arg_type is int)
+                profile.guarded.natives[signature] = (native, int_positions)
+        self._update_tier(profile)
+
+    def wait(self):
+        """Espera as compilações pendentes terminarem"""
+        if self._worker is not None:
+            self._queue.join()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def stats(self):
+        """Estado de cada função já chamada, das mais quentes para as mais frias"""
+        result = []
+        for profile in sorted(self._profiles.values(), key=lambda p: -(p.calls + p.back_edges)):
+            result.append({
+                "name": profile.name,
+                "tier": profile.tier,
+                "calls": profile.calls,
+                "back_edges": profile.back_edges,
+                "native_calls": profile.guarded.hits,
+                "guard_failures": profile.guard_failures,
+                "hot_at_calls": profile.hot_at_calls,
+                "queue_time": profile.queue_time(),
+                "compile_time": profile.compile_time(),
+                "error": profile.error(),
+                "specializations": [{
+                    "signature": tuple(arg_type.__name__ for arg_type in specialization.signature),
+                    "tier": specialization.tier,
+                    "compile_time": specialization.compile_time(),
+                    "error": specialization.error,
+                } for specialization in profile.specializations.values()],
+            })
+        return result
+
+    def report(self):
+        """Linhas legíveis com o estado de cada função e de suas especializações"""
+        lines = [f"{'função':20} {'camada':12} {'chamadas':>9} {'back-edges':>11} {'nativas':>9} "
+                 f"{'falhas':>7} {'fila ms':>8} {'compilação ms':>14}"]
+        for entry in self.stats():
+            lines.append(f"{entry['name']:20} {entry['tier']:12} {entry['calls']:9d} {entry['back_edges']:11d} "
+                         f"{entry['native_calls']:9d} {entry['guard_failures']:7d} "
+                         f"{_milliseconds(entry['queue_time']):>8} {_milliseconds(entry['compile_time']):>14}")
+            for specialization in entry["specializations"]:
+                line = (f"  ({', '.join(specialization['signature'])}) {specialization['tier']}"
+                        f" {_milliseconds(specialization['compile_time'])} ms")
+                if specialization["error"]:
+                    line += f"  {specialization['error'].splitlines()[0]}"
+                lines.append(line)
+        cache = getattr(self.compiler, "cache", None)
+        if cache is not None:
+            lines.append(f"cache em disco: {cache.hits} acertos, {cache.misses} falhas ({cache.cache_dir})")
+        return lines
+
+
+def _signature(arguments):
+    """Assinatura de uma chamada: a tupla dos tipos dos argumentos"""
+    if not isinstance(arguments, (list, tuple)):
+        arguments = [arguments]
+    return tuple(map(type, arguments))
+
+
+def _milliseconds(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def _loops_of(statements):
+    """Laços while/for de um corpo de função, sem entrar em funções aninhadas"""
+    loops = []
+    for stmt in statements:
+        if isinstance(stmt, (WhileStatement, ForStatement)):
+            loops.append(stmt)
+            loops.extend(_loops_of(stmt.body))
+        elif isinstance(stmt, IfStatement):
+            loops.extend(_loops_of(stmt.then_branch))
+            for _, body in stmt.elif_branches or []:
+                loops.extend(_loops_of(body))
+            loops.extend(_loops_of(stmt.else_branch or []))
+        elif isinstance(stmt, BlockStatement):
+            loops.extend(_loops_of(stmt.statements))
+    return loops